@@ -0,0 +1,11 @@
+"""
+Performance benchmarks for the prediction, backtest, grading and reporting hot paths.
+
+The suite seeds a synthetic OHLCV universe into mongomock or a disposable mongod
+and writes wall time, throughput and peak RSS per benchmark as JSON, so runs of
+two commits can be compared:
+
+    cd src
+    python -m benchmarks.run_benchmarks --tier tiny --output /tmp/before.json
+    python -m benchmarks.run_benchmarks --tier tiny --compare /tmp/before.json
+"""
@@ -0,0 +1,114 @@
+"""
+harness.py
+
+Timing, peak memory and comparison helpers for the benchmark suite.
+
+Peak RSS is read from VmHWM in /proc/self/status, and the high-water mark is reset
+before every benchmark through /proc/self/clear_refs, so each result holds its own
+peak. Where /proc is not available, the process-wide ru_maxrss is reported instead.
+"""
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Tuple, Union
+
+PROC_STATUS = '/proc/self/status'
+PROC_CLEAR_REFS = '/proc/self/clear_refs'
+
+# Throughput drop (fraction) reported as a regression by compare_runs
+DEFAULT_TOLERANCE = 0.10
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Outcome of one benchmark.
+
+    Attributes:
+        name (str): Benchmark name.
+        seconds (float): Wall time.
+        items (int): Units processed (symbols, trades, scores...).
+        unit (str): Name of the unit, e.g. 'symbols'.
+        peak_rss_mb (float): Peak resident memory while it ran.
+        extra (dict): Other counts, e.g. {'trades': 12}.
+    """
+    name: str
+    seconds: float
+    items: int
+    unit: str
+    peak_rss_mb: float
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Items per second."""
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        """JSON-ready dict, with the throughput and the per-second rate of every extra count."""
+        rates = {k: v / self.seconds if self.seconds > 0 else 0.0 for k, v in self.extra.items()}
+        return {**asdict(self), 'throughput': self.throughput, 'rates': rates}
+
+
+def reset_peak_rss() -> bool:
+    """Resets the kernel's peak RSS mark for this process. Returns False if unsupported."""
+    try:
+        with open(PROC_CLEAR_REFS, 'w', encoding='utf-8') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB (since the last reset, where supported)."""
+    try:
+        with open(PROC_STATUS, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KB elsewhere
+    return max_rss / 1024 / 1024 if sys.platform == 'darwin' else max_rss / 1024
+
+
+def measure(name: str, unit: str, func: Callable[[], Union[int, Tuple[int, Dict[str, float]]]]) -> BenchmarkResult:
+    """
+    Runs func once and times it.
+
+    Args:
+        name: Benchmark name.
+        unit: Name of the units func processes.
+        func: Callable returning the number of units, or (units, extra counts).
+    """
+    reset_peak_rss()
+    start = time.perf_counter()
+    outcome = func()
+    seconds = time.perf_counter() - start
+    items, extra = outcome if isinstance(outcome, tuple) else (outcome, {})
+    return BenchmarkResult(name, seconds, int(items), unit, peak_rss_mb(), dict(extra))
+
+
+def compare_runs(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compares two benchmark runs (as written by run_benchmarks) benchmark by benchmark.
+
+    Returns:
+        list: One line per benchmark present in both runs, with the throughput and peak
+        RSS ratios, marked REGRESSION when throughput fell by more than tolerance.
+    """
+    before = {r['name']: r for r in baseline.get('results', [])}
+    lines = []
+    for result in current.get('results', []):
+        old = before.get(result['name'])
+        if old is None:
+            continue
+        speed = result['throughput'] / old['throughput'] if old['throughput'] else float('inf')
+        memory = result['peak_rss_mb'] / old['peak_rss_mb'] if old['peak_rss_mb'] else float('inf')
+        flag = '  REGRESSION' if speed < 1 - tolerance else ''
+        lines.append(f"{result['name']:<16} throughput x{speed:.2f} ({old['throughput']:.1f} -> "
+                     f"{result['throughput']:.1f} {result['unit']}/s), peak RSS x{memory:.2f}{flag}")
+    return lines
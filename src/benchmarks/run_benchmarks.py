@@ -0,0 +1,238 @@
+"""
+run_benchmarks.py
+
+CLI for the benchmark suite. Seeds a synthetic universe, runs the selected
+benchmarks against it and writes one JSON document per run:
+
+    {"commit": ..., "universe": {...}, "results": [{"name", "seconds", "items", "unit",
+     "throughput", "peak_rss_mb", "extra", "rates"}, ...]}
+
+Without --mongo-uri the universe lives in mongomock, which keeps every document as
+Python objects; the 1k+ symbol tiers need a disposable mongod instead, e.g.
+`docker run --rm -p 27018:27017 mongo` and `--mongo-uri mongodb://localhost:27018`.
+The benchmark database is dropped before and after the run.
+
+Usage:
+    cd src
+    python -m benchmarks.run_benchmarks --tier tiny
+    python -m benchmarks.run_benchmarks --tier small --mongo-uri mongodb://localhost:27018 \
+        --only predict,grading --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+from pymongo import MongoClient
+
+from benchmarks.harness import BenchmarkResult, compare_runs, measure
+from benchmarks.synthetic import (
+    SCORE_FUTURE_BARS, SYNTHETIC_SCORE_VERSION, SyntheticUniverse, seed_database, seed_trade_scores
+)
+from bluehorseshoe.analysis.backtest import BacktestConfig, BacktestOptions, Backtester
+from bluehorseshoe.analysis.grading_engine import GradingEngine
+from bluehorseshoe.analysis.strategy import SwingTrader
+from bluehorseshoe.core.config import get_settings
+from bluehorseshoe.data.historical_data import get_technical_indicators
+from bluehorseshoe.reporting.html_reporter import HTMLReporter
+from bluehorseshoe.reporting.report_generator import ReportWriter
+
+BENCHMARK_DB = 'bluehorseshoe_benchmark'
+
+# (symbols, years) per tier
+TIERS = {
+    'tiny': (60, 2),
+    'small': (1000, 5),
+    'medium': (5000, 10),
+    'large': (10000, 25),
+}
+
+BENCHMARKS = ['indicators', 'predict', 'backtest', 'range_backtest', 'grading', 'report']
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def get_args():
+    """Parses and returns CLI arguments."""
+    parser = argparse.ArgumentParser(description='Run the BlueHorseshoe benchmark suite')
+    parser.add_argument('--tier', choices=sorted(TIERS), default='tiny', help='Universe size preset')
+    parser.add_argument('--symbols', type=int, help='Number of symbols (overrides the tier)')
+    parser.add_argument('--years', type=float, help='Years of daily bars (overrides the tier)')
+    parser.add_argument('--seed', type=int, default=7, help='Seed of the synthetic prices')
+    parser.add_argument('--mongo-uri', type=str, help='Disposable mongod to seed (default: mongomock)')
+    parser.add_argument('--only', type=str, help=f"Comma separated subset of: {','.join(BENCHMARKS)}")
+    parser.add_argument('--range-days', type=int, default=28, help='Calendar days of the range backtest')
+    parser.add_argument('--interval', type=int, default=7, help='Days between range backtest steps')
+    parser.add_argument('--indicator-sample', type=int, default=200, help='Symbols timed by the indicators benchmark')
+    parser.add_argument('--scores-per-symbol', type=int, default=10, help='Synthetic scores graded per symbol')
+    parser.add_argument('--output', type=str, help='JSON output path (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', type=str, help='Earlier JSON run to compare against')
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    """Short hash of the checked out commit, or 'unknown'."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def open_database(mongo_uri: Optional[str]):
+    """Returns (client, database): a dropped database on mongo_uri, or a mongomock one."""
+    if mongo_uri:
+        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+        client.drop_database(BENCHMARK_DB)
+        return client, client[BENCHMARK_DB]
+    try:
+        import mongomock  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        sys.exit("mongomock is required without --mongo-uri (pip install mongomock)")
+    client = mongomock.MongoClient()
+    return client, client[BENCHMARK_DB]
+
+
+def run_suite(database, universe: SyntheticUniverse, names: List[str], workdir: str,
+              range_days: int = 28, interval_days: int = 7, indicator_sample: int = 200,
+              n_scores: int = 0) -> List[BenchmarkResult]:
+    """
+    Runs the named benchmarks against a seeded universe.
+
+    Predictions and backtests use the session SCORE_FUTURE_BARS bars before the end of
+    the histories, so their trades have bars to resolve on.
+    """
+    sessions = universe.sessions
+    as_of = sessions[-(SCORE_FUTURE_BARS + 1)] if len(sessions) > SCORE_FUTURE_BARS else sessions[-1]
+    range_start = (pd.Timestamp(as_of) - pd.Timedelta(days=range_days)).strftime('%Y-%m-%d')
+    n_symbols = len(universe.symbols)
+    state: Dict = {}
+
+    def indicators():
+        frames = [universe.ohlcv(i) for i in range(min(indicator_sample, n_symbols))]
+
+        def call():
+            for df in frames:
+                get_technical_indicators(df)
+            return len(frames), {'bars': len(frames) * universe.n_bars}
+        return measure('indicators', 'symbols', call)
+
+    writer = ReportWriter(os.path.join(workdir, 'report.txt'))
+    trader = SwingTrader(database=database, config=get_settings(), report_writer=writer)
+
+    def predict():
+        def call():
+            state['prediction'] = trader.swing_predict(target_date=as_of)
+            return n_symbols, {'candidates': len(state['prediction'].get('candidates', []))}
+        return measure('predict', 'symbols', call)
+
+    def backtest():
+        backtester = Backtester(BacktestConfig(), database=database)
+        return measure('backtest', 'symbols', lambda: (
+            n_symbols, {'trades': len(backtester.run_backtest(as_of, BacktestOptions()))}))
+
+    def range_backtest():
+        backtester = Backtester(BacktestConfig(), database=database)
+        steps = len(pd.date_range(range_start, as_of, freq=f'{interval_days}D'))
+        return measure('range_backtest', 'symbol_dates', lambda: (
+            n_symbols * steps,
+            {'trades': len(backtester.run_range_backtest(range_start, as_of, interval_days, BacktestOptions()))}))
+
+    def grading():
+        engine = GradingEngine(database=database)
+        return measure('grading', 'trades', lambda: len(engine.run_grading(
+            query={'version': SYNTHETIC_SCORE_VERSION}, limit=max(n_scores, 1), database=database)))
+
+    def report():
+        # The report renders the prediction's candidates; predict untimed if it was not run
+        prediction = state.get('prediction') or trader.swing_predict(target_date=as_of)
+        regime = dict(prediction['regime'])
+        spy_details = regime.get('details', {}).get('SPY', {})
+        regime['spy_price'] = spy_details.get('close', 'N/A')
+        regime['spy_ma50'] = spy_details.get('ema50', 'N/A')
+        regime['spy_ma200'] = spy_details.get('ema200', 'N/A')
+        reporter = HTMLReporter(output_dir=workdir, database=database)
+        candidates = [dict(c) for c in prediction['candidates']]
+        return measure('report', 'candidates', lambda: (
+            len(candidates), {'bytes': len(reporter.generate_report(as_of, regime, candidates, []))}))
+
+    suite = {'indicators': indicators, 'predict': predict, 'backtest': backtest,
+             'range_backtest': range_backtest, 'grading': grading, 'report': report}
+    results = []
+    try:
+        for name in names:
+            logging.info("Benchmark %s...", name)
+            results.append(suite[name]())
+            logging.info("Benchmark %s: %.2fs, %.1f %s/s", name, results[-1].seconds,
+                         results[-1].throughput, results[-1].unit)
+    finally:
+        writer.close()
+    return results
+
+
+def main():
+    """Seeds the universe, runs the benchmarks and writes the JSON report."""
+    args = get_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    n_symbols, years = TIERS[args.tier]
+    universe = SyntheticUniverse(n_symbols=args.symbols or n_symbols, years=args.years or years, seed=args.seed)
+    names = [n.strip() for n in args.only.split(',')] if args.only else BENCHMARKS
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    commit = git_commit()
+    output = os.path.abspath(args.output or os.path.join(RESULTS_DIR, f'{commit}.json'))
+    client, database = open_database(args.mongo_uri)
+    cwd = os.getcwd()
+    try:
+        logging.info("Seeding %d symbols x %d bars...", len(universe.symbols), universe.n_bars)
+        seeded = seed_database(database, universe)
+        n_scores = seed_trade_scores(database, universe, per_symbol=args.scores_per_symbol)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            # Backtest CSV logs and reports are written relative to the working directory
+            os.chdir(workdir)
+            results = run_suite(database, universe, names, workdir, args.range_days, args.interval,
+                                args.indicator_sample, n_scores)
+    finally:
+        os.chdir(cwd)
+        if args.mongo_uri:
+            client.drop_database(BENCHMARK_DB)
+        client.close()
+
+    run = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': 'mongod' if args.mongo_uri else 'mongomock',
+        'universe': {'symbols': seeded['symbols'], 'years': universe.years, 'bars': seeded['bars'],
+                     'seed': universe.seed, 'scores': n_scores},
+        'results': [r.to_dict() for r in results],
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+
+    for r in results:
+        print(f"{r.name:<16} {r.seconds:9.2f}s {r.throughput:12.1f} {r.unit}/s  peak RSS {r.peak_rss_mb:8.1f} MB")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline.get('commit', args.compare)}:")
+        for line in compare_runs(run, baseline):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+synthetic.py
+
+Deterministic synthetic universes for the benchmark suite. Every symbol is a
+geometric random walk with its own drift and volatility, stored through
+`save_historical_data_to_mongo` with the indicators `get_technical_indicators`
+adds, so the benchmarked code reads the same documents as in production.
+
+The universe starts with the symbols MarketRegime and the benchmark data read
+by name (SPY, QQQ and MarketRegime.MAJORS), so no run falls back to the network.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from bluehorseshoe.analysis.market_regime import MarketRegime
+from bluehorseshoe.core.scores import ScoreManager
+from bluehorseshoe.core.symbols import upsert_symbols_to_mongo
+from bluehorseshoe.data.historical_data import get_technical_indicators, save_historical_data_to_mongo
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Last session of every synthetic history
+END_DATE = '2025-12-31'
+
+SYNTHETIC_SCORE_VERSION = "benchmark"
+
+# Sessions kept after the last synthetic score, so every score has bars to grade
+SCORE_FUTURE_BARS = 15
+
+
+@dataclass
+class SyntheticUniverse:
+    """
+    Size and seed of a synthetic universe.
+
+    Attributes:
+        n_symbols (int): Number of symbols, including the named ones.
+        years (float): Years of daily bars per symbol.
+        seed (int): Seed of the price paths.
+    """
+    n_symbols: int = 100
+    years: float = 2.0
+    seed: int = 7
+
+    @property
+    def n_bars(self) -> int:
+        """Daily bars per symbol."""
+        return max(int(self.years * TRADING_DAYS_PER_YEAR), 1)
+
+    @property
+    def symbols(self) -> List[str]:
+        """Symbol names: the index and MarketRegime symbols first, then SYN00000..."""
+        named = list(dict.fromkeys(MarketRegime.INDICES + MarketRegime.MAJORS))[:self.n_symbols]
+        return named + [f'SYN{i:05d}' for i in range(self.n_symbols - len(named))]
+
+    @property
+    def sessions(self) -> List[str]:
+        """Session dates of every history ('YYYY-MM-DD')."""
+        return list(pd.bdate_range(end=END_DATE, periods=self.n_bars).strftime('%Y-%m-%d'))
+
+    def ohlcv(self, index: int) -> pd.DataFrame:
+        """Raw daily bars of the index-th symbol (same result on every call)."""
+        rng = np.random.default_rng((self.seed, index))
+        n = self.n_bars
+        vol = rng.uniform(0.008, 0.035)
+        close = rng.uniform(5, 300) * np.exp(np.cumsum(rng.normal(rng.normal(0.0003, 0.0006), vol, n)))
+        open_ = close * np.exp(rng.normal(0, vol / 2, n))
+        return pd.DataFrame({
+            'date': self.sessions,
+            'open': open_.round(2),
+            'high': (np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))).round(2),
+            'low': (np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))).round(2),
+            'close': close.round(2),
+            'volume': rng.integers(100_000, 20_000_000, n),
+        })
+
+
+def seed_database(database, universe: SyntheticUniverse) -> Dict[str, int]:
+    """
+    Writes the universe's symbols and histories (with indicators) to the database.
+
+    Returns:
+        dict: 'symbols' and 'bars' written.
+    """
+    symbols = universe.symbols
+    upsert_symbols_to_mongo(
+        [{'symbol': s, 'name': f'{s} Synthetic', 'exchange': 'NYSE' if i % 2 else 'NASDAQ'}
+         for i, s in enumerate(symbols)],
+        database=database
+    )
+    for i, symbol in enumerate(symbols):
+        days = get_technical_indicators(universe.ohlcv(i))
+        save_historical_data_to_mongo(symbol, {'symbol': symbol, 'full_name': f'{symbol} Synthetic', 'days': days},
+                                      database)
+        if (i + 1) % 500 == 0:
+            logging.info("Seeded %d/%d synthetic symbols...", i + 1, len(symbols))
+    return {'symbols': len(symbols), 'bars': len(symbols) * universe.n_bars}
+
+
+def seed_trade_scores(database, universe: SyntheticUniverse, per_symbol: int = 10) -> int:
+    """
+    Writes per_symbol scores with entry, stop and target levels for every symbol,
+    on random sessions that leave SCORE_FUTURE_BARS bars to grade.
+
+    Returns:
+        int: Number of score documents written.
+    """
+    sessions = universe.sessions[:-SCORE_FUTURE_BARS]
+    if not sessions:
+        return 0
+    rng = np.random.default_rng((universe.seed, 1))
+    documents = []
+    for i, symbol in enumerate(universe.symbols):
+        closes = universe.ohlcv(i)['close'].to_numpy()
+        for day in np.unique(rng.integers(0, len(sessions), per_symbol)):
+            entry = float(closes[day]) * 0.99
+            documents.append({
+                'symbol': symbol,
+                'date': sessions[day],
+                'score': float(rng.uniform(1, 20)),
+                'strategy': 'baseline' if day % 2 else 'mean_reversion',
+                'version': SYNTHETIC_SCORE_VERSION,
+                'metadata': {'entry_price': entry, 'stop_loss': entry * 0.95, 'take_profit': entry * 1.06}
+            })
+    ScoreManager(database=database).save_scores(documents)
+    return len(documents)
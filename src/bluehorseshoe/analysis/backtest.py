@@ -7,17 +7,17 @@ past data and verifying results against subsequent price action.
 """
 
 import logging
-import os
 import csv
 from pathlib import Path
-import concurrent.futures
-from functools import partial
 from dataclasses import dataclass
 from typing import Optional, List, Dict
 import pandas as pd
 from bluehorseshoe.analysis.strategy import SwingTrader, StrategyContext
+from bluehorseshoe.analysis.trade_simulator import simulate_limit_trades
+from bluehorseshoe.core.config import WeightSet
 from bluehorseshoe.core.symbols import get_symbol_name_list
 from bluehorseshoe.data.historical_data import load_historical_data
+from bluehorseshoe.data.universe_panel import UniversePanel, panel_start_date
 from bluehorseshoe.reporting.report_generator import ReportSingleton
 
 
@@ -38,35 +38,52 @@ class BacktestOptions:
     enabled_indicators: Optional[List[str]] = None
     aggregation: str = "sum"
     symbols: Optional[List[str]] = None
+    weights: Optional[WeightSet] = None
+
+
+def summarize_range_results(all_results, title: str = "FINAL STRESS TEST SUMMARY"):
+    """
+    Summarize aggregated range backtest results (trade dicts with status, entry and exit_price).
+    Trades without an entry or exit (None, or NaN in DataFrame records) are not counted.
+    The title heads the summary, so results of other engines can say what they leave out.
+    """
+    valid_all = [r for r in all_results if pd.notna(r.get('entry')) and pd.notna(r.get('exit_price'))]
+    if not valid_all:
+        ReportSingleton().write("\nNo valid trades in range.")
+        return
+
+    total_trades = len(valid_all)
+    profitable_trades = sum(1 for r in valid_all if r['status'] in ['success', 'closed_profit'])
+    total_pnl = sum(((r['exit_price'] / r['entry']) - 1) * 100 for r in valid_all)
+    avg_pnl = total_pnl / total_trades
+    win_rate = (profitable_trades / total_trades) * 100
+
+    ReportSingleton().write(f"\n--- {title} ---")
+    ReportSingleton().write(f"Total Trades Evaluated: {total_trades}")
+    ReportSingleton().write(f"Overall Win Rate: {win_rate:.2f}%")
+    ReportSingleton().write(f"Overall Average PnL: {avg_pnl:.2f}%")
+    ReportSingleton().write(f"Total Cumulative PnL: {total_pnl:.2f}%")
+    ReportSingleton().write("---------------------------------")
 
-@dataclass
-class TradeState:
-    """Mutable state for a single trade simulation."""
-    # pylint: disable=too-many-instance-attributes
-    entry_price: float
-    take_profit: float
-    current_stop: float
-    status: str = 'no_entry'
-    actual_entry: Optional[float] = None
-    exit_price: Optional[float] = None
-    exit_date: Optional[pd.Timestamp] = None
-    entry_idx: int = -1
 
 class Backtester:
     """Class for orchestrating historical backtests of the trading strategy."""
 
-    def __init__(self, config: BacktestConfig = None, database=None):
+    def __init__(self, config: BacktestConfig = None, database=None, panel: Optional[UniversePanel] = None):
         """
         Initialize Backtester with optional dependency injection.
 
         Args:
             config: BacktestConfig instance
             database: MongoDB database instance. If None, uses global singleton.
+            panel: Optional UniversePanel shared with the SwingTrader. If None, range
+                backtests build one for the duration of the run.
         """
         if config is None:
             config = BacktestConfig()
         self.database = database
-        self.trader = SwingTrader(database=database)
+        self.panel = panel
+        self.trader = SwingTrader(database=database, panel=panel)
         self.config = config
         # Expose config attributes
         self.hold_days = config.hold_days
@@ -75,69 +92,6 @@ class Backtester:
         self.target_profit_factor = config.target_profit_factor
         self.stop_loss_factor = config.stop_loss_factor
 
-    def _check_entry(self, row, i, state):
-        """Check if entry conditions are met."""
-        if row['low'] <= state.entry_price:
-            state.status = 'active'
-            state.entry_idx = i
-
-            # Slippage/Gap Logic
-            if row['open'] < state.entry_price:
-                state.actual_entry = row['open']
-            else:
-                state.actual_entry = state.entry_price
-
-            # Immediate Stop/Target Check (Intraday)
-            if row['low'] <= state.current_stop:
-                state.status = 'stopped_out'
-                state.exit_price = state.current_stop
-                if row['open'] < state.current_stop:
-                    state.exit_price = row['open']
-                state.exit_date = row['date']
-                return
-
-            if row['high'] >= state.take_profit:
-                state.status = 'success'
-                state.exit_price = state.take_profit
-                if row['open'] > state.take_profit:
-                    state.exit_price = row['open']
-                state.exit_date = row['date']
-                return
-
-        elif i >= self.hold_days:
-            state.status = 'limit_expired'
-
-    def _check_active_trade(self, row, current_idx, state, future_data):
-        """Check for exit conditions in an active trade."""
-        # Stop Loss
-        if row['low'] <= state.current_stop:
-            state.status = 'stopped_out'
-            state.exit_price = state.current_stop
-            if row['open'] < state.current_stop:
-                state.exit_price = row['open']
-            state.exit_date = row['date']
-            return
-
-        # Take Profit
-        if row['high'] >= state.take_profit:
-            state.status = 'success'
-            state.exit_price = state.take_profit
-            if row['open'] > state.take_profit:
-                state.exit_price = row['open']
-            state.exit_date = row['date']
-            return
-
-        # Time Exit
-        days_in_trade = current_idx - state.entry_idx
-        if days_in_trade >= self.hold_days:
-            state.status = 'time_exit'
-            state.exit_price = row['close']
-            state.exit_date = row['date']
-            if state.exit_price > state.actual_entry:
-                state.status = 'closed_profit'
-            else:
-                state.status = 'closed_loss'
-
     def evaluate_prediction(self, prediction: Dict, target_date: str) -> Dict:
         """
         Simulates a trade based on the prediction using future data.
@@ -157,50 +111,44 @@ class Backtester:
         # Determine strictness of entry (optional, can be passed in config)
         # strict_entry = True # If True, Low must be <= Entry. If False, buy at Open.
 
-        price_data = load_historical_data(symbol, database=self.database)
-        if not price_data or 'days' not in price_data:
-            return {'symbol': symbol, 'status': 'data_error'}
-
-        df = pd.DataFrame(price_data['days'])
-        if df.empty:
-            return {'symbol': symbol, 'status': 'data_error'}
-
-        df['date'] = pd.to_datetime(df['date'])
-
-        # Filter for data AFTER the target date
         # target_date is the analysis date. We can enter on target_date (if intraday) or next day.
         # Typically "predictions for target_date" means analysis done on target_date close.
         # So we look at data > target_date.
-        start_date = pd.to_datetime(target_date)
-        future_data = df[df['date'] > start_date].sort_values('date').reset_index(drop=True)
+        if self.panel is not None and symbol in self.panel:
+            future_data = self.panel.future_frame(symbol, target_date)
+        else:
+            price_data = load_historical_data(symbol, database=self.database)
+            if not price_data or 'days' not in price_data:
+                return {'symbol': symbol, 'status': 'data_error'}
+
+            df = pd.DataFrame(price_data['days'])
+            if df.empty:
+                return {'symbol': symbol, 'status': 'data_error'}
+
+            df['date'] = pd.to_datetime(df['date'])
+
+            # Filter for data AFTER the target date
+            start_date = pd.to_datetime(target_date)
+            future_data = df[df['date'] > start_date].sort_values('date').reset_index(drop=True)
 
         if future_data.empty:
             return {'symbol': symbol, 'status': 'no_future_data'}
 
-        state = TradeState(
-            entry_price=entry_price,
-            take_profit=take_profit,
-            current_stop=stop_loss
+        sim = simulate_limit_trades(
+            future_data['open'].to_numpy(), future_data['high'].to_numpy(),
+            future_data['low'].to_numpy(), future_data['close'].to_numpy(),
+            [0], [entry_price], [stop_loss], [take_profit], self.hold_days
         )
-
-        for i, row in future_data.iterrows():
-            # If we haven't entered yet
-            if state.status == 'no_entry':
-                self._check_entry(row, i, state)
-            # If we are in a trade
-            elif state.status == 'active':
-                self._check_active_trade(row, i, state, future_data)
-
-            if state.status in ['stopped_out', 'success', 'limit_expired', 'time_exit', 'closed_profit', 'closed_loss']:
-                break
+        filled = sim.entry_idx[0] != -1
+        exited = sim.exit_idx[0] != -1
 
         return {
             'symbol': symbol,
-            'status': state.status,
-            'entry': state.actual_entry,
-            'exit_price': state.exit_price,
-            'exit_date': state.exit_date,
-            'days_held': (i - state.entry_idx) if state.entry_idx != -1 else 0
+            'status': sim.status[0],
+            'entry': float(sim.actual_entry[0]) if filled else None,
+            'exit_price': float(sim.exit_price[0]) if exited else None,
+            'exit_date': future_data['date'].iloc[sim.exit_idx[0]] if exited else None,
+            'days_held': int(sim.days_held[0])
         }
 
     def _print_backtest_header(self, target_date: str, options: BacktestOptions) -> None:
@@ -218,36 +166,30 @@ class Backtester:
         return symbols
 
     def _generate_predictions(self, symbols: List[str], target_date: str, options: BacktestOptions) -> List[Dict]:
-        max_workers = min(8, os.cpu_count() or 4)
         logging.info("Generating %s predictions for %s...", options.strategy, target_date)
         predictions = []
 
         ctx = StrategyContext(
             target_date=target_date,
             enabled_indicators=options.enabled_indicators,
-            aggregation=options.aggregation
+            aggregation=options.aggregation,
+            weights=options.weights
         )
+        self.trader.precompute_scores(symbols, ctx)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            process_func = partial(self.trader.process_symbol, ctx=ctx)
-            future_to_symbol = {executor.submit(process_func, sym): sym for sym in symbols}
-
-            processed_count = 0
-            total_symbols = len(symbols)
-            for future in concurrent.futures.as_completed(future_to_symbol):
-                processed_count += 1
-                try:
-                    result = future.result()
-                    predictions.append(result)
-                except Exception as e: # pylint: disable=broad-exception-caught
-                    logging.error("Exception during prediction: %s", e)
-
-                if processed_count % 500 == 0 or processed_count == total_symbols:
-                    print(
-                        f"  > Progress: {processed_count}/{total_symbols} symbols analyzed "
-                        f"({(processed_count / total_symbols) * 100:.1f}%)",
-                        flush=True
-                    )
+        total_symbols = len(symbols)
+        for processed_count, (_, result, error) in enumerate(self.trader.iter_predictions(symbols, ctx), 1):
+            if error is not None:
+                logging.error("Exception during prediction: %s", error)
+            else:
+                predictions.append(result)
+
+            if processed_count % 500 == 0 or processed_count == total_symbols:
+                print(
+                    f"  > Progress: {processed_count}/{total_symbols} symbols analyzed "
+                    f"({(processed_count / total_symbols) * 100:.1f}%)",
+                    flush=True
+                )
         return predictions
 
     def _filter_and_sort_predictions(self, predictions: List[Dict], options: BacktestOptions) -> List[Dict]:
@@ -379,28 +321,17 @@ class Backtester:
 
         return results
 
+    def _set_panel(self, panel: Optional[UniversePanel]) -> None:
+        """Shares a UniversePanel (or None) between the backtester and its trader."""
+        self.panel = panel
+        self.trader.panel = panel
+
     def _summarize_range_results(self, all_results):
         """Summarize aggregated backtest results."""
-        valid_all = [r for r in all_results if 'entry' in r and 'exit_price' in r]
-        if not valid_all:
-            ReportSingleton().write("\nNo valid trades in range.")
-            return
-
-        total_trades = len(valid_all)
-        profitable_trades = sum(1 for r in valid_all if r['status'] in ['success', 'closed_profit'])
-        total_pnl = sum(((r['exit_price'] / r['entry']) - 1) * 100 for r in valid_all)
-        avg_pnl = total_pnl / total_trades
-        win_rate = (profitable_trades / total_trades) * 100
-
-        ReportSingleton().write("\n--- FINAL STRESS TEST SUMMARY ---")
-        ReportSingleton().write(f"Total Trades Evaluated: {total_trades}")
-        ReportSingleton().write(f"Overall Win Rate: {win_rate:.2f}%")
-        ReportSingleton().write(f"Overall Average PnL: {avg_pnl:.2f}%")
-        ReportSingleton().write(f"Total Cumulative PnL: {total_pnl:.2f}%")
-        ReportSingleton().write("---------------------------------")
+        summarize_range_results(all_results)
 
     def run_range_backtest(self, start_date: str, end_date: str, interval_days: int = 7, options: BacktestOptions = None):
-        """Runs backtests over a range of dates at set intervals."""
+        """Runs backtests over a range of dates at set intervals and returns all their results."""
         if options is None:
             options = BacktestOptions()
 
@@ -429,13 +360,27 @@ class Backtester:
             # Update options with loaded symbols to pass down
             options.symbols = symbols
 
-        while current_ts <= end_ts:
-            date_str = current_ts.strftime('%Y-%m-%d')
-            print(f"\n--- Processing Step {current_step}/{total_steps}: {date_str} ---", flush=True)
-            day_results = self.run_backtest(date_str, options=options)
-            all_results.extend(day_results)
-            current_ts += pd.Timedelta(days=interval_days)
-            current_step += 1
+        # Load the universe once for the whole range instead of once per step
+        built_panel = False
+        if self.panel is None and self.database is not None:
+            print("  > Building universe panel...", end="", flush=True)
+            self._set_panel(UniversePanel.from_database(
+                self.database, symbols=symbols, start_date=panel_start_date(start_date)))
+            built_panel = True
+            print(f" Done ({len(self.panel)} symbols x {len(self.panel.dates)} dates).", flush=True)
+
+        try:
+            while current_ts <= end_ts:
+                date_str = current_ts.strftime('%Y-%m-%d')
+                print(f"\n--- Processing Step {current_step}/{total_steps}: {date_str} ---", flush=True)
+                day_results = self.run_backtest(date_str, options=options)
+                all_results.extend(day_results)
+                current_ts += pd.Timedelta(days=interval_days)
+                current_step += 1
+        finally:
+            if built_panel:
+                self._set_panel(None)
 
         # Aggregate Summary
         self._summarize_range_results(all_results)
+        return all_results
@@ -8,6 +8,17 @@ WEAK_R2_THRESHOLD = 0.3
 MIN_VOLUME_THRESHOLD = 100000
 MIN_STOCK_PRICE = 5.0
 MAX_STOCK_PRICE = 500.0
+
+# Dead / pinned stocks: over the last FLAT_WINDOW bars, mean high-low range or close
+# standard deviation below these fractions of the mean close
+FLAT_WINDOW = 5
+DEAD_RANGE_RATIO = 0.005
+PINNED_STD_RATIO = 0.002
+
+# Symbols whose last bar is older than this (calendar days) before the target date are skipped
+MAX_STALE_DAYS = 7
+# Symbols with fewer bars than this up to the target date are skipped
+MIN_HISTORY_BARS = 30
 STOP_LOSS_FACTOR = 0.97
 TAKE_PROFIT_FACTOR = 1.05
 
@@ -0,0 +1,995 @@
+"""
+cross_sectional.py
+
+This module provides the `CrossSectionalScorer`, a vectorized counterpart of
+`TechnicalAnalyzer.calculate_technical_score`. Instead of instantiating seven
+`Indicator` subclasses per symbol, it scores every symbol of a `ScoringBlock`
+(symbols x bars, right-aligned so each row ends on its latest bar) at once with
+NumPy array operations, and returns the same component dict per symbol.
+
+Windowed indicators read the last few columns of the block. Recursive ones
+(EWMs, Wilder ATR, Parabolic SAR, SuperTrend) step through time once, updating
+all symbols together. TA-Lib candlestick patterns are already compiled code and
+are evaluated per row.
+
+Usage example:
+    scorer = CrossSectionalScorer()
+    scores = scorer.score_panel(panel, target_date='2024-06-28')
+    scores['baseline']['AAPL']  # {'trend': 3.0, 'volume': 1.0, ..., 'total': 7.5}
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import talib
+
+from bluehorseshoe.analysis.constants import (
+    TREND_PERIOD, MIN_VOLUME_THRESHOLD,
+    FLAT_WINDOW, DEAD_RANGE_RATIO, PINNED_STD_RATIO,
+    OVERSOLD_RSI_THRESHOLD_EXTREME, OVERSOLD_RSI_REWARD_EXTREME,
+    OVERSOLD_RSI_THRESHOLD_MODERATE, OVERSOLD_RSI_REWARD_MODERATE,
+    OVERSOLD_BB_REWARD, OVERSOLD_BB_POSITION_THRESHOLD,
+    MR_OVERSOLD_RSI_REWARD_EXTREME, MR_OVERSOLD_RSI_REWARD_MODERATE,
+    MR_OVERSOLD_BB_REWARD, MR_BELLOW_LOW_BB_BONUS, MR_CONFLUENCE_BONUS,
+    PENALTY_EMA_OVEREXTENSION_MODERATE, PENALTY_EMA_OVEREXTENSION_EXTREME,
+    PENALTY_EMA_THRESHOLD_MODERATE, PENALTY_EMA_THRESHOLD_EXTREME,
+    PENALTY_RSI_THRESHOLD_EXTREME, PENALTY_RSI_SCORE_EXTREME,
+    PENALTY_RSI_THRESHOLD_MODERATE, PENALTY_RSI_SCORE_MODERATE,
+    PENALTY_VOLUME_EXHAUSTION
+)
+from bluehorseshoe.analysis.indicators.limit_indicators import PIVOT_MULTIPLIER, FIFTY_TWO_WEEK_MULTIPLIER
+from bluehorseshoe.core.config import WeightSet, weights_config
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+INDICATOR_FIELDS = (
+    'rsi_14', 'roc_5', 'macd_line', 'macd_signal', 'bb_upper', 'bb_lower', 'stoch_k', 'stoch_d',
+    'dmi_p', 'dmi_n', 'adx', 'avg_volume_20', 'ema_20'
+)
+
+# Minimum block width so every fixed window (52-week range, shifted Ichimoku spans) is addressable
+MIN_BLOCK_WIDTH = 256
+
+# Symbols scored per block when scoring a whole panel (bounds peak memory)
+DEFAULT_CHUNK_SIZE = 1000
+
+# Columns each indicator group requires (mirrors the Indicator subclasses' required_cols)
+REQUIRED_COLUMNS = {
+    "trend": ('high', 'low', 'close', 'open', 'stoch_k', 'stoch_d'),
+    "volume": ('high', 'low', 'close', 'volume'),
+    "limit": ('close', 'high', 'low'),
+    "candlestick": ('open', 'close', 'high', 'low'),
+    "moving_average": ('close', 'volume'),
+    "momentum": ('close', 'high', 'low'),
+    "price_action": ('open', 'close', 'volume')
+}
+GROUP_ORDER = ("trend", "volume", "limit", "candlestick", "moving_average", "momentum", "price_action")
+
+
+@dataclass
+class ScoringBlock:
+    """
+    Right-aligned price history for a set of symbols.
+
+    Attributes:
+        symbols (list[str]): Symbols in row order.
+        lengths (np.ndarray): Number of bars per symbol.
+        columns (dict): Field name -> array of shape (len(symbols), width). Row i holds
+            the symbol's last lengths[i] bars in its rightmost columns, NaN before them.
+        present (dict): Field name -> bool array, True where the symbol has that column.
+    """
+    symbols: List[str]
+    lengths: np.ndarray
+    columns: Dict[str, np.ndarray]
+    present: Dict[str, np.ndarray]
+
+    @property
+    def width(self) -> int:
+        """Number of bar columns in the block."""
+        return next(iter(self.columns.values())).shape[1] if self.columns else 0
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> 'ScoringBlock':
+        """Builds a block from per-symbol history DataFrames (oldest bar first)."""
+        symbols = list(frames)
+        lengths = np.array([len(frames[s]) for s in symbols], dtype=np.int64)
+        width = max(MIN_BLOCK_WIDTH, int(lengths.max()) if len(lengths) else 0)
+        columns, present = {}, {}
+        for field in PRICE_FIELDS + INDICATOR_FIELDS:
+            has = np.array([field in frames[s].columns for s in symbols], dtype=bool)
+            if not has.any():
+                continue
+            values = np.full((len(symbols), width), np.nan)
+            for i, symbol in enumerate(symbols):
+                if has[i] and lengths[i]:
+                    values[i, width - lengths[i]:] = frames[symbol][field].to_numpy(dtype=np.float64)
+            columns[field] = values
+            present[field] = has
+        return cls(symbols, lengths, columns, present)
+
+    @classmethod
+    def from_panel(cls, panel, symbols: Iterable[str], target_date: Optional[str] = None) -> 'ScoringBlock':
+        """Builds a block from a UniversePanel, as of target_date."""
+        symbols = [s for s in symbols if s in panel]
+        lengths, columns, present = panel.aligned_columns(
+            symbols, target_date, PRICE_FIELDS + INDICATOR_FIELDS, min_width=MIN_BLOCK_WIDTH)
+        return cls(symbols, lengths, columns, present)
+
+
+def _ewm(x: np.ndarray, alpha: float, adjust: bool, min_periods: int = 0) -> np.ndarray:
+    """Row-wise exponentially weighted mean, step for step as pandas computes it."""
+    rows, width = x.shape
+    out = np.full((rows, width), np.nan)
+    weighted = np.full(rows, np.nan)
+    old_wt = np.ones(rows)
+    nobs = np.zeros(rows, dtype=np.int64)
+    factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    with np.errstate(invalid='ignore'):
+        for t in range(width):
+            cur = x[:, t]
+            is_obs = ~np.isnan(cur)
+            has = ~np.isnan(weighted)
+            nobs += is_obs
+
+            step = has & is_obs
+            decayed = old_wt * factor
+            blended = np.where(weighted != cur, (decayed * weighted + new_wt * cur) / (decayed + new_wt), weighted)
+            weighted = np.where(step, blended, np.where(~has & is_obs, cur, weighted))
+            old_wt = np.where(step, decayed + new_wt if adjust else 1.0,
+                              np.where(has & ~is_obs, decayed, old_wt))
+            out[:, t] = np.where(nobs >= min_periods, weighted, np.nan)
+    return out
+
+
+def _shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shifts each row right by `periods` columns, NaN-filling the left edge."""
+    out = np.full_like(x, np.nan)
+    out[:, periods:] = x[:, :-periods]
+    return out
+
+
+def _window(x: np.ndarray, size: int, offset: int = 0) -> np.ndarray:
+    """Columns [-(size + offset), -offset) of every row."""
+    end = x.shape[1] - offset
+    return x[:, end - size:end]
+
+
+def _ta_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, lengths: np.ndarray, window: int) -> np.ndarray:
+    """`ta.volatility.AverageTrueRange`: zeros before the seed, SMA seed, then Wilder smoothing."""
+    rows, width = close.shape
+    prev_close = _shift(close)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    start = width - lengths
+    seeded = lengths >= window
+    seed_col = np.where(seeded, start + window - 1, width)
+
+    atr = np.zeros((rows, width))
+    idx = np.nonzero(seeded)[0]
+    if len(idx):
+        cols = start[idx][:, None] + np.arange(window)
+        atr[idx, seed_col[idx]] = true_range[idx[:, None], cols].mean(axis=1)
+    for t in range(int(seed_col.min()) + 1 if len(idx) else width, width):
+        active = t > seed_col
+        atr[:, t] = np.where(active, (atr[:, t - 1] * (window - 1) + true_range[:, t]) / float(window), atr[:, t])
+    return atr
+
+
+def _first_valid_shift(x: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Previous value per row, with each row's first bar standing in for its own predecessor."""
+    prev = _shift(x)
+    rows = np.nonzero(lengths > 0)[0]
+    first = x.shape[1] - lengths[rows]
+    prev[rows, first] = x[rows, first]
+    return prev
+
+
+class _BlockFeatures:
+    """Lazily computed, shared intermediate series for one block."""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, block: ScoringBlock):
+        self.block = block
+        self.n = block.lengths
+        cols = block.columns
+        self.open = cols.get('open')
+        self.high = cols.get('high')
+        self.low = cols.get('low')
+        self.close = cols.get('close')
+        self.volume = cols.get('volume')
+        self.valid = ~np.isnan(self.close)
+        self._cache = {}
+
+    def cached(self, key, fn):
+        """Computes fn() once per block."""
+        if key not in self._cache:
+            self._cache[key] = fn()
+        return self._cache[key]
+
+    def col(self, field: str) -> np.ndarray:
+        """Field array, all-NaN if no symbol in the block has it."""
+        if field in self.block.columns:
+            return self.block.columns[field]
+        return np.full_like(self.close, np.nan)
+
+    def has(self, *fields: str) -> np.ndarray:
+        """True where the symbol has every one of the fields."""
+        result = np.ones(len(self.n), dtype=bool)
+        for field in fields:
+            result &= self.block.present.get(field, np.zeros(len(self.n), dtype=bool))
+        return result
+
+    def last(self, field: str, k: int = 1) -> np.ndarray:
+        """Value of a field k bars before the end (k=1 is the latest bar)."""
+        return self.col(field)[:, -k]
+
+    def ema_adjusted(self, span: int) -> np.ndarray:
+        """close.ewm(span=span).mean()"""
+        return self.cached(('ema_adj', span), lambda: _ewm(self.close, 2.0 / (span + 1), adjust=True))
+
+    def keltner_parts(self, window: int) -> tuple:
+        """EMA middle line and Wilder ATR as used by the TTM squeeze and Keltner scores."""
+        def compute():
+            kc_mean = _ewm(self.close, 2.0 / (window + 1), adjust=False)
+            prev_close = _first_valid_shift(self.close, self.n)
+            true_range = np.maximum(self.high - self.low, np.maximum(np.abs(self.high - prev_close),
+                                                                     np.abs(self.low - prev_close)))
+            atr = _ewm(true_range, 1.0 / window, adjust=False)
+            return kc_mean, atr
+        return self.cached(('keltner', window), compute)
+
+    def ta_atr(self, window: int) -> np.ndarray:
+        """ta AverageTrueRange over the block."""
+        return self.cached(('ta_atr', window), lambda: _ta_atr(self.high, self.low, self.close, self.n, window))
+
+
+# --------------------------------------------------------------------------------------
+# Trend
+# --------------------------------------------------------------------------------------
+
+def _trend_stochastic(f: _BlockFeatures) -> np.ndarray:
+    k, d = f.col('stoch_k'), f.col('stoch_d')
+    k1, d1, k0, d0 = k[:, -1], d[:, -1], k[:, -2], d[:, -2]
+    return np.select(
+        [(k1 > d1) & (k0 <= d0), (k1 < d1) & (k0 >= d0), k1 < 20, k1 > 80],
+        [2, -2, 1, -1], default=0).astype(float)
+
+
+def _trend_ichimoku(f: _BlockFeatures) -> np.ndarray:
+    high, low, close = f.high, f.low, f.close
+
+    def midpoint(size, offset):
+        return (_window(high, size, offset).max(axis=1) + _window(low, size, offset).min(axis=1)) / 2
+
+    tenkan_now, tenkan_prev = midpoint(9, 0), midpoint(9, 1)
+    kijun_now, kijun_prev = midpoint(26, 0), midpoint(26, 1)
+    span_a = (midpoint(9, 26) + midpoint(26, 26)) / 2
+    span_b = midpoint(52, 26)
+    last_close = close[:, -1]
+
+    score = np.zeros(len(f.n))
+    cloud = ~np.isnan(span_a) & ~np.isnan(span_b)
+    top = np.maximum(span_a, span_b)
+    bottom = np.minimum(span_a, span_b)
+    score += np.where(cloud & (last_close > top), 2, np.where(cloud & (last_close < bottom), -2, 0))
+
+    lines = (f.n > 1) & ~np.isnan(tenkan_now) & ~np.isnan(kijun_now) & ~np.isnan(tenkan_prev) & ~np.isnan(kijun_prev)
+    bull = (tenkan_now > kijun_now) & (tenkan_prev <= kijun_prev)
+    bear = (tenkan_now < kijun_now) & (tenkan_prev >= kijun_prev)
+    score += np.where(lines & bull, 2, np.where(lines & bear, -2, 0))
+
+    score += np.where(cloud, np.where(span_a > span_b, 1, -1), 0)
+    return score
+
+
+def _trend_psar(f: _BlockFeatures, step: float = 0.02, max_step: float = 0.2) -> np.ndarray:
+    high, low, close = f.high, f.low, f.close
+    rows, width = close.shape
+    start = width - f.n
+    first = np.minimum(start, width - 1)
+    row_idx = np.arange(rows)
+
+    psar = close.copy()
+    up_trend = np.ones(rows, dtype=bool)
+    af = np.full(rows, step)
+    up_trend_high = high[row_idx, first]
+    down_trend_low = low[row_idx, first]
+
+    with np.errstate(invalid='ignore'):
+        for i in range(max(2, int(start.min()) + 2 if rows else width), width):
+            active = i >= start + 2
+            prev = psar[:, i - 1]
+            max_high, min_low = high[:, i], low[:, i]
+
+            up_value = prev + af * (up_trend_high - prev)
+            down_value = prev - af * (prev - down_trend_low)
+            value = np.where(up_trend, up_value, down_value)
+            reversal = np.where(up_trend, min_low < value, max_high > value)
+
+            # Reversals jump to the opposite extreme and reset the acceleration factor
+            value = np.where(reversal, np.where(up_trend, up_trend_high, down_trend_low), value)
+            new_low = up_trend & reversal
+            new_high = ~up_trend & reversal
+
+            # Trend continuation: extend the extreme point and clamp to the prior two bars
+            extend_up = up_trend & ~reversal & (max_high > up_trend_high)
+            extend_down = ~up_trend & ~reversal & (min_low < down_trend_low)
+            up_clamp = np.where(low[:, i - 2] < value, low[:, i - 2], np.where(low[:, i - 1] < value, low[:, i - 1], value))
+            down_clamp = np.where(high[:, i - 2] > value, high[:, i - 2], np.where(high[:, i - 1] > value, high[:, i - 1], value))
+            value = np.where(up_trend & ~reversal, up_clamp, np.where(~up_trend & ~reversal, down_clamp, value))
+
+            af_next = np.where(reversal, step, np.where(extend_up | extend_down, np.minimum(af + step, max_step), af))
+            up_next = np.where(extend_up, max_high, np.where(new_high, max_high, up_trend_high))
+            down_next = np.where(extend_down, min_low, np.where(new_low, min_low, down_trend_low))
+
+            psar[:, i] = np.where(active, value, psar[:, i])
+            af = np.where(active, af_next, af)
+            up_trend_high = np.where(active, up_next, up_trend_high)
+            down_trend_low = np.where(active, down_next, down_trend_low)
+            up_trend = np.where(active, up_trend != reversal, up_trend)
+
+    above_today = psar[:, -1] > close[:, -1]
+    above_yesterday = psar[:, -2] > close[:, -2]
+    score = np.where(above_yesterday & ~above_today, 2.0, np.where(~above_yesterday & above_today, -2.0, 0.0))
+    return np.where(f.n >= 2, score, 0.0)
+
+
+def _trend_heiken_ashi(f: _BlockFeatures) -> np.ndarray:
+    ha_close = (f.open + f.high + f.low + f.close) / 4.0
+    ha_open = (_shift(f.open) + _shift(f.close)) / 2.0
+    bullish = (_window(ha_close, 3) > _window(ha_open, 3)).sum(axis=1)
+    return np.select(
+        [bullish == 3, bullish == 2, bullish == 1, ha_close[:, -1] < ha_open[:, -1]],
+        [3.0, 2.0, 1.0, -1.0], default=0.0)
+
+
+def _trend_adx(f: _BlockFeatures) -> np.ndarray:
+    dmi_p, dmi_n, adx = f.last('dmi_p'), f.last('dmi_n'), f.last('adx')
+    score = np.select([adx > 35, adx > 30, adx > 25], [3, 2, 1], 0).astype(float)
+    return np.where(f.has('dmi_p', 'dmi_n', 'adx') & (dmi_p > dmi_n), score, 0.0)
+
+
+def _trend_donchian(f: _BlockFeatures, window: int = 20) -> np.ndarray:
+    upper = _window(f.high, window, 1).max(axis=1)
+    lower = _window(f.low, window, 1).min(axis=1)
+    middle = ((upper - lower) / 2.0) + lower
+    close = f.close[:, -1]
+    score = np.select([close > upper, close < lower, close > middle, close < middle], [2.0, -2.0, 1.0, -1.0], 0.0)
+    return np.where((f.n >= window) & ~np.isnan(upper) & ~np.isnan(lower), score, 0.0)
+
+
+def _trend_supertrend(f: _BlockFeatures, period: int = 10, multiplier: float = 3.0) -> np.ndarray:
+    high, low, close = f.high, f.low, f.close
+    rows, width = close.shape
+    start = width - f.n
+    atr = f.ta_atr(period)
+    hl2 = (high + low) / 2
+    basic_upper = hl2 + (multiplier * atr)
+    basic_lower = hl2 - (multiplier * atr)
+
+    final_upper = np.zeros(rows)
+    final_lower = np.zeros(rows)
+    trend = np.zeros(rows, dtype=np.int8)
+    prev_trend = np.zeros(rows, dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        for i in range(max(1, int(start.min()) + 1 if rows else width), width):
+            active = i >= start + 1
+            upper = np.where((basic_upper[:, i] < final_upper) | (close[:, i - 1] > final_upper), basic_upper[:, i], final_upper)
+            lower = np.where((basic_lower[:, i] > final_lower) | (close[:, i - 1] < final_lower), basic_lower[:, i], final_lower)
+            curr = np.where(trend == 0, np.where(close[:, i] > upper, 1, -1), trend)
+            curr = np.where(curr == 1, np.where(close[:, i] < lower, -1, 1), np.where(close[:, i] > upper, 1, -1))
+
+            final_upper = np.where(active, upper, final_upper)
+            final_lower = np.where(active, lower, final_lower)
+            prev_trend = np.where(active, trend, prev_trend)
+            trend = np.where(active, curr, trend).astype(np.int8)
+
+    score = np.select(
+        [(trend == 1) & (prev_trend == -1), (trend == -1) & (prev_trend == 1), trend == 1, trend == -1],
+        [2.0, -2.0, 1.0, -1.0], 0.0)
+    return np.where(f.n >= period + 1, score, 0.0)
+
+
+def _trend_ttm_squeeze(f: _BlockFeatures, bb_length: int = 20, bb_std: float = 2.0,
+                       kc_length: int = 20, kc_atr_mult: float = 1.5) -> np.ndarray:
+    close = f.close
+    kc_mean, atr = f.keltner_parts(kc_length)
+    kc_width = (kc_mean + (kc_atr_mult * atr)) - (kc_mean - (kc_atr_mult * atr))
+
+    squeeze = []
+    for offset in (0, 1):
+        windows = _window(close, bb_length, offset)
+        bb_mean = np.mean(windows, axis=1)
+        bb_std_val = np.std(windows, axis=1, ddof=1)
+        bb_width = (bb_mean + (bb_std * bb_std_val)) - (bb_mean - (bb_std * bb_std_val))
+        squeeze.append(bb_width < kc_width[:, -1 - offset])
+    in_squeeze_now, in_squeeze_prev = squeeze
+
+    momentum = close[:, -1] - close[:, -6]
+    score = np.select(
+        [~in_squeeze_now & in_squeeze_prev & (momentum > 0),
+         ~in_squeeze_now & in_squeeze_prev,
+         in_squeeze_now & (momentum > 0),
+         in_squeeze_now & (np.abs(momentum) < close[:, -1] * 0.01),
+         in_squeeze_now],
+        [2.0, -2.0, 1.5, 0.5, -1.0], 0.0)
+    return np.where(f.n >= max(bb_length, kc_length) + 5, score, 0.0)
+
+
+def _trend_aroon(f: _BlockFeatures, window: int = 25) -> np.ndarray:
+    def aroon(offset):
+        up = (np.argmax(_window(f.high, window, offset), axis=1) + 1) / window * 100
+        down = (np.argmin(_window(f.low, window, offset), axis=1) + 1) / window * 100
+        return up, down
+
+    up_now, down_now = aroon(0)
+    up_prev, _ = aroon(1)
+    up_3, down_3 = aroon(2)
+    recent_bullish_cross = (up_now > down_now) & (up_3 <= down_3)
+    score = np.select(
+        [(up_now > 70) & (down_now < 30), recent_bullish_cross, (up_now > 50) & (up_now > up_prev),
+         (down_now > 70) & (up_now < 30), down_now > up_now],
+        [2.0, 1.5, 1.0, -2.0, -1.0], 0.0)
+    return np.where(f.n >= window + 5, score, 0.0)
+
+
+def _trend_keltner(f: _BlockFeatures, window: int = 20, atr_mult: float = 2.0) -> np.ndarray:
+    kc_mean, atr = f.keltner_parts(window)
+    upper = kc_mean + (atr_mult * atr)
+    lower = kc_mean - (atr_mult * atr)
+    price_now, price_prev = f.close[:, -1], f.close[:, -2]
+    upper_now, lower_now, middle_now = upper[:, -1], lower[:, -1], kc_mean[:, -1]
+    breaking_above = (price_now > upper_now) & (price_prev <= upper[:, -2])
+    breaking_below = (price_now < lower_now) & (price_prev >= lower[:, -2])
+    score = np.select(
+        [breaking_above, price_now > upper_now, price_now > middle_now,
+         breaking_below, price_now < lower_now, price_now < middle_now],
+        [2.0, 1.0, 0.5, -2.0, -1.0, -0.5], 0.0)
+    return np.where(f.n >= window + 5, score, 0.0)
+
+
+# --------------------------------------------------------------------------------------
+# Volume
+# --------------------------------------------------------------------------------------
+
+def _volume_obv(f: _BlockFeatures, window: int = 5) -> np.ndarray:
+    direction = np.where(f.close < _shift(f.close), -f.volume, f.volume)
+    obv = np.cumsum(np.where(f.valid, direction, 0.0), axis=1)
+    diff = obv[:, -1] - obv[:, -(window + 1)]
+    return np.where(f.n >= window + 1, np.select([diff > 0, diff < 0], [1.0, -1.0], 0.0), 0.0)
+
+
+def _volume_cmf(f: _BlockFeatures, window: int = 20, threshold: float = 0.05) -> np.ndarray:
+    mfv = ((f.close - f.low) - (f.high - f.close)) / (f.high - f.low)
+    mfv = np.where(np.isnan(mfv), 0.0, mfv) * f.volume
+    cmf = _window(mfv, window).sum(axis=1) / _window(f.volume, window).sum(axis=1)
+    return np.select([np.isnan(cmf), cmf > threshold, cmf > 0, cmf < -threshold], [0.0, 2.0, 1.0, -2.0], -1.0)
+
+
+def _volume_atr_band(f: _BlockFeatures, ma_window: int = 20, atr_multiplier: float = 2.0) -> np.ndarray:
+    tail = _window(f.close, ma_window)
+    ma = np.nansum(tail, axis=1) / (~np.isnan(tail)).sum(axis=1)
+    atr = f.ta_atr(14)[:, -1]
+    close = f.close[:, -1]
+    score = np.select([close > ma + atr_multiplier * atr, close < ma - atr_multiplier * atr], [-1.0, 1.0], 0.0)
+    return np.where(f.n >= 14, score, 0.0)
+
+
+def _volume_atr_spike(f: _BlockFeatures, window: int = 14, spike_multiplier: float = 1.5) -> np.ndarray:
+    atr = f.ta_atr(14)
+    today, past = atr[:, -1], atr[:, -(window + 1)]
+    score = np.where(today >= spike_multiplier * past, -2.0, 0.0)
+    return np.where((f.n >= 14) & (f.n >= window + 1) & (past != 0) & ~np.isnan(past), score, 0.0)
+
+
+def _volume_avg_volume(f: _BlockFeatures, window: int = 20) -> np.ndarray:
+    avg_volume = _window(f.volume, window).mean(axis=1)
+    return np.where(f.n >= window, np.where(avg_volume < 100000, -1.0, 1.0), 0.0)
+
+
+def _volume_mfi(f: _BlockFeatures, window: int = 14) -> np.ndarray:
+    typical_price = (f.high + f.low + f.close) / 3.0
+    prev = _shift(typical_price)
+    up_down = np.where(typical_price > prev, 1, np.where(typical_price < prev, -1, 0))
+    mfr = _window(typical_price * f.volume * up_down, window)
+    positive = np.sum(np.where(mfr >= 0.0, mfr, 0.0), axis=1)
+    negative = np.abs(np.sum(np.where(mfr < 0.0, mfr, 0.0), axis=1))
+    mfi = 100 - (100 / (1 + positive / negative))
+    score = np.select([mfi < 20, mfi < 30, mfi > 80], [2.0, 1.0, -1.0], 0.0)
+    return np.where((f.n >= window) & ~np.isnan(mfi), score, 0.0)
+
+
+def _volume_vwap(f: _BlockFeatures, window: int = 20) -> np.ndarray:
+    high, low, close, volume = (_window(x, window) for x in (f.high, f.low, f.close, f.volume))
+    typical_price = (high + low + close) / 3
+    vwap = (typical_price * volume).sum(axis=1) / volume.sum(axis=1)
+    diff_pct = ((f.close[:, -1] - vwap) / vwap) * 100
+    score = np.select([diff_pct > 2.0, diff_pct > 1.0, diff_pct < -2.0, diff_pct < -1.0], [2.0, 1.0, -2.0, -1.0], 0.0)
+    return np.where(f.n >= window, score, 0.0)
+
+
+def _volume_force_index(f: _BlockFeatures, window: int = 13) -> np.ndarray:
+    force = _ewm((f.close - _shift(f.close)) * f.volume, 2.0 / (window + 1), adjust=False, min_periods=window)
+    now, prev, prev2 = force[:, -1], force[:, -2], force[:, -3]
+    acceleration = (now - prev) - (prev - prev2)
+    score = np.select(
+        [(now > 0) & (acceleration > 0), (now > 0) & (now > prev), now > 0,
+         (now < 0) & (acceleration < 0), (now < 0) & (now < prev), now < 0],
+        [2.0, 1.0, 0.5, -2.0, -1.0, -0.5], 0.0)
+    return np.where((f.n >= window + 5) & ~np.isnan(now) & ~np.isnan(prev), score, 0.0)
+
+
+def _volume_ad_line(f: _BlockFeatures, window: int = 10) -> np.ndarray:
+    clv = ((f.close - f.low) - (f.high - f.close)) / (f.high - f.low)
+    adi = np.where(np.isnan(clv), 0.0, clv) * f.volume
+    ad_line = np.cumsum(np.where(f.valid, adi, 0.0), axis=1)
+    now = ad_line[:, -1]
+    trend_10 = now - ad_line[:, -(window + 1)]
+    trend_5 = now - ad_line[:, -(window // 2 + 1)]
+    score = np.select([trend_10 > 0, trend_5 > 0, trend_10 < 0, trend_5 < 0], [2.0, 1.0, -2.0, -1.0], 0.0)
+    return np.where((f.n >= window + 5) & ~np.isnan(now), score, 0.0)
+
+
+# --------------------------------------------------------------------------------------
+# Limit, candlestick, moving average, momentum and price action
+# --------------------------------------------------------------------------------------
+
+def _limit_pivot(f: _BlockFeatures, proximity_pct: float = 0.5) -> np.ndarray:
+    high_prev, low_prev, close_prev = f.high[:, -2], f.low[:, -2], f.close[:, -2]
+    pivot = (high_prev + low_prev + close_prev) / 3.0
+    r1 = 2 * pivot - low_prev
+    s1 = 2 * pivot - high_prev
+    r2 = pivot + (r1 - s1)
+    s2 = pivot - (r1 - s1)
+    close = f.close[:, -1]
+    score = np.select([close > r2, close > r1, close < s2, close < s1], [2.0, 1.0, -2.0, -1.0], 0.0)
+    score += np.where(np.abs(pivot - f.low[:, -1]) <= pivot * (proximity_pct / 100.0), 1.0, 0.0)
+    return np.where((f.n > 0) & ~np.isnan(pivot), score, 0.0)
+
+
+def _limit_52_week(f: _BlockFeatures, window: int = 252) -> np.ndarray:
+    high_52 = _window(f.high, window).max(axis=1)
+    low_52 = _window(f.low, window).min(axis=1)
+    position = (f.close[:, -1] - low_52) / (high_52 - low_52) * 100
+    score = np.select([position >= 90, position <= 10], [1.0, -1.0], 0.0)
+    return np.where(f.n >= window, score, 0.0)
+
+
+def _candlestick_soldiers(f: _BlockFeatures, body_ratio: float = 0.3, threshold: float = 0.0001) -> np.ndarray:
+    opens, highs, lows, closes = (_window(x, 2) for x in (f.open, f.high, f.low, f.close))
+    all_white = (closes > opens + threshold).all(axis=1)
+    body = np.abs(closes - opens)
+    upper_shadow = highs - np.maximum(opens, closes)
+    lower_shadow = np.minimum(opens, closes) - lows
+    small_shadows = ((body != 0) & (upper_shadow / body <= body_ratio) & (lower_shadow / body <= body_ratio)).all(axis=1)
+    higher_open = opens[:, 1] > closes[:, 0] + threshold
+    higher_close = closes[:, 1] > closes[:, 0] + threshold
+    detected = all_white & small_shadows & higher_open & higher_close
+    return np.where((f.n >= 3) & detected, 1.0, 0.0)
+
+
+def _candlestick_talib(f: _BlockFeatures, pattern) -> np.ndarray:
+    width = f.close.shape[1]
+    score = np.zeros(len(f.n))
+    for i, length in enumerate(f.n):
+        if length == 0:
+            continue
+        start = width - length
+        value = pattern(f.open[i, start:], f.high[i, start:], f.low[i, start:], f.close[i, start:])[-1]
+        score[i] = 1.0 if value >= 100 else -1.0 if value <= -100 else 0.0
+    return score
+
+
+def _moving_average_ma_score(f: _BlockFeatures, window: int = 20) -> np.ndarray:
+    weights = np.arange(1, window + 1, dtype=float)
+    weights /= weights.sum()
+    closes = _window(f.close, window)
+    wma = closes @ weights
+    vwma = (closes * _window(f.volume, window)).sum(axis=1) / (_window(f.volume, window).sum(axis=1) + 1e-10)
+    close = f.close[:, -1]
+    enough = f.n >= window
+    score = np.where(enough & ~np.isnan(wma), np.where(close > wma, 1.0, -1.0), 0.0)
+    score += np.where(enough & ~np.isnan(vwma), np.where(close > vwma, 1.0, -1.0), 0.0)
+    return np.where(f.n >= 1, score, 0.0)
+
+
+def _moving_average_crossovers(f: _BlockFeatures) -> np.ndarray:
+    fast = f.ema_adjusted(9)[:, -1]
+    med = f.ema_adjusted(21)[:, -1]
+    slow = (f.ema_adjusted(50)[:, -1] + f.ema_adjusted(200)[:, -1]) / 2
+    return np.where((f.n >= 1) & (fast > med) & (med > slow), 1.0, 0.0)
+
+
+def _momentum_rsi(f: _BlockFeatures) -> np.ndarray:
+    rsi = f.last('rsi_14')
+    return np.where(f.has('rsi_14'), np.select([rsi <= 50, rsi <= 60], [2.0, 1.0], 0.0), 0.0)
+
+
+def _momentum_roc(f: _BlockFeatures) -> np.ndarray:
+    roc = f.col('roc_5')
+    roc_std = np.std(_window(roc, 20), axis=1, ddof=1)
+    last = roc[:, -1]
+    score = np.select([last > 2 * roc_std, last > 1 * roc_std], [2.0, 1.0], 0.0)
+    return np.where(f.has('roc_5') & ~np.isnan(roc_std), score, 0.0)
+
+
+def _momentum_macd(f: _BlockFeatures, signal_multiplier: float) -> np.ndarray:
+    line, signal = f.last('macd_line'), f.last('macd_signal')
+    diff = line - signal
+    score = np.select([diff > signal * signal_multiplier, diff > signal], [2.0, 1.0], 0.0)
+    return np.where(f.has('macd_line', 'macd_signal') & (diff > 0) & (line > 0), score, 0.0)
+
+
+def _momentum_bb_position(f: _BlockFeatures) -> np.ndarray:
+    upper, lower = f.last('bb_upper'), f.last('bb_lower')
+    position = (f.close[:, -1] - lower) / (upper - lower)
+    score = np.select(
+        [(position >= 0.3) & (position < 0.7), (position >= 0.1) & (position < 0.3), position >= 0.85],
+        [2.0, 3.0, -1.0], 0.0)
+    return np.where(f.has('bb_lower', 'bb_upper') & (upper > lower), score, 0.0)
+
+
+def _momentum_williams_r(f: _BlockFeatures) -> np.ndarray:
+    highest_high = _window(f.high, 14).max(axis=1)
+    lowest_low = _window(f.low, 14).min(axis=1)
+    wr_val = -100.0 * (highest_high - f.close[:, -1]) / (highest_high - lowest_low)
+    score = np.select([wr_val < -80, wr_val < -50, wr_val > -20], [2.0, 1.0, -1.0], 0.0)
+    return np.where((f.n >= 14) & (highest_high != lowest_low), score, 0.0)
+
+
+def _momentum_cci(f: _BlockFeatures, window: int = 20) -> np.ndarray:
+    typical_price = (_window(f.high, window) + _window(f.low, window) + _window(f.close, window)) / 3.0
+    tp_mean = typical_price.mean(axis=1)
+    mean_dev = np.abs(typical_price - tp_mean[:, None]).mean(axis=1)
+    cci = (typical_price[:, -1] - tp_mean) / (0.015 * mean_dev)
+    score = np.select([cci < -200, cci < -100, cci > 200, cci > 100], [3.0, 2.0, -2.0, -1.0], 0.0)
+    return np.where((f.n >= window) & (mean_dev != 0), score, 0.0)
+
+
+def _price_action_gap(f: _BlockFeatures) -> np.ndarray:
+    today_open, yesterday_close = f.open[:, -1], f.close[:, -2]
+    gap_pct = ((today_open - yesterday_close) / yesterday_close) * 100
+    avg_volume_20 = f.volume[:, -21:-1].mean(axis=1)
+    volume_ratio = np.where(avg_volume_20 > 0, f.volume[:, -1] / avg_volume_20, 1.0)
+    score = np.select(
+        [(gap_pct > 2.0) & (volume_ratio > 1.5), (gap_pct > 2.0) & (volume_ratio > 1.2), gap_pct > 2.0,
+         (gap_pct > 1.0) & (volume_ratio > 1.2), gap_pct > 1.0, gap_pct > 0.5,
+         gap_pct < -2.0, gap_pct < -1.0, gap_pct < -0.5],
+        [2.0, 1.5, 1.0, 1.0, 0.5, 0.5, -2.0, -1.0, -0.5], 0.0)
+    return np.where(f.n >= 21, score, 0.0)
+
+
+def _group_subs(group: str, f: Optional[_BlockFeatures], weight_source=weights_config) -> list:
+    """
+    Sub-indicators of a group in Indicator.get_score order: (name, weight, score function).
+
+    The weight is a key into the group's weights, or a fixed multiplier. weight_source
+    (weights_config or a WeightSet) only supplies the MACD signal threshold.
+    """
+    if group == "trend":
+        return [
+            ('stochastic', 'STOCHASTIC_MULTIPLIER', lambda: _trend_stochastic(f)),
+            ('ichimoku', 'ICHIMOKU_MULTIPLIER', lambda: _trend_ichimoku(f)),
+            ('psar', 'PSAR_MULTIPLIER', lambda: _trend_psar(f)),
+            ('heiken_ashi', 'HEIKEN_ASHI_MULTIPLIER', lambda: _trend_heiken_ashi(f)),
+            ('adx', 'ADX_MULTIPLIER', lambda: _trend_adx(f)),
+            ('donchian', 'DONCHIAN_MULTIPLIER', lambda: _trend_donchian(f)),
+            ('supertrend', 'SUPERTREND_MULTIPLIER', lambda: _trend_supertrend(f)),
+            ('ttm_squeeze', 'TTM_SQUEEZE_MULTIPLIER', lambda: _trend_ttm_squeeze(f)),
+            ('aroon', 'AROON_MULTIPLIER', lambda: _trend_aroon(f)),
+            ('keltner', 'KELTNER_MULTIPLIER', lambda: _trend_keltner(f)),
+        ]
+    if group == "volume":
+        return [
+            ('obv', 'OBV_MULTIPLIER', lambda: _volume_obv(f)),
+            ('cmf', 'CMF_MULTIPLIER', lambda: _volume_cmf(f)),
+            ('atr_band', 'ATR_BAND_MULTIPLIER', lambda: _volume_atr_band(f)),
+            ('atr_spike', 'ATR_SPIKE_MULTIPLIER', lambda: _volume_atr_spike(f)),
+            ('avg_volume', 1.0, lambda: _volume_avg_volume(f)),
+            ('mfi', 'MFI_MULTIPLIER', lambda: _volume_mfi(f)),
+            ('vwap', 'VWAP_MULTIPLIER', lambda: _volume_vwap(f)),
+            ('force_index', 'FORCE_INDEX_MULTIPLIER', lambda: _volume_force_index(f)),
+            ('ad_line', 'AD_LINE_MULTIPLIER', lambda: _volume_ad_line(f)),
+        ]
+    if group == "limit":
+        return [
+            ('pivot', PIVOT_MULTIPLIER, lambda: _limit_pivot(f)),
+            ('52_week', FIFTY_TWO_WEEK_MULTIPLIER, lambda: _limit_52_week(f)),
+        ]
+    if group == "candlestick":
+        return [
+            ('soldiers', 'THREE_WHITE_SOLDIERS_MULTIPLIER', lambda: _candlestick_soldiers(f)),
+            ('methods', 'RISE_FALL_3_METHODS_MULTIPLIER', lambda: _candlestick_talib(f, talib.CDLRISEFALL3METHODS)),
+            ('marubozu', 'MARUBOZU_MULTIPLIER', lambda: _candlestick_talib(f, talib.CDLMARUBOZU)),
+            ('belt_hold', 'BELT_HOLD_MULTIPLIER', lambda: _candlestick_talib(f, talib.CDLBELTHOLD)),
+        ]
+    if group == "moving_average":
+        return [
+            ('ma_score', 1.0, lambda: _moving_average_ma_score(f)),
+            ('crossovers', 1.0, lambda: _moving_average_crossovers(f)),
+        ]
+    if group == "momentum":
+        signal_multiplier = weight_source.get_weights('momentum')['MACD_SIGNAL_MULTIPLIER']
+        return [
+            ('macd', 'MACD_MULTIPLIER', lambda: _momentum_macd(f, signal_multiplier)),
+            ('roc', 'ROC_MULTIPLIER', lambda: _momentum_roc(f)),
+            ('rsi', 'RSI_MULTIPLIER', lambda: _momentum_rsi(f)),
+            ('bb_position', 'BB_MULTIPLIER', lambda: _momentum_bb_position(f)),
+            ('williams_r', 'WILLIAMS_R_MULTIPLIER', lambda: _momentum_williams_r(f)),
+            ('cci', 'CCI_MULTIPLIER', lambda: _momentum_cci(f)),
+        ]
+    return [('gap', 'GAP_MULTIPLIER', lambda: _price_action_gap(f))]
+
+
+def _resolve_multiplier(group: str, weight, weights: Optional[dict] = None) -> float:
+    """Multiplier of a sub-indicator weight from _group_subs (current weights unless given)."""
+    if not isinstance(weight, str):
+        return float(weight)
+    if weights is None:
+        weights = weights_config.get_weights(group)
+    return float(weights[weight])
+
+
+def signal_specs(groups: Iterable[str] = GROUP_ORDER) -> List[tuple]:
+    """(group, sub-indicator, weight) of every sub-indicator, in scoring order."""
+    return [(group, name, weight) for group in groups for name, weight, _ in _group_subs(group, None)]
+
+
+def _group_score(group: str, f: _BlockFeatures, enabled_sub_indicators: Optional[list], aggregation: str,
+                 weight_source=weights_config) -> np.ndarray:
+    """Vectorized Indicator.get_score(...).buy for one group."""
+    product = aggregation == "product"
+    score = np.full(len(f.n), 1.0 if product else 0.0)
+    active_count = 0
+    weights = weight_source.get_weights(group)
+    for name, weight, func in _group_subs(group, f, weight_source):
+        if enabled_sub_indicators is None or name in enabled_sub_indicators:
+            multiplier = _resolve_multiplier(group, weight, weights)
+            if multiplier == 0.0:
+                continue
+            sub_score = func() * multiplier
+            score = score * sub_score if product else score + sub_score
+            active_count += 1
+    if active_count == 0:
+        return np.zeros(len(f.n))
+    return score
+
+
+class CrossSectionalScorer:
+    """
+    Scores many symbols at once with the same rules as `TechnicalAnalyzer`.
+
+    Args:
+        enabled_indicators: Same format as `TechnicalAnalyzer.calculate_technical_score`.
+        aggregation: "sum" or "product".
+        weights: WeightSet to score with (default: the weights_config singleton).
+    """
+
+    def __init__(self, enabled_indicators: Optional[list[str]] = None, aggregation: str = "sum",
+                 weights: Optional[WeightSet] = None):
+        self.enabled_indicators = enabled_indicators
+        self.aggregation = aggregation
+        self.weights = weights if weights is not None else weights_config
+
+    def _indicator_filters(self) -> Dict[str, Optional[list]]:
+        filters = {}
+        for item in self.enabled_indicators or []:
+            if ":" in item:
+                group, sub = item.split(":", 1)
+                filters.setdefault(group, [])
+                filters[group].append(sub)
+            else:
+                filters[item] = None
+        return filters
+
+    @staticmethod
+    def _gate(f: _BlockFeatures) -> np.ndarray:
+        """True for symbols the per-symbol path scores (enough volume, not dead or flat)."""
+        avg_volume = f.last('avg_volume_20')
+        low_volume = ~f.has('avg_volume_20') | (avg_volume < MIN_VOLUME_THRESHOLD)
+
+        recent_close = _window(f.close, FLAT_WINDOW)
+        avg_close = recent_close.mean(axis=1)
+        avg_tr = (_window(f.high, FLAT_WINDOW) - _window(f.low, FLAT_WINDOW)).mean(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dead = ((avg_tr / avg_close < DEAD_RANGE_RATIO)
+                    | (np.std(recent_close, axis=1, ddof=1) / avg_close < PINNED_STD_RATIO))
+        dead &= f.n >= FLAT_WINDOW
+        return (f.n > 0) & ~low_volume & ~dead
+
+    @staticmethod
+    def _missing_columns(f: _BlockFeatures, groups: Iterable[str]) -> np.ndarray:
+        missing = np.zeros(len(f.n), dtype=bool)
+        for group in groups:
+            missing |= ~f.has(*REQUIRED_COLUMNS[group])
+        return missing
+
+    @staticmethod
+    def _baseline_modifiers(f: _BlockFeatures) -> Dict[str, np.ndarray]:
+        """Vectorized TechnicalAnalyzer._calculate_baseline_modifiers."""
+        close = f.close[:, -1]
+        dist_ema9 = (close / f.ema_adjusted(9)[:, -1]) - 1
+        rsi = np.where(f.has('rsi_14'), f.last('rsi_14'), 50.0)
+
+        # Uptrend = positive least-squares slope over the trend period
+        rows = np.nonzero(f.n >= TREND_PERIOD)[0]
+        is_uptrend = np.zeros(len(f.n), dtype=bool)
+        if len(rows):
+            slopes = np.polyfit(np.arange(TREND_PERIOD), _window(f.close, TREND_PERIOD)[rows].T, 1)[0]
+            is_uptrend[rows] = slopes > 0
+
+        bb_lower = f.last('bb_lower')
+        vol_ratio = f.volume[:, -1] / np.where(f.has('avg_volume_20'), f.last('avg_volume_20'), 1.0)
+        climax = (rsi < OVERSOLD_RSI_THRESHOLD_EXTREME) & (vol_ratio > 2.0)
+        return {
+            "penalty_ema_overextension": np.select(
+                [dist_ema9 > PENALTY_EMA_THRESHOLD_EXTREME, dist_ema9 > PENALTY_EMA_THRESHOLD_MODERATE],
+                [PENALTY_EMA_OVEREXTENSION_EXTREME, PENALTY_EMA_OVEREXTENSION_MODERATE], 0.0),
+            "penalty_rsi": np.select(
+                [rsi > PENALTY_RSI_THRESHOLD_EXTREME, rsi > PENALTY_RSI_THRESHOLD_MODERATE],
+                [PENALTY_RSI_SCORE_EXTREME, PENALTY_RSI_SCORE_MODERATE], 0.0),
+            "bonus_oversold_rsi": np.select(
+                [rsi < OVERSOLD_RSI_THRESHOLD_EXTREME, rsi < OVERSOLD_RSI_THRESHOLD_MODERATE],
+                [np.where(is_uptrend, abs(OVERSOLD_RSI_REWARD_EXTREME), OVERSOLD_RSI_REWARD_EXTREME),
+                 np.where(is_uptrend, abs(OVERSOLD_RSI_REWARD_MODERATE), OVERSOLD_RSI_REWARD_MODERATE)], 0.0),
+            "bonus_oversold_bb": np.where(
+                f.has('bb_lower') & (close < bb_lower),
+                np.where(is_uptrend, abs(OVERSOLD_BB_REWARD), OVERSOLD_BB_REWARD), 0.0),
+            "bonus_selling_climax": np.where(climax, 3.0, 0.0),
+            "penalty_volume_exhaustion": np.where(~climax & (vol_ratio > 3.0), PENALTY_VOLUME_EXHAUSTION, 0.0),
+        }
+
+    def score_baseline(self, block: ScoringBlock) -> Dict[str, Dict[str, float]]:
+        """
+        Vectorized TechnicalAnalyzer.calculate_baseline_score for every symbol in the block.
+
+        Symbols the per-symbol path would reject for missing columns are left out.
+        """
+        f = _BlockFeatures(block)
+        filters = self._indicator_filters()
+        groups = [g for g in GROUP_ORDER if not filters or g in filters]
+        gate = self._gate(f)
+        skip = gate & self._missing_columns(f, groups)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            group_scores = {g: _group_score(g, f, filters.get(g), self.aggregation, self.weights) for g in groups}
+            modifiers = self._baseline_modifiers(f) if not self.enabled_indicators else {}
+
+        product = self.aggregation == "product"
+        total = np.full(len(f.n), 1.0 if product else 0.0)
+        for score in group_scores.values():
+            total = total * score if product else total + score
+        if not groups:
+            total = np.zeros(len(f.n))
+        for score in modifiers.values():
+            total = total + score
+
+        results = {}
+        for i, symbol in enumerate(block.symbols):
+            if skip[i]:
+                continue
+            if not gate[i]:
+                results[symbol] = {"total": 0.0}
+                continue
+            components = {g: float(s[i]) for g, s in group_scores.items()}
+            components.update({k: float(v[i]) for k, v in modifiers.items()})
+            components["total"] = float(total[i])
+            results[symbol] = components
+        return results
+
+    def raw_baseline_signals(self, block: ScoringBlock) -> tuple:
+        """
+        Unweighted baseline sub-indicator scores for every symbol in the block.
+
+        With "sum" aggregation, calculate_baseline_score's total is the dot product of
+        these signals with their multipliers plus the modifiers, which is what lets
+        `signal_cache.WeightSweep` re-weight them without rescoring.
+
+        Returns:
+            tuple: (specs, signals, modifiers, eligible) where specs lists the
+            (group, sub-indicator, weight) of each signal column, signals has shape
+            (len(block.symbols), len(specs)), modifiers holds the weight-independent
+            baseline penalties and bonuses, and eligible is False for symbols that
+            calculate_baseline_score leaves out or scores 0 without indicators.
+        """
+        f = _BlockFeatures(block)
+        filters = self._indicator_filters()
+        groups = [g for g in GROUP_ORDER if not filters or g in filters]
+        gate = self._gate(f)
+        eligible = gate & ~self._missing_columns(f, groups)
+
+        specs, columns = [], []
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for group in groups:
+                for name, weight, func in _group_subs(group, f, self.weights):
+                    if filters.get(group) is None or name in filters[group]:
+                        specs.append((group, name, weight))
+                        columns.append(func())
+            modifiers = self._baseline_modifiers(f) if not self.enabled_indicators else {}
+
+        signals = np.zeros((len(block.symbols), len(specs)))
+        if columns:
+            signals = np.nan_to_num(np.column_stack(columns), nan=0.0)
+        total_modifiers = np.zeros(len(block.symbols))
+        for score in modifiers.values():
+            total_modifiers = total_modifiers + score
+        signals[~eligible] = 0.0
+        return specs, signals, np.where(eligible, total_modifiers, 0.0), eligible
+
+    def score_mean_reversion(self, block: ScoringBlock) -> Dict[str, Dict[str, float]]:
+        """
+        Vectorized TechnicalAnalyzer.calculate_mean_reversion_score for every symbol in the block.
+        """
+        f = _BlockFeatures(block)
+        enabled = self.enabled_indicators
+        weights = self.weights.get_weights('mean_reversion')
+        gate = self._gate(f)
+        close = f.close[:, -1]
+
+        parts = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if (not enabled or "rsi" in enabled) and weights.get('RSI_MULTIPLIER', 1.0) > 0:
+                rsi = np.where(f.has('rsi_14'), f.last('rsi_14'), 50.0)
+                parts["bonus_oversold_rsi"] = np.select(
+                    [rsi < OVERSOLD_RSI_THRESHOLD_EXTREME, rsi < OVERSOLD_RSI_THRESHOLD_MODERATE],
+                    [MR_OVERSOLD_RSI_REWARD_EXTREME, MR_OVERSOLD_RSI_REWARD_MODERATE], 0.0
+                ) * weights.get('RSI_MULTIPLIER', 1.0)
+            if (not enabled or "bb" in enabled) and weights.get('BB_MULTIPLIER', 1.0) > 0:
+                lower, upper = f.last('bb_lower'), f.last('bb_upper')
+                bb_pos = (close - lower) / (upper - lower)
+                bonus = np.where(bb_pos < OVERSOLD_BB_POSITION_THRESHOLD,
+                                 MR_OVERSOLD_BB_REWARD + np.where(close < lower, MR_BELLOW_LOW_BB_BONUS, 0.0), 0.0)
+                bonus = np.where(f.has('bb_lower', 'bb_upper') & (upper > lower), bonus, 0.0)
+                parts["bonus_oversold_bb"] = bonus * weights.get('BB_MULTIPLIER', 1.0)
+            if (not enabled or "ma_dist" in enabled) and weights.get('MA_DIST_MULTIPLIER', 1.0) > 0:
+                dist_ema20 = (close / f.last('ema_20')) - 1
+                bonus = np.where(dist_ema20 < -0.05, np.where(dist_ema20 < -0.10, 3.0, 1.5), 0.0)
+                parts["bonus_ma_dist"] = np.where(f.has('ema_20'), bonus, 0.0) * weights.get('MA_DIST_MULTIPLIER', 1.0)
+            if (not enabled or "candlestick" in enabled) and weights.get('CANDLESTICK_MULTIPLIER', 1.0) > 0:
+                candles = _group_score("candlestick", f, None, "sum", self.weights)
+                parts["candlestick"] = np.where(candles > 0, 2.0, 0.0) * weights.get('CANDLESTICK_MULTIPLIER', 1.0)
+        skip = gate & ("candlestick" in parts) & self._missing_columns(f, ["candlestick"])
+
+        results = {}
+        for i, symbol in enumerate(block.symbols):
+            if skip[i]:
+                continue
+            if not gate[i]:
+                results[symbol] = {"total": 0.0}
+                continue
+            components = {k: float(v[i]) for k, v in parts.items() if v[i] > 0 or enabled}
+            if components.get("bonus_oversold_rsi", 0) > 0 and components.get("bonus_oversold_bb", 0) > 0:
+                components["bonus_confluence"] = float(MR_CONFLUENCE_BONUS)
+
+            product = self.aggregation == "product"
+            total = 1.0 if product else 0.0
+            if not components:
+                total = 0.0
+            for score in components.values():
+                total = total * score if product else total + score
+            components["total"] = float(total)
+            results[symbol] = components
+        return results
+
+    def score_block(self, block: ScoringBlock, strategy: str = "baseline") -> Dict[str, Dict[str, float]]:
+        """Scores a block with the given strategy ("baseline" or "mean_reversion")."""
+        if strategy == "mean_reversion":
+            return self.score_mean_reversion(block)
+        return self.score_baseline(block)
+
+    def score_panel(self, panel, target_date: Optional[str] = None, symbols: Optional[Iterable[str]] = None,
+                    strategies: Iterable[str] = ("baseline", "mean_reversion"),
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Scores panel symbols as of target_date.
+
+        Returns:
+            dict: strategy -> symbol -> component dict (as returned by calculate_technical_score).
+        """
+        symbols = [s for s in (panel.symbols if symbols is None else symbols) if s in panel]
+        results = {strategy: {} for strategy in strategies}
+        for offset in range(0, len(symbols), chunk_size):
+            block = ScoringBlock.from_panel(panel, symbols[offset:offset + chunk_size], target_date)
+            for strategy in strategies:
+                results[strategy].update(self.score_block(block, strategy))
+        return results
@@ -6,10 +6,18 @@ trading signals (scores) against actual market outcomes to quantify performance.
 """
 
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
+from bluehorseshoe.analysis.trade_simulator import simulate_bracket_trades
+from bluehorseshoe.core.config import get_settings
+from bluehorseshoe.data.columnar_store import load_columnar_data_from_mongo
 from bluehorseshoe.data.historical_data import load_historical_data
+from bluehorseshoe.data.universe_panel import UniversePanel
+
+# Panel fields grading reads: the simulated bars and the ATR at the signal date
+GRADING_FIELDS = ('open', 'high', 'low', 'close', 'atr_14')
 
 @dataclass
 class TradeParams: # pylint: disable=too-many-instance-attributes
@@ -39,63 +47,18 @@ class GradingEngine:
     Evaluates historical predictions stored in 'trade_scores' against actual price action.
     """
 
-    def __init__(self, hold_days: int = 10, database=None):
+    def __init__(self, hold_days: int = 10, database=None, panel: Optional[UniversePanel] = None):
         """
         Initialize GradingEngine with optional dependency injection.
 
         Args:
             hold_days: Number of days to hold a trade
             database: MongoDB database instance. If None, uses global singleton.
+            panel: Optional UniversePanel. Symbols in the panel are not reloaded from Mongo.
         """
         self.hold_days = hold_days
         self.database = database
-
-    def _simulate_trade(self, params: TradeParams, future_data: pd.DataFrame) -> TradeResult:
-        """Core simulation logic for iterating through future price action."""
-        status = 'hold'
-        exit_date = None
-        exit_price = None
-        max_gain = -999.0
-
-        all_lows = future_data['low'].values
-        min_low = min(all_lows) if len(all_lows) > 0 else params.entry_price
-        min_low = min(min_low, params.entry_price)
-
-        all_highs = future_data['high'].values
-        max_high = max(all_highs) if len(all_highs) > 0 else params.entry_price
-        max_high = max(max_high, params.entry_price)
-
-        for _, day in future_data.iterrows():
-            high = day['high']
-            low = day['low']
-
-            current_max_gain = ((high / params.entry_price) - 1) * 100
-            max_gain = max(max_gain, current_max_gain)
-
-            if high >= params.take_profit:
-                status, exit_price, exit_date = 'success', params.take_profit, day['date']
-                break
-
-            if low <= params.stop_loss:
-                status, exit_price, exit_date = 'failure', params.stop_loss, day['date']
-                break
-
-        if status == 'hold':
-            last_day = future_data.iloc[-1]
-            exit_price, exit_date = last_day['close'], last_day['date']
-            status = 'success' if exit_price > params.entry_price else 'failure'
-
-        days_held = len(future_data[future_data['date'] <= exit_date]) if exit_date else self.hold_days
-
-        return TradeResult(
-            status=status,
-            exit_price=exit_price,
-            exit_date=exit_date,
-            max_gain=max_gain,
-            max_high=max_high,
-            min_low=min_low,
-            days_held=days_held
-        )
+        self.panel = panel
 
     def evaluate_score(self, score_doc: Dict) -> Dict:
         """
@@ -119,16 +82,14 @@ class GradingEngine:
         if any(v is None for v in [params.entry_price, params.stop_loss, params.take_profit]):
             return {'symbol': symbol, 'date': signal_date, 'score': params.score, 'status': 'missing_metadata'}
 
-        price_data = load_historical_data(symbol, database=self.database)
-        if not price_data or 'days' not in price_data:
+        df = self._load_price_frame(symbol)
+        if df is None:
             return {'symbol': symbol, 'date': signal_date, 'score': params.score, 'status': 'no_data'}
 
-        df = pd.DataFrame(price_data['days'])
-        df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-
         return self._evaluate_with_df(score_doc, df)
 
-    def run_grading(self, query: Dict = None, limit: int = 5000, database=None) -> List[Dict]:
+    def run_grading(self, query: Dict = None, limit: int = 5000, database=None,
+                    preload: bool = False) -> List[Dict]:
         """
         Runs grading on a batch of scores from MongoDB.
         Optimized to load historical data once per symbol.
@@ -137,6 +98,9 @@ class GradingEngine:
             query: MongoDB query filter
             limit: Maximum number of scores to process
             database: MongoDB database instance. Required.
+            preload: Without a panel, load one UniversePanel (GRADING_FIELDS, from the
+                first signal date to the last plus the hold window) instead of one
+                history read per symbol.
         """
         if database is None:
             raise ValueError("database parameter is required for run_grading")
@@ -152,6 +116,13 @@ class GradingEngine:
         for s in scores:
             symbol_map.setdefault(s['symbol'], []).append(s)
 
+        if preload and self.panel is None and scores:
+            dates = [str(s['date'])[:10] for s in scores]
+            # Sessions to cover the hold window, in calendar days with room for weekends and holidays
+            end = (pd.Timestamp(max(dates)) + pd.Timedelta(days=2 * self.hold_days + 10)).strftime('%Y-%m-%d')
+            self.panel = UniversePanel.from_database(
+                database, symbols=list(symbol_map), start_date=min(dates), end_date=end, fields=GRADING_FIELDS)
+
         results = []
         for i, (symbol, sym_scores) in enumerate(symbol_map.items()):
             results.extend(self._process_symbol_scores(symbol, sym_scores))
@@ -162,70 +133,115 @@ class GradingEngine:
 
     def _process_symbol_scores(self, symbol: str, sym_scores: List[Dict]) -> List[Dict]:
         """Helper to process all scores for a single symbol."""
-        price_data = load_historical_data(symbol, database=self.database)
-        if not price_data or 'days' not in price_data:
+        df = self._load_price_frame(symbol)
+        if df is None:
             return [{'symbol': symbol, 'date': s['date'], 'score': s.get('score'), 'status': 'no_data'}
                     for s in sym_scores]
 
+        return self._evaluate_batch(sym_scores, df)
+
+    def _load_price_frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Loads a symbol's history as a DataFrame with 'YYYY-MM-DD' string dates."""
+        df = None
+        if self.panel is not None and symbol in self.panel:
+            df = self.panel.frame(symbol)
+        elif get_settings().price_store == 'columnar':
+            columnar = load_columnar_data_from_mongo(symbol, self.database)
+            if columnar:
+                df = columnar['frame']
+
+        if df is not None:
+            df['date'] = np.datetime_as_string(df['date'].to_numpy(dtype='datetime64[D]'), unit='D')
+            return df
+
+        price_data = load_historical_data(symbol, database=self.database)
+        if not price_data or 'days' not in price_data:
+            return None
+
         df = pd.DataFrame(price_data['days'])
         df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-
-        return [self._evaluate_with_df(s, df) for s in sym_scores]
+        return df
 
     def _evaluate_with_df(self, score_doc: Dict, df: pd.DataFrame) -> Dict:
         """
         Internal method to evaluate a score using a pre-loaded DataFrame.
         """
-        metadata = score_doc.get('metadata', {})
-        params = TradeParams(
-            symbol=score_doc['symbol'],
-            signal_date=score_doc['date'],
-            entry_price=metadata.get('entry_price'),
-            stop_loss=metadata.get('stop_loss'),
-            take_profit=metadata.get('take_profit'),
-            score=score_doc.get('score'),
-            strategy=score_doc.get('strategy', 'unknown'),
-            components=metadata.get('components', {})
-        )
+        return self._evaluate_batch([score_doc], df)[0]
 
-        if any(v is None for v in [params.entry_price, params.stop_loss, params.take_profit]):
-            return {'symbol': params.symbol, 'date': params.signal_date,
-                    'score': params.score, 'status': 'missing_metadata'}
-
-        # Get data strictly after signal_date
-        future_data = df[df['date'] > params.signal_date].sort_values('date').head(self.hold_days)
-        if future_data.empty:
-            return {'symbol': params.symbol, 'date': params.signal_date,
-                    'score': params.score, 'status': 'no_future_data'}
-
-        sim = self._simulate_trade(params, future_data)
+    def _evaluate_batch(self, score_docs: List[Dict], df: pd.DataFrame) -> List[Dict]:
+        """
+        Evaluates many score documents of one symbol against its pre-loaded DataFrame
+        with a single call to the vectorized trade simulator.
+        """
+        params = []
+        for score_doc in score_docs:
+            metadata = score_doc.get('metadata', {})
+            params.append(TradeParams(
+                symbol=score_doc['symbol'],
+                signal_date=score_doc['date'],
+                entry_price=metadata.get('entry_price'),
+                stop_loss=metadata.get('stop_loss'),
+                take_profit=metadata.get('take_profit'),
+                score=score_doc.get('score'),
+                strategy=score_doc.get('strategy', 'unknown'),
+                components=metadata.get('components', {})
+            ))
+
+        results: List[Optional[Dict]] = [None] * len(params)
+        tradable = []
+        for i, p in enumerate(params):
+            if any(v is None for v in [p.entry_price, p.stop_loss, p.take_profit]):
+                results[i] = {'symbol': p.symbol, 'date': p.signal_date,
+                              'score': p.score, 'status': 'missing_metadata'}
+            else:
+                tradable.append(i)
+        if not tradable:
+            return results
+
+        # Sort once; each trade starts at the first bar strictly after its signal date
+        if not df['date'].is_monotonic_increasing:
+            df = df.sort_values('date', kind='stable')
+        dates = df['date'].to_numpy().astype(str)
+        trades = [params[i] for i in tradable]
+        start = np.searchsorted(dates, [p.signal_date for p in trades], side='right')
+        entry = np.array([p.entry_price for p in trades], dtype=float)
+
+        sim = simulate_bracket_trades(
+            df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), start, entry,
+            [p.stop_loss for p in trades], [p.take_profit for p in trades], self.hold_days
+        )
 
         # ATR at signal date (or closest before)
-        signal_rows = df[df['date'] <= params.signal_date]
-        atr = signal_rows.iloc[-1].get('atr_14', 1.0) if not signal_rows.empty else 1.0
-        if pd.isna(atr) or atr <= 0:
-            atr = 1.0
-
-        pnl = ((sim.exit_price / params.entry_price) - 1) * 100
-        mae_atr = (params.entry_price - sim.min_low) / atr if atr > 0 else 0
-        mfe_atr = (sim.max_high - params.entry_price) / atr if atr > 0 else 0
-
-        return {
-            'symbol': params.symbol,
-            'date': params.signal_date,
-            'score': params.score,
-            'strategy': params.strategy,
-            'components': params.components,
-            'status': sim.status,
-            'entry': params.entry_price,
-            'exit_price': sim.exit_price,
-            'exit_date': sim.exit_date,
-            'pnl': pnl,
-            'max_gain': sim.max_gain,
-            'mae_atr': mae_atr,
-            'mfe_atr': mfe_atr,
-            'days_held': sim.days_held
-        }
+        atr_values = df['atr_14'].to_numpy(dtype=float) if 'atr_14' in df.columns else np.ones(len(df))
+        atr = np.where(start > 0, atr_values[np.maximum(start - 1, 0)], 1.0)
+        atr = np.where(np.isnan(atr) | (atr <= 0), 1.0, atr)
+
+        pnl = (sim.exit_price / entry - 1) * 100
+        mae_atr = (entry - sim.min_low) / atr
+        mfe_atr = (sim.max_high - entry) / atr
+
+        for k, (i, p) in enumerate(zip(tradable, trades)):
+            if sim.status[k] == 'no_future_data':
+                results[i] = {'symbol': p.symbol, 'date': p.signal_date,
+                              'score': p.score, 'status': 'no_future_data'}
+                continue
+            results[i] = {
+                'symbol': p.symbol,
+                'date': p.signal_date,
+                'score': p.score,
+                'strategy': p.strategy,
+                'components': p.components,
+                'status': sim.status[k],
+                'entry': p.entry_price,
+                'exit_price': float(sim.exit_price[k]),
+                'exit_date': dates[sim.exit_idx[k]],
+                'pnl': float(pnl[k]),
+                'max_gain': float(sim.max_gain[k]),
+                'mae_atr': float(mae_atr[k]),
+                'mfe_atr': float(mfe_atr[k]),
+                'days_held': int(sim.days_held[k])
+            }
+        return results
 
     @staticmethod
     def summarize_results(results: List[Dict]) -> pd.DataFrame:
@@ -30,7 +30,7 @@ import mplfinance as mpf #pylint: disable=import-error
 
 from bluehorseshoe.reporting.report_generator import GraphData, graph
 from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore
-from bluehorseshoe.core.config import weights_config
+from bluehorseshoe.core.config import WeightSet, weights_config
 
 
 
@@ -60,8 +60,11 @@ class CandlestickIndicator(Indicator):
         calculate_score() -> float:
     """
 
-    def __init__(self, data: pd.DataFrame):
-        self.weights = weights_config.get_weights('candlestick')
+    # TA-Lib patterns read a fixed window (pattern bars plus 10-bar candle averages)
+    warmup_bars = 30
+
+    def __init__(self, data: pd.DataFrame, weights: Optional[WeightSet] = None):
+        self.weights = (weights if weights is not None else weights_config).get_weights('candlestick')
         self.required_cols = ['open', 'close', 'high', 'low']
         self.symbol = 'NONAME'
         super().__init__(data)
@@ -224,6 +227,15 @@ class CandlestickIndicator(Indicator):
 
         return 1.0 if belt_hold[-1] >= 100 else -1.0 if belt_hold[-1] <= -100 else 0.0
 
+    def sub_indicators(self) -> dict:
+        """Sub-indicator name -> (score function, weight), in aggregation order."""
+        return {
+            'soldiers': (self.detect_three_white_soldiers, 'THREE_WHITE_SOLDIERS_MULTIPLIER'),
+            'methods': (self.find_rise_fall_3_methods, 'RISE_FALL_3_METHODS_MULTIPLIER'),
+            'marubozu': (self.find_marubozu, 'MARUBOZU_MULTIPLIER'),
+            'belt_hold': (self.find_belt_hold, 'BELT_HOLD_MULTIPLIER')
+        }
+
     def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
         """
         Calculate the combined score based on various candlestick patterns.
@@ -231,12 +243,7 @@ class CandlestickIndicator(Indicator):
         buy_score = 1.0 if aggregation == "product" else 0.0
         active_count = 0
 
-        sub_map = {
-            'soldiers': (self.detect_three_white_soldiers, 'THREE_WHITE_SOLDIERS_MULTIPLIER'),
-            'methods': (self.find_rise_fall_3_methods, 'RISE_FALL_3_METHODS_MULTIPLIER'),
-            'marubozu': (self.find_marubozu, 'MARUBOZU_MULTIPLIER'),
-            'belt_hold': (self.find_belt_hold, 'BELT_HOLD_MULTIPLIER')
-        }
+        sub_map = self.sub_indicators()
 
         for name, (func, weight_key) in sub_map.items():
             if enabled_sub_indicators is None or name in enabled_sub_indicators:
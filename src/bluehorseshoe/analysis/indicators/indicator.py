@@ -8,6 +8,7 @@ methods to provide specific functionality for different types of indicators.
 
 Attributes:
     required_cols (list): A list of column names required in the input data.
+    warmup_bars (int): Bars of history the score of the last bar depends on.
 
 Methods:
     __init__(data: pd.DataFrame):
@@ -21,17 +22,32 @@ Methods:
         Abstract method to calculate and return the buy and sell scores.
         Must be implemented by subclasses.
 
+    get_raw_signals(enabled_sub_indicators: list[str] | None) -> dict[str, float]:
+        Returns the unweighted score of every sub-indicator listed by `sub_indicators`.
+
     graph() -> None:
         Abstract method to generate a graph for the indicator.
         Must be implemented by subclasses.
 """
 
+import math
 from collections import namedtuple
 from abc import ABC, abstractmethod
+from typing import Dict, Optional
 import pandas as pd
 
 IndicatorScore = namedtuple('Score', ['buy', 'sell'])
 
+# Weight an EMA may still give to bars before a lookback slice. At 1e-6 the
+# sliced and full-history scores agree (see tests/test_lookback.py).
+EMA_CONVERGENCE_TOLERANCE = 1e-6
+
+
+def ema_warmup(alpha: float, tolerance: float = EMA_CONVERGENCE_TOLERANCE) -> int:
+    """Bars after which an EMA with smoothing factor `alpha` has forgotten its seed."""
+    return int(math.ceil(math.log(tolerance) / math.log(1.0 - alpha)))
+
+
 class Indicator(ABC):
     """
     Abstract base class for financial indicators.
@@ -43,6 +59,9 @@ class Indicator(ABC):
 
     Attributes:
         required_cols (list): A list of column names required in the input data.
+        warmup_bars (int): Bars of history the score of the last bar depends on,
+            including the bars EMA-seeded calculations need to converge. Scoring only
+            the last `warmup_bars` rows gives the same result as the full history.
 
     Methods:
         __init__(data: pd.DataFrame):
@@ -56,12 +75,16 @@ class Indicator(ABC):
             Abstract method to calculate and return the buy and sell scores.
             Must be implemented by subclasses.
 
+        get_raw_signals(enabled_sub_indicators: list[str] | None) -> dict[str, float]:
+            Returns the unweighted score of every sub-indicator listed by `sub_indicators`.
+
         graph() -> None:
             Abstract method to generate a graph for the indicator.
             Must be implemented by subclasses.
     """
 
     required_cols = []
+    warmup_bars = 1
 
     def __init__(self, data: pd.DataFrame):
         if self._validate_columns(data, self.required_cols):
@@ -85,6 +108,32 @@ class Indicator(ABC):
         """
         return IndicatorScore(0.0, 0.0)
 
+    def sub_indicators(self) -> dict:
+        """
+        Sub-indicators that make up the score, in aggregation order.
+
+        Returns:
+            dict: name -> (score function, weight). The weight is a key into the
+            indicator's weights, a fixed multiplier, or None for a multiplier of 1.
+        """
+        return {}
+
+    def get_raw_signals(self, enabled_sub_indicators: Optional[list[str]] = None) -> Dict[str, float]:
+        """
+        Calculate the unweighted score of each sub-indicator.
+
+        Sub-indicators whose multiplier is currently zero are included, so that the
+        scores can be re-weighted later without recomputing them.
+
+        Returns:
+            dict: sub-indicator name -> raw score.
+        """
+        return {
+            name: float(func())
+            for name, (func, _) in self.sub_indicators().items()
+            if enabled_sub_indicators is None or name in enabled_sub_indicators
+        }
+
     @abstractmethod
     def graph(self) -> None:
         """
@@ -9,6 +9,7 @@ from typing import Optional
 import pandas as pd
 from bluehorseshoe.reporting.report_generator import GraphData, graph
 from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore
+from bluehorseshoe.core.config import WeightSet
 
 PIVOT_MULTIPLIER = 1.0
 FIFTY_TWO_WEEK_MULTIPLIER = 1.0
@@ -30,7 +31,11 @@ class LimitIndicator(Indicator):
             Calculates the score based on pivot levels and a predefined multiplier.
     """
 
-    def __init__(self, data: pd.DataFrame):
+    # 52-week range, plus the previous bar for the pivot points
+    warmup_bars = 252 + 1
+
+    def __init__(self, data: pd.DataFrame, weights: Optional[WeightSet] = None):  # pylint: disable=unused-argument
+        # weights is accepted so every indicator is built alike; these multipliers are fixed
         self.symbol = 'NONAME'
         self.required_cols = ['close', 'high', 'low']
         super().__init__(data)
@@ -153,6 +158,13 @@ class LimitIndicator(Indicator):
 
         return 1.0 if position >= 90 else -1.0 if position <= 10 else 0.0
 
+    def sub_indicators(self) -> dict:
+        """Sub-indicator name -> (score function, weight), in aggregation order."""
+        return {
+            'pivot': (self.score_pivot_levels, PIVOT_MULTIPLIER),
+            '52_week': (self.score_52_week_range, FIFTY_TWO_WEEK_MULTIPLIER)
+        }
+
     def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
         """
         Calculate the score based on pivot levels and a multiplier.
@@ -160,10 +172,7 @@ class LimitIndicator(Indicator):
         buy_score = 1.0 if aggregation == "product" else 0.0
         active_count = 0
 
-        sub_map = {
-            'pivot': (self.score_pivot_levels, PIVOT_MULTIPLIER),
-            '52_week': (self.score_52_week_range, FIFTY_TWO_WEEK_MULTIPLIER)
-        }
+        sub_map = self.sub_indicators()
 
         for name, (func, multiplier) in sub_map.items():
             if enabled_sub_indicators is None or name in enabled_sub_indicators:
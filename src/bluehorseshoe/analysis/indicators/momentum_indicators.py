@@ -30,7 +30,7 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore
-from bluehorseshoe.core.config import weights_config
+from bluehorseshoe.core.config import WeightSet, weights_config
 
 
 
@@ -69,8 +69,11 @@ class MomentumIndicator(Indicator):
         the relevant technical indicator data for analysis.
         """
 
-    def __init__(self, data: pd.DataFrame):
-        self.weights = weights_config.get_weights('momentum')
+    # ROC standard deviation and CCI windows; the rest reads stored indicator columns
+    warmup_bars = 20 + 1
+
+    def __init__(self, data: pd.DataFrame, weights: Optional[WeightSet] = None):
+        self.weights = (weights if weights is not None else weights_config).get_weights('momentum')
         self.required_cols = ['close', 'high', 'low']
         super().__init__(data)
 
@@ -259,12 +262,9 @@ class MomentumIndicator(Indicator):
             default=0
         ).item()
 
-    def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
-        buy_score = 1.0 if aggregation == "product" else 0.0
-        active_count = 0
-
-        # Mapping of sub-indicator names to their calculation methods and weight keys
-        sub_map = {
+    def sub_indicators(self) -> dict:
+        """Sub-indicator name -> (score function, weight), in aggregation order."""
+        return {
             'macd': (self.calculate_macd, 'MACD_MULTIPLIER'),
             'roc': (self.calculate_roc, 'ROC_MULTIPLIER'),
             'rsi': (self.calculate_rsi, 'RSI_MULTIPLIER'),
@@ -273,6 +273,12 @@ class MomentumIndicator(Indicator):
             'cci': (self.calculate_cci, 'CCI_MULTIPLIER')
         }
 
+    def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
+        buy_score = 1.0 if aggregation == "product" else 0.0
+        active_count = 0
+
+        sub_map = self.sub_indicators()
+
         for name, (func, weight_key) in sub_map.items():
             if enabled_sub_indicators is None or name in enabled_sub_indicators:
                 multiplier = self.weights[weight_key] if weight_key else 1.0
@@ -14,7 +14,8 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
-from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore
+from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore, ema_warmup
+from bluehorseshoe.core.config import WeightSet
 
 class MovingAverageIndicator(Indicator):
     """
@@ -27,7 +28,11 @@ class MovingAverageIndicator(Indicator):
         calculate_crossovers():
     """
 
-    def __init__(self, data: pd.DataFrame):
+    # Adjusted EMA200 of the crossover check
+    warmup_bars = 200 + ema_warmup(2 / 201)
+
+    def __init__(self, data: pd.DataFrame, weights: Optional[WeightSet] = None):  # pylint: disable=unused-argument
+        # weights is accepted so every indicator is built alike; these multipliers are fixed
         self.required_cols = ['close', 'volume']
         super().__init__(data)
 
@@ -125,6 +130,13 @@ class MovingAverageIndicator(Indicator):
             return 1.0 if fast_ema.iloc[-1] > med_ema.iloc[-1] > slow_ema.iloc[-1] else 0.0
         return 0.0
 
+    def sub_indicators(self) -> dict:
+        """Sub-indicator name -> (score function, weight), in aggregation order."""
+        return {
+            'ma_score': (self.calculate_ma_score, None),
+            'crossovers': (self.calculate_crossovers, None)
+        }
+
     def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
         """
         Calculate the score based on the moving average crossover signals.
@@ -132,12 +144,9 @@ class MovingAverageIndicator(Indicator):
         buy_score = 1.0 if aggregation == "product" else 0.0
         active_count = 0
 
-        sub_map = {
-            'ma_score': self.calculate_ma_score,
-            'crossovers': self.calculate_crossovers
-        }
+        sub_map = self.sub_indicators()
 
-        for name, func in sub_map.items():
+        for name, (func, _) in sub_map.items():
             if enabled_sub_indicators is None or name in enabled_sub_indicators:
                 score = func()
                 if aggregation == "product":
@@ -17,7 +17,7 @@ import numpy as np
 import pandas as pd
 
 from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore
-from bluehorseshoe.core.config import weights_config
+from bluehorseshoe.core.config import WeightSet, weights_config
 
 
 class PriceActionIndicator(Indicator):
@@ -33,8 +33,11 @@ class PriceActionIndicator(Indicator):
     - Gap direction shows momentum shift
     """
 
-    def __init__(self, data: pd.DataFrame):
-        self.weights = weights_config.get_weights('price_action')
+    # Gap against the previous close, volume against the 20 bars before it
+    warmup_bars = 21
+
+    def __init__(self, data: pd.DataFrame, weights: Optional[WeightSet] = None):
+        self.weights = (weights if weights is not None else weights_config).get_weights('price_action')
         self.required_cols = ['open', 'close', 'volume']
         super().__init__(data)
 
@@ -109,6 +112,12 @@ class PriceActionIndicator(Indicator):
         # No significant gap
         return 0.0
 
+    def sub_indicators(self) -> dict:
+        """Sub-indicator name -> (score function, weight), in aggregation order."""
+        return {
+            'gap': (self.calculate_gap_score, 'GAP_MULTIPLIER'),
+        }
+
     def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
         """
         Compute the overall buy and sell scores derived from price action indicators.
@@ -129,10 +138,7 @@ class PriceActionIndicator(Indicator):
         buy_score = 1.0 if aggregation == "product" else 0.0
         active_count = 0
 
-        # Mapping of sub-indicator names to their calculation methods and weight keys
-        sub_map = {
-            'gap': (self.calculate_gap_score, 'GAP_MULTIPLIER'),
-        }
+        sub_map = self.sub_indicators()
 
         for name, (func, weight_key) in sub_map.items():
             if enabled_sub_indicators is None or name in enabled_sub_indicators:
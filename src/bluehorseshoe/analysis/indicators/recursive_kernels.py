@@ -0,0 +1,338 @@
+"""
+recursive_kernels.py
+
+This module provides single-pass kernels for the recursive trend indicators used by
+`TrendIndicator`: Parabolic SAR and SuperTrend (with its Wilder ATR).
+
+Each kernel walks the bars once and returns its end-of-series state along with the
+series. `state.advance(high, low, close)` continues from that state with new bars,
+so the next day's value costs O(1) instead of a pass over the whole history.
+`KernelStateCache` remembers end states by a digest of the bars they cover, which
+lets `TrendIndicator` resume from the state of the same history one bar shorter
+(the previous date of a range backtest).
+
+The loops are compiled with numba when it is installed. Without it they run as
+plain Python over lists, which avoids the per-element cost of NumPy scalar indexing.
+
+Usage example:
+    values, state = parabolic_sar(high, low, close)
+    values, state = state.advance(next_high, next_low, next_close)
+    state.flip_score()
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit  # pylint: disable=import-error
+except ImportError:
+    njit = None
+
+
+def _psar_loop(high, low, psar, start, up_trend, af, up_trend_high, down_trend_low, step, max_step):
+    """Parabolic SAR from bar `start` on; psar[start - 2:start] must hold the two prior values."""
+    for i in range(start, len(high)):
+        reversal = False
+        max_high = high[i]
+        min_low = low[i]
+
+        if up_trend:
+            psar[i] = psar[i - 1] + af * (up_trend_high - psar[i - 1])
+
+            if min_low < psar[i]:
+                reversal = True
+                psar[i] = up_trend_high
+                down_trend_low = min_low
+                af = step
+            else:
+                if max_high > up_trend_high:
+                    up_trend_high = max_high
+                    af = min(af + step, max_step)
+
+                if low[i - 2] < psar[i]:
+                    psar[i] = low[i - 2]
+                elif low[i - 1] < psar[i]:
+                    psar[i] = low[i - 1]
+        else:
+            psar[i] = psar[i - 1] - af * (psar[i - 1] - down_trend_low)
+
+            if max_high > psar[i]:
+                reversal = True
+                psar[i] = down_trend_low
+                up_trend_high = max_high
+                af = step
+            else:
+                if min_low < down_trend_low:
+                    down_trend_low = min_low
+                    af = min(af + step, max_step)
+
+                if high[i - 2] > psar[i]:
+                    psar[i] = high[i - 2]
+                elif high[i - 1] > psar[i]:
+                    psar[i] = high[i - 1]
+
+        up_trend = up_trend != reversal  # XOR
+    return up_trend, af, up_trend_high, down_trend_low
+
+
+def _supertrend_loop(high, low, close, true_range, trend_out, first_bar, period, multiplier, seed,
+                     atr, prev_close, final_upper, final_lower, trend, prev_trend):
+    """SuperTrend direction of each bar; first_bar is the index of bar 0 in the whole series."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    for j in range(len(close)):
+        i = first_bar + j
+        if i == period - 1:
+            atr = seed
+        elif i >= period:
+            atr = (atr * (period - 1) + true_range[j]) / float(period)
+
+        if i > 0:
+            hl2 = (high[j] + low[j]) / 2
+            basic_upper = hl2 + (multiplier * atr)
+            basic_lower = hl2 - (multiplier * atr)
+            if basic_upper < final_upper or prev_close > final_upper:
+                final_upper = basic_upper
+            if basic_lower > final_lower or prev_close < final_lower:
+                final_lower = basic_lower
+
+            curr = trend
+            if curr == 0:  # Initialization
+                curr = 1 if close[j] > final_upper else -1
+            if curr == 1:
+                if close[j] < final_lower:
+                    curr = -1
+            elif close[j] > final_upper:
+                curr = 1
+            prev_trend = trend
+            trend = curr
+
+        trend_out[j] = trend
+        prev_close = close[j]
+    return atr, prev_close, final_upper, final_lower, trend, prev_trend
+
+
+if njit is not None:
+    _psar_loop = njit(cache=True)(_psar_loop)
+    _supertrend_loop = njit(cache=True)(_supertrend_loop)
+
+
+def _loop_input(values: np.ndarray):
+    """Loop argument: a contiguous float64 array for numba, a list for the Python loop."""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return values if njit is not None else values.tolist()
+
+
+@dataclass(frozen=True)
+class PsarState:
+    """Parabolic SAR state after the last bar: enough to compute the next bar's value."""
+    # pylint: disable=too-many-instance-attributes
+    step: float
+    max_step: float
+    up_trend: bool
+    af: float
+    up_trend_high: float
+    down_trend_low: float
+    psar: Tuple[float, float]   # Last two SAR values
+    high: Tuple[float, float]   # Last two bars
+    low: Tuple[float, float]
+    close: Tuple[float, float]
+
+    def advance(self, high, low, close) -> Tuple[np.ndarray, 'PsarState']:
+        """SAR values of the new bars and the state after the last of them."""
+        high = np.concatenate([self.high, np.asarray(high, dtype=np.float64)])
+        low = np.concatenate([self.low, np.asarray(low, dtype=np.float64)])
+        close = np.concatenate([self.close, np.asarray(close, dtype=np.float64)])
+        psar = np.concatenate([self.psar, np.zeros(len(close) - 2)])
+        values, state = _run_psar(high, low, close, psar, 2, self.step, self.max_step,
+                                  (self.up_trend, self.af, self.up_trend_high, self.down_trend_low))
+        return values[2:], state
+
+    def flip_score(self) -> float:
+        """2.0 when the SAR flipped below price on the last bar, -2.0 when it flipped above, else 0.0."""
+        above_today = self.psar[1] > self.close[1]
+        above_yesterday = self.psar[0] > self.close[0]
+        if above_yesterday and not above_today:
+            return 2.0
+        return -2.0 if not above_yesterday and above_today else 0.0
+
+
+def _run_psar(high, low, close, psar, start, step, max_step, carry) -> Tuple[np.ndarray, PsarState]:
+    """Runs the SAR loop over context plus new bars and packages the end state."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    out = _loop_input(psar)
+    carry = _psar_loop(_loop_input(high), _loop_input(low), out, start, *carry, step, max_step)
+    values = np.asarray(out, dtype=np.float64)
+    state = PsarState(
+        step, max_step, bool(carry[0]), float(carry[1]), float(carry[2]), float(carry[3]),
+        (float(values[-2]), float(values[-1])), (float(high[-2]), float(high[-1])),
+        (float(low[-2]), float(low[-1])), (float(close[-2]), float(close[-1]))
+    )
+    return values, state
+
+
+def parabolic_sar(high, low, close, step: float = 0.02,
+                  max_step: float = 0.2) -> Tuple[np.ndarray, Optional[PsarState]]:
+    """
+    Parabolic SAR of every bar, seeded with the closes of the first two bars.
+
+    Returns:
+        tuple: (SAR values, end state); the state is None with fewer than two bars.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < 2:
+        return close.copy(), None
+    return _run_psar(high, low, close, close.copy(), 2, step, max_step, (True, step, high[0], low[0]))
+
+
+@dataclass(frozen=True)
+class SupertrendState:
+    """SuperTrend state after the last bar, including the Wilder ATR it is built on."""
+    # pylint: disable=too-many-instance-attributes
+    period: int
+    multiplier: float
+    bars: int                   # Bars seen so far
+    atr: float
+    prev_close: float
+    final_upper: float
+    final_lower: float
+    trend: int                  # 1 bullish, -1 bearish, 0 before the first comparison
+    prev_trend: int
+    pending_true_range: Tuple[float, ...] = ()  # True ranges before the ATR is seeded
+
+    def advance(self, high, low, close) -> Tuple[np.ndarray, 'SupertrendState']:
+        """Trend direction of the new bars and the state after the last of them."""
+        return _run_supertrend(high, low, close, self)
+
+    def trend_score(self) -> float:
+        """2/-2 when the trend flipped bullish/bearish on the last bar, else 1/-1 for its direction."""
+        if self.trend == 1 and self.prev_trend == -1:
+            return 2.0
+        if self.trend == -1 and self.prev_trend == 1:
+            return -2.0
+        if self.trend == 1:
+            return 1.0
+        return -1.0 if self.trend == -1 else 0.0
+
+
+def _run_supertrend(high, low, close, state: SupertrendState) -> Tuple[np.ndarray, SupertrendState]:
+    """Continues a SuperTrend state over new bars."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    prev_close = np.concatenate([[state.prev_close if state.bars else np.nan], close[:-1]])
+    # `ta.volatility.AverageTrueRange` true range: NaN-skipping max, so bar 0 is high - low
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    period = state.period
+    pending = state.pending_true_range
+    seed = 0.0
+    if state.bars < period:
+        pending = pending + tuple(true_range[:period - state.bars].tolist())
+        if len(pending) == period:
+            # Same reduction as ta's `true_range[0:window].mean()`
+            seed = float(pd.Series(pending, dtype=np.float64).mean())
+            pending = ()
+
+    trend_out = np.zeros(len(close), dtype=np.int8)
+    out = trend_out if njit is not None else [0] * len(close)
+    atr, last_close, final_upper, final_lower, trend, prev_trend = _supertrend_loop(
+        _loop_input(high), _loop_input(low), _loop_input(close), _loop_input(true_range), out,
+        state.bars, period, state.multiplier, seed, state.atr, state.prev_close,
+        state.final_upper, state.final_lower, state.trend, state.prev_trend
+    )
+    trend_out[:] = out
+    new_state = SupertrendState(
+        period, state.multiplier, state.bars + len(close), float(atr),
+        float(last_close) if len(close) else state.prev_close,
+        float(final_upper), float(final_lower), int(trend), int(prev_trend), pending
+    )
+    return trend_out, new_state
+
+
+def supertrend(high, low, close, period: int = 10,
+               multiplier: float = 3.0) -> Tuple[np.ndarray, SupertrendState]:
+    """
+    SuperTrend direction of every bar (1 bullish, -1 bearish, 0 on the first bar).
+
+    The ATR matches `ta.volatility.AverageTrueRange(window=period)`: zero before
+    bar period - 1, a simple-mean seed, then Wilder smoothing.
+    """
+    empty = SupertrendState(period, multiplier, 0, 0.0, np.nan, 0.0, 0.0, 0, 0)
+    return _run_supertrend(high, low, close, empty)
+
+
+def bar_digests(*columns: np.ndarray) -> Tuple[bytes, bytes]:
+    """
+    Digests of the bars without and with the last one, used as KernelStateCache keys.
+
+    The columns are interleaved row by row, so the digest of n - 1 bars is a prefix of
+    the digest of n bars and both come from one pass over the data.
+    """
+    rows = np.ascontiguousarray(np.column_stack(columns), dtype=np.float64)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(rows[:-1].tobytes())
+    prefix = digest.digest()
+    digest.update(rows[-1:].tobytes())
+    return prefix, digest.digest()
+
+
+class KernelStateCache:
+    """
+    Thread-safe LRU of kernel end states, keyed by (kernel, parameters, bar digest).
+
+    Args:
+        maxsize: States kept; one per symbol and kernel covers a range backtest.
+    """
+
+    def __init__(self, maxsize: int = 32768):
+        self.maxsize = maxsize
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+            return state
+
+    def _put(self, key, state) -> None:
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+
+    def resolve(self, kernel: tuple, digests: Tuple[bytes, bytes],
+                compute: Callable[[], object], advance: Callable[[object], object]):
+        """
+        End state for the bars behind `digests`.
+
+        Returns the cached state if these bars were seen, advances the state of the
+        bars without the last one by a single bar if that was seen, and otherwise runs
+        `compute` over the full history.
+        """
+        prefix, full = digests
+        state = self._get((kernel, full))
+        if state is None:
+            previous = self._get((kernel, prefix))
+            state = advance(previous) if previous is not None else compute()
+            if state is not None:
+                self._put((kernel, full), state)
+        return state
+
+    def clear(self) -> None:
+        """Drops every cached state."""
+        with self._lock:
+            self._states.clear()
+
+
+# Shared by every TrendIndicator in the process
+kernel_states = KernelStateCache()
@@ -0,0 +1,154 @@
+"""Parity tests for the single-pass Parabolic SAR and SuperTrend kernels.
+
+The references are the per-bar loops TrendIndicator used before the kernels, with
+the ATR taken from `ta.volatility.AverageTrueRange`.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from ta.volatility import AverageTrueRange
+
+from bluehorseshoe.analysis.indicators.recursive_kernels import (
+    KernelStateCache, bar_digests, parabolic_sar, supertrend
+)
+from bluehorseshoe.analysis.indicators.trend_indicators import TrendIndicator
+
+
+def _bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    opens = close + rng.normal(0, 1.0, n)
+    return pd.DataFrame({
+        'open': opens,
+        'high': np.maximum(opens, close) + rng.uniform(0, 1.5, n),
+        'low': np.minimum(opens, close) - rng.uniform(0, 1.5, n),
+        'close': close,
+        'stoch_k': 50.0,
+        'stoch_d': 50.0,
+    })
+
+
+def _psar_reference(high, low, close, step=0.02, max_step=0.2):
+    psar = close.copy()
+    up_trend, af = True, step
+    up_trend_high, down_trend_low = high[0], low[0]
+    for i in range(2, len(close)):
+        reversal = False
+        if up_trend:
+            psar[i] = psar[i - 1] + af * (up_trend_high - psar[i - 1])
+            if low[i] < psar[i]:
+                reversal, psar[i], down_trend_low, af = True, up_trend_high, low[i], step
+            else:
+                if high[i] > up_trend_high:
+                    up_trend_high, af = high[i], min(af + step, max_step)
+                if low[i - 2] < psar[i]:
+                    psar[i] = low[i - 2]
+                elif low[i - 1] < psar[i]:
+                    psar[i] = low[i - 1]
+        else:
+            psar[i] = psar[i - 1] - af * (psar[i - 1] - down_trend_low)
+            if high[i] > psar[i]:
+                reversal, psar[i], up_trend_high, af = True, down_trend_low, high[i], step
+            else:
+                if low[i] < down_trend_low:
+                    down_trend_low, af = low[i], min(af + step, max_step)
+                if high[i - 2] > psar[i]:
+                    psar[i] = high[i - 2]
+                elif high[i - 1] > psar[i]:
+                    psar[i] = high[i - 1]
+        up_trend = up_trend != reversal
+    return psar
+
+
+def _supertrend_reference(df, period=10, multiplier=3.0):
+    high, low, close = df['high'].values, df['low'].values, df['close'].values
+    atr = AverageTrueRange(df['high'], df['low'], df['close'], window=period).average_true_range().values
+    hl2 = (high + low) / 2
+    basic_upper, basic_lower = hl2 + (multiplier * atr), hl2 - (multiplier * atr)
+    final_upper, final_lower = np.zeros(len(df)), np.zeros(len(df))
+    trend = np.zeros(len(df), dtype=np.int8)
+    for i in range(1, len(df)):
+        take_upper = basic_upper[i] < final_upper[i - 1] or close[i - 1] > final_upper[i - 1]
+        final_upper[i] = basic_upper[i] if take_upper else final_upper[i - 1]
+        take_lower = basic_lower[i] > final_lower[i - 1] or close[i - 1] < final_lower[i - 1]
+        final_lower[i] = basic_lower[i] if take_lower else final_lower[i - 1]
+        curr = trend[i - 1] or (1 if close[i] > final_upper[i] else -1)
+        if curr == 1:
+            curr = -1 if close[i] < final_lower[i] else 1
+        else:
+            curr = 1 if close[i] > final_upper[i] else -1
+        trend[i] = curr
+    return trend
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_kernels_match_reference_loops(seed):
+    """Full passes reproduce the per-bar loops exactly."""
+    df = _bars(400, seed)
+    high, low, close = df['high'].values, df['low'].values, df['close'].values
+
+    values, _ = parabolic_sar(high, low, close)
+    np.testing.assert_array_equal(values, _psar_reference(high, low, close))
+
+    trend, _ = supertrend(high, low, close)
+    np.testing.assert_array_equal(trend, _supertrend_reference(df))
+
+
+@pytest.mark.parametrize("split", [0, 1, 2, 5, 9, 10, 11, 150, 399])
+def test_advancing_state_matches_full_pass(split):
+    """Resuming from an exported state, including before the ATR seed, gives the same series."""
+    df = _bars(400, 42)
+    high, low, close = df['high'].values, df['low'].values, df['close'].values
+
+    full_trend, full_state = supertrend(high, low, close)
+    head, state = supertrend(high[:split], low[:split], close[:split])
+    tail, state = state.advance(high[split:], low[split:], close[split:])
+    np.testing.assert_array_equal(np.concatenate([head, tail]), full_trend)
+    assert state == full_state
+
+    if split >= 2:
+        full_psar, full_state = parabolic_sar(high, low, close)
+        head, state = parabolic_sar(high[:split], low[:split], close[:split])
+        for i in range(split, len(close)):  # One bar at a time, like consecutive backtest dates
+            values, state = state.advance(high[i:i + 1], low[i:i + 1], close[i:i + 1])
+            head = np.concatenate([head, values])
+        np.testing.assert_array_equal(head, full_psar)
+        assert state == full_state
+
+
+def test_state_cache_resumes_from_previous_bar():
+    """A history one bar longer than a cached one is advanced, not recomputed."""
+    df = _bars(120, 3)
+    cols = [df[c].to_numpy() for c in ('high', 'low', 'close')]
+    cache = KernelStateCache(maxsize=4)
+    computed = []
+
+    def resolve(n):
+        def compute():
+            computed.append(n)
+            return parabolic_sar(*(c[:n] for c in cols))[1]
+        return cache.resolve(('psar',), bar_digests(*(c[:n] for c in cols)), compute,
+                             lambda prev: prev.advance(*(c[n - 1:n] for c in cols))[1])
+
+    states = [resolve(n) for n in range(100, 110)]
+    assert computed == [100]
+    assert states[-1] == parabolic_sar(*(c[:109] for c in cols))[1]
+    assert resolve(105) is not None and computed == [100, 105]  # Evicted by the LRU bound
+
+
+def test_trend_indicator_scores_over_consecutive_dates():
+    """Scores along a growing history equal the reference loops for every date."""
+    df = _bars(260, 8)
+    for end in range(200, 260):
+        days = df.iloc[:end].reset_index(drop=True)
+        indicator = TrendIndicator(days)
+        psar = _psar_reference(days['high'].values, days['low'].values, days['close'].values)
+        above_today, above_yesterday = psar[-1] > days['close'].iloc[-1], psar[-2] > days['close'].iloc[-2]
+        expected_psar = 2.0 if above_yesterday and not above_today else (
+            -2.0 if not above_yesterday and above_today else 0.0)
+        assert indicator.calculate_psar_score() == expected_psar
+
+        trend = _supertrend_reference(days)
+        expected_st = {(1, -1): 2.0, (-1, 1): -2.0}.get((trend[-1], trend[-2]), float(trend[-1]))
+        assert indicator.calculate_supertrend() == expected_st
@@ -33,10 +33,13 @@ import numpy as np
 import pandas as pd
 from numpy.lib.stride_tricks import sliding_window_view
 from ta.trend import AroonIndicator # pylint: disable=import-error
-from ta.volatility import DonchianChannel, AverageTrueRange # pylint: disable=import-error
+from ta.volatility import DonchianChannel # pylint: disable=import-error
 
-from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore
-from bluehorseshoe.core.config import weights_config
+from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore, ema_warmup
+from bluehorseshoe.analysis.indicators.recursive_kernels import (
+    bar_digests, kernel_states, parabolic_sar, supertrend
+)
+from bluehorseshoe.core.config import WeightSet, weights_config
 
 
 
@@ -56,9 +59,14 @@ class TrendIndicator(Indicator):
     - SuperTrend
     """
 
-    def __init__(self, data: pd.DataFrame):
-        self.weights = weights_config.get_weights('trend')
+    # Keltner and TTM Squeeze ATRs (alpha 1/20) converge slowest; the Parabolic SAR
+    # forgets its seed after a few reversals, well within that
+    warmup_bars = max(52 + 26 + 1, 20 + ema_warmup(1 / 20), 10 + ema_warmup(1 / 10) + 1, 250)
+
+    def __init__(self, data: pd.DataFrame, weights: Optional[WeightSet] = None):
+        self.weights = (weights if weights is not None else weights_config).get_weights('trend')
         self.required_cols = ['high', 'low', 'close', 'open', 'stoch_k', 'stoch_d']
+        self._bar_digests = None
         super().__init__(data)
 
     def calculate_dmi_adx(self) -> float:
@@ -83,7 +91,7 @@ class TrendIndicator(Indicator):
 
     def calculate_psar_score(self, step: float = 0.02, max_step: float = 0.2) -> float:
         """
-        Calculates a Parabolic SAR flip-based score using numpy arrays (no pandas iloc).
+        Calculates a Parabolic SAR flip-based score with the single-pass SAR kernel.
 
         Parabolic SAR flips if it moves from above price to below price (bullish)
         or from below price to above price (bearish).
@@ -92,70 +100,31 @@ class TrendIndicator(Indicator):
         :param max_step: The maximum step for AF, commonly 0.2.
         :return:         A float representing the SAR-based score for the latest row.
         """
-        n = len(self.days)
-        if n < 2:
+        if len(self.days) < 2:
             return 0.0
 
-        high = self.days['high'].values
-        low = self.days['low'].values
-        close = self.days['close'].values
-
-        # Compute PSAR using numpy arrays
-        psar = close.copy()
-        up_trend = True
-        af = step
-        up_trend_high = high[0]
-        down_trend_low = low[0]
-
-        for i in range(2, n):
-            reversal = False
-            max_high = high[i]
-            min_low = low[i]
-
-            if up_trend:
-                psar[i] = psar[i - 1] + af * (up_trend_high - psar[i - 1])
-
-                if min_low < psar[i]:
-                    reversal = True
-                    psar[i] = up_trend_high
-                    down_trend_low = min_low
-                    af = step
-                else:
-                    if max_high > up_trend_high:
-                        up_trend_high = max_high
-                        af = min(af + step, max_step)
-
-                    if low[i - 2] < psar[i]:
-                        psar[i] = low[i - 2]
-                    elif low[i - 1] < psar[i]:
-                        psar[i] = low[i - 1]
-            else:
-                psar[i] = psar[i - 1] - af * (psar[i - 1] - down_trend_low)
-
-                if max_high > psar[i]:
-                    reversal = True
-                    psar[i] = down_trend_low
-                    up_trend_high = max_high
-                    af = step
-                else:
-                    if min_low < down_trend_low:
-                        down_trend_low = min_low
-                        af = min(af + step, max_step)
-
-                    if high[i - 2] > psar[i]:
-                        psar[i] = high[i - 2]
-                    elif high[i - 1] > psar[i]:
-                        psar[i] = high[i - 1]
-
-            up_trend = up_trend != reversal  # XOR
+        state = self._kernel_state(
+            ('psar', step, max_step),
+            lambda high, low, close: parabolic_sar(high, low, close, step, max_step)[1]
+        )
+        return state.flip_score()
 
-        # Detect flip between last two days
-        psar_above_today = psar[-1] > close[-1]
-        psar_above_yesterday = psar[-2] > close[-2]
+    def _kernel_state(self, kernel: tuple, compute):
+        """
+        End state of a recursive kernel over self.days.
 
-        if psar_above_yesterday and not psar_above_today:
-            return 2.0
-        return -2.0 if not psar_above_yesterday and psar_above_today else 0.0
+        When the same history one bar shorter was scored before (the previous date of a
+        range backtest), its cached state is advanced by the last bar instead of rerunning
+        the kernel over every bar.
+        """
+        high, low, close = (self.days[col].to_numpy(dtype=np.float64) for col in ('high', 'low', 'close'))
+        if self._bar_digests is None:
+            self._bar_digests = bar_digests(high, low, close)
+        return kernel_states.resolve(
+            kernel, self._bar_digests,
+            compute=lambda: compute(high, low, close),
+            advance=lambda previous: previous.advance(high[-1:], low[-1:], close[-1:])[1]
+        )
 
     def calculate_ichimoku(self):
         """
@@ -338,7 +307,7 @@ class TrendIndicator(Indicator):
 
     def calculate_supertrend(self, period: int = 10, multiplier: float = 3.0) -> float:
         """
-        Calculate SuperTrend score (OPTIMIZED VERSION).
+        Calculate SuperTrend score with the single-pass SuperTrend kernel.
 
         SuperTrend is an ATR-based trailing stop indicator.
 
@@ -349,75 +318,13 @@ class TrendIndicator(Indicator):
         • -1 if Bearish (Red)
         """
         if len(self.days) < period + 1:
-             return 0.0
-
-        # Convert to numpy arrays once (avoid repeated .iloc[] calls)
-        high = self.days['high'].values
-        low = self.days['low'].values
-        close = self.days['close'].values
+            return 0.0
 
-        # Calculate ATR using numpy
-        atr_indicator = AverageTrueRange(
-            self.days['high'],
-            self.days['low'],
-            self.days['close'],
-            window=period
+        state = self._kernel_state(
+            ('supertrend', period, multiplier),
+            lambda high, low, close: supertrend(high, low, close, period, multiplier)[1]
         )
-        atr = atr_indicator.average_true_range().values
-
-        # Vectorized calculations
-        hl2 = (high + low) / 2
-        basic_upper = hl2 + (multiplier * atr)
-        basic_lower = hl2 - (multiplier * atr)
-
-        # Initialize result arrays
-        n = len(self.days)
-        final_upper = np.zeros(n)
-        final_lower = np.zeros(n)
-        trend = np.zeros(n, dtype=np.int8)  # Use int8 for memory efficiency
-
-        # Optimized iterative calculation using numpy arrays (no .iloc[])
-        for i in range(1, n):
-            # Final Upper
-            if basic_upper[i] < final_upper[i-1] or close[i-1] > final_upper[i-1]:
-                final_upper[i] = basic_upper[i]
-            else:
-                final_upper[i] = final_upper[i-1]
-
-            # Final Lower
-            if basic_lower[i] > final_lower[i-1] or close[i-1] < final_lower[i-1]:
-                final_lower[i] = basic_lower[i]
-            else:
-                final_lower[i] = final_lower[i-1]
-
-            # Trend
-            curr_trend = trend[i-1]
-            if curr_trend == 0:  # Initialization
-                curr_trend = 1 if close[i] > final_upper[i] else -1
-
-            if curr_trend == 1:
-                if close[i] < final_lower[i]:
-                    curr_trend = -1
-            else:
-                if close[i] > final_upper[i]:
-                    curr_trend = 1
-
-            trend[i] = curr_trend
-
-        # Scoring
-        curr = trend[-1]
-        prev = trend[-2]
-
-        if curr == 1 and prev == -1:
-            return 2.0
-        elif curr == -1 and prev == 1:
-            return -2.0
-        elif curr == 1:
-            return 1.0
-        elif curr == -1:
-            return -1.0
-
-        return 0.0
+        return state.trend_score()
 
     def calculate_ttm_squeeze(self, bb_length: int = 20, bb_std: float = 2.0,
                               kc_length: int = 20, kc_atr_mult: float = 1.5) -> float:
@@ -591,9 +498,8 @@ class TrendIndicator(Indicator):
         up_now = aroon_up[-1]
         down_now = aroon_down[-1]
 
-        # Previous values (for crossover detection)
+        # Previous Aroon Up (for a strengthening uptrend)
         up_prev = aroon_up[-2]
-        down_prev = aroon_down[-2]
 
         # Check for recent crossover (last 3 days)
         # Using indices -1, -2, -3 directly from numpy array
@@ -702,6 +608,31 @@ class TrendIndicator(Indicator):
         else:
             return 0.0  # At middle line
 
+    def calculate_stochastic(self) -> float:
+        """Stochastic crossover (+/-2) or oversold/overbought (+/-1) score for the last bar."""
+        k_prev = self.days['stoch_k'].shift(1)
+        d_prev = self.days['stoch_d'].shift(1)
+        crossover_up = ((self.days['stoch_k'] > self.days['stoch_d']) & (k_prev <= d_prev)).iloc[-1]
+        crossover_down = ((self.days['stoch_k'] < self.days['stoch_d']) & (k_prev >= d_prev)).iloc[-1]
+        oversold = (self.days['stoch_k'] < 20).iloc[-1]
+        overbought = (self.days['stoch_k'] > 80).iloc[-1]
+        return np.select([crossover_up, crossover_down, oversold, overbought], [2, -2, 1, -1], default=0).sum()
+
+    def sub_indicators(self) -> dict:
+        """Sub-indicator name -> (score function, weight), in aggregation order."""
+        return {
+            'stochastic': (self.calculate_stochastic, 'STOCHASTIC_MULTIPLIER'),
+            'ichimoku': (self.calculate_ichimoku_score, 'ICHIMOKU_MULTIPLIER'),
+            'psar': (self.calculate_psar_score, 'PSAR_MULTIPLIER'),
+            'heiken_ashi': (self.calculate_heiken_ashi, 'HEIKEN_ASHI_MULTIPLIER'),
+            'adx': (self.calculate_dmi_adx, 'ADX_MULTIPLIER'),
+            'donchian': (self.calculate_donchian, 'DONCHIAN_MULTIPLIER'),
+            'supertrend': (self.calculate_supertrend, 'SUPERTREND_MULTIPLIER'),
+            'ttm_squeeze': (self.calculate_ttm_squeeze, 'TTM_SQUEEZE_MULTIPLIER'),
+            'aroon': (self.calculate_aroon, 'AROON_MULTIPLIER'),
+            'keltner': (self.calculate_keltner, 'KELTNER_MULTIPLIER')
+        }
+
     def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
         """
         Calculate the trend score based on the following indicators:
@@ -718,30 +649,8 @@ class TrendIndicator(Indicator):
         buy_score = 1.0 if aggregation == "product" else 0.0
         active_count = 0
 
-        # Sub-indicator mapping
-        def calc_stochastic():
-            k_prev = self.days['stoch_k'].shift(1)
-            d_prev = self.days['stoch_d'].shift(1)
-            crossover_up = ((self.days['stoch_k'] > self.days['stoch_d']) & (k_prev <= d_prev)).iloc[-1]
-            crossover_down = ((self.days['stoch_k'] < self.days['stoch_d']) & (k_prev >= d_prev)).iloc[-1]
-            oversold = (self.days['stoch_k'] < 20).iloc[-1]
-            overbought = (self.days['stoch_k'] > 80).iloc[-1]
-            return np.select([crossover_up, crossover_down, oversold, overbought], [2, -2, 1, -1], default=0).sum()
-
-        sub_map = {
-            'stochastic': (calc_stochastic, 'STOCHASTIC_MULTIPLIER'),
-            'ichimoku': (self.calculate_ichimoku_score, 'ICHIMOKU_MULTIPLIER'),
-            'psar': (self.calculate_psar_score, 'PSAR_MULTIPLIER'),
-            'heiken_ashi': (self.calculate_heiken_ashi, 'HEIKEN_ASHI_MULTIPLIER'),
-            'adx': (self.calculate_dmi_adx, 'ADX_MULTIPLIER'),
-            'donchian': (self.calculate_donchian, 'DONCHIAN_MULTIPLIER'),
-            'supertrend': (self.calculate_supertrend, 'SUPERTREND_MULTIPLIER'),
-            'ttm_squeeze': (self.calculate_ttm_squeeze, 'TTM_SQUEEZE_MULTIPLIER'),
-            'aroon': (self.calculate_aroon, 'AROON_MULTIPLIER'),
-            'keltner': (self.calculate_keltner, 'KELTNER_MULTIPLIER')
-        }
-
-        for name, (func, weight_key) in sub_map.items():
+        for name, sub_indicator in self.sub_indicators().items():
+            func, weight_key = sub_indicator
             if enabled_sub_indicators is None or name in enabled_sub_indicators:
                 multiplier = self.weights[weight_key]
                 if multiplier == 0.0:
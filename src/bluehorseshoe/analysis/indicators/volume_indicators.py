@@ -35,8 +35,8 @@ import pandas as pd
 from ta.volume import OnBalanceVolumeIndicator, ChaikinMoneyFlowIndicator, MFIIndicator, AccDistIndexIndicator, ForceIndexIndicator #pylint: disable=import-error
 from ta.volatility import AverageTrueRange # pylint: disable=import-error
 
-from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore
-from bluehorseshoe.core.config import weights_config
+from bluehorseshoe.analysis.indicators.indicator import Indicator, IndicatorScore, ema_warmup
+from bluehorseshoe.core.config import WeightSet, weights_config
 
 
 
@@ -49,8 +49,11 @@ class VolumeIndicator(Indicator):
     A class to calculate a score based on volume indicators.
     """
 
-    def __init__(self, data: pd.DataFrame):
-        self.weights = weights_config.get_weights('volume')
+    # Wilder ATR seeded at DEFAULT_WINDOW bars; the spike score also reads it DEFAULT_WINDOW bars back
+    warmup_bars = DEFAULT_WINDOW + ema_warmup(1 / DEFAULT_WINDOW) + DEFAULT_WINDOW + 1
+
+    def __init__(self, data: pd.DataFrame, weights: Optional[WeightSet] = None):
+        self.weights = (weights if weights is not None else weights_config).get_weights('volume')
         self.required_cols = ['high', 'low', 'close', 'volume']
         super().__init__(data)
 
@@ -410,14 +413,9 @@ class VolumeIndicator(Indicator):
 
         return 0.0
 
-    def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
-        """
-        Returns a score based on the volume indicators.
-        """
-        buy_score = 1.0 if aggregation == "product" else 0.0
-        active_count = 0
-
-        sub_map = {
+    def sub_indicators(self) -> dict:
+        """Sub-indicator name -> (score function, weight), in aggregation order."""
+        return {
             'obv': (self.score_obv_trend, 'OBV_MULTIPLIER'),
             'cmf': (self.calculate_cmf_with_ta, 'CMF_MULTIPLIER'),
             'atr_band': (self.score_atr_band, 'ATR_BAND_MULTIPLIER'),
@@ -429,6 +427,15 @@ class VolumeIndicator(Indicator):
             'ad_line': (self.calculate_ad_line, 'AD_LINE_MULTIPLIER')
         }
 
+    def get_score(self, enabled_sub_indicators: Optional[list[str]] = None, aggregation: str = "sum") -> IndicatorScore:
+        """
+        Returns a score based on the volume indicators.
+        """
+        buy_score = 1.0 if aggregation == "product" else 0.0
+        active_count = 0
+
+        sub_map = self.sub_indicators()
+
         for name, (func, weight_key) in sub_map.items():
             if enabled_sub_indicators is None or name in enabled_sub_indicators:
                 multiplier = self.weights[weight_key] if weight_key else 1.0
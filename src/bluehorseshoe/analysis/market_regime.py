@@ -1,12 +1,42 @@
 """
 Module for analyzing market regime and health.
+
+Besides the per-date `get_market_health`, regimes for every trading day can be
+precomputed into the 'market_regime' collection with `MarketRegime.update_history`
+(run by `-u`), after which `get_market_health` serves them by date lookup. Breadth
+is measured over the whole universe, with one vectorized EMA pass over a close-only
+panel, both for the stored series and for dates computed on demand.
 """
 import logging
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from bluehorseshoe.analysis.constants import STRONG_R2_THRESHOLD, TREND_PERIOD
 from bluehorseshoe.data.historical_data import load_historical_data
+from bluehorseshoe.data.universe_panel import UniversePanel, panel_start_date
 from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
 
+REGIME_COLLECTION = 'market_regime'
+
+# Calendar days of regime history computed per universe panel load
+REGIME_CHUNK_DAYS = 365
+
+# Calendar days the first update_history computes when nothing is stored yet;
+# older dates are backfilled by passing start_date (`-u --regime-since DATE`)
+REGIME_BACKFILL_DAYS = 365
+
+# Calendar days of closes loaded before a chunk for the breadth EMA: bars older than
+# ~250 sessions weigh under 1e-4 in an EMA50
+BREADTH_WARMUP_DAYS = 365
+
+# Bars of history before an index is scored (EMA200)
+INDEX_MIN_BARS = 200
+BREADTH_EMA_SPAN = 50
+
+
 class MarketRegime:
     """
     Analyzes overall market health using major indices (SPY, QQQ).
@@ -14,40 +44,33 @@ class MarketRegime:
     """
     # pylint: disable=too-few-public-methods
 
+    INDICES = ['SPY', 'QQQ']
+    MAJORS = [
+        'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'TSLA', 'NVDA', 'BRK.B', 'JNJ', 'JPM',
+        'V', 'PG', 'MA', 'HD', 'UNH', 'DIS', 'BAC', 'ADBE', 'CRM', 'XOM'
+    ]
+
     @staticmethod
-    def _calculate_breadth(target_date: Optional[str] = None, database=None) -> float:
+    def _load_frame(symbol: str, target_date: Optional[str] = None, database=None,
+                    panel: Optional[UniversePanel] = None) -> Optional[pd.DataFrame]:
         """
-        Calculates market breadth: % of a sample of major stocks above their 50-day EMA.
-
-        Args:
-            target_date: Optional date to calculate breadth for
-            database: MongoDB database instance. If None, uses global singleton.
+        Loads a symbol's history up to target_date, from the panel when it holds the symbol.
         """
-        majors = [
-            'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'TSLA', 'NVDA', 'BRK.B', 'JNJ', 'JPM',
-            'V', 'PG', 'MA', 'HD', 'UNH', 'DIS', 'BAC', 'ADBE', 'CRM', 'XOM'
-        ]
-        above_ema = 0
-        total = 0
+        if panel is not None and symbol in panel:
+            return panel.frame(symbol, target_date)
 
-        for symbol in majors:
-            data = load_historical_data(symbol, database=database)
-            if not data or not data.get('days'):
-                continue
-            df = pd.DataFrame(data['days'])
-            if target_date:
-                df['date'] = pd.to_datetime(df['date'])
-                df = df[df['date'] <= pd.to_datetime(target_date)]
-            if len(df) < 50:
-                continue
-            ema50 = df['close'].ewm(span=50).mean().iloc[-1]
-            if df.iloc[-1]['close'] > ema50:
-                above_ema += 1
-            total += 1
-        return (above_ema / total) if total > 0 else 0.5
+        data = load_historical_data(symbol, database=database)
+        if not data or not data.get('days'):
+            return None
+        df = pd.DataFrame(data['days'])
+        if target_date:
+            df['date'] = pd.to_datetime(df['date'])
+            df = df[df['date'] <= pd.to_datetime(target_date)]
+        return df
 
     @staticmethod
-    def _get_index_health(symbol: str, target_date: Optional[str] = None, database=None) -> tuple[int, Dict[str, Any]]:
+    def _get_index_health(symbol: str, target_date: Optional[str] = None, database=None,
+                          panel: Optional[UniversePanel] = None) -> tuple[int, Dict[str, Any]]:
         """
         Calculates the health score for a single index.
 
@@ -55,20 +78,16 @@ class MarketRegime:
             symbol: Index symbol (e.g., SPY, QQQ)
             target_date: Optional date to calculate health for
             database: MongoDB database instance. If None, uses global singleton.
+            panel: Optional UniversePanel to slice history from.
         """
-        data = load_historical_data(symbol, database=database)
-        if not data or not data.get('days'):
+        df = MarketRegime._load_frame(symbol, target_date, database=database, panel=panel)
+        if df is None:
             logging.warning("MarketRegime: No data for %s", symbol)
             return 0, {'status': 'Unknown'}
+        if target_date and df.empty:
+            return 0, {'status': 'Unknown'}
 
-        df = pd.DataFrame(data['days'])
-        if target_date:
-            df['date'] = pd.to_datetime(df['date'])
-            df = df[df['date'] <= pd.to_datetime(target_date)]
-            if df.empty:
-                return 0, {'status': 'Unknown'}
-
-        if len(df) < 200:
+        if len(df) < INDEX_MIN_BARS:
             logging.warning("MarketRegime: Insufficient data for %s", symbol)
             return 0, {'status': 'Insufficient'}
 
@@ -105,13 +124,244 @@ class MarketRegime:
         return 'Bearish', 0.0
 
     @staticmethod
-    def get_market_health(target_date: Optional[str] = None, database=None) -> Dict[str, Any]:
+    def _breadth_points(breadth: float) -> int:
+        """Score points contributed by market breadth."""
+        if breadth > 0.6:
+            return 2
+        if breadth > 0.4:
+            return 1
+        return 0
+
+    @staticmethod
+    def _trend_series(close: np.ndarray) -> List[str]:
+        """`TechnicalAnalyzer.calculate_trend` as of every bar, from closed-form rolling fits."""
+        trends = ["Insufficient data"] * min(len(close), TREND_PERIOD - 1)
+        if len(close) < TREND_PERIOD:
+            return trends
+        windows = np.lib.stride_tricks.sliding_window_view(close, TREND_PERIOD)
+        x = np.arange(TREND_PERIOD) - (TREND_PERIOD - 1) / 2
+        centered = windows - windows.mean(axis=1, keepdims=True)
+        slope = centered @ x / (x @ x)
+        ss_tot = (centered ** 2).sum(axis=1)
+        ss_res = ss_tot - slope ** 2 * (x @ x)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r2_value = np.where(ss_tot != 0, 1 - ss_res / ss_tot, 0.0)
+        trend_map = {
+            (True, True): "Strong Uptrend",
+            (True, False): "Weak Uptrend",
+            (False, True): "Strong Downtrend",
+            (False, False): "Weak Downtrend"
+        }
+        trends.extend(trend_map[(up, strong)] for up, strong in zip(slope > 0, r2_value > STRONG_R2_THRESHOLD))
+        return trends
+
+    @staticmethod
+    def _index_health_series(df: pd.DataFrame) -> tuple[np.ndarray, List[Dict[str, Any]]]:
+        """`_get_index_health` as of every bar of an index history."""
+        close = df['close'].to_numpy(dtype=float)
+        ema20, ema50, ema200 = (df['close'].ewm(span=span).mean().to_numpy() for span in (20, 50, 200))
+        trends = MarketRegime._trend_series(close)
+        scores = ((close > ema20).astype(int) + (close > ema50) + (close > ema200)
+                  + np.array(["Downtrend" not in t for t in trends], dtype=int))
+        scores[:INDEX_MIN_BARS - 1] = 0
+
+        details = [
+            {'status': 'Insufficient'} if i < INDEX_MIN_BARS - 1 else {
+                'score': int(scores[i]), 'trend': trends[i], 'close': float(close[i]),
+                'ema20': float(ema20[i]), 'ema50': float(ema50[i]), 'ema200': float(ema200[i])
+            }
+            for i in range(len(close))
+        ]
+        return scores, details
+
+    @staticmethod
+    def breadth_series(panel: UniversePanel) -> np.ndarray:
+        """
+        Breadth as of every panel date: the fraction of panel symbols with at least 50
+        bars whose last close is above their 50-day EMA (0.5 when none qualify).
+
+        One EWM pass over the dates x symbols close matrix replaces a history load and
+        EMA per symbol per date. ignore_na keeps each symbol's EMA on its own bars.
+        """
+        closes = pd.DataFrame(panel.values[:, :, panel.fields.index('close')].T)
+        ema = closes.ewm(span=BREADTH_EMA_SPAN, ignore_na=True).mean().to_numpy()
+        last_close = closes.ffill().to_numpy()
+        eligible = np.cumsum(closes.notna().to_numpy(), axis=0) >= BREADTH_EMA_SPAN
+        above = (eligible & (last_close > ema)).sum(axis=1)
+        total = eligible.sum(axis=1)
+        return np.where(total > 0, above / np.maximum(total, 1), 0.5)
+
+    @staticmethod
+    def _universe_breadth(target_date: Optional[str] = None, database=None,
+                          panel: Optional[UniversePanel] = None) -> float:
+        """
+        Breadth as of target_date the way update_history stores it: `breadth_series`
+        over a close-only panel of the whole universe.
+
+        Args:
+            target_date: Optional date to calculate breadth for (default: the latest bars).
+            database: MongoDB database instance the universe closes are loaded from.
+            panel: Panel used as the universe when no database is given.
+        """
+        if database is not None:
+            end = pd.Timestamp(target_date) if target_date else pd.Timestamp.now()
+            panel = UniversePanel.from_database(
+                database, start_date=panel_start_date(end.strftime('%Y-%m-%d'), BREADTH_WARMUP_DAYS),
+                end_date=target_date, fields=['close'])
+        if panel is None:
+            return 0.5
+        day = panel.date_index(target_date) - 1
+        return float(MarketRegime.breadth_series(panel)[day]) if day >= 0 else 0.5
+
+    @staticmethod
+    def compute_history(panel: UniversePanel, index_frames: Dict[str, pd.DataFrame],
+                        start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Market regime of every index session in [start_date, end_date].
+
+        Args:
+            panel: Close panel of the breadth universe, covering the range and at least
+                50 sessions before it.
+            index_frames: Full histories of the INDICES (oldest bar first).
+            start_date: First date ('YYYY-MM-DD'), default the first index session.
+            end_date: Last date ('YYYY-MM-DD'), default the last index session.
+
+        Returns:
+            list: One `get_market_health` dict per session, with its 'date'.
+        """
+        series = {}
+        for symbol in MarketRegime.INDICES:
+            df = index_frames.get(symbol)
+            if df is None or df.empty:
+                continue
+            scores, details = MarketRegime._index_health_series(df)
+            series[symbol] = (pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d').to_numpy(), scores, details)
+
+        sessions = np.unique(np.concatenate([dates for dates, _, _ in series.values()])) if series else []
+        sessions = [d for d in sessions if (start_date is None or d >= start_date) and (end_date is None or d <= end_date)]
+        breadth = MarketRegime.breadth_series(panel)
+
+        history = []
+        for date in sessions:
+            health_data = {}
+            total_score = 0
+            for symbol in MarketRegime.INDICES:
+                if symbol not in series:
+                    health_data[symbol] = {'status': 'Unknown'}
+                    continue
+                dates, scores, details = series[symbol]
+                pos = int(np.searchsorted(dates, date, side='right')) - 1
+                if pos < 0:
+                    health_data[symbol] = {'status': 'Unknown'}
+                    continue
+                total_score += int(scores[pos])
+                health_data[symbol] = details[pos]
+
+            day = panel.date_index(date) - 1
+            health_data['breadth'] = float(breadth[day]) if day >= 0 else 0.5
+            total_score += MarketRegime._breadth_points(health_data['breadth'])
+
+            status, multiplier = MarketRegime._get_final_status(total_score)
+            history.append({'date': date, 'status': status, 'multiplier': multiplier, 'details': health_data})
+        return history
+
+    @staticmethod
+    def update_history(database=None, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       chunk_days: int = REGIME_CHUNK_DAYS) -> int:
+        """
+        Computes and stores the regime of every session into the 'market_regime' collection.
+
+        Args:
+            database: MongoDB database instance. Required.
+            start_date: First date to (re)compute. Default: the session after the last
+                stored date, or the last REGIME_BACKFILL_DAYS when nothing is stored yet.
+            end_date: Last date to compute, default the last index session.
+            chunk_days: Calendar days computed per universe panel load.
+
+        Returns:
+            int: Number of regime documents written.
+        """
+        if database is None:
+            raise ValueError("database parameter is required for MarketRegime.update_history")
+        collection = database[REGIME_COLLECTION]
+        collection.create_index('date', unique=True)
+
+        index_frames = {}
+        for symbol in MarketRegime.INDICES:
+            df = MarketRegime._load_frame(symbol, end_date, database=database)
+            if df is not None and not df.empty:
+                index_frames[symbol] = df
+        if not index_frames:
+            logging.warning("MarketRegime: No index data, regime history not updated.")
+            return 0
+        sessions = np.unique(np.concatenate([
+            pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d').to_numpy() for df in index_frames.values()]))
+
+        if start_date is None:
+            last = collection.find_one({}, sort=[('date', -1)])
+            if last:
+                pending = sessions[sessions > last['date']]
+            else:
+                # First run: a bounded window, not the whole index history
+                window_start = pd.Timestamp(sessions[-1]) - pd.Timedelta(days=REGIME_BACKFILL_DAYS)
+                pending = sessions[sessions >= window_start.strftime('%Y-%m-%d')]
+            if len(pending) == 0:
+                logging.info("MarketRegime: Regime history is up to date.")
+                return 0
+            start_date = pending[0]
+        end_date = end_date or sessions[-1]
+
+        written = 0
+        chunk_start = pd.Timestamp(start_date)
+        while chunk_start <= pd.Timestamp(end_date):
+            first = chunk_start.strftime('%Y-%m-%d')
+            last_day = min(chunk_start + pd.Timedelta(days=chunk_days - 1), pd.Timestamp(end_date)).strftime('%Y-%m-%d')
+            chunk_start += pd.Timedelta(days=chunk_days)
+            if not np.any((sessions >= first) & (sessions <= last_day)):
+                continue
+
+            # Closes only: the one input of breadth
+            panel = UniversePanel.from_database(database, start_date=panel_start_date(first, BREADTH_WARMUP_DAYS),
+                                                end_date=last_day, fields=['close'])
+            history = MarketRegime.compute_history(panel, index_frames, first, last_day)
+            now = datetime.now(timezone.utc)
+            operations = [UpdateOne({'date': doc['date']}, {'$set': {**doc, 'updated_at': now}}, upsert=True)
+                          for doc in history]
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+            written += len(operations)
+            logging.info("MarketRegime: Regime history stored through %s (%d sessions).", last_day, written)
+        return written
+
+    @staticmethod
+    def _stored_health(target_date: Optional[str], database=None) -> Optional[Dict[str, Any]]:
+        """The precomputed regime of target_date, if the 'market_regime' collection has it."""
+        if database is None or not target_date:
+            return None
+        try:
+            doc = database[REGIME_COLLECTION].find_one({'date': str(target_date)[:10]})
+        except PyMongoError as e:
+            logging.warning("MarketRegime: Regime lookup failed: %s", e)
+            return None
+        if not isinstance(doc, dict):
+            return None
+        return {'status': doc['status'], 'multiplier': doc['multiplier'], 'details': doc['details']}
+
+    @staticmethod
+    def get_market_health(target_date: Optional[str] = None, database=None,
+                          panel: Optional[UniversePanel] = None) -> Dict[str, Any]:
         """
         Determines the current market regime using price action, EMAs, and Breadth.
 
+        A date stored by `update_history` is served from the 'market_regime' collection.
+        Other dates are computed here, with breadth over the whole universe as well
+        (see `_universe_breadth`), so both agree.
+
         Args:
             target_date: Optional date to calculate health for
             database: MongoDB database instance. If None, uses global singleton.
+            panel: Optional UniversePanel to slice index history from instead of loading it.
+                Breadth only reads it when no database is given.
 
         Returns:
             {
@@ -120,20 +370,20 @@ class MarketRegime:
                 'details': { 'SPY': ..., 'QQQ': ..., 'breadth': ... }
             }
         """
-        indices = ['SPY', 'QQQ']
+        stored = MarketRegime._stored_health(target_date, database)
+        if stored is not None:
+            return stored
+
         health_data = {}
         total_score = 0
 
-        for symbol in indices:
-            score, details = MarketRegime._get_index_health(symbol, target_date, database=database)
+        for symbol in MarketRegime.INDICES:
+            score, details = MarketRegime._get_index_health(symbol, target_date, database=database, panel=panel)
             total_score += score
             health_data[symbol] = details
 
-        breadth = MarketRegime._calculate_breadth(target_date, database=database)
-        if breadth > 0.6:
-            total_score += 2
-        elif breadth > 0.4:
-            total_score += 1
+        breadth = MarketRegime._universe_breadth(target_date, database=database, panel=panel)
+        total_score += MarketRegime._breadth_points(breadth)
         health_data['breadth'] = breadth
 
         status, multiplier = MarketRegime._get_final_status(total_score)
@@ -2,9 +2,9 @@
 Module for ML-based trade signal overlay.
 """
 import os
-from typing import Dict
-from datetime import datetime
+from typing import Dict, List, Optional
 import logging
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
@@ -13,7 +13,10 @@ from sklearn.metrics import classification_report
 import joblib
 
 from bluehorseshoe.analysis.grading_engine import GradingEngine
-from bluehorseshoe.analysis.ml_utils import extract_features
+from bluehorseshoe.analysis.ml_utils import (
+    PredictionItem, build_feature_matrix, extract_features, extract_features_batch
+)
+from bluehorseshoe.data.feature_store import FeatureStore
 
 class MLOverlayTrainer:
     """
@@ -59,10 +62,14 @@ class MLOverlayTrainer:
         # Filter for successful/failed trades only
         df_graded = df_graded[df_graded['status'].isin(['success', 'failure'])]
 
+        # One bulk load of overviews and news for every traded symbol
+        feature_store = FeatureStore(self.database)
+        feature_store.preload(df_graded['symbol'].unique())
+
         features = []
         for _, row in df_graded.iterrows():
             # Extract unified features
-            feat = extract_features(row['symbol'], row.get('components', {}), row['date'], database=self.database)
+            feat = extract_features(row['symbol'], row.get('components', {}), row['date'], feature_store=feature_store)
             if not feat:
                 continue
 
@@ -156,16 +163,21 @@ class MLInference:
     Handles loading the trained ML model and performing predictions.
     """
     # pylint: disable=too-few-public-methods
-    def __init__(self, model_path: str = "src/models/ml_overlay_v1.joblib", database=None):
+    def __init__(self, model_path: str = "src/models/ml_overlay_v1.joblib", database=None,
+                 feature_store: Optional[FeatureStore] = None):
         """
         Initialize ML inference.
 
         Args:
             model_path: Path to the trained model file.
             database: MongoDB database instance. Required for feature extraction.
+            feature_store: Optional shared FeatureStore. If None, one is created from database.
         """
         self.model_path = model_path
         self.database = database
+        if feature_store is None and database is not None:
+            feature_store = FeatureStore(database)
+        self.feature_store = feature_store
         self.models = {} # Cache for strategy-specific models
         self.encoders = {}
         self.features = {} # Cache for features per model
@@ -182,28 +194,15 @@ class MLInference:
             if key == "general":
                 logging.warning("ML Overlay model not found at %s", path)
 
-    def _encode_features(self, feat: Dict, encoders: Dict) -> Dict:
-        """Helper to encode categorical features for inference."""
-        for col in ['Sector', 'Industry']:
-            le = encoders.get(col)
-            val = str(feat.get(col, 'Unknown'))
-            if le:
-                try:
-                    feat[col] = le.transform([val])[0]
-                except ValueError:
-                    feat[col] = 0
-            else:
-                feat[col] = 0
-        return feat
-
-    def _prepare_inference_df(self, feat: Dict, model_key: str) -> pd.DataFrame:
-        """Aligns feature dict with model training features and returns DataFrame."""
-        df = pd.DataFrame([feat])
-        model_features = self.features.get(model_key, [])
-        for f in model_features: # pylint: disable=invalid-name
-            if f not in df.columns:
-                df[f] = 0.0
-        return df[model_features].fillna(0)
+    def _resolve_model(self, strategy: str):
+        """Returns (model key, model) for a strategy, falling back to the general model."""
+        # Try to load strategy-specific model if not already loaded
+        if strategy != "general" and strategy not in self.models:
+            strat_path = f"src/models/ml_overlay_{strategy}.joblib"
+            self._load_model(strat_path, strategy)
+
+        model_key = strategy if strategy in self.models else "general"
+        return model_key, self.models.get(model_key)
 
     def predict_probability(self, symbol: str, components: Dict[str, float], target_date: str = None, strategy: str = "general") -> float:
         """
@@ -220,30 +219,31 @@ class MLInference:
         """
         if self.database is None:
             raise ValueError("database parameter is required for predict_probability")
+        return float(self.predict_probability_batch([(symbol, components, target_date)], strategy=strategy)[0])
 
-        # Try to load strategy-specific model if not already loaded
-        if strategy != "general" and strategy not in self.models:
-            strat_path = f"src/models/ml_overlay_{strategy}.joblib"
-            self._load_model(strat_path, strategy)
+    def predict_probability_batch(self, items: List[PredictionItem], strategy: str = "general") -> np.ndarray:
+        """
+        Predicts win probabilities for many symbols with a single predict_proba call.
 
-        # Fallback to general model
-        model_key = strategy if strategy in self.models else "general"
-        model = self.models.get(model_key)
+        Args:
+            items: (symbol, components, target_date) tuples; a None date means today.
+            strategy: Strategy name for model selection.
 
-        if model is None:
-            return 0.0
+        Returns:
+            Array of success probabilities, one per item (0.0 when no model is loaded).
+        """
+        if self.database is None:
+            raise ValueError("database parameter is required for predict_probability_batch")
 
-        if target_date is None:
-            target_date = datetime.now().strftime("%Y-%m-%d")
+        model_key, model = self._resolve_model(strategy)
+        if model is None or not items:
+            return np.zeros(len(items))
 
-        # Build feature vector
-        feat = extract_features(symbol, components, target_date, database=self.database)
-        feat = self._encode_features(feat, self.encoders.get(model_key, {}))
-        df_inf = self._prepare_inference_df(feat, model_key)
+        feats = extract_features_batch(items, database=self.database, feature_store=self.feature_store)
+        df_inf = build_feature_matrix(feats, self.encoders.get(model_key, {}), self.features.get(model_key, []))
 
-        # Predict probability of class 1 (Success)
-        probs = model.predict_proba(df_inf)[0]
-        return float(probs[1])
+        # Probability of class 1 (Success)
+        return model.predict_proba(df_inf)[:, 1].astype(float)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -2,9 +2,9 @@
 Module for ML-based profit target prediction.
 """
 import os
-from typing import Dict
-from datetime import datetime
+from typing import Dict, List, Optional
 import logging
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
@@ -13,7 +13,10 @@ from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import joblib
 
 from bluehorseshoe.analysis.grading_engine import GradingEngine
-from bluehorseshoe.analysis.ml_utils import extract_features
+from bluehorseshoe.analysis.ml_utils import (
+    PredictionItem, build_feature_matrix, extract_features, extract_features_batch
+)
+from bluehorseshoe.data.feature_store import FeatureStore
 
 class ProfitTargetTrainer:
     """
@@ -73,10 +76,14 @@ class ProfitTargetTrainer:
 
         logging.info("Found %d trades with positive MFE for training.", len(df_graded))
 
+        # One bulk load of overviews and news for every traded symbol
+        feature_store = FeatureStore(self.database)
+        feature_store.preload(df_graded['symbol'].unique())
+
         features = []
         for _, row in df_graded.iterrows():
             # Extract unified features
-            feat = extract_features(row['symbol'], row.get('components', {}), row['date'], database=self.database)
+            feat = extract_features(row['symbol'], row.get('components', {}), row['date'], feature_store=feature_store)
             if not feat:
                 continue
 
@@ -201,14 +208,18 @@ class ProfitTargetInference:
     Predicts optimal ATR multiplier for a profit target.
     """
     # pylint: disable=too-few-public-methods
-    def __init__(self, database=None):
+    def __init__(self, database=None, feature_store: Optional[FeatureStore] = None):
         """
         Initialize profit target inference.
 
         Args:
             database: MongoDB database instance. Required for feature extraction.
+            feature_store: Optional shared FeatureStore. If None, one is created from database.
         """
         self.database = database
+        if feature_store is None and database is not None:
+            feature_store = FeatureStore(database)
+        self.feature_store = feature_store
         self.models = {}
         self.encoders = {}
         self.features = {}
@@ -232,28 +243,6 @@ class ProfitTargetInference:
             else:
                 logging.warning("Profit Target Model '%s' not found at %s", key, path)
 
-    def _encode_features(self, feat: Dict, encoders: Dict) -> Dict:
-        """Helper to encode categorical features for inference."""
-        for col in ['Sector', 'Industry']:
-            le = encoders.get(col)
-            val = str(feat.get(col, 'Unknown'))
-            if le:
-                try:
-                    feat[col] = le.transform([val])[0]
-                except ValueError:
-                    feat[col] = 0
-            else:
-                feat[col] = 0
-        return feat
-
-    def _prepare_inference_df(self, feat: Dict, feature_list: list) -> pd.DataFrame:
-        """Aligns feature dict with model training features and returns DataFrame."""
-        df = pd.DataFrame([feat])
-        for f in feature_list: # pylint: disable=invalid-name
-            if f not in df.columns:
-                df[f] = 0.0
-        return df[feature_list].fillna(0)
-
     def predict_profit_target_multiplier(
         self,
         symbol: str,
@@ -275,22 +264,35 @@ class ProfitTargetInference:
         """
         if self.database is None:
             raise ValueError("database parameter is required for predict_profit_target_multiplier")
+        return float(self.predict_profit_target_multiplier_batch([(symbol, components, target_date)], strategy=strategy)[0])
+
+    def predict_profit_target_multiplier_batch(self, items: List[PredictionItem], strategy: str = "baseline") -> np.ndarray:
+        """
+        Predicts profit target ATR multipliers for many symbols with a single predict call.
+
+        Args:
+            items: (symbol, components, target_date) tuples; a None date means today.
+            strategy: Trading strategy ('baseline' or 'mean_reversion')
+
+        Returns:
+            Array of recommended ATR multipliers, one per item.
+        """
+        if self.database is None:
+            raise ValueError("database parameter is required for predict_profit_target_multiplier_batch")
 
         # Determine which model to use
         model_key = strategy if strategy in self.models else 'v1'
 
         if model_key not in self.models:
             # Default fallback
-            return 3.0 if strategy == "baseline" else 2.0
-
-        if target_date is None:
-            target_date = datetime.now().strftime("%Y-%m-%d")
+            return np.full(len(items), 3.0 if strategy == "baseline" else 2.0)
+        if not items:
+            return np.zeros(0)
 
-        feat = extract_features(symbol, components, target_date, database=self.database)
-        feat = self._encode_features(feat, self.encoders[model_key])
-        df_inf = self._prepare_inference_df(feat, self.features[model_key])
+        feats = extract_features_batch(items, database=self.database, feature_store=self.feature_store)
+        df_inf = build_feature_matrix(feats, self.encoders[model_key], self.features[model_key])
 
-        predicted_mfe = float(self.models[model_key].predict(df_inf)[0])
+        predicted_mfe = self.models[model_key].predict(df_inf).astype(float)
 
         # Safety factor: Use 75% of predicted peak to exit before reversal
         # This helps lock in gains before potential reversal
@@ -298,8 +300,6 @@ class ProfitTargetInference:
 
         # Floor values to ensure minimum reasonable targets
         if strategy == "baseline":
-            recommended_multiplier = max(2.5, recommended_multiplier)
-        else:  # mean_reversion
-            recommended_multiplier = max(1.5, recommended_multiplier)
-
-        return recommended_multiplier
+            return np.maximum(2.5, recommended_multiplier)
+        # mean_reversion
+        return np.maximum(1.5, recommended_multiplier)
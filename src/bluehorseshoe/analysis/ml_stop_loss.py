@@ -2,9 +2,9 @@
 Module for ML-based stop loss prediction.
 """
 import os
-from typing import Dict
-from datetime import datetime
+from typing import Dict, List, Optional
 import logging
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
@@ -13,7 +13,10 @@ from sklearn.metrics import mean_squared_error, r2_score
 import joblib
 
 from bluehorseshoe.analysis.grading_engine import GradingEngine
-from bluehorseshoe.analysis.ml_utils import extract_features
+from bluehorseshoe.analysis.ml_utils import (
+    PredictionItem, build_feature_matrix, extract_features, extract_features_batch
+)
+from bluehorseshoe.data.feature_store import FeatureStore
 
 class StopLossTrainer:
     """
@@ -55,10 +58,14 @@ class StopLossTrainer:
         # We want to train on both successes and failures to see how deep they go
         df_graded = df_graded[df_graded['status'].isin(['success', 'failure'])]
 
+        # One bulk load of overviews and news for every traded symbol
+        feature_store = FeatureStore(self.database)
+        feature_store.preload(df_graded['symbol'].unique())
+
         features = []
         for _, row in df_graded.iterrows():
             # Extract unified features
-            feat = extract_features(row['symbol'], row.get('components', {}), row['date'], database=self.database)
+            feat = extract_features(row['symbol'], row.get('components', {}), row['date'], feature_store=feature_store)
             if not feat:
                 continue
 
@@ -138,16 +145,21 @@ class StopLossInference:
     Predicts optimal ATR multiplier for a stop loss.
     """
     # pylint: disable=too-few-public-methods
-    def __init__(self, model_path: str = "src/models/ml_stop_loss_v1.joblib", database=None):
+    def __init__(self, model_path: str = "src/models/ml_stop_loss_v1.joblib", database=None,
+                 feature_store: Optional[FeatureStore] = None):
         """
         Initialize stop loss inference.
 
         Args:
             model_path: Path to the trained model file.
             database: MongoDB database instance. Required for feature extraction.
+            feature_store: Optional shared FeatureStore. If None, one is created from database.
         """
         self.model_path = model_path
         self.database = database
+        if feature_store is None and database is not None:
+            feature_store = FeatureStore(database)
+        self.feature_store = feature_store
         self.model = None
         self.encoders = {}
         self.features = []
@@ -161,28 +173,6 @@ class StopLossInference:
             self.features = data['features']
             logging.info("Stop Loss Model loaded from %s", self.model_path)
 
-    def _encode_features(self, feat: Dict) -> Dict:
-        """Helper to encode categorical features for inference."""
-        for col in ['Sector', 'Industry']:
-            le = self.encoders.get(col)
-            val = str(feat.get(col, 'Unknown'))
-            if le:
-                try:
-                    feat[col] = le.transform([val])[0]
-                except ValueError:
-                    feat[col] = 0
-            else:
-                feat[col] = 0
-        return feat
-
-    def _prepare_inference_df(self, feat: Dict) -> pd.DataFrame:
-        """Aligns feature dict with model training features and returns DataFrame."""
-        df = pd.DataFrame([feat])
-        for f in self.features: # pylint: disable=invalid-name
-            if f not in df.columns:
-                df[f] = 0.0
-        return df[self.features].fillna(0)
-
     def predict_stop_loss_multiplier(self, symbol: str, components: Dict[str, float], target_date: str = None) -> float:
         """
         Predicts the recommended ATR multiplier for the stop loss.
@@ -197,20 +187,31 @@ class StopLossInference:
         """
         if self.database is None:
             raise ValueError("database parameter is required for predict_stop_loss_multiplier")
+        return float(self.predict_stop_loss_multiplier_batch([(symbol, components, target_date)])[0])
 
-        if self.model is None:
-            return 2.0  # Default fallback
+    def predict_stop_loss_multiplier_batch(self, items: List[PredictionItem]) -> np.ndarray:
+        """
+        Predicts stop loss ATR multipliers for many symbols with a single predict call.
+
+        Args:
+            items: (symbol, components, target_date) tuples; a None date means today.
+
+        Returns:
+            Array of recommended ATR multipliers, one per item.
+        """
+        if self.database is None:
+            raise ValueError("database parameter is required for predict_stop_loss_multiplier_batch")
 
-        if target_date is None:
-            target_date = datetime.now().strftime("%Y-%m-%d")
+        if self.model is None:
+            return np.full(len(items), 2.0)  # Default fallback
+        if not items:
+            return np.zeros(0)
 
-        feat = extract_features(symbol, components, target_date, database=self.database)
-        feat = self._encode_features(feat)
-        df_inf = self._prepare_inference_df(feat)
+        feats = extract_features_batch(items, database=self.database, feature_store=self.feature_store)
+        df_inf = build_feature_matrix(feats, self.encoders, self.features)
 
-        predicted_mae = float(self.model.predict(df_inf)[0])
+        predicted_mae = self.model.predict(df_inf).astype(float)
 
         # We recommend a stop loss slightly beyond the predicted MAE
         # e.g., predicted_mae + 0.5 ATR, with a minimum of 1.5 ATR
-        recommended_multiplier = max(1.5, predicted_mae + 0.5)
-        return recommended_multiplier
+        return np.maximum(1.5, predicted_mae + 0.5)
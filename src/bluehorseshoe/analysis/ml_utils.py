@@ -2,8 +2,16 @@
 """
 Utility functions for ML model management and performance tracking.
 """
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
 from bluehorseshoe.core.symbols import get_overview_from_mongo, get_sentiment_score
+from bluehorseshoe.data.feature_store import FeatureStore
+
+# (symbol, technical components, target date) as passed to the batch prediction APIs
+PredictionItem = Tuple[str, Dict[str, float], Optional[str]]
+
+CATEGORICAL_FEATURES = ['Sector', 'Industry']
 
 def safe_float(val: Any) -> float:
     """Safely converts a value to float, handling None and strings."""
@@ -14,7 +22,8 @@ def safe_float(val: Any) -> float:
     except (ValueError, TypeError):
         return 0.0
 
-def extract_features(symbol: str, components: Dict[str, float], target_date: str, database=None) -> Dict[str, Any]:
+def extract_features(symbol: str, components: Dict[str, float], target_date: str, database=None,
+                     feature_store: Optional[FeatureStore] = None) -> Dict[str, Any]:
     """
     Extracts a consolidated feature dictionary for a given symbol and date.
     Combines technical components, fundamental data, and sentiment scores.
@@ -23,17 +32,26 @@ def extract_features(symbol: str, components: Dict[str, float], target_date: str
         symbol: Stock symbol.
         components: Technical indicator scores.
         target_date: Target date for feature extraction.
-        database: MongoDB database instance. Required.
+        database: MongoDB database instance. Required unless feature_store is given.
+        feature_store: Optional FeatureStore; when given, overview and sentiment come from its cache.
     """
+    if feature_store is not None:
+        return _combine_features(
+            components, feature_store.get_overview(symbol), feature_store.get_sentiment(symbol, target_date)
+        )
     if database is None:
         raise ValueError("database parameter is required for extract_features")
 
+    overview = get_overview_from_mongo(symbol, database=database)
+    sentiment = get_sentiment_score(symbol, target_date, database=database)
+    return _combine_features(components, overview, sentiment)
+
+def _combine_features(components: Dict[str, float], overview: Dict[str, Any], sentiment: float) -> Dict[str, Any]:
+    """Builds the feature dict from technical components, a company overview and a sentiment score."""
     # 1. Start with Technical Features
     feat = components.copy()
 
     # 2. Fundamental Features (from overviews)
-    overview = get_overview_from_mongo(symbol, database=database)
-
     if overview:
         feat['Sector'] = overview.get('Sector', 'Unknown')
         feat['Industry'] = overview.get('Industry', 'Unknown')
@@ -48,6 +66,47 @@ def extract_features(symbol: str, components: Dict[str, float], target_date: str
         feat['PERatio'] = 0.0
 
     # 3. News Sentiment Feature
-    feat['SentimentScore'] = get_sentiment_score(symbol, target_date, database=database)
+    feat['SentimentScore'] = sentiment
 
     return feat
+
+def extract_features_batch(items: List[PredictionItem], database=None,
+                           feature_store: Optional[FeatureStore] = None) -> List[Dict[str, Any]]:
+    """
+    Batched extract_features: overviews and news for all symbols are loaded in bulk
+    through a FeatureStore. Items without a date use today.
+
+    Args:
+        items: (symbol, components, target_date) tuples.
+        database: MongoDB database instance. Required unless feature_store is given.
+        feature_store: Optional FeatureStore to reuse across batches.
+    """
+    if feature_store is None:
+        if database is None:
+            raise ValueError("database parameter is required for extract_features_batch")
+        feature_store = FeatureStore(database)
+    if not items:
+        return []
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    feature_store.preload(symbol for symbol, _, _ in items)
+    return [
+        extract_features(symbol, components, target_date or today, feature_store=feature_store)
+        for symbol, components, target_date in items
+    ]
+
+def build_feature_matrix(features: List[Dict[str, Any]], encoders: Dict, feature_names: List[str]) -> pd.DataFrame:
+    """
+    Encodes categorical features and aligns rows with a model's training features.
+    Unknown categories and missing features become 0.
+    """
+    df = pd.DataFrame(features)
+    for col in CATEGORICAL_FEATURES:
+        le = encoders.get(col)
+        values = df[col].astype(str) if col in df.columns else pd.Series('Unknown', index=df.index)
+        if le:
+            codes = {label: code for code, label in enumerate(le.classes_)}
+            df[col] = values.map(codes).fillna(0).astype(int)
+        else:
+            df[col] = 0
+    return df.reindex(columns=feature_names, fill_value=0.0).fillna(0)
@@ -0,0 +1,261 @@
+"""
+performance.py
+
+Scores the suggestions of past sessions against the bar of the session after them,
+with one query for the candidates and one for the bars however many dates and
+symbols are involved.
+
+A candidate (top `top_n` scores of each strategy on a pick date, with its
+entry/stop/target from the score metadata) is evaluated on the next session's bar:
+
+- No Entry: the low never reached the entry price;
+- Stopped Out: entered and the low reached the stop (checked first, as before);
+- Target Hit: entered and the high reached the target;
+- Active: entered, neither level reached; marked to the close.
+
+`previous_performance` is the one-day table of the report; `rolling_performance`
+aggregates the last N sessions into win rate and PnL by strategy and score bucket.
+
+Usage example:
+    previous_performance(database, '2024-07-08')   # {'date': '2024-07-05', 'results': [...]}
+    rolling_performance(database, '2024-07-08', sessions=30)['table']
+"""
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from bluehorseshoe.core.scores import SCORE_RANK_INDEX
+from bluehorseshoe.core.trading_calendar import get_trading_calendar
+
+STRATEGIES = ('baseline', 'mean_reversion')
+
+# Candidates per strategy and pick date
+TOP_N = 5
+
+# Sessions in the rolling scorecard
+ROLLING_SESSIONS = 30
+
+# Score buckets of the rolling scorecard: [edge_i, edge_i+1)
+SCORE_BUCKET_EDGES = [-np.inf, 5.0, 10.0, 15.0, np.inf]
+SCORE_BUCKET_LABELS = ['<5', '5-10', '10-15', '15+']
+
+CANDIDATE_COLUMNS = ['pick_date', 'eval_date', 'strategy', 'symbol', 'score', 'entry', 'stop', 'target']
+
+
+def top_candidates(database, pick_dates: Iterable[str], top_n: int = TOP_N,
+                   strategies: Iterable[str] = STRATEGIES) -> pd.DataFrame:
+    """
+    Top scores of each strategy on each pick date, in one aggregation over trade_scores.
+    The match and sort run on SCORE_RANK_INDEX (created here if missing), so only the
+    scores of the pick dates are read, already in group order.
+
+    Returns:
+        pd.DataFrame: pick_date, strategy, symbol, score, entry, stop, target; highest score first.
+    """
+    collection = database['trade_scores']
+    collection.create_index(SCORE_RANK_INDEX)
+    pipeline = [
+        {'$match': {'date': {'$in': list(pick_dates)}, 'strategy': {'$in': list(strategies)}}},
+        {'$sort': dict(SCORE_RANK_INDEX)},
+        {'$group': {
+            '_id': {'date': '$date', 'strategy': '$strategy'},
+            'top': {'$push': {
+                'symbol': '$symbol', 'score': '$score', 'entry': '$metadata.entry_price',
+                'stop': '$metadata.stop_loss', 'target': '$metadata.take_profit'
+            }}
+        }},
+        {'$project': {'top': {'$slice': ['$top', top_n]}}},
+    ]
+    rows = [
+        {'pick_date': group['_id']['date'], 'strategy': group['_id']['strategy'], **cand}
+        for group in collection.aggregate(pipeline, allowDiskUse=True)
+        for cand in group['top']
+    ]
+    frame = pd.DataFrame(rows, columns=[c for c in CANDIDATE_COLUMNS if c != 'eval_date'])
+    return frame.sort_values('score', ascending=False, kind='stable', ignore_index=True)
+
+
+def fetch_bars(database, symbols: Iterable[str], start: str, end: str) -> pd.DataFrame:
+    """
+    Bars of symbols between start and end (inclusive), in one aggregation over historical_prices.
+
+    Returns:
+        pd.DataFrame: symbol, date, high, low, close.
+    """
+    pipeline = [
+        {'$match': {'symbol': {'$in': list(symbols)}}},
+        {'$project': {'_id': 0, 'symbol': 1, 'days': {'$filter': {
+            'input': '$days', 'as': 'd',
+            'cond': {'$and': [{'$gte': ['$$d.date', start]}, {'$lte': ['$$d.date', end]}]}
+        }}}},
+    ]
+    rows = [
+        {'symbol': doc['symbol'], 'date': d['date'], 'high': d.get('high'), 'low': d.get('low'),
+         'close': d.get('close')}
+        for doc in database['historical_prices'].aggregate(pipeline)
+        for d in doc.get('days') or []
+    ]
+    return pd.DataFrame(rows, columns=['symbol', 'date', 'high', 'low', 'close'])
+
+
+def evaluate_outcomes(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds outcome, pnl (fraction of entry) and triggered to candidates joined with their bar.
+
+    Args:
+        frame: entry, stop, target, high, low, close columns.
+    """
+    entry = frame['entry'].to_numpy(dtype=float)
+    stop = frame['stop'].to_numpy(dtype=float)
+    target = frame['target'].to_numpy(dtype=float)
+    high = frame['high'].to_numpy(dtype=float)
+    low = frame['low'].to_numpy(dtype=float)
+    close = frame['close'].to_numpy(dtype=float)
+
+    with np.errstate(invalid='ignore'):
+        triggered = low <= entry
+        stopped = triggered & (low <= stop)
+        hit = triggered & ~stopped & (high >= target)
+        active = triggered & ~stopped & ~hit
+        conditions = [stopped, hit, active]
+        outcome = np.select(conditions, ['Stopped Out', 'Target Hit', 'Active'], 'No Entry')
+        pnl = np.select(conditions, [(stop - entry) / entry, (target - entry) / entry, (close - entry) / entry], 0.0)
+
+    return frame.assign(outcome=outcome, pnl=pnl, triggered=triggered)
+
+
+def evaluate_candidates(database, candidates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Evaluates candidates on the bar of their eval_date, fetching every bar in one query.
+    Candidates without an entry price or without that bar are dropped.
+
+    Args:
+        database: MongoDB database instance. Required.
+        candidates: CANDIDATE_COLUMNS.
+
+    Returns:
+        pd.DataFrame: The candidates with high, low, close, outcome, pnl and triggered.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for evaluate_candidates")
+    candidates = candidates[pd.to_numeric(candidates['entry'], errors='coerce').fillna(0) > 0]
+    if candidates.empty:
+        return evaluate_outcomes(candidates.assign(high=[], low=[], close=[]))
+
+    bars = fetch_bars(database, candidates['symbol'].unique(),
+                      candidates['eval_date'].min(), candidates['eval_date'].max())
+    joined = candidates.merge(bars, left_on=['symbol', 'eval_date'], right_on=['symbol', 'date'], how='inner')
+    return evaluate_outcomes(joined.drop(columns='date'))
+
+
+def _pick_sessions(database, end_date: str, sessions: int) -> List[str]:
+    """The last sessions + 1 sessions up to end_date: each pick date followed by its eval date."""
+    calendar = get_trading_calendar(database)
+    start = (pd.Timestamp(end_date) - pd.Timedelta(days=2 * sessions + 10)).strftime('%Y-%m-%d')
+    return [d for d in calendar.range(start, end_date) if d <= end_date][-(sessions + 1):]
+
+
+def _candidates_for(database, pick_dates: List[str], eval_dates: List[str], top_n: int) -> pd.DataFrame:
+    candidates = top_candidates(database, pick_dates, top_n=top_n)
+    candidates['eval_date'] = candidates['pick_date'].map(dict(zip(pick_dates, eval_dates)))
+    return candidates[CANDIDATE_COLUMNS]
+
+
+def previous_performance(database, target_date: str, top_n: int = TOP_N) -> Dict[str, Any]:
+    """
+    Performance on target_date of the previous session's top candidates.
+
+    Args:
+        database: MongoDB database instance. Required.
+        target_date: Evaluation date ('YYYY-MM-DD').
+        top_n: Candidates per strategy.
+
+    Returns:
+        Dict: {'date': previous session, 'results': [{symbol, strategy, entry, stop, target,
+        outcome, pnl, close, high, low}, ...]} (strategies in STRATEGIES order), or {} without
+        a previous session.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for previous_performance")
+    prev_date = get_trading_calendar(database).previous(target_date)
+    if not prev_date:
+        return {}
+
+    evaluated = evaluate_candidates(database, _candidates_for(database, [prev_date], [target_date], top_n))
+    order = {s: i for i, s in enumerate(STRATEGIES)}
+    evaluated = evaluated.iloc[np.lexsort((-evaluated['score'].to_numpy(dtype=float),
+                                           evaluated['strategy'].map(order).to_numpy()))]
+    results = [
+        {'symbol': r.symbol, 'strategy': r.strategy, 'entry': float(r.entry), 'stop': float(r.stop),
+         'target': float(r.target), 'outcome': r.outcome, 'pnl': float(r.pnl), 'close': float(r.close),
+         'high': float(r.high), 'low': float(r.low)}
+        for r in evaluated.itertuples(index=False)
+    ]
+    return {'date': prev_date, 'results': results}
+
+
+def performance_table(evaluated: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Win rate and PnL by strategy and score bucket, plus an 'All' row per strategy.
+    Win rate and average PnL are over entered trades; PnL is in fractions of the entry.
+    Candidates without a numeric score are left out.
+    """
+    scores = pd.to_numeric(evaluated['score'], errors='coerce')
+    evaluated = evaluated[scores.notna()]
+    if evaluated.empty:
+        return []
+    frame = evaluated.assign(
+        bucket=pd.cut(scores[scores.notna()], SCORE_BUCKET_EDGES, labels=SCORE_BUCKET_LABELS,
+                      right=False).astype(str),
+        win=evaluated['triggered'] & (evaluated['pnl'] > 0),
+        entered_pnl=evaluated['pnl'].where(evaluated['triggered']),
+    )
+    rows = []
+    for strategy, by_strategy in frame.groupby('strategy', sort=False):
+        groups = list(by_strategy.groupby('bucket', sort=False))
+        groups.sort(key=lambda item: SCORE_BUCKET_LABELS.index(item[0]))
+        for bucket, group in groups + [('All', by_strategy)]:
+            entries = int(group['triggered'].sum())
+            rows.append({
+                'strategy': strategy,
+                'bucket': bucket,
+                'picks': len(group),
+                'entries': entries,
+                'win_rate': float(group['win'].sum() / entries) if entries else None,
+                'avg_pnl': float(group['entered_pnl'].mean()) if entries else None,
+                'total_pnl': float(group['entered_pnl'].sum()),
+            })
+    return rows
+
+
+def rolling_performance(database, end_date: str, sessions: int = ROLLING_SESSIONS,
+                        top_n: int = TOP_N) -> Dict[str, Any]:
+    """
+    Performance of the top candidates of the last `sessions` pick dates, each evaluated
+    on the session after it; the last evaluation date is the last session up to end_date.
+
+    Args:
+        database: MongoDB database instance. Required.
+        end_date: Last evaluation date ('YYYY-MM-DD').
+        sessions: Pick dates in the window.
+        top_n: Candidates per strategy and pick date.
+
+    Returns:
+        Dict: {'start': first pick date, 'end': end_date, 'sessions': pick dates,
+        'trades': evaluated candidates, 'table': performance_table rows}, or {} without sessions.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for rolling_performance")
+    dates = _pick_sessions(database, end_date, sessions)
+    if len(dates) < 2:
+        return {}
+    pick_dates, eval_dates = dates[:-1], dates[1:]
+    evaluated = evaluate_candidates(database, _candidates_for(database, pick_dates, eval_dates, top_n))
+    return {
+        'start': pick_dates[0],
+        'end': end_date,
+        'sessions': len(pick_dates),
+        'trades': len(evaluated),
+        'table': performance_table(evaluated),
+    }
@@ -0,0 +1,264 @@
+"""
+portfolio.py
+
+This module provides `PortfolioSimulator`, which replays backtest candidates as one
+account: cash, concurrent positions and per-trade risk sizing, with an equity curve,
+drawdown and turnover instead of an average of independent trade returns.
+
+Candidates are resolved first with `simulate_limit_trades` (the `Backtester` fill
+and exit rules), grouped by symbol. Their fills and exits then form an array-based
+order book on the panel's session axis, and the account only steps through sessions
+that have fills or exits. Position values are marked to market from the panel's
+closes once the positions are known.
+
+Sizing follows position_sizer.py: shares = risk dollars / (entry - stop), where the
+risk dollars are risk_percent of the equity at the previous close, rounded to 3
+decimals (fractional) or down to whole shares as position_sizer does. The position
+limit and the available cash cap the result; caps are rounded down, so a capped
+order never costs more than they allow.
+
+Usage example:
+    trades = WalkForwardBacktester(panel=panel).run('2022-01-03', '2024-12-31', interval_days=1)
+    result = PortfolioSimulator(PortfolioConfig(initial_capital=50_000)).run(trades, panel)
+    result.summary()['max_drawdown_pct']
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from bluehorseshoe.analysis.trade_simulator import simulate_limit_trades
+from bluehorseshoe.data.universe_panel import UniversePanel
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Candidate columns an order is built from (other backtest columns are dropped)
+ORDER_COLUMNS = ['date', 'symbol', 'strategy', 'score', 'entry_price', 'stop_loss', 'take_profit']
+
+
+@dataclass
+class PortfolioConfig:
+    """Account and risk parameters for a portfolio backtest."""
+    initial_capital: float = 100_000.0
+    risk_percent: float = 1.0            # Equity risked between entry and stop, per trade
+    max_positions: int = 10
+    max_position_percent: float = 20.0   # Largest position cost, in % of equity
+    fractional: bool = True              # Fractional shares (3 decimals) or whole shares
+    hold_days: int = 3
+
+
+@dataclass
+class PortfolioResult:
+    """
+    Outcome of a portfolio backtest.
+
+    Attributes:
+        equity (pd.Series): Marked-to-market equity at every session close.
+        cash (pd.Series): Cash at every session close.
+        positions (pd.Series): Number of open positions at every session close.
+        trades (pd.DataFrame): Filled trades with their size, fill, exit and PnL.
+        skipped (pd.DataFrame): Candidates that filled but were not taken, with the reason.
+        initial_capital (float): Starting cash.
+    """
+    equity: pd.Series
+    cash: pd.Series
+    positions: pd.Series
+    trades: pd.DataFrame
+    skipped: pd.DataFrame = field(default_factory=pd.DataFrame)
+    initial_capital: float = 0.0
+
+    @property
+    def drawdown(self) -> pd.Series:
+        """Fall from the running equity peak, as a fraction of the peak (<= 0)."""
+        return self.equity / self.equity.cummax() - 1
+
+    @property
+    def turnover(self) -> float:
+        """Traded notional (average of buys and sells) over the average equity."""
+        if self.trades.empty or self.equity.empty:
+            return 0.0
+        bought = (self.trades['shares'] * self.trades['fill_price']).sum()
+        sold = (self.trades['shares'] * self.trades['exit_price']).dropna().sum()
+        return float((bought + sold) / 2 / self.equity.mean())
+
+    def summary(self) -> Dict[str, float]:
+        """Headline numbers of the run."""
+        years = max(len(self.equity), 1) / TRADING_DAYS_PER_YEAR
+        closed = self.trades.dropna(subset=['exit_price']) if not self.trades.empty else self.trades
+        final_equity = float(self.equity.iloc[-1]) if not self.equity.empty else self.initial_capital
+        return {
+            'final_equity': final_equity,
+            'total_return_pct': (final_equity / self.initial_capital - 1) * 100,
+            'max_drawdown_pct': float(self.drawdown.min() * 100) if not self.equity.empty else 0.0,
+            'turnover': self.turnover,
+            'annual_turnover': self.turnover / years,
+            'trades': len(self.trades),
+            'win_rate_pct': float((closed['pnl'] > 0).mean() * 100) if len(closed) else 0.0,
+            'avg_positions': float(self.positions.mean()) if not self.positions.empty else 0.0,
+        }
+
+
+def resolve_candidates(candidates: pd.DataFrame, panel: UniversePanel, hold_days: int) -> pd.DataFrame:
+    """
+    Fill and exit sessions of every candidate under the Backtester rules.
+
+    Args:
+        candidates: One row per order with 'date' (signal session), 'symbol', 'score',
+            'entry_price', 'stop_loss' and 'take_profit'.
+        panel: Price panel covering the candidates and the bars after them.
+        hold_days: Bars allowed for the fill and the holding period.
+
+    Returns:
+        DataFrame of the filled candidates with 'fill_day' and 'exit_day' (panel date
+        indices, exit_day -1 while still open), 'fill_price' and 'exit_price'.
+    """
+    candidates = candidates[[c for c in ORDER_COLUMNS if c in candidates.columns]]
+    resolved = []
+    for symbol, group in candidates.groupby('symbol', sort=False):
+        if symbol not in panel:
+            continue
+        df = panel.frame(symbol)
+        days = np.searchsorted(panel.dates, df['date'].to_numpy().astype('datetime64[D]'))
+        start = np.searchsorted(df['date'].to_numpy().astype('datetime64[D]'),
+                                pd.to_datetime(group['date']).to_numpy().astype('datetime64[D]'), side='right')
+        sim = simulate_limit_trades(
+            df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+            start, group['entry_price'].to_numpy(), group['stop_loss'].to_numpy(),
+            group['take_profit'].to_numpy(), hold_days
+        )
+        filled = sim.entry_idx != -1
+        out = group[filled].copy()
+        out['fill_day'] = days[sim.entry_idx[filled]]
+        out['exit_day'] = np.where(sim.exit_idx[filled] != -1, days[sim.exit_idx[filled]], -1)
+        out['fill_price'] = sim.actual_entry[filled]
+        out['exit_price'] = sim.exit_price[filled]
+        out['status'] = sim.status[filled]
+        resolved.append(out)
+    if not resolved:
+        return pd.DataFrame(columns=list(candidates.columns) + ['fill_day', 'exit_day', 'fill_price', 'exit_price', 'status'])
+    return pd.concat(resolved, ignore_index=True)
+
+
+class PortfolioSimulator:
+    """
+    Event-driven account simulation over resolved backtest candidates.
+
+    On each session, positions exit first (freeing cash), then the orders filling
+    that session are taken in descending score order while a position slot, the
+    symbol and enough cash are free.
+    """
+
+    def __init__(self, config: PortfolioConfig = None):
+        self.config = config if config is not None else PortfolioConfig()
+
+    def _size(self, equity: float, cash: float, entry: float, stop: float) -> float:
+        """Shares for one order (position_sizer.calculate_position_size, capped)."""
+        risk_per_share = entry - stop
+        if risk_per_share <= 0 or entry <= 0:
+            return 0.0
+        shares = equity * (self.config.risk_percent / 100) / risk_per_share
+        cap = min(equity * (self.config.max_position_percent / 100) / entry, cash / entry)
+        if self.config.fractional:
+            return float(min(round(shares, 3), np.floor(cap * 1000) / 1000))
+        return float(min(np.floor(shares), np.floor(cap)))
+
+    def run(self, candidates: pd.DataFrame, panel: UniversePanel) -> PortfolioResult:
+        """
+        Simulates the account over the panel sessions from the first candidate on.
+
+        Args:
+            candidates: Backtest candidates (see `resolve_candidates`), e.g. the table
+                returned by `WalkForwardBacktester.run`.
+            panel: Price panel covering the candidates and the bars after them.
+        """
+        cfg = self.config
+        orders = resolve_candidates(candidates, panel, cfg.hold_days)
+        orders = orders.sort_values(['fill_day', 'score'], ascending=[True, False], kind='stable').reset_index(drop=True)
+        n = len(orders)
+        first_day = int(panel.date_index(str(pd.to_datetime(candidates['date']).min().date())) - 1) if len(candidates) else 0
+        sessions = panel.dates[max(first_day, 0):]
+        offset = max(first_day, 0)
+
+        fill_day = orders['fill_day'].to_numpy(dtype=np.int64) - offset if n else np.zeros(0, dtype=np.int64)
+        exit_day = orders['exit_day'].to_numpy(dtype=np.int64) if n else np.zeros(0, dtype=np.int64)
+        exit_day = np.where(exit_day >= 0, exit_day - offset, -1)
+        fill_price = orders['fill_price'].to_numpy(dtype=float) if n else np.zeros(0)
+        exit_price = orders['exit_price'].to_numpy(dtype=float) if n else np.zeros(0)
+        stop = orders['stop_loss'].to_numpy(dtype=float) if n else np.zeros(0)
+        traded = {s: i for i, s in enumerate(dict.fromkeys(orders['symbol']))} if n else {}
+        symbol_idx = np.array([traded[s] for s in orders['symbol']] if n else [], dtype=np.int64)
+
+        # Closes of the traded symbols per session, carried over sessions a symbol did not trade
+        panel_rows = {s: i for i, s in enumerate(panel.symbols)}
+        rows = [panel_rows[s] for s in traded]
+        closes = pd.DataFrame(panel.values[rows, offset:, panel.fields.index('close')].T).ffill().to_numpy()
+
+        shares = np.zeros(n)
+        is_open = np.zeros(n, dtype=bool)
+        cash_flow = np.zeros(len(sessions))
+        cash = cfg.initial_capital
+        skipped: List[Dict] = []
+
+        event_days = np.unique(np.concatenate([fill_day, exit_day[exit_day >= 0]])) if n else np.zeros(0, dtype=np.int64)
+        for day in event_days:
+            # Exits free cash before the session's fills
+            closing = np.nonzero(is_open & (exit_day == day))[0]
+            cash += float((shares[closing] * exit_price[closing]).sum())
+            cash_flow[day] += float((shares[closing] * exit_price[closing]).sum())
+            is_open[closing] = False
+
+            held = np.nonzero(is_open)[0]
+            marks = closes[max(day - 1, 0), symbol_idx[held]]
+            equity = cash + float(np.nansum(shares[held] * np.where(np.isnan(marks), fill_price[held], marks)))
+            held_symbols = set(symbol_idx[held].tolist())
+            for i in np.nonzero(fill_day == day)[0]:
+                reason = None
+                if len(held_symbols) >= cfg.max_positions:
+                    reason = 'max_positions'
+                elif symbol_idx[i] in held_symbols:
+                    reason = 'already_held'
+                else:
+                    size = self._size(equity, cash, fill_price[i], stop[i])
+                    if size <= 0:
+                        reason = 'no_cash' if cash < fill_price[i] else 'no_risk'
+                if reason is not None:
+                    skipped.append({'date': orders.at[i, 'date'], 'symbol': orders.at[i, 'symbol'], 'reason': reason})
+                    continue
+                shares[i] = size
+                cash -= size * fill_price[i]
+                cash_flow[day] -= size * fill_price[i]
+                held_symbols.add(symbol_idx[i])
+                if exit_day[i] == day:
+                    # Stopped or targeted on the fill bar
+                    cash += size * exit_price[i]
+                    cash_flow[day] += size * exit_price[i]
+                    held_symbols.discard(symbol_idx[i])
+                else:
+                    is_open[i] = True
+
+        # Mark to market: a position counts from its fill close to the close before its exit
+        taken = np.nonzero(shares > 0)[0]
+        holdings = np.zeros(len(sessions))
+        open_count = np.zeros(len(sessions), dtype=np.int64)
+        for i in taken:
+            end = exit_day[i] if exit_day[i] >= 0 else len(sessions)
+            if end > fill_day[i]:
+                holdings[fill_day[i]:end] += shares[i] * closes[fill_day[i]:end, symbol_idx[i]]
+                open_count[fill_day[i]:end] += 1
+
+        index = pd.to_datetime(sessions)
+        cash_series = pd.Series(cfg.initial_capital + np.cumsum(cash_flow), index=index)
+        trades = orders.loc[taken].copy()
+        trades['shares'] = shares[taken]
+        trades['fill_date'] = index[fill_day[taken]]
+        trades['exit_date'] = [index[d] if d >= 0 else pd.NaT for d in exit_day[taken]]
+        trades['pnl'] = trades['shares'] * (trades['exit_price'] - trades['fill_price'])
+        return PortfolioResult(
+            equity=cash_series + holdings,
+            cash=cash_series,
+            positions=pd.Series(open_count, index=index),
+            trades=trades.drop(columns=['fill_day', 'exit_day']).reset_index(drop=True),
+            skipped=pd.DataFrame(skipped, columns=['date', 'symbol', 'reason']),
+            initial_capital=cfg.initial_capital
+        )
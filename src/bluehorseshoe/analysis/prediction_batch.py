@@ -0,0 +1,388 @@
+"""
+prediction_batch.py
+
+Batch and ML orchestration for `SwingTrader`. Symbols are prepared one by one
+(load, weekly trend gate, technical scores, entry parameters), then each ML model
+runs once over the whole batch and the surviving setups are validated and
+assembled into prediction results. `iter_predictions` spreads batches over a
+thread pool or, through prediction_pool, a process pool.
+
+`PredictionBatchMixin` holds no state of its own: it relies on the SwingTrader
+attributes (config, panel, ML inference objects) and per-symbol helpers.
+
+Usage example:
+    trader = SwingTrader(database=db)
+    ctx = StrategyContext(target_date='2024-06-28')
+    for symbol, result, error in trader.iter_predictions(['AAPL', 'MSFT'], ctx):
+        ...
+"""
+import concurrent.futures
+import contextvars
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from bluehorseshoe.analysis.constants import (
+    MIN_STOCK_PRICE, MAX_STOCK_PRICE,
+    MIN_RR_RATIO_BASELINE, MIN_RR_RATIO_MEAN_REVERSION,
+    MAX_RISK_PERCENT,
+    REQUIRE_WEEKLY_UPTREND
+)
+from bluehorseshoe.analysis.prediction_pool import (
+    chunk_symbols, iter_chunk_results, iter_process_predictions, resolve_workers
+)
+from bluehorseshoe.core import profiling
+from bluehorseshoe.core.config import WeightSet, weights_config
+
+@dataclass
+class StrategyContext:
+    """Encapsulates common parameters for strategy processing."""
+    target_date: Optional[str] = None
+    enabled_indicators: Optional[List[str]] = None
+    aggregation: str = "sum"
+    benchmark_df: Optional[pd.DataFrame] = None
+    market_health: Optional[Dict[str, Any]] = None
+    symbol_map: Optional[Dict[str, str]] = None
+    # strategy -> symbol -> score components, filled from the panel by CrossSectionalScorer
+    precomputed_scores: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None
+    # Indicator weights to score with; None reads the weights_config singleton
+    weights: Optional[WeightSet] = None
+
+
+class PredictionBatchMixin:
+    """Batch preparation, ML inference and result assembly for SwingTrader."""
+
+    def _prepare_baseline(self, df: pd.DataFrame, symbol: str, yesterday: dict, ctx: StrategyContext) -> Optional[Dict]:
+        """Baseline scoring and entry parameters; everything before the ML models run."""
+        # Regime Filter: Skip momentum during bearish regimes
+        # UPDATED (Jan 2026): User requested to bypass this hard filter.
+        # if ctx.market_health and ctx.market_health['status'] == 'Bearish':
+        #    return None
+
+        # Dynamic Regime Filtering:
+        # In Bear/Neutral markets, we MUST have a Weekly Uptrend to avoid "bull traps".
+        # In strong Bull markets, we can relax this to capture early reversals or strong daily momentum.
+        should_enforce_weekly = REQUIRE_WEEKLY_UPTREND
+        if ctx.market_health and ctx.market_health['status'] == 'Bullish':
+            should_enforce_weekly = False
+
+        is_uptrend = self.is_weekly_uptrend(df)
+        if should_enforce_weekly and not is_uptrend:
+            # print(f"DEBUG: {symbol} - Baseline failed weekly uptrend")
+            return None
+
+        # *** STEP 1: Calculate score FIRST ***
+        score_components = self._technical_score(df, symbol, ctx, "baseline")
+        technical_score = score_components.get("total", 0.0)
+
+        # *** STEP 2: Get dynamic entry parameters ***
+        last_row = df.iloc[-1]
+        ema9 = df['close'].ewm(span=9).mean().iloc[-1]
+        atr = self._calculate_atr(df)
+
+        entry_price, atr_discount_used, signal_strength = self._determine_baseline_entry(
+            last_row, ema9, atr, technical_score
+        )
+        return {
+            "symbol": symbol,
+            "df": df,
+            "date": str(yesterday['date'])[:10],
+            "components": score_components,
+            "entry_price": entry_price,
+            "atr_discount_used": atr_discount_used,
+            "signal_strength": signal_strength
+        }
+
+    def _finish_baseline(self, pending: Dict, ml_profit_multiplier: float, ctx: StrategyContext) -> Optional[Dict]:
+        """Builds and validates the baseline setup once the profit target model has run."""
+        df = pending['df']
+        symbol = pending['symbol']
+        score_components = pending['components']
+        entry_price = pending['entry_price']
+        last_row = df.iloc[-1]
+
+        # *** STEP 4: Calculate baseline setup with ML stop & profit ***
+        ml_stop_multiplier = 2.0
+        baseline_setup = self.calculate_baseline_setup(df, ml_stop_multiplier=ml_stop_multiplier, ml_profit_multiplier=ml_profit_multiplier)
+
+        # *** STEP 5: Override entry price with dynamic calculation ***
+        baseline_setup['entry_price'] = entry_price
+
+        # *** STEP 6: Recalculate risk/reward with new entry ***
+        stop_loss = baseline_setup['stop_loss']
+        take_profit = baseline_setup['take_profit']
+        risk = entry_price - stop_loss
+        reward = take_profit - entry_price
+        baseline_setup['rr_ratio'] = reward / risk if risk > 0 else 0
+
+        # Recalculate is_realistic with new entry
+        last_close = last_row['close']
+        risk_pct = (entry_price - stop_loss) / entry_price if entry_price > 0 else 0
+        baseline_setup['is_realistic'] = (
+            (abs((last_close / entry_price) - 1) <= 0.15) and
+            (risk_pct <= MAX_RISK_PERCENT)
+        )
+
+        # *** STEP 7: Add new metadata fields ***
+        baseline_setup['atr_discount_used'] = pending['atr_discount_used']
+        baseline_setup['signal_strength'] = pending['signal_strength']
+        baseline_setup['profit_multiplier'] = ml_profit_multiplier
+
+        # Validation checks
+        if not baseline_setup['is_realistic'] or baseline_setup['rr_ratio'] < MIN_RR_RATIO_BASELINE:
+            # print(f"DEBUG: {symbol} - Baseline failed setup checks: realistic={baseline_setup['is_realistic']}, rr={baseline_setup['rr_ratio']}")
+            return None
+
+        entry_price = baseline_setup['entry_price']
+        if not MIN_STOCK_PRICE < entry_price < MAX_STOCK_PRICE:
+            print(f"DEBUG: {symbol} - Baseline price out of range: {entry_price}")
+            return None
+
+        # Apply Relative Strength (RS) Bonus
+        rs_multiplier = (ctx.weights if ctx.weights is not None else weights_config).get_weights('momentum').get('RS_MULTIPLIER', 1.0)
+        if ctx.benchmark_df is not None and rs_multiplier != 0.0:
+            rs_ratio = self.calculate_relative_strength(df, ctx.benchmark_df)
+            if rs_ratio > 1.10:
+                rs_bonus = 5.0
+            elif rs_ratio > 1.0:
+                rs_bonus = 2.0
+            else:
+                rs_bonus = -2.0
+            rs_bonus *= rs_multiplier
+            score_components["rs_index"] = rs_bonus
+            score_components["total"] += rs_bonus
+
+        return {
+            "symbol": symbol,
+            "date": pending['date'],
+            "components": score_components,
+            "setup": baseline_setup,
+            "stop_multiplier": ml_stop_multiplier,
+            "profit_multiplier": ml_profit_multiplier
+        }
+
+    def _prepare_mr(self, df: pd.DataFrame, symbol: str, yesterday: dict, ctx: StrategyContext) -> Dict:
+        """Mean Reversion scoring; everything before the ML models run."""
+        return {
+            "symbol": symbol,
+            "df": df,
+            "date": str(yesterday['date'])[:10],
+            "components": self._technical_score(df, symbol, ctx, "mean_reversion")
+        }
+
+    def _finish_mr(self, pending: Dict, ml_stop_multiplier_mr: float, ml_profit_multiplier_mr: float) -> Optional[Dict]:
+        """Builds and validates the Mean Reversion setup once the stop and target models have run."""
+        mr_setup = self.calculate_mean_reversion_setup(
+            pending['df'], ml_stop_multiplier=ml_stop_multiplier_mr, ml_profit_multiplier=ml_profit_multiplier_mr
+        )
+        if not mr_setup['is_realistic'] or mr_setup['rr_ratio'] < MIN_RR_RATIO_MEAN_REVERSION:
+            return None
+
+        entry_price = mr_setup['entry_price']
+        if not MIN_STOCK_PRICE < entry_price < MAX_STOCK_PRICE:
+            return None
+
+        # Add profit multiplier to setup metadata
+        mr_setup['profit_multiplier'] = ml_profit_multiplier_mr
+
+        return {
+            "symbol": pending['symbol'],
+            "date": pending['date'],
+            "components": pending['components'],
+            "setup": mr_setup,
+            "stop_multiplier": ml_stop_multiplier_mr,
+            "profit_multiplier": ml_profit_multiplier_mr
+        }
+
+    def _run_models(self, baseline: List[Dict], mean_reversion: List[Dict], ctx: StrategyContext) -> tuple[List[Dict], List[Dict]]:
+        """
+        Runs each ML model once over the whole batch: stop and target multipliers first,
+        then win probabilities for the setups that pass validation.
+
+        Returns:
+            (baseline results, mean reversion results) for the surviving setups.
+        """
+        def items(entries):
+            return [(e['symbol'], e['components'], e['date']) for e in entries]
+
+        # *** STEP 3: Predict ML profit target (baseline) and stop/target (mean reversion) multipliers ***
+        with profiling.span('ml.profit_target.baseline'):
+            profit_baseline = self.profit_target_inference.predict_profit_target_multiplier_batch(
+                items(baseline), strategy="baseline"
+            ) if baseline else []
+        with profiling.span('ml.stop_loss.mean_reversion'):
+            stop_mr = self.stop_loss_inference.predict_stop_loss_multiplier_batch(items(mean_reversion)) if mean_reversion else []
+        with profiling.span('ml.profit_target.mean_reversion'):
+            profit_mr = self.profit_target_inference.predict_profit_target_multiplier_batch(
+                items(mean_reversion), strategy="mean_reversion"
+            ) if mean_reversion else []
+
+        baseline_results = []
+        for pending, profit in zip(baseline, profit_baseline):
+            with profiling.span('setup.baseline'):
+                result = self._finish_baseline(pending, float(profit), ctx)
+            if result is not None:
+                baseline_results.append(result)
+
+        mr_results = []
+        for pending, stop, profit in zip(mean_reversion, stop_mr, profit_mr):
+            with profiling.span('setup.mean_reversion'):
+                result = self._finish_mr(pending, float(stop), float(profit))
+            if result is not None:
+                mr_results.append(result)
+
+        # Calculate ML Win Probability
+        for results, strategy in ((baseline_results, "baseline"), (mr_results, "mean_reversion")):
+            if not results:
+                continue
+            with profiling.span(f'ml.win_probability.{strategy}'):
+                probs = self.ml_inference.predict_probability_batch(items(results), strategy=strategy)
+            for result, prob in zip(results, probs):
+                result['ml_prob'] = float(prob)
+                result['score'] = result['components'].pop("total", 0.0)
+
+        return baseline_results, mr_results
+
+    def _process_baseline(self, df: pd.DataFrame, symbol: str, yesterday: dict, ctx: StrategyContext) -> Optional[Dict]:
+        """Process Baseline strategy logic for a single symbol."""
+        pending = self._prepare_baseline(df, symbol, yesterday, ctx)
+        if pending is None:
+            return None
+        results, _ = self._run_models([pending], [], ctx)
+        return results[0] if results else None
+
+    def _process_mr(self, df: pd.DataFrame, symbol: str, yesterday: dict, ctx: StrategyContext) -> Optional[Dict]:
+        """Process Mean Reversion strategy logic for a single symbol."""
+        _, results = self._run_models([], [self._prepare_mr(df, symbol, yesterday, ctx)], ctx)
+        return results[0] if results else None
+
+    def _prepare_symbol(self, symbol: str, ctx: StrategyContext) -> Optional[Dict]:
+        """Loads a symbol and runs both strategies up to the ML stage."""
+        with profiling.symbol_span(symbol):
+            # 1. Load and Validate Data
+            with profiling.span('load'):
+                data_result = self._load_and_validate_data(symbol, ctx.target_date)
+            if not data_result:
+                return None
+            df, price_data, yesterday = data_result
+
+            # 2. Process Strategies
+            with profiling.span('baseline'):
+                baseline = self._prepare_baseline(df, symbol, yesterday, ctx)
+            with profiling.span('mean_reversion'):
+                mean_reversion = self._prepare_mr(df, symbol, yesterday, ctx)
+        return {
+            "symbol": symbol,
+            "df": df,
+            "price_data": price_data,
+            "yesterday": yesterday,
+            "baseline": baseline,
+            "mr": mean_reversion
+        }
+
+    def _complete_batch(self, prepared: List[Dict], ctx: StrategyContext) -> List[Optional[Dict]]:
+        """Runs the ML models once for all prepared symbols and assembles their results."""
+        baseline_results, mr_results = self._run_models(
+            [p['baseline'] for p in prepared if p['baseline'] is not None],
+            [p['mr'] for p in prepared],
+            ctx
+        )
+        baseline_by_symbol = {r['symbol']: r for r in baseline_results}
+        mr_by_symbol = {r['symbol']: r for r in mr_results}
+
+        results = []
+        for item in prepared:
+            symbol = item['symbol']
+            baseline_data = baseline_by_symbol.get(symbol)
+            mr_data = mr_by_symbol.get(symbol)
+
+            if not baseline_data and not mr_data:
+                results.append(None)
+                continue
+
+            # 3. Finalize Result
+            rs_ratio = 1.0
+            if ctx.benchmark_df is not None:
+                rs_ratio = self.calculate_relative_strength(item['df'], ctx.benchmark_df)
+
+            ret_val = {
+                'symbol': symbol,
+                'name': item['price_data'].get('full_name', symbol),
+                'exchange': ctx.symbol_map.get(symbol, 'Unknown') if ctx.symbol_map else 'Unknown',
+                'date': str(item['yesterday']['date']),
+                'rs_ratio': rs_ratio,
+                'baseline_score': baseline_data['score'] if baseline_data else 0.0,
+                'baseline_components': baseline_data['components'] if baseline_data else {},
+                'baseline_setup': baseline_data['setup'] if baseline_data else {},
+                'baseline_ml_prob': baseline_data['ml_prob'] if baseline_data else 0.0,
+                'mr_score': mr_data['score'] if mr_data else 0.0,
+                'mr_components': mr_data['components'] if mr_data else {},
+                'mr_setup': mr_data['setup'] if mr_data else {},
+                'mr_ml_prob': mr_data['ml_prob'] if mr_data else 0.0
+            }
+            logging.info("Processed %s with results Baseline: %.2f, MR: %.2f", symbol, ret_val['baseline_score'], ret_val['mr_score'])
+            results.append(ret_val)
+        return results
+
+    def process_symbol(self, symbol: str, ctx: StrategyContext) -> Optional[Dict]:
+        """Process a single symbol and return its trading data."""
+        prepared = self._prepare_symbol(symbol, ctx)
+        if prepared is None:
+            return None
+        return self._complete_batch([prepared], ctx)[0]
+
+    def process_symbols(self, symbols: List[str], ctx: StrategyContext) -> List[tuple]:
+        """
+        Processes a batch of symbols, running each ML model once for the whole batch.
+
+        Returns:
+            (symbol, result, error) tuples in input order; result is None for skipped symbols,
+            error is None on success.
+        """
+        outcomes = []
+        prepared = []
+        for symbol in symbols:
+            try:
+                item = self._prepare_symbol(symbol, ctx)
+            except Exception as e: # pylint: disable=broad-exception-caught
+                outcomes.append((symbol, None, str(e)))
+                continue
+            outcomes.append((symbol, None, None))
+            if item is not None:
+                item['position'] = len(outcomes) - 1
+                prepared.append(item)
+
+        for item, result in zip(prepared, self._complete_batch(prepared, ctx)):
+            outcomes[item['position']] = (item['symbol'], result, None)
+        return outcomes
+
+    def iter_predictions(self, symbols: List[str], ctx: StrategyContext):
+        """
+        Runs process_symbols over chunks of symbols with the configured executor.
+
+        prediction_executor "process" uses a process pool (see prediction_pool); anything
+        else uses a thread pool sharing this SwingTrader.
+
+        Yields:
+            (symbol, result, error) tuples in completion order; error is None on success.
+        """
+        executor_kind = self.config.prediction_executor
+        max_workers = resolve_workers(self.config.prediction_workers, executor_kind)
+        logging.info("Processing %d symbols with %d %s workers...", len(symbols), max_workers, executor_kind)
+
+        if executor_kind == "process":
+            yield from iter_process_predictions(
+                symbols, ctx, self.config, panel=self.panel, workers=max_workers
+            )
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Chunks of symbols so each ML model runs once per chunk; each runs in a copy
+            # of this context so its spans reach this run's recorder
+            future_map = {
+                executor.submit(contextvars.copy_context().run, self.process_symbols, chunk, ctx): chunk
+                for chunk in chunk_symbols(symbols, max_workers)
+            }
+            yield from iter_chunk_results(future_map)
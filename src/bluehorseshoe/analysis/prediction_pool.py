@@ -0,0 +1,143 @@
+"""
+prediction_pool.py
+
+Process-pool execution of `SwingTrader.process_symbols`. Per-symbol scoring is
+pandas/NumPy/Python-bound and holds the GIL, so a thread pool keeps one core busy.
+
+Each worker process builds its own Mongo client (through `create_app_container`)
+and its own `SwingTrader`, ML models included, once in the pool initializer.
+Tasks are chunks of symbols: only the chunk and a `StrategyContext` trimmed to it
+cross the process boundary, and results are yielded chunk by chunk as workers finish.
+With stage metrics on, each worker records its spans in its own `StageRecorder` and
+returns them with the chunk, to be merged into the recorder active in the parent.
+
+Usage example:
+    for symbol, result, error in iter_process_predictions(symbols, ctx, settings, panel=panel):
+        ...
+"""
+import dataclasses
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
+
+from bluehorseshoe.core import profiling
+from bluehorseshoe.core.config import Settings
+from bluehorseshoe.core.container import create_app_container
+
+# Upper bound on symbols per task (and per batched ML inference call); smaller
+# chunks are used when there are few symbols per worker
+DEFAULT_CHUNK_SIZE = 250
+
+# Per-process SwingTrader, created by _init_worker
+_worker_trader = None
+
+# Per-process StageRecorder (None when stage metrics are off), created by _init_worker
+_worker_recorder = None
+
+
+def resolve_workers(workers: int, executor: str = "process") -> int:
+    """Worker count for a setting value; 0 means os.cpu_count() (threads stay capped at 8)."""
+    if workers > 0:
+        return workers
+    cpus = os.cpu_count() or 4
+    return cpus if executor == "process" else min(8, cpus)
+
+
+def _init_worker(settings: Settings, panel) -> None:
+    """Pool initializer: one Mongo client and one SwingTrader (with its models) per process."""
+    # Imported here: strategy imports this module
+    from bluehorseshoe.analysis.strategy import SwingTrader  # pylint: disable=import-outside-toplevel
+    global _worker_trader, _worker_recorder  # pylint: disable=global-statement
+    container = create_app_container(settings)
+    _worker_trader = SwingTrader(database=container.get_database(), config=settings, panel=panel)
+    # A fresh recorder, not the one inherited through fork with the parent's records
+    _worker_recorder = profiling.StageRecorder(settings.profile_slowest) if settings.stage_metrics else None
+
+
+def _process_chunk(symbols: List[str], ctx) -> Tuple[List[Tuple[str, Optional[dict], Optional[str]]], Optional[dict]]:
+    """Runs process_symbols for a chunk inside a worker; returns the outcomes and the chunk's spans."""
+    with profiling.recording(_worker_recorder):
+        outcomes = _worker_trader.process_symbols(symbols, ctx)
+    return outcomes, _worker_recorder.drain() if _worker_recorder is not None else None
+
+
+def chunk_symbols(symbols: List[str], workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[List[str]]:
+    """Splits symbols into chunks of at most chunk_size, with at least ~4 chunks per worker."""
+    # Enough chunks that a slow one does not leave the other workers idle
+    size = max(1, min(chunk_size, math.ceil(len(symbols) / (workers * 4))))
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+def iter_chunk_results(future_map: dict) -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+    """
+    Yields per-symbol outcomes of chunk futures as they complete; a failed chunk fails each of its symbols.
+
+    Futures may return the outcomes alone or (outcomes, spans) as _process_chunk does;
+    the spans are merged into the active recorder.
+    """
+    for future in as_completed(future_map):
+        try:
+            outcomes = future.result()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            for symbol in future_map[future]:
+                yield symbol, None, str(e)
+            continue
+        if isinstance(outcomes, tuple):
+            outcomes, records = outcomes
+            recorder = profiling.active_recorder()
+            if recorder is not None:
+                recorder.merge(records)
+        yield from outcomes
+
+
+def _chunk_context(ctx, symbols: List[str]):
+    """Copy of ctx carrying only the per-symbol data the chunk needs."""
+    precomputed = None
+    if ctx.precomputed_scores is not None:
+        precomputed = {
+            strategy: {s: scores[s] for s in symbols if s in scores}
+            for strategy, scores in ctx.precomputed_scores.items()
+        }
+    symbol_map = None
+    if ctx.symbol_map is not None:
+        symbol_map = {s: ctx.symbol_map[s] for s in symbols if s in ctx.symbol_map}
+    return dataclasses.replace(ctx, precomputed_scores=precomputed, symbol_map=symbol_map)
+
+
+def _mp_context():
+    # Fork lets workers inherit the panel and weights without pickling them
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def iter_process_predictions(symbols: List[str], ctx, settings: Settings, panel=None,
+                             workers: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE
+                             ) -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+    """
+    Runs process_symbols over chunks of symbols in a process pool.
+
+    Args:
+        symbols: Symbols to process.
+        ctx: StrategyContext shared by every symbol.
+        settings: Settings used to build each worker's container and SwingTrader.
+        panel: Optional UniversePanel handed to each worker's SwingTrader.
+        workers: Number of processes (0 = os.cpu_count()).
+        chunk_size: Maximum symbols per task.
+
+    Yields:
+        (symbol, result, error) tuples in completion order; error is None on success.
+    """
+    workers = resolve_workers(workers)
+    if not symbols:
+        return
+    chunks = chunk_symbols(symbols, workers, chunk_size)
+    logging.info("Process pool: %d symbols in %d chunks across %d workers", len(symbols), len(chunks), workers)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(),
+                             initializer=_init_worker, initargs=(settings, panel)) as executor:
+        future_map = {executor.submit(_process_chunk, chunk, _chunk_context(ctx, chunk)): chunk for chunk in chunks}
+        yield from iter_chunk_results(future_map)
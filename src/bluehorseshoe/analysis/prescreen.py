@@ -0,0 +1,146 @@
+"""
+prescreen.py
+
+Drops symbols the prediction path would discard anyway, before any history is
+loaded. One aggregation over `historical_prices_recent` returns the last
+FLAT_WINDOW bars on or before the target date of every symbol, and a symbol is
+dropped when those bars show it:
+
+- stale: the last bar is more than MAX_STALE_DAYS before the target date (or,
+  without one, before the latest bar of the universe);
+- illiquid: avg_volume_20 below MIN_VOLUME_THRESHOLD, where both strategies score 0;
+- out of price range: no entry price either strategy can set lies inside
+  MIN_STOCK_PRICE..MAX_STOCK_PRICE (baseline entries stay within ENTRY_CLOSE_SLACK
+  of the close);
+- dead or flat: the same range and close deviation test as
+  TechnicalAnalyzer._is_dead_or_flat.
+
+Symbols the recent collection cannot judge (no document, or no bar on or before
+the target date) are kept and take the full path.
+
+Usage example:
+    screen = prescreen_symbols(symbols, database=db, target_date='2024-06-28')
+    screen.kept, screen.counts()  # {'illiquid': 3120, 'flat': 41, ...}
+"""
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pymongo.errors import PyMongoError
+
+from bluehorseshoe.analysis.constants import (
+    DEAD_RANGE_RATIO, FLAT_WINDOW, MAX_STALE_DAYS, MAX_STOCK_PRICE, MIN_STOCK_PRICE,
+    MIN_VOLUME_THRESHOLD, PINNED_STD_RATIO
+)
+
+RECENT_COLLECTION = 'historical_prices_recent'
+
+# Baseline setups are rejected when the close is more than 15% from the entry
+ENTRY_CLOSE_SLACK = 0.15
+
+
+@dataclass
+class PrescreenResult:
+    """
+    Outcome of a pre-screen.
+
+    Attributes:
+        kept (List[str]): Symbols to process, in input order.
+        dropped (Dict[str, str]): Dropped symbol -> reason ('stale', 'illiquid', 'price' or 'flat').
+    """
+    kept: List[str]
+    dropped: Dict[str, str] = field(default_factory=dict)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of dropped symbols per reason."""
+        return dict(Counter(self.dropped.values()))
+
+
+def _last_bars_pipeline(symbols: List[str], target_date: Optional[str]) -> List[Dict]:
+    bars = '$days'
+    if target_date is not None:
+        bars = {'$filter': {'input': '$days', 'as': 'd', 'cond': {'$lte': ['$$d.date', target_date]}}}
+    return [
+        {'$match': {'symbol': {'$in': symbols}}},
+        {'$project': {
+            '_id': 0,
+            'symbol': 1,
+            'bars': {'$map': {
+                'input': {'$slice': [bars, -FLAT_WINDOW]},
+                'as': 'b',
+                'in': {'date': '$$b.date', 'close': '$$b.close', 'high': '$$b.high', 'low': '$$b.low',
+                       'avg_volume_20': '$$b.avg_volume_20'}
+            }}
+        }}
+    ]
+
+
+def _is_flat(bars: List[Dict]) -> bool:
+    """TechnicalAnalyzer._is_dead_or_flat over the last FLAT_WINDOW bars."""
+    if len(bars) < FLAT_WINDOW:
+        return False
+    close = np.array([b['close'] for b in bars], dtype=float)
+    avg_close = close.mean()
+    avg_range = np.mean([b['high'] - b['low'] for b in bars])
+    return bool(avg_range / avg_close < DEAD_RANGE_RATIO or close.std(ddof=1) / avg_close < PINNED_STD_RATIO)
+
+
+def _reject_reason(bars: List[Dict], reference: pd.Timestamp) -> Optional[str]:
+    last = bars[-1]
+    if (reference - pd.Timestamp(last['date'])).days > MAX_STALE_DAYS:
+        return 'stale'
+    if (last.get('avg_volume_20') or 0) < MIN_VOLUME_THRESHOLD:
+        return 'illiquid'
+    close = last.get('close') or 0
+    if not MIN_STOCK_PRICE * (1 - ENTRY_CLOSE_SLACK) < close < MAX_STOCK_PRICE * (1 + ENTRY_CLOSE_SLACK):
+        return 'price'
+    if _is_flat(bars):
+        return 'flat'
+    return None
+
+
+def prescreen_symbols(symbols: List[str], database=None, target_date: Optional[str] = None) -> PrescreenResult:
+    """
+    Splits symbols into those worth processing and those the prediction path would discard.
+
+    Args:
+        symbols: Candidate symbols.
+        database: MongoDB database instance. Required.
+        target_date: Prediction date ('YYYY-MM-DD'); None screens on the latest bars.
+
+    Returns:
+        PrescreenResult: Kept symbols and the reason each other symbol was dropped.
+        Every symbol is kept if the aggregation fails.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for prescreen_symbols")
+    if not symbols:
+        return PrescreenResult(kept=[])
+
+    day = pd.Timestamp(target_date).strftime('%Y-%m-%d') if target_date else None
+    try:
+        docs = list(database[RECENT_COLLECTION].aggregate(_last_bars_pipeline(list(symbols), day)))
+    except PyMongoError as e:
+        logging.warning("Pre-screen failed, processing all %d symbols: %s", len(symbols), e)
+        return PrescreenResult(kept=list(symbols))
+
+    last_bars = {doc['symbol']: doc['bars'] for doc in docs if doc.get('bars')}
+    if day is not None:
+        reference = pd.Timestamp(day)
+    elif last_bars:
+        reference = max(pd.Timestamp(bars[-1]['date']) for bars in last_bars.values())
+    else:
+        return PrescreenResult(kept=list(symbols))
+
+    kept, dropped = [], {}
+    for symbol in symbols:
+        bars = last_bars.get(symbol)
+        reason = _reject_reason(bars, reference) if bars else None
+        if reason is None:
+            kept.append(symbol)
+        else:
+            dropped[symbol] = reason
+    return PrescreenResult(kept=kept, dropped=dropped)
@@ -0,0 +1,196 @@
+"""
+score_history.py
+
+This module materializes point-in-time technical scores for every date of a range.
+Rebuilding a year of scores with `swing_predict` reloads every symbol and rescores
+only its last bar, once per date. Here each symbol is loaded once and its dates
+become the rows of a `ScoringBlock`: row i holds the history up to date i, cut to
+the same lookback tail `TechnicalAnalyzer` scores, so `CrossSectionalScorer` scores
+a whole chunk of dates in one vectorized call.
+
+Only the technical components are materialized. The ML stop/target models, the
+weekly-uptrend gate and the relative strength bonus of `swing_predict` are not
+applied, and documents are saved with `HISTORY_SCORE_VERSION`.
+
+Usage example:
+    builder = ScoreHistoryBuilder(database=db)
+    builder.build('2024-01-01', '2024-12-31', symbols=['AAPL', 'MSFT'])
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bluehorseshoe.analysis.cross_sectional import (
+    CrossSectionalScorer, INDICATOR_FIELDS, MIN_BLOCK_WIDTH, PRICE_FIELDS, ScoringBlock
+)
+from bluehorseshoe.analysis.technical_analyzer import (
+    INDICATOR_CLASSES, LOOKBACK_ALIGNMENT, TechnicalAnalyzer
+)
+from bluehorseshoe.core.config import WeightSet
+from bluehorseshoe.core.scores import ScoreManager
+from bluehorseshoe.core.symbols import get_symbol_name_list
+from bluehorseshoe.data.universe_panel import UniversePanel
+
+HISTORY_SCORE_VERSION = "history-1.0"
+
+# Dates scored per block (bounds peak memory: dates x lookback x fields)
+DEFAULT_DATE_CHUNK = 64
+
+# Symbols loaded per panel. Full histories are loaded, so batches are smaller than
+# the panel's own Mongo batches.
+HISTORY_BATCH_SIZE = 50
+
+
+def history_block(df: pd.DataFrame, row_ends: Iterable[int], lookback: int,
+                  labels: Optional[List[str]] = None) -> ScoringBlock:
+    """
+    Builds a block whose rows are one symbol's point-in-time histories.
+
+    Row i holds the bars of df up to and including position row_ends[i], cut like
+    `TechnicalAnalyzer._lookback_tail(days, lookback)`.
+
+    Args:
+        df: Symbol history (oldest bar first) with price and indicator columns.
+        row_ends: Positions of the last bar of each row.
+        lookback: Bars of history a score needs (see `TechnicalAnalyzer.required_lookback`).
+        labels: Row labels (default: the row_ends as strings).
+    """
+    ends = np.asarray(row_ends, dtype=np.int64) + 1
+    excess = ends - lookback
+    starts = np.where(excess > 0, excess - excess % LOOKBACK_ALIGNMENT, 0)
+    lengths = ends - starts
+    width = max(MIN_BLOCK_WIDTH, int(lengths.max()) if len(lengths) else 0)
+
+    # Source bar of every (row, column), right-aligned on the row's last bar
+    source = ends[:, None] - width + np.arange(width)
+    valid = source >= starts[:, None]
+    source = np.where(valid, source, 0)
+
+    columns, present = {}, {}
+    for field in PRICE_FIELDS + INDICATOR_FIELDS:
+        if field not in df.columns:
+            continue
+        values = df[field].to_numpy(dtype=np.float64)
+        columns[field] = np.where(valid, values[source], np.nan)
+        present[field] = np.ones(len(ends), dtype=bool)
+
+    labels = labels if labels is not None else [str(end - 1) for end in ends]
+    return ScoringBlock(list(labels), lengths, columns, present)
+
+
+def score_history(df: pd.DataFrame, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  strategies: Iterable[str] = ("baseline", "mean_reversion"),
+                  scorer: Optional[CrossSectionalScorer] = None,
+                  chunk_size: int = DEFAULT_DATE_CHUNK,
+                  dates: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Scores one symbol as of every bar dated within [start_date, end_date].
+
+    Args:
+        df: The symbol's full history (oldest bar first) with a 'date' column.
+        start_date: First date to score ('YYYY-MM-DD'), default the first bar.
+        end_date: Last date to score ('YYYY-MM-DD'), default the last bar.
+        strategies: Strategies to score.
+        scorer: CrossSectionalScorer to score with (default: all indicators, "sum").
+        chunk_size: Dates scored per block.
+        dates: Optional bar dates to score; the others in the range are skipped.
+
+    Returns:
+        dict: strategy -> date -> component dict (as returned by calculate_technical_score).
+    """
+    scorer = scorer if scorer is not None else CrossSectionalScorer()
+    results = {strategy: {} for strategy in strategies}
+    if df is None or df.empty:
+        return results
+
+    bar_dates = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d').to_numpy()
+    in_range = np.ones(len(bar_dates), dtype=bool)
+    if start_date is not None:
+        in_range &= bar_dates >= start_date
+    if end_date is not None:
+        in_range &= bar_dates <= end_date
+    if dates is not None:
+        in_range &= np.isin(bar_dates, list(dates))
+    positions = np.nonzero(in_range)[0]
+
+    filters = scorer._indicator_filters()  # pylint: disable=protected-access
+    lookback = TechnicalAnalyzer.required_lookback(
+        [g for g in INDICATOR_CLASSES if not filters or g in filters],
+        modifiers=not scorer.enabled_indicators
+    )
+    for offset in range(0, len(positions), chunk_size):
+        rows = positions[offset:offset + chunk_size]
+        block = history_block(df, rows, lookback, labels=list(bar_dates[rows]))
+        for strategy in strategies:
+            results[strategy].update(scorer.score_block(block, strategy))
+    return results
+
+
+class ScoreHistoryBuilder:
+    """
+    Writes point-in-time baseline and mean reversion scores for a date range to
+    'trade_scores', loading each symbol once.
+
+    Args:
+        database: MongoDB database instance. Required.
+        enabled_indicators: Same format as `TechnicalAnalyzer.calculate_technical_score`.
+        aggregation: "sum" or "product".
+        weights: WeightSet to score with (default: the weights_config singleton).
+        overwrite: Replace existing scores. By default only missing (symbol, date,
+            strategy) scores are inserted, so full `swing_predict` scores are kept.
+    """
+
+    def __init__(self, database=None, enabled_indicators: Optional[list[str]] = None,
+                 aggregation: str = "sum", weights: Optional[WeightSet] = None, overwrite: bool = False):
+        if database is None:
+            raise ValueError("database parameter is required for ScoreHistoryBuilder")
+        self.database = database
+        self.scorer = CrossSectionalScorer(enabled_indicators, aggregation, weights)
+        self.score_manager = ScoreManager(database=database)
+        self.overwrite = overwrite
+
+    @staticmethod
+    def _documents(symbol: str, scores: Dict[str, Dict[str, Dict[str, float]]]) -> List[Dict]:
+        """trade_scores documents for the positive scores, like swing_predict saves."""
+        return [
+            {
+                "symbol": symbol,
+                "date": date,
+                "score": components["total"],
+                "strategy": strategy,
+                "version": HISTORY_SCORE_VERSION,
+                "metadata": {"components": components}
+            }
+            for strategy, by_date in scores.items()
+            for date, components in by_date.items()
+            if components.get("total", 0.0) > 0
+        ]
+
+    def build(self, start_date: str, end_date: str, symbols: Optional[List[str]] = None,
+              strategies: Iterable[str] = ("baseline", "mean_reversion"),
+              batch_size: int = HISTORY_BATCH_SIZE) -> int:
+        """
+        Scores every symbol for every trading date in [start_date, end_date].
+
+        Returns:
+            int: Number of score documents written.
+        """
+        if symbols is None:
+            symbols = get_symbol_name_list(database=self.database)
+        strategies = tuple(strategies)
+
+        written = 0
+        for offset in range(0, len(symbols), batch_size):
+            batch = symbols[offset:offset + batch_size]
+            panel = UniversePanel.from_database(self.database, symbols=batch, end_date=end_date)
+            documents = []
+            for symbol in panel.symbols:
+                scores = score_history(panel.frame(symbol), start_date, end_date, strategies, self.scorer)
+                documents.extend(self._documents(symbol, scores))
+            self.score_manager.save_scores(documents, overwrite=self.overwrite)
+            written += len(documents)
+            logging.info("Score history: %d/%d symbols, %d scores written.",
+                         min(offset + batch_size, len(symbols)), len(symbols), written)
+        return written
@@ -0,0 +1,274 @@
+"""
+signal_cache.py
+
+This module provides the `SignalCache`, a persisted array of unweighted baseline
+sub-indicator scores (dates x symbols x signals), and `WeightSweep`, which evaluates
+weights.json configurations against it.
+
+With "sum" aggregation a baseline score is the dot product of the raw sub-indicator
+scores with their multipliers, plus the weight-independent penalties and bonuses.
+Raw scores are therefore computed once per (symbol, date), and every weight
+configuration is one matrix multiply per date followed by the Backtester's candidate
+selection (top N positive scores) and grading with the vectorized trade simulator,
+instead of a rewritten weights.json and a full backtest per multiplier value.
+
+Usage example:
+    cache = SignalCache.build(panel, dates=['2024-06-03', '2024-06-10'])
+    cache.save('signals.npz')
+    sweep = WeightSweep(SignalCache.load('signals.npz'), panel, top_n=5)
+    results = sweep.run([{'trend': {'PSAR_MULTIPLIER': 2.0}}, {'momentum': {'RSI_MULTIPLIER': 0.5}}])
+    WeightSweep.summarize(results)
+"""
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from bluehorseshoe.analysis.backtest import BacktestConfig
+from bluehorseshoe.analysis.cross_sectional import (
+    DEFAULT_CHUNK_SIZE, CrossSectionalScorer, ScoringBlock, signal_specs
+)
+from bluehorseshoe.analysis.trade_simulator import simulate_bracket_trades
+from bluehorseshoe.core.config import WeightSet, weights_config
+
+
+@dataclass
+class SignalCache:
+    """
+    Raw baseline signals for a set of symbols on a set of signal dates.
+
+    Attributes:
+        dates (list[str]): Signal dates ('YYYY-MM-DD') in cache order.
+        symbols (list[str]): Symbols in cache order.
+        specs (list[tuple]): (group, sub-indicator, weight) of each signal, where the
+            weight is a weights.json key of the group or a fixed multiplier.
+        values (np.ndarray): Raw scores of shape (len(dates), len(symbols), len(specs)).
+        modifiers (np.ndarray): Baseline penalties and bonuses of shape (len(dates), len(symbols)).
+        eligible (np.ndarray): False where the symbol is not scored on that date.
+        macd_signal_multiplier (float): MACD_SIGNAL_MULTIPLIER the raw MACD scores were
+            computed with; it is a threshold rather than a weight.
+    """
+    # pylint: disable=too-many-instance-attributes
+    dates: List[str]
+    symbols: List[str]
+    specs: List[tuple]
+    values: np.ndarray
+    modifiers: np.ndarray
+    eligible: np.ndarray
+    macd_signal_multiplier: float
+
+    @property
+    def signals(self) -> List[str]:
+        """Signal names ("group:sub_indicator") in column order."""
+        return [f"{group}:{name}" for group, name, _ in self.specs]
+
+    def get(self, symbol: str, date: str, signal: str) -> float:
+        """Raw score of one signal of a symbol on a date."""
+        return float(self.values[self.dates.index(date), self.symbols.index(symbol), self.signals.index(signal)])
+
+    @classmethod
+    def build(cls, panel, dates: Iterable[str], symbols: Optional[Iterable[str]] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, weights: Optional[WeightSet] = None) -> 'SignalCache':
+        """
+        Computes the raw signals of panel symbols as of each date.
+
+        Args:
+            panel: UniversePanel holding the symbols' history.
+            dates: Signal dates ('YYYY-MM-DD').
+            symbols: Symbols to include (default: every panel symbol).
+            chunk_size: Symbols scored per block.
+            weights: WeightSet whose MACD_SIGNAL_MULTIPLIER the raw MACD scores use
+                (default: weights_config).
+        """
+        dates = [pd.Timestamp(d).strftime('%Y-%m-%d') for d in dates]
+        symbols = [s for s in (panel.symbols if symbols is None else symbols) if s in panel]
+        specs = signal_specs()
+        scorer = CrossSectionalScorer(weights=weights)
+
+        values = np.zeros((len(dates), len(symbols), len(specs)), dtype=np.float32)
+        modifiers = np.zeros((len(dates), len(symbols)), dtype=np.float32)
+        eligible = np.zeros((len(dates), len(symbols)), dtype=bool)
+        for d, date in enumerate(dates):
+            for offset in range(0, len(symbols), chunk_size):
+                block = ScoringBlock.from_panel(panel, symbols[offset:offset + chunk_size], date)
+                _, signals, block_modifiers, block_eligible = scorer.raw_baseline_signals(block)
+                rows = slice(offset, offset + len(block.symbols))
+                values[d, rows] = signals
+                modifiers[d, rows] = block_modifiers
+                eligible[d, rows] = block_eligible
+            logging.info("Signal cache: %s done (%d/%d dates)", date, d + 1, len(dates))
+
+        return cls(dates, symbols, specs, values, modifiers, eligible,
+                   float(scorer.weights.get_weights('momentum')['MACD_SIGNAL_MULTIPLIER']))
+
+    def save(self, path) -> None:
+        """Writes the cache to a compressed .npz file."""
+        meta = {'specs': self.specs, 'macd_signal_multiplier': self.macd_signal_multiplier}
+        np.savez_compressed(
+            path, dates=np.array(self.dates), symbols=np.array(self.symbols), values=self.values,
+            modifiers=self.modifiers, eligible=self.eligible, meta=np.array(json.dumps(meta))
+        )
+
+    @classmethod
+    def load(cls, path) -> 'SignalCache':
+        """Reads a cache written by `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(
+                dates=[str(date) for date in data['dates']],
+                symbols=[str(symbol) for symbol in data['symbols']],
+                specs=[tuple(spec) for spec in meta['specs']],
+                values=data['values'],
+                modifiers=data['modifiers'],
+                eligible=data['eligible'],
+                macd_signal_multiplier=meta['macd_signal_multiplier']
+            )
+
+
+@dataclass
+class SweepResult:
+    """Trades taken with one weight configuration."""
+    label: str
+    weights: Dict[str, Dict[str, float]]
+    trades: pd.DataFrame = field(repr=False)
+
+    def summary(self) -> Dict[str, float]:
+        """Trade count, win rate and PnL statistics of the graded trades."""
+        graded = self.trades[self.trades['status'].isin(['success', 'failure'])] if len(self.trades) else self.trades
+        count = len(graded)
+        return {
+            'label': self.label,
+            'trades': count,
+            'win_rate': float((graded['status'] == 'success').mean() * 100) if count else 0.0,
+            'avg_pnl': float(graded['pnl'].mean()) if count else 0.0,
+            'total_pnl': float(graded['pnl'].sum()) if count else 0.0
+        }
+
+
+class WeightSweep:
+    """
+    Evaluates weight configurations against a SignalCache.
+
+    Candidates are chosen like `Backtester._filter_and_sort_predictions`: the top_n
+    symbols with a positive baseline score on each date. Each candidate is entered at
+    its close on the signal date, with stop and target at the config's stop_loss_factor
+    and target_profit_factor of that price, and graded with the GradingEngine rules
+    over hold_days bars. ML models and the weekly-uptrend filter are not applied.
+
+    Args:
+        cache: SignalCache of the dates and symbols to sweep.
+        panel: UniversePanel with the bars after each signal date.
+        config: BacktestConfig with hold_days, stop_loss_factor and target_profit_factor.
+        top_n: Candidates taken per date.
+        base_weights: WeightSet that configs are merged over (default: weights_config).
+    """
+
+    def __init__(self, cache: SignalCache, panel, config: Optional[BacktestConfig] = None, top_n: int = 10,
+                 base_weights: Optional[WeightSet] = None):
+        self.cache = cache
+        self.panel = panel
+        self.config = config or BacktestConfig()
+        self.top_n = top_n
+        self.base_weights = base_weights if base_weights is not None else weights_config
+        self._graded = {}
+
+    def weight_matrix(self, configs: List[Union[WeightSet, Dict[str, Dict[str, float]]]]) -> np.ndarray:
+        """
+        Multipliers of shape (signals, configs). Configs are WeightSets or use the
+        weights.json layout; categories and keys a config leaves out keep the base weights.
+        """
+        matrix = np.zeros((len(self.cache.specs), len(configs)))
+        for c, config in enumerate(configs):
+            if isinstance(config, WeightSet):
+                config = config.to_dict()
+            for k, (group, name, weight) in enumerate(self.cache.specs):
+                weights = {**self.base_weights.get_weights(group), **config.get(group, {})}
+                matrix[k, c] = float(weights[weight]) if isinstance(weight, str) else float(weight)
+                if group == 'momentum' and name == 'macd' and matrix[k, c] != 0.0:
+                    signal_multiplier = weights.get('MACD_SIGNAL_MULTIPLIER', self.cache.macd_signal_multiplier)
+                    if signal_multiplier != self.cache.macd_signal_multiplier:
+                        raise ValueError(
+                            f"MACD_SIGNAL_MULTIPLIER {signal_multiplier} changes the raw MACD signal; "
+                            f"the cache was built with {self.cache.macd_signal_multiplier}"
+                        )
+        return matrix
+
+    def scores(self, date_index: int, matrix: np.ndarray) -> np.ndarray:
+        """Baseline scores of shape (symbols, configs) on one cached date."""
+        scores = self.cache.values[date_index].astype(np.float64) @ matrix
+        scores += self.cache.modifiers[date_index].astype(np.float64)[:, None]
+        return np.where(self.cache.eligible[date_index][:, None], scores, 0.0)
+
+    def select(self, scores: np.ndarray) -> List[np.ndarray]:
+        """Symbol indices of the top_n positive scores per config, best first."""
+        order = np.argsort(-scores, axis=0, kind='stable')[:self.top_n]
+        return [order[:, c][scores[order[:, c], c] > 0] for c in range(scores.shape[1])]
+
+    def run(self, configs: List[Union[WeightSet, Dict[str, Dict[str, float]]]],
+            labels: Optional[List[str]] = None) -> List[SweepResult]:
+        """Selects and grades candidates on every cached date for each configuration."""
+        if labels is None:
+            labels = [str(i) for i in range(len(configs))]
+        matrix = self.weight_matrix(configs)
+
+        picks = [[] for _ in configs]
+        for d in range(len(self.cache.dates)):
+            scores = self.scores(d, matrix)
+            for c, symbols in enumerate(self.select(scores)):
+                picks[c].extend((d, s, scores[s, c]) for s in symbols)
+
+        self._grade({(d, s) for config_picks in picks for d, s, _ in config_picks})
+
+        results = []
+        for label, config, config_picks in zip(labels, configs, picks):
+            rows = [{'date': self.cache.dates[d], 'symbol': self.cache.symbols[s], 'score': float(score),
+                     **self._graded[(d, s)]} for d, s, score in config_picks]
+            weights = config.to_dict() if isinstance(config, WeightSet) else config
+            results.append(SweepResult(label, weights, pd.DataFrame(rows)))
+        return results
+
+    def _grade(self, pairs) -> None:
+        """Grades (date index, symbol index) pairs not graded yet, one simulator call per symbol."""
+        by_symbol = {}
+        for d, s in pairs:
+            if (d, s) not in self._graded:
+                by_symbol.setdefault(s, []).append(d)
+
+        fields = {name: self.panel.fields.index(name) for name in ('high', 'low', 'close')}
+        panel_rows = {symbol: i for i, symbol in enumerate(self.panel.symbols)}
+        for s, date_indices in by_symbol.items():
+            bars = self.panel.values[panel_rows[self.cache.symbols[s]]]
+            valid = ~np.isnan(bars[:, fields['close']])
+            bar_dates = self.panel.dates[valid]
+            highs, lows, closes = (bars[valid, fields[name]] for name in ('high', 'low', 'close'))
+
+            signal_dates = np.array([self.cache.dates[d] for d in date_indices], dtype='datetime64[D]')
+            start = np.searchsorted(bar_dates, signal_dates, side='right')
+            entry = np.where(start > 0, closes[np.maximum(start - 1, 0)], np.nan)
+            sim = simulate_bracket_trades(
+                highs, lows, closes, start, entry, entry * self.config.stop_loss_factor,
+                entry * self.config.target_profit_factor, self.config.hold_days
+            )
+            for k, d in enumerate(date_indices):
+                if start[k] == 0 or sim.status[k] == 'no_future_data':
+                    self._graded[(d, s)] = {'status': 'no_future_data' if start[k] else 'no_data'}
+                    continue
+                self._graded[(d, s)] = {
+                    'status': sim.status[k],
+                    'entry': float(entry[k]),
+                    'exit_price': float(sim.exit_price[k]),
+                    'exit_date': str(bar_dates[sim.exit_idx[k]]),
+                    'pnl': float((sim.exit_price[k] / entry[k] - 1) * 100),
+                    'days_held': int(sim.days_held[k])
+                }
+
+    @staticmethod
+    def summarize(results: List[SweepResult]) -> pd.DataFrame:
+        """One row of summary statistics per configuration, best average PnL first."""
+        summary = pd.DataFrame([result.summary() for result in results])
+        if summary.empty:
+            return summary
+        return summary.sort_values('avg_pnl', ascending=False).reset_index(drop=True)
@@ -20,9 +20,7 @@ Constants:
 """
 import logging
 import os
-import concurrent.futures
-from functools import partial
-from dataclasses import dataclass
+import time
 from typing import Dict, Optional, List, Any
 
 import pandas as pd
@@ -30,24 +28,33 @@ from pymongo.database import Database
 from ta.volatility import AverageTrueRange
 
 from bluehorseshoe.analysis.constants import (
-    MIN_STOCK_PRICE, MAX_STOCK_PRICE,
+    MAX_STALE_DAYS,
+    MIN_HISTORY_BARS,
     ATR_WINDOW,
-    MIN_RR_RATIO_BASELINE, MIN_RR_RATIO_MEAN_REVERSION,
+    MIN_RR_RATIO_BASELINE,
     MAX_RISK_PERCENT,
-    REQUIRE_WEEKLY_UPTREND,
     SIGNAL_STRENGTH_THRESHOLDS,
     ENTRY_DISCOUNT_BY_SIGNAL,
     ENABLE_DYNAMIC_ENTRY
 )
+from bluehorseshoe.analysis.cross_sectional import CrossSectionalScorer
+from bluehorseshoe.analysis import performance
 from bluehorseshoe.analysis.market_regime import MarketRegime
 from bluehorseshoe.analysis.ml_overlay import MLInference
 from bluehorseshoe.analysis.ml_stop_loss import StopLossInference
 from bluehorseshoe.analysis.ml_profit_target import ProfitTargetInference
+from bluehorseshoe.analysis.prediction_batch import PredictionBatchMixin, StrategyContext
+from bluehorseshoe.analysis.prescreen import prescreen_symbols
 from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
-from bluehorseshoe.core.config import Settings, get_settings, weights_config
+from bluehorseshoe.core import profiling
+from bluehorseshoe.core.config import Settings, get_settings
 from bluehorseshoe.core.scores import ScoreManager
 from bluehorseshoe.core.symbols import get_symbol_name_list, get_symbols_from_mongo
+from bluehorseshoe.core.trading_calendar import get_trading_calendar
+from bluehorseshoe.data.columnar_store import load_columnar_data_from_mongo
+from bluehorseshoe.data.feature_store import FeatureStore
 from bluehorseshoe.data.historical_data import load_historical_data
+from bluehorseshoe.data.universe_panel import UniversePanel
 from bluehorseshoe.reporting.report_generator import ReportWriter, ReportSingleton
 
 # Expected P&L by score based on historical backtest analysis (11,960 trades)
@@ -59,17 +66,7 @@ EXPECTED_PNL_BY_SCORE = {
     16.0: 0.24, 17.0: 0.73, 18.0: 0.94
 }
 
-@dataclass
-class StrategyContext:
-    """Encapsulates common parameters for strategy processing."""
-    target_date: Optional[str] = None
-    enabled_indicators: Optional[List[str]] = None
-    aggregation: str = "sum"
-    benchmark_df: Optional[pd.DataFrame] = None
-    market_health: Optional[Dict[str, Any]] = None
-    symbol_map: Optional[Dict[str, str]] = None
-
-class SwingTrader:
+class SwingTrader(PredictionBatchMixin):
     """Main class for swing trading analysis."""
 
     def __init__(
@@ -79,7 +76,8 @@ class SwingTrader:
         ml_inference: Optional[MLInference] = None,
         stop_loss_inference: Optional[StopLossInference] = None,
         profit_target_inference: Optional[ProfitTargetInference] = None,
-        report_writer: Optional[ReportWriter] = None
+        report_writer: Optional[ReportWriter] = None,
+        panel: Optional[UniversePanel] = None
     ):
         """
         Initialize SwingTrader with dependency injection.
@@ -91,17 +89,27 @@ class SwingTrader:
             stop_loss_inference: StopLossInference instance. If None, creates new instance.
             profit_target_inference: ProfitTargetInference instance. If None, creates new instance.
             report_writer: ReportWriter instance for logging. If None, uses legacy ReportSingleton.
+            panel: Optional UniversePanel. Symbols in the panel are sliced from memory instead of loaded from Mongo.
         """
         # Store injected dependencies
         self.database = database
+        self.panel = panel
         self.config = config if config is not None else get_settings()
         self.report_writer = report_writer
 
         # Initialize analysis components
         self.technical_analyzer = TechnicalAnalyzer()
-        self.ml_inference = ml_inference if ml_inference is not None else MLInference(database=database)
-        self.stop_loss_inference = stop_loss_inference if stop_loss_inference is not None else StopLossInference(database=database)
-        self.profit_target_inference = profit_target_inference if profit_target_inference is not None else ProfitTargetInference(database=database)
+        # One feature cache shared by the three models
+        feature_store = FeatureStore(database) if database is not None else None
+        self.ml_inference = ml_inference if ml_inference is not None else MLInference(
+            database=database, feature_store=feature_store
+        )
+        self.stop_loss_inference = stop_loss_inference if stop_loss_inference is not None else StopLossInference(
+            database=database, feature_store=feature_store
+        )
+        self.profit_target_inference = profit_target_inference if profit_target_inference is not None else ProfitTargetInference(
+            database=database, feature_store=feature_store
+        )
 
         # Create ScoreManager with injected database
         if database is not None:
@@ -308,7 +316,8 @@ class SwingTrader:
             'is_realistic': (abs((last_close / entry_price) - 1) <= 0.15) and (risk_pct <= MAX_RISK_PERCENT)
         }
 
-    def calculate_mean_reversion_setup(self, df: pd.DataFrame, ml_stop_multiplier: float = 1.5, ml_profit_multiplier: float = 2.0) -> Dict[str, float]:
+    def calculate_mean_reversion_setup(self, df: pd.DataFrame, ml_stop_multiplier: float = 1.5,
+                                       ml_profit_multiplier: float = 2.0) -> Dict[str, float]:
         """
         Calculate structural prices for Mean Reversion (Dip) strategy:
         Entry = Current Close (Buying extreme weakness)
@@ -383,31 +392,44 @@ class SwingTrader:
 
     def _load_and_validate_data(self, symbol: str, target_date: Optional[str]) -> Optional[tuple[pd.DataFrame, dict, dict]]:
         """Helper to load and validate historical data."""
-        price_data = load_historical_data(symbol, database=self.database, score_manager_instance=self.score_manager)
-        if price_data is None or not price_data.get('days'):
-            logging.error("Failed to load historical data for %s.", symbol)
-            return None
+        if self.panel is not None and symbol in self.panel:
+            # Point-in-time slice straight from the shared panel
+            df = self.panel.frame(symbol, target_date)
+            price_data = {'symbol': symbol, 'full_name': self.panel.full_name(symbol)}
+        else:
+            price_data = {}
+            if self.config.price_store == 'columnar':
+                price_data = load_columnar_data_from_mongo(symbol, self.database)
 
-        df = pd.DataFrame(price_data['days'])
+            if price_data:
+                df = price_data['frame']
+            else:
+                price_data = load_historical_data(symbol, database=self.database, score_manager_instance=self.score_manager)
+                if price_data is None or not price_data.get('days'):
+                    logging.error("Failed to load historical data for %s.", symbol)
+                    return None
+                df = pd.DataFrame(price_data['days'])
+
+            if target_date:
+                df['date'] = pd.to_datetime(df['date'])
+                df = df[df['date'] <= pd.to_datetime(target_date)]
 
         if target_date:
-            df['date'] = pd.to_datetime(df['date'])
             target_ts = pd.to_datetime(target_date)
-            df = df[df['date'] <= target_ts]
-
             if not df.empty:
                 last_date = pd.to_datetime(df.iloc[-1]['date'])
-                if (target_ts - last_date).days > 7:
+                if (target_ts - last_date).days > MAX_STALE_DAYS:
                     logging.info("Symbol %s data is too stale for target date %s. Skipping.", symbol, target_date)
                     return None
 
-        if df.empty or len(df) < 30:
+        if df.empty or len(df) < MIN_HISTORY_BARS:
             logging.info("Symbol %s has insufficient data (%d days) for target date. Skipping.", symbol, len(df))
             return None
 
         yesterday = dict(df.iloc[-1])
         if not target_date and not self.config.holiday_mode:
-            last_trading_day = pd.Timestamp.now().normalize() - pd.offsets.BDay(1)
+            last_trading_day = pd.Timestamp(get_trading_calendar(self.database).previous(
+                pd.Timestamp.now().strftime('%Y-%m-%d')))
             yesterday['date'] = pd.to_datetime(yesterday['date'])
             if yesterday['date'] != last_trading_day:
                 logging.error("Data for %s on date '%s' is not '%s'.", symbol, yesterday['date'], last_trading_day)
@@ -417,208 +439,57 @@ class SwingTrader:
 
         return df, price_data, yesterday
 
-    def _process_baseline(self, df: pd.DataFrame, symbol: str, yesterday: dict, ctx: StrategyContext) -> Optional[Dict]:
-        """Process Baseline strategy logic."""
-        # Regime Filter: Skip momentum during bearish regimes
-        # UPDATED (Jan 2026): User requested to bypass this hard filter.
-        # if ctx.market_health and ctx.market_health['status'] == 'Bearish':
-        #    return None
-
-        # Dynamic Regime Filtering:
-        # In Bear/Neutral markets, we MUST have a Weekly Uptrend to avoid "bull traps".
-        # In strong Bull markets, we can relax this to capture early reversals or strong daily momentum.
-        should_enforce_weekly = REQUIRE_WEEKLY_UPTREND
-        if ctx.market_health and ctx.market_health['status'] == 'Bullish':
-            should_enforce_weekly = False
-
-        is_uptrend = self.is_weekly_uptrend(df)
-        if should_enforce_weekly and not is_uptrend:
-            # print(f"DEBUG: {symbol} - Baseline failed weekly uptrend")
-            return None
-
-        # *** STEP 1: Calculate score FIRST ***
-        score_components = self.technical_analyzer.calculate_baseline_score(
+    def _technical_score(self, df: pd.DataFrame, symbol: str, ctx: StrategyContext, strategy: str) -> Dict[str, float]:
+        """Returns the symbol's score components, from ctx.precomputed_scores when available."""
+        precomputed = (ctx.precomputed_scores or {}).get(strategy, {}).get(symbol)
+        if precomputed is not None:
+            # Copy: callers add and remove components
+            return dict(precomputed)
+        return self.technical_analyzer.calculate_technical_score(
             df,
+            strategy=strategy,
             enabled_indicators=ctx.enabled_indicators,
-            aggregation=ctx.aggregation
-        )
-        technical_score = score_components.get("total", 0.0)
-
-        # *** STEP 2: Get dynamic entry parameters ***
-        last_row = df.iloc[-1]
-        ema9 = df['close'].ewm(span=9).mean().iloc[-1]
-        atr = self._calculate_atr(df)
-
-        entry_price, atr_discount_used, signal_strength = self._determine_baseline_entry(
-            last_row, ema9, atr, technical_score
-        )
-
-        # *** STEP 3: Predict ML profit target multiplier ***
-        ml_profit_multiplier = self.profit_target_inference.predict_profit_target_multiplier(
-            symbol,
-            score_components,
-            target_date=str(yesterday['date'])[:10],
-            strategy="baseline"
+            aggregation=ctx.aggregation,
+            weights=ctx.weights
         )
 
-        # *** STEP 4: Calculate baseline setup with ML stop & profit ***
-        ml_stop_multiplier = 2.0
-        baseline_setup = self.calculate_baseline_setup(df, ml_stop_multiplier=ml_stop_multiplier, ml_profit_multiplier=ml_profit_multiplier)
-
-        # *** STEP 5: Override entry price with dynamic calculation ***
-        baseline_setup['entry_price'] = entry_price
-
-        # *** STEP 6: Recalculate risk/reward with new entry ***
-        stop_loss = baseline_setup['stop_loss']
-        take_profit = baseline_setup['take_profit']
-        risk = entry_price - stop_loss
-        reward = take_profit - entry_price
-        baseline_setup['rr_ratio'] = reward / risk if risk > 0 else 0
-
-        # Recalculate is_realistic with new entry
-        last_close = last_row['close']
-        risk_pct = (entry_price - stop_loss) / entry_price if entry_price > 0 else 0
-        baseline_setup['is_realistic'] = (
-            (abs((last_close / entry_price) - 1) <= 0.15) and
-            (risk_pct <= MAX_RISK_PERCENT)
-        )
-
-        # *** STEP 7: Add new metadata fields ***
-        baseline_setup['atr_discount_used'] = atr_discount_used
-        baseline_setup['signal_strength'] = signal_strength
-        baseline_setup['profit_multiplier'] = ml_profit_multiplier
-
-        # Validation checks
-        if not baseline_setup['is_realistic'] or baseline_setup['rr_ratio'] < MIN_RR_RATIO_BASELINE:
-            # print(f"DEBUG: {symbol} - Baseline failed setup checks: realistic={baseline_setup['is_realistic']}, rr={baseline_setup['rr_ratio']}")
-            return None
-
-        entry_price = baseline_setup['entry_price']
-        if not MIN_STOCK_PRICE < entry_price < MAX_STOCK_PRICE:
-            print(f"DEBUG: {symbol} - Baseline price out of range: {entry_price}")
-            return None
-
-        # Apply Relative Strength (RS) Bonus
-        rs_multiplier = weights_config.get_weights('momentum').get('RS_MULTIPLIER', 1.0)
-        if ctx.benchmark_df is not None and rs_multiplier != 0.0:
-            rs_ratio = self.calculate_relative_strength(df, ctx.benchmark_df)
-            if rs_ratio > 1.10:
-                rs_bonus = 5.0
-            elif rs_ratio > 1.0:
-                rs_bonus = 2.0
-            else:
-                rs_bonus = -2.0
-            rs_bonus *= rs_multiplier
-            score_components["rs_index"] = rs_bonus
-            score_components["total"] += rs_bonus
-
-        # Calculate ML Win Probability
-        ml_prob = self.ml_inference.predict_probability(
-            symbol,
-            score_components,
-            target_date=str(yesterday['date'])[:10],
-            strategy="baseline"
-        )
-
-        return {
-            "score": score_components.pop("total", 0.0),
-            "components": score_components,
-            "setup": baseline_setup,
-            "ml_prob": ml_prob,
-            "stop_multiplier": ml_stop_multiplier,
-            "profit_multiplier": ml_profit_multiplier
-        }
-
-    def _process_mr(self, df: pd.DataFrame, symbol: str, yesterday: dict, ctx: StrategyContext) -> Optional[Dict]:
-        """Process Mean Reversion strategy logic."""
-        score_components_mr = self.technical_analyzer.calculate_technical_score(
-            df,
-            strategy="mean_reversion",
-            enabled_indicators=ctx.enabled_indicators,
-            aggregation=ctx.aggregation
-        )
-
-        # Predict ML Stop Loss Multiplier
-        ml_stop_multiplier_mr = self.stop_loss_inference.predict_stop_loss_multiplier(
-            symbol,
-            score_components_mr,
-            target_date=str(yesterday['date'])[:10]
-        )
-
-        # Predict ML Profit Target Multiplier
-        ml_profit_multiplier_mr = self.profit_target_inference.predict_profit_target_multiplier(
-            symbol,
-            score_components_mr,
-            target_date=str(yesterday['date'])[:10],
-            strategy="mean_reversion"
-        )
-
-        mr_setup = self.calculate_mean_reversion_setup(df, ml_stop_multiplier=ml_stop_multiplier_mr, ml_profit_multiplier=ml_profit_multiplier_mr)
-        if not mr_setup['is_realistic'] or mr_setup['rr_ratio'] < MIN_RR_RATIO_MEAN_REVERSION:
-            return None
-
-        entry_price = mr_setup['entry_price']
-        if not MIN_STOCK_PRICE < entry_price < MAX_STOCK_PRICE:
-            return None
-
-        # Calculate ML Win Probability
-        ml_prob_mr = self.ml_inference.predict_probability(
-            symbol,
-            score_components_mr,
-            target_date=str(yesterday['date'])[:10],
-            strategy="mean_reversion"
+    def precompute_scores(self, symbols: List[str], ctx: StrategyContext) -> None:
+        """
+        Scores every panel symbol at once with CrossSectionalScorer and stores the
+        results on ctx. Without a panel, symbols are scored one by one in process_symbol.
+        """
+        if self.panel is None:
+            return
+        scorer = CrossSectionalScorer(
+            enabled_indicators=ctx.enabled_indicators, aggregation=ctx.aggregation, weights=ctx.weights
         )
+        ctx.precomputed_scores = scorer.score_panel(self.panel, target_date=ctx.target_date, symbols=symbols)
+        logging.info("Precomputed technical scores for %d symbols.", len(ctx.precomputed_scores.get('baseline', {})))
 
-        # Add profit multiplier to setup metadata
-        mr_setup['profit_multiplier'] = ml_profit_multiplier_mr
-
-        return {
-            "score": score_components_mr.pop("total", 0.0),
-            "components": score_components_mr,
-            "setup": mr_setup,
-            "ml_prob": ml_prob_mr,
-            "stop_multiplier": ml_stop_multiplier_mr,
-            "profit_multiplier": ml_profit_multiplier_mr
-        }
-
-    def process_symbol(self, symbol: str, ctx: StrategyContext) -> Optional[Dict]:
-        """Process a single symbol and return its trading data."""
-        # 1. Load and Validate Data
-        data_result = self._load_and_validate_data(symbol, ctx.target_date)
-        if not data_result:
-            return None
-        df, price_data, yesterday = data_result
-
-        # 2. Process Strategies
-        baseline_data = self._process_baseline(df, symbol, yesterday, ctx)
-        mr_data = self._process_mr(df, symbol, yesterday, ctx)
-
-        if not baseline_data and not mr_data:
-            return None
+    def screen_symbols(self, symbols: Optional[List[str]] = None, target_date: Optional[str] = None) -> List[str]:
+        """
+        Returns the symbols a prediction for target_date processes: the given symbols
+        (default: the whole universe), pre-screened when the prescreen setting is on.
+        """
+        if symbols is None:
+            symbols = get_symbol_name_list(database=self.database)
+        if self.config.prescreen:
+            with profiling.span('prescreen'):
+                symbols = self._prescreen(symbols, target_date)
+        return symbols
+
+    def _prescreen(self, symbols: List[str], target_date: Optional[str]) -> List[str]:
+        """Drops the symbols the recent bars show would be skipped (see prescreen)."""
+        screen = prescreen_symbols(symbols, database=self.database, target_date=target_date)
+        if screen.dropped:
+            reasons = ", ".join(f"{reason} {count}" for reason, count in sorted(screen.counts().items()))
+            self._write_report(f"Pre-screen: {len(screen.kept)} of {len(symbols)} symbols kept ({reasons})")
+        logging.info("Pre-screen kept %d of %d symbols", len(screen.kept), len(symbols))
+        return screen.kept
 
-        # 3. Finalize Result
-        rs_ratio = 1.0
-        if ctx.benchmark_df is not None:
-            rs_ratio = self.calculate_relative_strength(df, ctx.benchmark_df)
-
-        ret_val = {
-            'symbol': symbol,
-            'name': price_data.get('full_name', symbol),
-            'exchange': ctx.symbol_map.get(symbol, 'Unknown') if ctx.symbol_map else 'Unknown',
-            'date': str(yesterday['date']),
-            'rs_ratio': rs_ratio,
-            'baseline_score': baseline_data['score'] if baseline_data else 0.0,
-            'baseline_components': baseline_data['components'] if baseline_data else {},
-            'baseline_setup': baseline_data['setup'] if baseline_data else {},
-            'baseline_ml_prob': baseline_data['ml_prob'] if baseline_data else 0.0,
-            'mr_score': mr_data['score'] if mr_data else 0.0,
-            'mr_components': mr_data['components'] if mr_data else {},
-            'mr_setup': mr_data['setup'] if mr_data else {},
-            'mr_ml_prob': mr_data['ml_prob'] if mr_data else 0.0
-        }
-        logging.info("Processed %s with results Baseline: %.2f, MR: %.2f", symbol, ret_val['baseline_score'], ret_val['mr_score'])
-        return ret_val
     def _load_benchmark_data(self, target_date: Optional[str]) -> Optional[pd.DataFrame]:
+        if self.panel is not None and "SPY" in self.panel:
+            return self.panel.frame("SPY", target_date)
         benchmark_data = load_historical_data("SPY", database=self.database, score_manager_instance=self.score_manager)
         if benchmark_data and benchmark_data.get('days'):
             df = pd.DataFrame(benchmark_data['days'])
@@ -630,39 +501,24 @@ class SwingTrader:
 
     def _execute_prediction_batch(self, symbols: List[str], ctx: StrategyContext, progress_callback=None) -> List[Dict]:
         """Execute parallel prediction for a batch of symbols."""
-        max_workers = min(8, os.cpu_count() or 4)
-
         self._write_report(f"Yesterday was {'not ' if not self.config.holiday_mode else ''}a holiday.")
         if ctx.target_date:
             self._write_report(f"Predicting for historical date: {ctx.target_date}")
-        logging.info("Processing %d symbols with %d workers...", len(symbols), max_workers)
 
         results = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Partial binding for the common arguments
-            process_func = partial(
-                self.process_symbol,
-                ctx=ctx
-            )
+        total = len(symbols)
+        for i, (sym, res, error) in enumerate(self.iter_predictions(symbols, ctx), 1):
+            if error is not None:
+                logging.error("%s generated an exception: %s", sym, error)
+            else:
+                results.append(res)
 
-            # Submit all tasks
-            future_map = {executor.submit(process_func, sym): sym for sym in symbols}
-
-            total = len(symbols)
-            for i, future in enumerate(concurrent.futures.as_completed(future_map), 1):
-                try:
-                    res = future.result()
-                    results.append(res)
-                except Exception as e: # pylint: disable=broad-exception-caught
-                    sym = future_map[future]
-                    logging.error("%s generated an exception: %s", sym, e)
-
-                if i % 50 == 0 or i == total:
-                    pct = (i / total) * 100
-                    logging.info("Progress: %d/%d symbols processed (%.1f%%)", i, total, pct)
-                    print(f"Progress: {i}/{total} symbols processed ({pct:.1f}%)", flush=True)
-                    if progress_callback:
-                        progress_callback(i, total, pct)
+            if i % 50 == 0 or i == total:
+                pct = (i / total) * 100
+                logging.info("Progress: %d/%d symbols processed (%.1f%%)", i, total, pct)
+                print(f"Progress: {i}/{total} symbols processed ({pct:.1f}%)", flush=True)
+                if progress_callback:
+                    progress_callback(i, total, pct)
 
         return [r for r in results if r is not None]
 
@@ -679,6 +535,34 @@ class SwingTrader:
                 f"Score: {res[strategy_key]:.2f} | ML Win%: {res[prob_key]*100:.1f}% - Name: {res['name']}"
             )
 
+    def _report_stage_metrics(self, recorder: profiling.StageRecorder, target_date: Optional[str],
+                              seconds: float, n_symbols: int) -> None:
+        """Writes the stage timings to the report and run_metrics, and dumps the slowest profiles."""
+        self._write_report(f"\n--- Stage Timings ({seconds:.1f}s, {n_symbols} symbols) ---")
+        self._write_report(recorder.format_table())
+        slowest = recorder.slowest(profiling.SLOWEST_LISTED)
+        if slowest:
+            self._write_report("Slowest symbols: " + ", ".join(f"{s} {t * 1000:.0f}ms" for s, t in slowest))
+
+        profiles = []
+        if self.config.profile_slowest > 0:
+            directory = os.path.join(self.config.logs_path, 'profiles', target_date or 'latest')
+            try:
+                profiles = recorder.dump_profiles(directory)
+            except OSError as e:
+                logging.warning("Failed to write symbol profiles to %s: %s", directory, e)
+            if profiles:
+                logging.info("Wrote %d symbol profiles to %s", len(profiles), directory)
+
+        profiling.save_run_metrics(
+            self.database, "swing_predict", recorder,
+            target_date=target_date,
+            seconds=seconds,
+            symbols=n_symbols,
+            executor=self.config.prediction_executor,
+            profiles=profiles
+        )
+
     def _prepare_scores_for_save(self, valid_results) -> List[Dict]:
         score_data = []
         for r in valid_results:
@@ -720,102 +604,21 @@ class SwingTrader:
                 })
         return score_data
 
-    def _get_previous_trading_date(self, current_date: str) -> Optional[str]:
-        """Finds the trading date immediately preceding the current_date."""
-        # Use SPY as proxy for market days
-        data = self.database.historical_prices.find_one(
-            {"symbol": "SPY"},
-            {"days.date": 1}
-        )
-        if not data or 'days' not in data:
-            return None
-            
-        dates = sorted([d['date'] for d in data['days']])
-        
-        prev_date = None
-        for d in dates:
-            if d < current_date:
-                prev_date = d
-            else:
-                break
-        return prev_date
-
     def get_previous_performance(self, target_date: str) -> Dict[str, Any]:
         """
         Evaluates the performance of the PREVIOUS day's top candidates on the target_date.
         """
-        prev_date = self._get_previous_trading_date(target_date)
-        if not prev_date:
+        return performance.previous_performance(self.database, target_date)
+
+    def get_rolling_performance(self, target_date: str, sessions: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Win rate and PnL by strategy and score bucket of the top candidates of the last
+        sessions (default: config.performance_sessions) pick dates up to target_date.
+        """
+        sessions = sessions if sessions is not None else self.config.performance_sessions
+        if sessions <= 0:
             return {}
-            
-        # Get Scores for Prev Date
-        baseline_scores = self.score_manager.get_scores(prev_date, strategy="baseline")
-        mr_scores = self.score_manager.get_scores(prev_date, strategy="mean_reversion")
-        
-        # Filter Top 5 of each
-        top_baseline = sorted(baseline_scores, key=lambda x: x['score'], reverse=True)[:5]
-        top_mr = sorted(mr_scores, key=lambda x: x['score'], reverse=True)[:5]
-        
-        combined_candidates = top_baseline + top_mr
-        results = []
-        
-        for cand in combined_candidates:
-            symbol = cand['symbol']
-            setup = cand.get('metadata', {})
-            
-            entry = setup.get('entry_price')
-            stop = setup.get('stop_loss')
-            target = setup.get('take_profit')
-            
-            if not entry:
-                continue
-                
-            # Get Price Data for Target Date (Today)
-            price_doc = self.database.historical_prices.find_one(
-                {"symbol": symbol},
-                {"days": {"$elemMatch": {"date": target_date}}}
-            )
-            
-            if not price_doc or 'days' not in price_doc or not price_doc['days']:
-                # Maybe data missing for this symbol?
-                continue
-                
-            day_data = price_doc['days'][0]
-            
-            # Logic
-            triggered = day_data['low'] <= entry
-            
-            outcome = "Pending"
-            pnl_pct = 0.0
-            
-            if triggered:
-                # Check Stop/Target
-                if day_data['low'] <= stop:
-                    outcome = "Stopped Out"
-                    pnl_pct = (stop - entry) / entry
-                elif day_data['high'] >= target:
-                    outcome = "Target Hit"
-                    pnl_pct = (target - entry) / entry
-                else:
-                    outcome = "Active"
-                    pnl_pct = (day_data['close'] - entry) / entry
-            else:
-                outcome = "No Entry"
-                
-            results.append({
-                "symbol": symbol,
-                "strategy": cand.get('strategy', 'Unknown'),
-                "entry": entry,
-                "stop": stop,
-                "target": target,
-                "outcome": outcome,
-                "pnl": pnl_pct,
-                "close": day_data['close'],
-                "high": day_data['high'],
-                "low": day_data['low']
-            })
-            
-        return {"date": prev_date, "results": results}
+        return performance.rolling_performance(self.database, target_date, sessions=sessions)
 
     def swing_predict(
         self,
@@ -823,45 +626,66 @@ class SwingTrader:
         enabled_indicators: Optional[list[str]] = None,
         aggregation: str = "sum",
         symbols: Optional[list[str]] = None,
-        progress_callback=None
+        progress_callback=None,
+        screened: bool = False
     ) -> Dict[str, Any]:
-        """Main prediction function with parallel processing capability."""
-
-        # 1. Market Context Filter
-        market_health = MarketRegime.get_market_health(target_date=target_date, database=self.database)
-        self._write_report(f"Market Status: {market_health['status']} ({market_health['multiplier']}x risk)")
-
-        # 2. Setup Data
-        benchmark_df = self._load_benchmark_data(target_date)
-        if symbols is None:
-            symbols = get_symbol_name_list(database=self.database)
-
-        # Build symbol metadata map
-        all_symbols = get_symbols_from_mongo(database=self.database)
-        symbol_map = {s['symbol']: s.get('exchange', 'Unknown') for s in all_symbols}
-
-        ctx = StrategyContext(
-            target_date=target_date,
-            enabled_indicators=enabled_indicators,
-            aggregation=aggregation,
-            benchmark_df=benchmark_df,
-            market_health=market_health,
-            symbol_map=symbol_map
-        )
-
-        # 3. Execute
-        valid_results = self._execute_prediction_batch(symbols, ctx, progress_callback=progress_callback)
+        """
+        Main prediction function with parallel processing capability.
 
-        # 4. Report & Collect Data
-        # We print to console/txt via ReportSingleton inside these helpers
-        self._report_top_candidates(valid_results, 'baseline_score', 'baseline_setup', 'Baseline (Trend)')
-        self._report_top_candidates(valid_results, 'mr_score', 'mr_setup', 'Mean Reversion (Dip)')
+        Pass screened=True when symbols already come from screen_symbols, so they
+        are not pre-screened a second time.
+        """
+        recorder = profiling.StageRecorder(self.config.profile_slowest) if self.config.stage_metrics else None
+        start = time.perf_counter()
+
+        with profiling.recording(recorder):
+            # 1. Market Context Filter
+            with profiling.span('regime'):
+                market_health = MarketRegime.get_market_health(
+                    target_date=target_date, database=self.database, panel=self.panel
+                )
+            self._write_report(f"Market Status: {market_health['status']} ({market_health['multiplier']}x risk)")
+
+            # 2. Setup Data
+            with profiling.span('setup_data'):
+                benchmark_df = self._load_benchmark_data(target_date)
+
+                # Build symbol metadata map
+                all_symbols = get_symbols_from_mongo(database=self.database)
+                symbol_map = {s['symbol']: s.get('exchange', 'Unknown') for s in all_symbols}
+
+            if not screened:
+                symbols = self.screen_symbols(symbols, target_date)
+
+            ctx = StrategyContext(
+                target_date=target_date,
+                enabled_indicators=enabled_indicators,
+                aggregation=aggregation,
+                benchmark_df=benchmark_df,
+                market_health=market_health,
+                symbol_map=symbol_map
+            )
 
-        # 5. Save
-        if valid_results:
-            score_data = self._prepare_scores_for_save(valid_results)
-            self.score_manager.save_scores(score_data)
-            logging.info("Saved %d scores (Baseline & Mean Reversion) to trade_scores", len(score_data))
+            # 3. Execute
+            with profiling.span('precompute'):
+                self.precompute_scores(symbols, ctx)
+            with profiling.span('execute'):
+                valid_results = self._execute_prediction_batch(symbols, ctx, progress_callback=progress_callback)
+
+            # 4. Report & Collect Data
+            # We print to console/txt via ReportSingleton inside these helpers
+            self._report_top_candidates(valid_results, 'baseline_score', 'baseline_setup', 'Baseline (Trend)')
+            self._report_top_candidates(valid_results, 'mr_score', 'mr_setup', 'Mean Reversion (Dip)')
+
+            # 5. Save
+            if valid_results:
+                with profiling.span('save'):
+                    score_data = self._prepare_scores_for_save(valid_results)
+                    self.score_manager.save_scores(score_data)
+                logging.info("Saved %d scores (Baseline & Mean Reversion) to trade_scores", len(score_data))
+
+        if recorder is not None:
+            self._report_stage_metrics(recorder, target_date, time.perf_counter() - start, len(symbols))
 
         # 6. Prepare Return Data for HTML Reporter
         candidates = []
@@ -3,14 +3,16 @@ Module for performing technical analysis and scoring.
 """
 
 from functools import lru_cache
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 
 import numpy as np
 import pandas as pd
 
-from bluehorseshoe.core.config import weights_config
+from bluehorseshoe.core import profiling
+from bluehorseshoe.core.config import WeightSet, weights_config
 from bluehorseshoe.analysis.constants import (
     TREND_PERIOD, STRONG_R2_THRESHOLD, MIN_VOLUME_THRESHOLD,
+    FLAT_WINDOW, DEAD_RANGE_RATIO, PINNED_STD_RATIO,
     OVERSOLD_RSI_THRESHOLD_EXTREME, OVERSOLD_RSI_REWARD_EXTREME,
     OVERSOLD_RSI_THRESHOLD_MODERATE, OVERSOLD_RSI_REWARD_MODERATE,
     OVERSOLD_BB_REWARD, OVERSOLD_BB_POSITION_THRESHOLD,
@@ -23,6 +25,7 @@ from bluehorseshoe.analysis.constants import (
     PENALTY_VOLUME_EXHAUSTION
 )
 from bluehorseshoe.analysis.indicators.candlestick_indicators import CandlestickIndicator
+from bluehorseshoe.analysis.indicators.indicator import ema_warmup
 from bluehorseshoe.analysis.indicators.limit_indicators import LimitIndicator
 from bluehorseshoe.analysis.indicators.momentum_indicators import MomentumIndicator
 from bluehorseshoe.analysis.indicators.moving_average_indicators import MovingAverageIndicator
@@ -30,6 +33,24 @@ from bluehorseshoe.analysis.indicators.price_action_indicators import PriceActio
 from bluehorseshoe.analysis.indicators.trend_indicators import TrendIndicator
 from bluehorseshoe.analysis.indicators.volume_indicators import VolumeIndicator
 
+# Indicator groups of the baseline score, in scoring order
+INDICATOR_CLASSES = {
+    "trend": TrendIndicator,
+    "volume": VolumeIndicator,
+    "limit": LimitIndicator,
+    "candlestick": CandlestickIndicator,
+    "moving_average": MovingAverageIndicator,
+    "momentum": MomentumIndicator,
+    "price_action": PriceActionIndicator
+}
+
+# Bars the baseline modifiers read: the trend regression and the adjusted EMA9
+MODIFIER_WARMUP_BARS = max(TREND_PERIOD, 9 + ema_warmup(2 / 10))
+
+# Lookback cuts start on this grid of bars, so consecutive dates share a first bar and
+# the recursive trend kernels can advance the previous date's cached state
+LOOKBACK_ALIGNMENT = 64
+
 class TechnicalAnalyzer:
     """Handles technical analysis calculations with optimized methods."""
     # pylint: disable=too-few-public-methods
@@ -59,10 +80,10 @@ class TechnicalAnalyzer:
         Detects if a stock is 'dead', halted, or pinned (e.g., pending acquisition).
         Criteria: Extremely low volatility over the last 5 days.
         """
-        if len(days) < 5:
+        if len(days) < FLAT_WINDOW:
             return False
 
-        recent = days.tail(5)
+        recent = days.tail(FLAT_WINDOW)
         avg_close = recent['close'].mean()
 
         # 1. Check ATR (normalized)
@@ -71,12 +92,12 @@ class TechnicalAnalyzer:
         # We need previous close for the full TR, but simple H-L is usually enough to catch dead stocks
         avg_tr = high_low.mean()
 
-        if avg_tr / avg_close < 0.005: # Less than 0.5% average daily range
+        if avg_tr / avg_close < DEAD_RANGE_RATIO: # Less than 0.5% average daily range
             return True
 
         # 2. Check Standard Deviation of Close
         std_dev = recent['close'].std()
-        if std_dev / avg_close < 0.002: # Extremely pinned price
+        if std_dev / avg_close < PINNED_STD_RATIO: # Extremely pinned price
             return True
 
         return False
@@ -107,24 +128,50 @@ class TechnicalAnalyzer:
         days: pd.DataFrame,
         strategy: str = "baseline",
         enabled_indicators: Optional[list[str]] = None,
-        aggregation: str = "sum"
+        aggregation: str = "sum",
+        weights: Optional[WeightSet] = None
     ) -> Dict[str, float]:
         """
         Calculate a technical score based on the specified strategy.
         Returns a dictionary of component scores for granular analysis.
+        Indicator multipliers come from `weights`, or from weights_config if None.
         """
         if strategy == "mean_reversion":
             return TechnicalAnalyzer.calculate_mean_reversion_score(
                 days,
                 enabled_indicators=enabled_indicators,
-                aggregation=aggregation
+                aggregation=aggregation,
+                weights=weights
             )
         return TechnicalAnalyzer.calculate_baseline_score(
             days,
             enabled_indicators=enabled_indicators,
-            aggregation=aggregation
+            aggregation=aggregation,
+            weights=weights
         )
 
+    @staticmethod
+    def required_lookback(groups: Optional[Iterable[str]] = None, modifiers: bool = True) -> int:
+        """
+        Bars of history a baseline score needs: the longest warm-up of the scored
+        indicator groups (all of them if None) and of the modifiers.
+        """
+        warmups = [INDICATOR_CLASSES[g].warmup_bars for g in (INDICATOR_CLASSES if groups is None else groups)]
+        if modifiers:
+            warmups.append(MODIFIER_WARMUP_BARS)
+        return max(warmups, default=1)
+
+    @staticmethod
+    def _lookback_tail(days: pd.DataFrame, lookback: int) -> pd.DataFrame:
+        """
+        At least the last `lookback` bars (fewer than lookback + LOOKBACK_ALIGNMENT).
+        Indicators copy what they are given, so long histories are cut first.
+        """
+        excess = len(days) - lookback
+        if excess <= 0:
+            return days
+        return days.iloc[excess - excess % LOOKBACK_ALIGNMENT:]
+
     @staticmethod
     def _calculate_baseline_modifiers(days: pd.DataFrame) -> tuple[float, Dict[str, float]]:
         """Calculates penalties and bonuses for the baseline strategy."""
@@ -234,37 +281,29 @@ class TechnicalAnalyzer:
     def _score_indicators(
         days: pd.DataFrame,
         indicator_filters: Dict[str, Optional[list[str]]],
-        aggregation: str
+        aggregation: str,
+        weights: Optional[WeightSet] = None
     ) -> tuple[float, Dict[str, float], int]:
         """Calculates combined score from all active indicator classes."""
-        all_indicators_classes = {
-            "trend": TrendIndicator,
-            "volume": VolumeIndicator,
-            "limit": LimitIndicator,
-            "candlestick": CandlestickIndicator,
-            "moving_average": MovingAverageIndicator,
-            "momentum": MomentumIndicator,
-            "price_action": PriceActionIndicator
-        }
-
         components = {}
         total_score = 1.0 if aggregation == "product" else 0.0
         active_count = 0
 
-        for name, cls in all_indicators_classes.items():
+        for name, cls in INDICATOR_CLASSES.items():
             if indicator_filters and name not in indicator_filters:
                 continue
 
-            indicator_inst = cls(days)
-            sub_filters = indicator_filters.get(name)
+            with profiling.span(f"indicator.{name}"):
+                indicator_inst = cls(days, weights=weights)
+                sub_filters = indicator_filters.get(name)
 
-            try:
-                score = indicator_inst.get_score(
-                    enabled_sub_indicators=sub_filters,
-                    aggregation=aggregation
-                ).buy
-            except TypeError:
-                score = indicator_inst.get_score().buy
+                try:
+                    score = indicator_inst.get_score(
+                        enabled_sub_indicators=sub_filters,
+                        aggregation=aggregation
+                    ).buy
+                except TypeError:
+                    score = indicator_inst.get_score().buy
 
             components[name] = float(score)
             if aggregation == "product":
@@ -275,15 +314,30 @@ class TechnicalAnalyzer:
 
         return total_score, components, active_count
 
+    @staticmethod
+    def calculate_raw_signals(days: pd.DataFrame, weights: Optional[WeightSet] = None) -> Dict[str, float]:
+        """
+        Unweighted score of every baseline sub-indicator, keyed "group:sub_indicator".
+        Multipliers are not applied, so zero-weighted sub-indicators are included.
+        """
+        days = TechnicalAnalyzer._lookback_tail(days, TechnicalAnalyzer.required_lookback(modifiers=False))
+        signals = {}
+        for group, cls in INDICATOR_CLASSES.items():
+            for name, value in cls(days, weights=weights).get_raw_signals().items():
+                signals[f"{group}:{name}"] = value
+        return signals
+
     @staticmethod
     def calculate_baseline_score(
         days: pd.DataFrame,
         enabled_indicators: Optional[list[str]] = None,
-        aggregation: str = "sum"
+        aggregation: str = "sum",
+        weights: Optional[WeightSet] = None
     ) -> Dict[str, float]:
         """
         Trend-following scoring: Rewards strength, momentum, and breakouts.
         'aggregation' can be 'sum' or 'product'.
+        Only the last `required_lookback` bars of the scored groups are used.
         """
         if len(days) == 0 or days.iloc[-1].get('avg_volume_20', 0) < MIN_VOLUME_THRESHOLD:
             return {"total": 0.0}
@@ -303,8 +357,12 @@ class TechnicalAnalyzer:
                 else:
                     indicator_filters[item] = None
 
+        days = TechnicalAnalyzer._lookback_tail(days, TechnicalAnalyzer.required_lookback(
+            [g for g in INDICATOR_CLASSES if not indicator_filters or g in indicator_filters],
+            modifiers=not enabled_indicators
+        ))
         total_score, components, active_count = TechnicalAnalyzer._score_indicators(
-            days, indicator_filters, aggregation
+            days, indicator_filters, aggregation, weights
         )
 
         if active_count == 0:
@@ -323,7 +381,8 @@ class TechnicalAnalyzer:
     def _get_mean_reversion_components(
         days: pd.DataFrame,
         enabled_indicators: Optional[list[str]],
-        weights: Dict[str, float]
+        weights: Dict[str, float],
+        weight_set: Optional[WeightSet] = None
     ) -> Dict[str, float]:
         """Calculates individual mean reversion scoring components."""
         last_row = days.iloc[-1]
@@ -349,7 +408,7 @@ class TechnicalAnalyzer:
 
         # 4. Candlestick Reversals
         if (not enabled_indicators or "candlestick" in enabled_indicators) and weights.get('CANDLESTICK_MULTIPLIER', 1.0) > 0:
-            cs = CandlestickIndicator(days)
+            cs = CandlestickIndicator(days, weights=weight_set)
             cs_score = 2.0 if cs.get_score().buy > 0 else 0.0
             cs_score *= weights.get('CANDLESTICK_MULTIPLIER', 1.0)
             if cs_score > 0 or enabled_indicators:
@@ -365,7 +424,8 @@ class TechnicalAnalyzer:
     def calculate_mean_reversion_score(
         days: pd.DataFrame,
         enabled_indicators: Optional[list[str]] = None,
-        aggregation: str = "sum"
+        aggregation: str = "sum",
+        weights: Optional[WeightSet] = None
     ) -> Dict[str, float]:
         """
         Mean-reversion scoring: Rewards oversold conditions and "buying the dip".
@@ -376,8 +436,12 @@ class TechnicalAnalyzer:
         if TechnicalAnalyzer._is_dead_or_flat(days):
             return {"total": 0.0}
 
-        weights = weights_config.get_weights('mean_reversion')
-        mr_components = TechnicalAnalyzer._get_mean_reversion_components(days, enabled_indicators, weights)
+        # Last-row signals plus the candlestick patterns
+        days = TechnicalAnalyzer._lookback_tail(days, CandlestickIndicator.warmup_bars)
+        mr_weights = (weights if weights is not None else weights_config).get_weights('mean_reversion')
+        mr_components = TechnicalAnalyzer._get_mean_reversion_components(
+            days, enabled_indicators, mr_weights, weight_set=weights
+        )
 
         total_score = 1.0 if aggregation == "product" else 0.0
         if not mr_components:
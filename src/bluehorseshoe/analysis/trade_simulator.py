@@ -0,0 +1,204 @@
+"""
+trade_simulator.py
+
+This module provides NumPy kernels that resolve many trades on the same symbol at
+once. Each trade is a row of (start index, entry, stop, target); the bars it can
+touch are gathered into a (trades x window) matrix and the first stop, target or
+time exit is found with a boolean mask and `argmax`, instead of walking future
+bars with `iterrows()` one trade at a time.
+
+Two sets of rules are implemented:
+- `simulate_bracket_trades`: `GradingEngine` rules. The trade is entered at the
+  entry price on the first bar, target is checked before stop on each bar, and an
+  unresolved trade is closed at the last bar of the holding window.
+- `simulate_limit_trades`: `Backtester` rules. A limit order at the entry price
+  fills when the low reaches it (at the open if the bar gaps below), stops and
+  targets fill at the open when the bar gaps through them, stop is checked before
+  target, and the trade is closed at the close after `hold_days` bars.
+
+Usage example:
+    out = simulate_bracket_trades(highs, lows, closes, start, entry, stop, target, hold_days=10)
+    out.status[0], out.exit_price[0], out.days_held[0]
+"""
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass
+class BracketOutcomes:
+    """Per-trade results of `simulate_bracket_trades`; every field is an array with one entry per trade."""
+    # pylint: disable=too-many-instance-attributes
+    status: np.ndarray      # 'success', 'failure' or 'no_future_data'
+    exit_idx: np.ndarray    # Bar index of the exit, -1 without future data
+    exit_price: np.ndarray
+    days_held: np.ndarray
+    max_gain: np.ndarray    # Best high up to the exit, in % of entry
+    max_high: np.ndarray    # Highest high of the holding window (at least the entry)
+    min_low: np.ndarray     # Lowest low of the holding window (at most the entry)
+
+
+@dataclass
+class LimitOutcomes:
+    """Per-trade results of `simulate_limit_trades`; every field is an array with one entry per trade."""
+    # pylint: disable=too-many-instance-attributes
+    status: np.ndarray        # 'no_entry', 'limit_expired', 'active', 'stopped_out', 'success',
+                              # 'closed_profit', 'closed_loss' or 'no_future_data'
+    entry_idx: np.ndarray     # Bar index of the fill, -1 if not filled
+    actual_entry: np.ndarray  # Fill price, NaN if not filled
+    exit_idx: np.ndarray      # Bar index of the exit, -1 if not exited
+    exit_price: np.ndarray    # NaN if not exited
+    days_held: np.ndarray     # Bars from fill to exit (or to the last bar while active)
+    mae: np.ndarray           # Lowest low from fill to exit, NaN if not filled
+    mfe: np.ndarray           # Highest high from fill to exit, NaN if not filled
+
+
+def _as_arrays(*values):
+    return [np.asarray(v, dtype=float) for v in values]
+
+
+def _window(n_bars: int, start: np.ndarray, width: int):
+    """Bar indices start..start+width-1 per trade, clipped to the series, and their validity mask."""
+    idx = start[:, None] + np.arange(width)[None, :]
+    valid = idx < n_bars
+    return np.minimum(idx, max(n_bars - 1, 0)), valid
+
+
+def simulate_bracket_trades(highs, lows, closes, start, entry, stop, target, hold_days: int) -> BracketOutcomes:
+    """
+    Resolves trades entered at `entry` on bar `start` and held for at most `hold_days` bars.
+
+    Args:
+        highs, lows, closes: Bar arrays of one symbol in date order.
+        start: Index of each trade's first bar (the first bar after the signal).
+        entry, stop, target: Price levels per trade.
+        hold_days: Length of the holding window in bars.
+    """
+    highs, lows, closes = _as_arrays(highs, lows, closes)
+    entry, stop, target = _as_arrays(entry, stop, target)
+    start = np.asarray(start, dtype=np.int64)
+    n_trades, n_bars = len(start), len(closes)
+
+    if n_bars == 0 or hold_days <= 0:
+        nothing = np.full(n_trades, np.nan)
+        return BracketOutcomes(np.full(n_trades, 'no_future_data', dtype=object), np.full(n_trades, -1),
+                               nothing, np.zeros(n_trades, dtype=np.int64), nothing, nothing.copy(), nothing.copy())
+
+    idx, valid = _window(n_bars, start, hold_days)
+    bar_high = np.where(valid, highs[idx], np.nan)
+    bar_low = np.where(valid, lows[idx], np.nan)
+    n_valid = valid.sum(axis=1)
+    has_data = n_valid > 0
+    rows = np.arange(n_trades)
+
+    # Target is checked before stop on the same bar
+    hit_target = bar_high >= target[:, None]
+    hit_stop = bar_low <= stop[:, None]
+    hit = hit_target | hit_stop
+    resolved = hit.any(axis=1)
+    first = np.where(resolved, hit.argmax(axis=1), np.maximum(n_valid - 1, 0))
+    exit_idx = np.where(has_data, start + first, -1)
+
+    last_close = closes[np.clip(exit_idx, 0, None)]
+    target_first = hit_target[rows, first]
+    exit_price = np.where(resolved, np.where(target_first, target, stop), last_close)
+    status = np.where(resolved, np.where(target_first, 'success', 'failure'),
+                      np.where(last_close > entry, 'success', 'failure')).astype(object)
+    status[~has_data] = 'no_future_data'
+
+    with np.errstate(invalid='ignore'):
+        running_high = np.fmax.accumulate(np.where(valid, bar_high, -np.inf), axis=1)
+    max_gain = (running_high[rows, first] / entry - 1) * 100
+
+    return BracketOutcomes(
+        status=status,
+        exit_idx=exit_idx,
+        exit_price=np.where(has_data, exit_price, np.nan),
+        days_held=np.where(has_data, first + 1, 0),
+        max_gain=np.where(has_data, max_gain, np.nan),
+        max_high=np.fmax(np.nanmax(np.where(valid, bar_high, -np.inf), axis=1, initial=-np.inf), entry),
+        min_low=np.fmin(np.nanmin(np.where(valid, bar_low, np.inf), axis=1, initial=np.inf), entry)
+    )
+
+
+def simulate_limit_trades(opens, highs, lows, closes, start, entry, stop, target, hold_days: int) -> LimitOutcomes:
+    """
+    Resolves limit-entry trades whose order is live from bar `start`.
+
+    The order may fill on any of the first hold_days + 1 bars and expires otherwise.
+    Once filled, the trade exits on the first bar that reaches the stop or the target
+    (the fill bar included), or at the close hold_days bars after the fill.
+
+    Args:
+        opens, highs, lows, closes: Bar arrays of one symbol in date order.
+        start: Index of each trade's first bar (the first bar after the signal).
+        entry, stop, target: Price levels per trade.
+        hold_days: Bars allowed for the fill and for the holding period.
+    """
+    opens, highs, lows, closes = _as_arrays(opens, highs, lows, closes)
+    entry, stop, target = _as_arrays(entry, stop, target)
+    start = np.asarray(start, dtype=np.int64)
+    n_trades, n_bars = len(start), len(closes)
+    rows = np.arange(n_trades)
+
+    status = np.full(n_trades, 'no_entry', dtype=object)
+    entry_idx = np.full(n_trades, -1, dtype=np.int64)
+    actual_entry = np.full(n_trades, np.nan)
+    exit_idx = np.full(n_trades, -1, dtype=np.int64)
+    exit_price = np.full(n_trades, np.nan)
+    days_held = np.zeros(n_trades, dtype=np.int64)
+    mae = np.full(n_trades, np.nan)
+    mfe = np.full(n_trades, np.nan)
+    status[start >= n_bars] = 'no_future_data'
+    if n_bars == 0 or n_trades == 0:
+        return LimitOutcomes(status, entry_idx, actual_entry, exit_idx, exit_price, days_held, mae, mfe)
+
+    # --- Fill: first bar in the order window whose low reaches the limit ---
+    hold_days = max(hold_days, 0)
+    idx, valid = _window(n_bars, start, hold_days + 1)
+    fill = valid & (lows[idx] <= entry[:, None])
+    filled = fill.any(axis=1)
+    fill_idx = start + fill.argmax(axis=1)
+    expired = ~filled & valid[:, -1]
+    status[expired] = 'limit_expired'
+
+    entry_idx[filled] = fill_idx[filled]
+    fill_open = opens[np.minimum(fill_idx, n_bars - 1)]
+    actual_entry[filled] = np.where(fill_open < entry, fill_open, entry)[filled]
+
+    # --- Exit: stop, then target, on each bar from the fill; close after hold_days bars ---
+    time_exit = max(hold_days, 1)
+    idx, valid = _window(n_bars, np.minimum(fill_idx, n_bars - 1), time_exit + 1)
+    valid &= filled[:, None]
+    bar_open, bar_high, bar_low = opens[idx], highs[idx], lows[idx]
+    hit_stop = valid & (bar_low <= stop[:, None])
+    hit_target = valid & (bar_high >= target[:, None])
+    hit_time = valid & (np.arange(time_exit + 1) == time_exit)[None, :]
+    hit = hit_stop | hit_target | hit_time
+    exited = hit.any(axis=1)
+    n_valid = valid.sum(axis=1)
+    last = np.where(exited, hit.argmax(axis=1), np.maximum(n_valid - 1, 0))
+
+    open_at = bar_open[rows, last]
+    close_at = closes[idx[rows, last]]
+    by_stop = exited & hit_stop[rows, last]
+    by_target = exited & ~by_stop & hit_target[rows, last]
+    by_time = exited & ~by_stop & ~by_target
+
+    price = np.where(by_stop, np.where(open_at < stop, open_at, stop),
+                     np.where(by_target, np.where(open_at > target, open_at, target), close_at))
+    exit_price[exited] = price[exited]
+    exit_idx[exited] = idx[rows, last][exited]
+
+    status[filled] = 'active'
+    status[by_stop] = 'stopped_out'
+    status[by_target] = 'success'
+    status[by_time & (close_at > actual_entry)] = 'closed_profit'
+    status[by_time & ~(close_at > actual_entry)] = 'closed_loss'
+    days_held[filled] = last[filled]
+
+    # Excursions from the fill bar through the exit bar (or the last bar while active)
+    through_exit = valid & (np.arange(time_exit + 1)[None, :] <= last[:, None])
+    mae[filled] = np.min(np.where(through_exit, bar_low, np.inf), axis=1)[filled]
+    mfe[filled] = np.max(np.where(through_exit, bar_high, -np.inf), axis=1)[filled]
+
+    return LimitOutcomes(status, entry_idx, actual_entry, exit_idx, exit_price, days_held, mae, mfe)
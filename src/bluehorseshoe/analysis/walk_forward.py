@@ -0,0 +1,248 @@
+"""
+walk_forward.py
+
+This module provides `WalkForwardBacktester`, a range backtest that sweeps time once.
+`Backtester.run_range_backtest` calls `run_backtest` for every step, which reruns
+the whole prediction pipeline for the universe. Here every symbol is read once from
+a `UniversePanel`, its technical scores for all steps come from `score_history`,
+and its trade levels are computed as series over its whole history. Each step then
+only ranks one row of the score matrix, and the trades of a symbol are resolved
+together by `simulate_limit_trades`, which makes daily backtests over multi-year
+ranges practical.
+
+Setups follow `SwingTrader.calculate_baseline_setup` and
+`calculate_mean_reversion_setup`, with the stop and profit multipliers SwingTrader
+falls back to without trained models. The ML overlays, the weekly-uptrend gate and
+the relative strength bonus are not applied.
+
+Usage example:
+    engine = WalkForwardBacktester(database=db)
+    trades = engine.run('2022-01-03', '2024-12-31', interval_days=1)
+    summarize_range_results(trades.dropna(subset=['entry', 'exit_price']).to_dict('records'),
+                            title=WALK_FORWARD_SUMMARY_TITLE)
+"""
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from ta.volatility import AverageTrueRange
+
+from bluehorseshoe.analysis.backtest import BacktestConfig, BacktestOptions
+from bluehorseshoe.analysis.constants import (
+    ATR_WINDOW, MAX_RISK_PERCENT, MAX_STALE_DAYS, MAX_STOCK_PRICE, MIN_HISTORY_BARS,
+    MIN_RR_RATIO_BASELINE, MIN_RR_RATIO_MEAN_REVERSION, MIN_STOCK_PRICE
+)
+from bluehorseshoe.analysis.cross_sectional import CrossSectionalScorer
+from bluehorseshoe.analysis.score_history import score_history
+from bluehorseshoe.analysis.strategy import SwingTrader
+from bluehorseshoe.analysis.trade_simulator import simulate_limit_trades
+from bluehorseshoe.data.universe_panel import UniversePanel, panel_start_date
+
+# Summary header of walk-forward results: without the ML overlays, weekly-uptrend gate
+# and RS bonus they approximate run_range_backtest and are not directly comparable
+WALK_FORWARD_SUMMARY_TITLE = "WALK-FORWARD SUMMARY (approximate: no ML overlays, weekly-uptrend gate or RS bonus)"
+
+# (stop, profit) ATR multipliers SwingTrader uses when no ML model is trained
+FALLBACK_MULTIPLIERS = {
+    "baseline": (2.0, 3.0),
+    "mean_reversion": (2.0, 2.0),
+}
+
+RESULT_COLUMNS = [
+    'date', 'symbol', 'strategy', 'score', 'entry_price', 'stop_loss', 'take_profit',
+    'status', 'entry', 'exit_price', 'exit_date', 'days_held', 'profit_loss'
+]
+
+
+def step_dates(sessions: np.ndarray, start_date: str, end_date: str, interval_days: int) -> List[str]:
+    """
+    Session each step of a range backtest scores: the last session on or before every
+    interval_days-th calendar day from start_date. Steps landing on the same session
+    (weekends with interval_days=1) are counted once.
+    """
+    steps = pd.date_range(start_date, end_date, freq=f'{interval_days}D').values.astype('datetime64[D]')
+    idx = np.searchsorted(np.asarray(sessions, dtype='datetime64[D]'), steps, side='right') - 1
+    return [str(sessions[i]) for i in np.unique(idx[idx >= 0])]
+
+
+def setup_levels(df: pd.DataFrame, positions: np.ndarray, scores: np.ndarray, strategy: str) -> Dict[str, np.ndarray]:
+    """
+    Entry, stop and target of a symbol's setup as of each bar in positions.
+
+    The indicators behind the setups (ATR, EMAs, rolling extremes) only look back,
+    so they are computed once over the whole history and read at each position.
+
+    Returns:
+        dict: 'entry_price', 'stop_loss', 'take_profit' arrays and a 'valid' mask
+        for setups SwingTrader would keep (realistic, enough reward/risk, price range).
+    """
+    stop_mult, profit_mult = FALLBACK_MULTIPLIERS[strategy]
+    close = df['close'].to_numpy(dtype=float)[positions]
+    atr = AverageTrueRange(high=df['high'], low=df['low'], close=df['close'],
+                           window=ATR_WINDOW).average_true_range().to_numpy()[positions]
+    atr = np.where(np.isnan(atr), close * 0.02, atr)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if strategy == "mean_reversion":
+            ema20 = df['close'].ewm(span=20).mean().to_numpy()[positions]
+            resistance_cap = df['high'].rolling(window=20, min_periods=1).max().to_numpy()[positions] * 0.98
+            entry = close
+            stop = entry - stop_mult * atr
+            atr_target = entry + profit_mult * atr
+            partial_reversion = np.where(entry < ema20, entry + (ema20 - entry) * 0.6, atr_target)
+            target = np.minimum(np.minimum(partial_reversion, atr_target), resistance_cap)
+            risk = entry - stop
+            rr_ratio = np.where(risk > 0, (target - entry) / risk, 0.0)
+            risk_pct = np.where(entry > 0, risk / entry, 0.0)
+            valid = (risk_pct <= MAX_RISK_PERCENT) & (rr_ratio >= MIN_RR_RATIO_MEAN_REVERSION)
+        else:
+            swing_stop = df['low'].rolling(window=5).min().to_numpy()[positions] * 0.985
+            resistance_cap = df['high'].rolling(window=20).max().to_numpy()[positions] * 0.98
+
+            # calculate_baseline_setup levels, from the default (score 0) entry
+            default_entry = close - SwingTrader._get_dynamic_atr_discount(0.0) * atr  # pylint: disable=protected-access
+            atr_stop = default_entry - stop_mult * atr
+            stop = np.minimum(swing_stop, atr_stop)
+            target = np.minimum(default_entry + profit_mult * atr, resistance_cap)
+            reward = target - default_entry
+            risk = default_entry - stop
+            rr_ratio = np.where(risk > 0, reward / risk, 0.0)
+            risk_atr = default_entry - atr_stop
+            rr_atr = np.where(risk_atr > 0, reward / risk_atr, 0.0)
+            tighten = (rr_ratio < MIN_RR_RATIO_BASELINE) & (stop == swing_stop) & (rr_atr >= MIN_RR_RATIO_BASELINE)
+            stop = np.where(tighten, atr_stop, stop)
+
+            # _finish_baseline: entry moved by the signal strength, reward/risk recomputed
+            discounts = np.array([SwingTrader._get_dynamic_atr_discount(s) for s in scores])  # pylint: disable=protected-access
+            entry = close - discounts * atr
+            risk = entry - stop
+            rr_ratio = np.where(risk > 0, (target - entry) / risk, 0.0)
+            risk_pct = np.where(entry > 0, risk / entry, 0.0)
+            valid = ((np.abs(close / entry - 1) <= 0.15) & (risk_pct <= MAX_RISK_PERCENT)
+                     & (rr_ratio >= MIN_RR_RATIO_BASELINE))
+
+    valid &= (MIN_STOCK_PRICE < entry) & (entry < MAX_STOCK_PRICE)
+    return {'entry_price': entry, 'stop_loss': stop, 'take_profit': target, 'valid': valid}
+
+
+class WalkForwardBacktester:
+    """
+    Range backtest that loads the universe once and walks the steps over precomputed
+    score and setup matrices.
+
+    Args:
+        config: BacktestConfig (hold_days is used).
+        database: MongoDB database instance. Required unless a panel is given.
+        panel: Optional UniversePanel covering the range and its warm-up history.
+    """
+
+    def __init__(self, config: Optional[BacktestConfig] = None, database=None,
+                 panel: Optional[UniversePanel] = None):
+        if database is None and panel is None:
+            raise ValueError("database parameter is required for WalkForwardBacktester")
+        self.config = config if config is not None else BacktestConfig()
+        self.database = database
+        self.panel = panel
+
+    def _symbol_signals(self, df: pd.DataFrame, steps: List[str], options: BacktestOptions,
+                        scorer: CrossSectionalScorer) -> Optional[Dict[str, np.ndarray]]:
+        """Point-in-time scores and setup levels of one symbol at every step."""
+        bar_dates = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d').to_numpy()
+        positions = np.searchsorted(bar_dates, steps, side='right') - 1
+        # Steps SwingTrader._load_and_validate_data would skip: stale last bar or short history
+        age = (np.asarray(steps, dtype='datetime64[D]')
+               - bar_dates[np.maximum(positions, 0)].astype('datetime64[D]')).astype(int)
+        has_bar = (positions >= 0) & (age <= MAX_STALE_DAYS) & (positions + 1 >= MIN_HISTORY_BARS)
+        if not has_bar.any():
+            return None
+
+        scored = score_history(df, strategies=(options.strategy,), scorer=scorer,
+                               dates=set(bar_dates[positions[has_bar]]))[options.strategy]
+        scores = np.array([scored.get(bar_dates[p], {}).get('total', 0.0) if ok else 0.0
+                           for p, ok in zip(positions, has_bar)])
+        levels = setup_levels(df, np.maximum(positions, 0), scores, options.strategy)
+        levels['valid'] &= has_bar & (scores > 0)
+        levels['score'] = scores
+        levels['position'] = positions
+        return levels
+
+    def run(self, start_date: str, end_date: str, interval_days: int = 7,
+            options: Optional[BacktestOptions] = None) -> pd.DataFrame:
+        """
+        Backtests every step from start_date to end_date, interval_days calendar days apart.
+
+        Returns:
+            DataFrame with one row per traded candidate (see RESULT_COLUMNS), ordered by
+            date and descending score.
+        """
+        if options is None:
+            options = BacktestOptions()
+        panel = self.panel
+        if panel is None:
+            panel = UniversePanel.from_database(
+                self.database, symbols=options.symbols, start_date=panel_start_date(start_date))
+        symbols = [s for s in (options.symbols or panel.symbols) if s in panel]
+        steps = step_dates(panel.dates, start_date, end_date, interval_days)
+        if not steps or not symbols:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        # Scores and setups of every symbol at every step (steps x symbols)
+        scorer = CrossSectionalScorer(options.enabled_indicators, options.aggregation, options.weights)
+        frames, signals = {}, {}
+        for count, symbol in enumerate(symbols, 1):
+            df = panel.frame(symbol)
+            found = self._symbol_signals(df, steps, options, scorer) if df is not None and not df.empty else None
+            if found is not None:
+                frames[symbol], signals[symbol] = df, found
+            if count % 500 == 0 or count == len(symbols):
+                logging.info("Walk-forward signals: %d/%d symbols", count, len(symbols))
+        if not signals:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        names = list(signals)
+        score_matrix = np.column_stack([np.where(signals[s]['valid'], signals[s]['score'], -np.inf) for s in names])
+
+        # Top candidates of each step: highest positive scores with a valid setup
+        picks: Dict[str, List[int]] = {}
+        for i, row in enumerate(score_matrix):
+            order = np.argsort(-row, kind='stable')[:options.top_n]
+            for j in order[np.isfinite(row[order])]:
+                picks.setdefault(names[j], []).append(i)
+
+        rows = []
+        for symbol, step_idx in picks.items():
+            rows.extend(self._simulate(symbol, frames[symbol], signals[symbol], np.array(step_idx), steps, options))
+        results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+        return results.sort_values(['date', 'score'], ascending=[True, False], kind='stable').reset_index(drop=True)
+
+    def _simulate(self, symbol: str, df: pd.DataFrame, levels: Dict[str, np.ndarray], step_idx: np.ndarray,
+                  steps: List[str], options: BacktestOptions) -> List[Dict]:
+        """Resolves all of a symbol's trades with one simulate_limit_trades call."""
+        entry, stop, target = (levels[k][step_idx] for k in ('entry_price', 'stop_loss', 'take_profit'))
+        sim = simulate_limit_trades(
+            df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+            levels['position'][step_idx] + 1, entry, stop, target, self.config.hold_days
+        )
+        dates = df['date'].to_numpy()
+        rows = []
+        for k, i in enumerate(step_idx):
+            filled, exited = sim.entry_idx[k] != -1, sim.exit_idx[k] != -1
+            actual_entry = float(sim.actual_entry[k]) if filled else None
+            exit_price = float(sim.exit_price[k]) if exited else None
+            rows.append({
+                'date': steps[i],
+                'symbol': symbol,
+                'strategy': options.strategy,
+                'score': float(levels['score'][i]),
+                'entry_price': float(entry[k]),
+                'stop_loss': float(stop[k]),
+                'take_profit': float(target[k]),
+                'status': sim.status[k],
+                'entry': actual_entry,
+                'exit_price': exit_price,
+                'exit_date': pd.Timestamp(dates[sim.exit_idx[k]]) if exited else None,
+                'days_held': int(sim.days_held[k]),
+                'profit_loss': round(((exit_price / actual_entry) - 1) * 100, 2) if filled and exited else 0.0
+            })
+        return rows
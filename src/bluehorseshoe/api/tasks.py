@@ -40,7 +40,8 @@ def update_market_data_task(self):
         container.get_mongo_client().server_info()
 
         # Run update for recent data (compact mode)
-        build_all_symbols_history(BackfillConfig(recent=True), database=container.get_database())
+        build_all_symbols_history(BackfillConfig(recent=True, concurrency=container.settings.fetch_concurrency),
+                                  database=container.get_database())
         logger.info("Market data update completed.")
         return "Data Updated"
     except Exception as e:
@@ -133,6 +134,7 @@ def generate_report_task(self, report_data: dict):
             report_writer=None
         )
         prev_perf = trader.get_previous_performance(date)
+        rolling_perf = trader.get_rolling_performance(date)
 
         # Generate full interactive report
         html_content = reporter.generate_report(
@@ -140,7 +142,8 @@ def generate_report_task(self, report_data: dict):
             regime=regime,
             candidates=candidates,
             charts=charts,
-            previous_performance=prev_perf
+            previous_performance=prev_perf,
+            rolling_performance=rolling_perf
         )
 
         # Generate email-friendly report (no JavaScript, no charts)
@@ -148,7 +151,8 @@ def generate_report_task(self, report_data: dict):
             date=date,
             regime=regime,
             candidates=candidates,
-            previous_performance=prev_perf
+            previous_performance=prev_perf,
+            rolling_performance=rolling_perf
         )
 
         # Save both versions
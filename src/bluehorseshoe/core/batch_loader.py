@@ -8,7 +8,7 @@ import os
 import time
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from pymongo.collection import Collection
 from requests.exceptions import RequestException
@@ -18,6 +18,7 @@ from .symbols import (
     fetch_daily_ohlc_from_net,
 )
 from .container import create_app_container
+from .symbol_status import COMPACT, plan_updates, record_fetch
 
 
 # -------------------------------
@@ -49,7 +50,8 @@ def get_checkpoint(database) -> Dict[str, Any]:
     Returns checkpoint doc:
       {
         "_id": CHECKPOINT_ID,
-        "last_symbol": "AAPL",
+        "last_symbol": "AAPL",        # last symbol of the latest batch
+        "classify_cursor": "MSFT",    # last symbol classified, in alphabetical order
         "updated_at": "...",
         "run_count": 12,
         "processed_total": 600
@@ -62,7 +64,8 @@ def get_checkpoint(database) -> Dict[str, Any]:
     return doc
 
 
-def set_checkpoint(database, last_symbol: str, processed_total: int, run_count: int) -> None:
+def set_checkpoint(database, last_symbol: str, processed_total: int, run_count: int,
+                   classify_cursor: Optional[str] = None) -> None:
     """Update the batch loader checkpoint in the database.
 
     Args:
@@ -70,17 +73,17 @@ def set_checkpoint(database, last_symbol: str, processed_total: int, run_count:
         last_symbol: Last processed symbol.
         processed_total: Total symbols processed.
         run_count: Number of runs completed.
+        classify_cursor: Last classified symbol (left unchanged if None).
     """
-    _checkpoint_col(database).update_one(
-        {"_id": CHECKPOINT_ID},
-        {"$set": {
-            "last_symbol": last_symbol,
-            "processed_total": processed_total,
-            "run_count": run_count,
-            "updated_at": datetime.utcnow().isoformat(),
-        }},
-        upsert=True
-    )
+    fields = {
+        "last_symbol": last_symbol,
+        "processed_total": processed_total,
+        "run_count": run_count,
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    if classify_cursor is not None:
+        fields["classify_cursor"] = classify_cursor
+    _checkpoint_col(database).update_one({"_id": CHECKPOINT_ID}, {"$set": fields}, upsert=True)
 
 
 def clear_checkpoint(database) -> None:
@@ -147,10 +150,17 @@ def run_historical_batch(
     Run a single batch of historical loads.
     Safe to call from cron repeatedly.
 
+    The batch is the first `limit` symbols of the symbol_status update plan (most
+    out of date first); each symbol is fetched compact or full as its gap needs.
+    Completed symbols drop out of the next plan, and so do symbols that failed or
+    stayed behind after a fetch since the expected bar was published, so repeated
+    runs end with status "done". No per-symbol checkpoint is written; the checkpoint
+    document only keeps the run counters.
+
     Args:
         database: MongoDB database instance.
         limit: Maximum number of symbols to process.
-        recent_only: If True, fetch compact data.
+        recent_only: If True, fetch compact data for every symbol.
         sleep_seconds: Sleep time between API calls.
         classify: If True, process all symbols; if False, only active symbols.
 
@@ -161,10 +171,13 @@ def run_historical_batch(
     run_count = int(ck.get("run_count", 0)) + 1
     processed_total = int(ck.get("processed_total", 0))
 
-    symbols = _symbols_after(database, last_symbol, limit, active_only=not classify)
+    query = {} if classify else {"active": True}
+    candidates = list(database["symbols"].find(query, {"_id": 0, "symbol": 1, "active": 1}))
+    plan = plan_updates(database, candidates)[:limit]
+    symbols = [fetch.symbol for fetch in plan]
 
     if not symbols:
-        logging.info("No more symbols after %s. Batch complete.", last_symbol)
+        logging.info("All symbols up to date. Batch complete.")
         return {
             "status": "done",
             "last_symbol": last_symbol,
@@ -177,10 +190,12 @@ def run_historical_batch(
     logging.info("Starting batch run #%d. last_symbol=%s limit=%d recent_only=%s",
                  run_count, last_symbol, limit, recent_only)
 
-    for sym in symbols:
+    for fetch in plan:
+        sym = fetch.symbol
         last_symbol = sym
         try:
-            refresh_historical_for_symbol(sym, recent=recent_only, database=database)
+            refresh_historical_for_symbol(sym, recent=recent_only or fetch.mode == COMPACT, database=database)
+            record_fetch(sym, database=database)
             stats["successes"] += 1
             processed_total += 1
             logging.info("Loaded %s (%d/%d this batch)", sym,
@@ -189,13 +204,14 @@ def run_historical_batch(
             stats["failures"] += 1
             processed_total += 1
             stats["failed_symbols"].append(sym)
+            record_fetch(sym, error=str(e), database=database)
             logging.exception("Failed loading %s: %s", sym, e)
 
         # cushion for AV + keep CPU polite
         time.sleep(sleep_seconds)
 
-        # checkpoint after each symbol so restarts are painless
-        set_checkpoint(database, last_symbol, processed_total, run_count)
+    # Run counters only: symbol_status already records each completed symbol
+    set_checkpoint(database, last_symbol, processed_total, run_count)
 
     return {
         "status": "ok",
@@ -218,8 +234,8 @@ def classify_symbols_batch(database, limit=50, sleep_seconds=1.2):
         sleep_seconds: Sleep time between API calls.
     """
     ck = get_checkpoint(database)
-    last_symbol = ck.get("last_symbol")
-    symbols = _symbols_after(database, last_symbol, limit, active_only=False)
+    # Own cursor: last_symbol is the end of a planned batch, not an alphabetical position
+    symbols = _symbols_after(database, ck.get("classify_cursor"), limit, active_only=False)
 
     if not symbols:
         return {"status": "done"}
@@ -232,7 +248,7 @@ def classify_symbols_batch(database, limit=50, sleep_seconds=1.2):
         refresh_historical_for_symbol(sym, True, database=database)
 
         processed_total += 1
-        set_checkpoint(database, sym, processed_total, run_count)
+        set_checkpoint(database, sym, processed_total, run_count, classify_cursor=sym)
         time.sleep(sleep_seconds)
 
     return {"status": "ok", "last_symbol": symbols[-1]}
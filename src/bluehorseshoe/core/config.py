@@ -4,7 +4,8 @@ Configuration management for BlueHorseshoe, handling application settings and in
 import json
 import os
 import logging
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 WEIGHTS_FILE = '/workspaces/BlueHorseshoe/src/weights.json'
@@ -76,10 +77,30 @@ class Settings(BaseSettings):
     # Alpha Vantage API
     alphavantage_key: str = ""
     alphavantage_cps: int = 2
+    fetch_concurrency: int = 4  # Requests in flight for -u/-b history updates (1 = serial)
+
+    # Prediction Execution ("thread" or "process"); 0 workers = os.cpu_count()
+    prediction_executor: str = "thread"
+    prediction_workers: int = 0
+
+    # Prediction profiling: per-stage timings (report and 'run_metrics'), and cProfile
+    # dumps of the N slowest symbols under logs_path/profiles (0 = off). Off by default
+    # so score rebuilds do not write a run_metrics document per date (STAGE_METRICS=true)
+    stage_metrics: bool = False
+    profile_slowest: int = 0
+
+    # Drop stale, illiquid, out-of-range and flat symbols with one query before prediction
+    prescreen: bool = True
+
+    # Sessions in the rolling performance scorecard of the report (0 = off)
+    performance_sessions: int = 30
 
     # Feature Flags
     holiday_mode: bool = False
 
+    # Price Storage ("documents" or "columnar")
+    price_store: str = "documents"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding='utf-8',
@@ -148,3 +169,53 @@ class ConfigManager:
         self.save_weights()
 
 weights_config = ConfigManager()
+
+
+@dataclass(frozen=True)
+class WeightSet:
+    """
+    Immutable snapshot of indicator weights.
+
+    Has the same `get_weights(category)` interface as `ConfigManager`, so scoring code
+    can take a WeightSet where it used to read the `weights_config` singleton. Weight
+    sets are hashable and picklable, which lets one process (or a pool of workers)
+    score with many of them at once without touching weights.json.
+
+    Usage example:
+        base = WeightSet.current()
+        boosted = base.with_overrides({'trend': {'PSAR_MULTIPLIER': 2.0}})
+        boosted.get_weights('trend')['PSAR_MULTIPLIER']  # 2.0
+    """
+    categories: Tuple[Tuple[str, Tuple[Tuple[str, float], ...]], ...] = ()
+
+    @classmethod
+    def from_dict(cls, weights: Mapping[str, Mapping[str, float]]) -> 'WeightSet':
+        """Builds a weight set from the weights.json layout ({category: {key: multiplier}})."""
+        return cls(tuple(sorted(
+            (category, tuple(sorted((key, float(value)) for key, value in values.items())))
+            for category, values in weights.items()
+        )))
+
+    @classmethod
+    def current(cls) -> 'WeightSet':
+        """Snapshot of the weights currently loaded by `weights_config`, over the defaults."""
+        categories = set(DEFAULT_WEIGHTS) | set(weights_config._weights)  # pylint: disable=protected-access
+        return cls.from_dict({category: weights_config.get_weights(category) for category in categories})
+
+    def get_weights(self, category: str) -> Dict[str, float]:
+        """Returns a copy of the weights of one category (the defaults if the set lacks it)."""
+        for name, values in self.categories:
+            if name == category:
+                return dict(values)
+        return dict(DEFAULT_WEIGHTS.get(category, {}))
+
+    def with_overrides(self, overrides: Mapping[str, Mapping[str, float]]) -> 'WeightSet':
+        """Returns a new weight set with some keys of some categories replaced."""
+        weights = self.to_dict()
+        for category, values in overrides.items():
+            weights.setdefault(category, {}).update(values)
+        return WeightSet.from_dict(weights)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Returns the weights in the weights.json layout."""
+        return {category: dict(values) for category, values in self.categories}
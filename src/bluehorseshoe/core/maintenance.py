@@ -9,7 +9,9 @@ from pymongo.errors import PyMongoError
 
 # Import our internal modules
 from bluehorseshoe.analysis.ml_overlay import MLOverlayTrainer
+from bluehorseshoe.data.columnar_store import build_columnar_store
 from . import symbols
+from .trading_calendar import update_trading_calendar
 from .container import create_app_container
 
 # Configure logging
@@ -95,6 +97,8 @@ def update_history_batch(database, limit: int = 0, recent_only: bool = True):
     print(f"Success: {success_count}")
     print(f"Errors:  {error_count}")
 
+    print(f"Trading calendar: {update_trading_calendar(database=database)} sessions.")
+
 def update_overviews_batch(database, limit: int = 0):
     """
     Step 3: Update company overview data for symbols in DB.
@@ -178,6 +182,21 @@ def retrain_ml_models(database, limit: int = 10000):
         logging.error("Failed to retrain ML models: %s", e)
         print(f"❌ Error: {e}")
 
+def build_columnar_prices(database):
+    """
+    Step 6: Convert stored price history into the columnar price store.
+
+    Args:
+        database: MongoDB database instance.
+    """
+    print("\n--- STEP 6: Building Columnar Price Store ---")
+    try:
+        converted = build_columnar_store(database)
+        print(f"✅ Columnar store built for {converted} symbols.")
+    except PyMongoError as e:
+        logging.error("Failed to build columnar store: %s", e)
+        print(f"❌ Error: {e}")
+
 def main():
     """Main entry point for maintenance script."""
     parser = argparse.ArgumentParser(description="BlueHorseshoe Data Maintenance")
@@ -188,6 +207,7 @@ def main():
     parser.add_argument("--news", action="store_true", help="Update news sentiment data")
     parser.add_argument("--retrain", action="store_true", help="Retrain ML models using graded trades")
     parser.add_argument("--full", action="store_true", help="Run symbols, history, overviews, news updates, and retrain models")
+    parser.add_argument("--columnar", action="store_true", help="Convert price history into the columnar price store")
     parser.add_argument("--limit", type=int, default=0, help="Limit update to N symbols (for testing)")
     parser.add_argument("--deep", action="store_true", help="Fetch FULL history instead of compact (recent)")
 
@@ -218,7 +238,10 @@ def main():
             train_limit = args.limit if args.limit > 0 else 10000
             retrain_ml_models(database, limit=train_limit)
 
-        if not (args.symbols or args.history or args.overviews or args.news or args.retrain or args.full):
+        if args.columnar:
+            build_columnar_prices(database)
+
+        if not (args.symbols or args.history or args.overviews or args.news or args.retrain or args.full or args.columnar):
             parser.print_help()
     finally:
         container.close()
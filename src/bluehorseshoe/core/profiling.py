@@ -0,0 +1,239 @@
+"""
+profiling.py
+
+Low-overhead stage timing for the prediction pipeline. Code marks its stages with
+`span("load")`; while a `StageRecorder` is active (see `recording`), every span adds
+its wall time to that stage, and `symbol_span` also totals the time per symbol.
+With no active recorder a span only reads a context variable.
+
+The active recorder is per context, so concurrent runs (swing_predict called from
+several threads or tasks) never record into each other. Worker threads of a run
+join its recorder by running in a copy of its context (`contextvars.copy_context().run`).
+Process workers record into a recorder of their own and return their records with
+`drain()`, which the parent folds in with `merge()`.
+
+With profile_slowest=N, each symbol_span also runs under cProfile and the profiles
+of the N slowest symbols are kept, to be written as .prof files (pstats format,
+readable with `python -m pstats` or snakeviz).
+
+Usage example:
+    recorder = StageRecorder(profile_slowest=5)
+    with recording(recorder):
+        with symbol_span('AAPL'):
+            with span('load'):
+                ...
+    recorder.summary()['load']['p95']
+"""
+import contextvars
+import cProfile
+import heapq
+import logging
+import marshal
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pymongo.errors import PyMongoError
+
+# Recorder spans of the current context report to; None when not recording
+_active: contextvars.ContextVar[Optional['StageRecorder']] = contextvars.ContextVar('stage_recorder', default=None)
+
+SYMBOL_STAGE = 'symbol'
+
+RUN_METRICS_COLLECTION = 'run_metrics'
+
+# Slowest symbols listed in the report and in run_metrics
+SLOWEST_LISTED = 10
+
+
+class StageRecorder:
+    """
+    Span durations per stage, wall time per symbol and the cProfile stats of the
+    slowest symbols.
+
+    Args:
+        profile_slowest: Number of slowest symbols to keep cProfile stats for (0 = off).
+    """
+
+    def __init__(self, profile_slowest: int = 0):
+        self.profile_slowest = profile_slowest
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.symbol_seconds: Dict[str, float] = {}
+        self._profiles: List[Tuple[float, str, dict]] = []  # Min-heap on seconds
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Records one span of a stage."""
+        with self._lock:
+            self.durations[stage].append(seconds)
+
+    def add_symbol(self, symbol: str, seconds: float, stats: Optional[dict] = None) -> None:
+        """Adds wall time to a symbol, keeping its profile if it is among the slowest."""
+        with self._lock:
+            self.symbol_seconds[symbol] = self.symbol_seconds.get(symbol, 0.0) + seconds
+            if stats is not None:
+                self._keep_profile(seconds, symbol, stats)
+
+    def _keep_profile(self, seconds: float, symbol: str, stats: dict) -> None:
+        if len(self._profiles) < self.profile_slowest:
+            heapq.heappush(self._profiles, (seconds, symbol, stats))
+        elif self._profiles and seconds > self._profiles[0][0]:
+            heapq.heapreplace(self._profiles, (seconds, symbol, stats))
+
+    def drain(self) -> Dict:
+        """Returns the records (picklable) and clears them, e.g. at the end of a worker task."""
+        with self._lock:
+            records = {
+                'durations': dict(self.durations),
+                'symbols': self.symbol_seconds,
+                'profiles': self._profiles,
+            }
+            self.durations = defaultdict(list)
+            self.symbol_seconds = {}
+            self._profiles = []
+        return records
+
+    def merge(self, records: Optional[Dict]) -> None:
+        """Adds records returned by another recorder's drain()."""
+        if not records:
+            return
+        with self._lock:
+            for stage, values in records['durations'].items():
+                self.durations[stage].extend(values)
+            for symbol, seconds in records['symbols'].items():
+                self.symbol_seconds[symbol] = self.symbol_seconds.get(symbol, 0.0) + seconds
+            for seconds, symbol, stats in records['profiles']:
+                self._keep_profile(seconds, symbol, stats)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: count, total, mean, p50, p95 and max seconds."""
+        stages = {}
+        for stage, values in sorted(self.durations.items()):
+            arr = np.asarray(values)
+            stages[stage] = {
+                'count': int(len(arr)),
+                'total': float(arr.sum()),
+                'mean': float(arr.mean()),
+                'p50': float(np.percentile(arr, 50)),
+                'p95': float(np.percentile(arr, 95)),
+                'max': float(arr.max()),
+            }
+        return stages
+
+    def slowest(self, n: int = 10) -> List[Tuple[str, float]]:
+        """The n symbols with the most wall time, slowest first."""
+        return heapq.nlargest(n, self.symbol_seconds.items(), key=lambda item: item[1])
+
+    def format_table(self) -> str:
+        """Plain-text table of the stage summary, slowest total first."""
+        lines = [f"{'Stage':<28}{'Count':>8}{'Total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'Max ms':>10}"]
+        for stage, s in sorted(self.summary().items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{stage:<28}{s['count']:>8}{s['total']:>10.2f}{s['p50'] * 1000:>10.2f}"
+                         f"{s['p95'] * 1000:>10.2f}{s['max'] * 1000:>10.2f}")
+        return "\n".join(lines)
+
+    def dump_profiles(self, directory: str) -> List[str]:
+        """Writes the kept profiles as <directory>/<rank>_<symbol>.prof and returns the paths."""
+        if not self._profiles:
+            return []
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for rank, (_, symbol, stats) in enumerate(sorted(self._profiles, key=lambda p: -p[0]), 1):
+            path = os.path.join(directory, f"{rank:02d}_{symbol.replace('/', '_')}.prof")
+            with open(path, 'wb') as f:
+                marshal.dump(stats, f)
+            paths.append(path)
+        return paths
+
+
+def active_recorder() -> Optional[StageRecorder]:
+    """The recorder spans currently report to, if any."""
+    return _active.get()
+
+
+@contextmanager
+def recording(recorder: Optional[StageRecorder]) -> Iterator[Optional[StageRecorder]]:
+    """Makes recorder the active one for the block (None disables recording)."""
+    token = _active.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times the block as one span of stage on the active recorder."""
+    recorder = _active.get()
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def symbol_span(symbol: str) -> Iterator[None]:
+    """Times the block as the per-symbol work of symbol, under cProfile when enabled."""
+    recorder = _active.get()
+    if recorder is None:
+        yield
+        return
+    profiler = None
+    if recorder.profile_slowest > 0:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            profiler = None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stats = None
+        if profiler is not None:
+            profiler.disable()
+            profiler.create_stats()
+            stats = profiler.stats
+        recorder.add(SYMBOL_STAGE, seconds)
+        recorder.add_symbol(symbol, seconds, stats)
+
+
+def save_run_metrics(database, run: str, recorder: StageRecorder, **fields: Any) -> Optional[Dict]:
+    """
+    Inserts a run's stage summary and slowest symbols into 'run_metrics'.
+
+    Args:
+        database: MongoDB database instance. Nothing is saved when None.
+        run: Name of the run, e.g. "swing_predict".
+        recorder: Recorder of the run.
+        **fields: Other fields of the document (target_date, seconds, symbols...).
+
+    Returns:
+        The saved document, or None when it was not saved.
+    """
+    if database is None:
+        return None
+    doc = {
+        'run': run,
+        'created_at': datetime.utcnow(),
+        **fields,
+        'stages': recorder.summary(),
+        'slowest': [{'symbol': s, 'seconds': t} for s, t in recorder.slowest(SLOWEST_LISTED)],
+    }
+    try:
+        database[RUN_METRICS_COLLECTION].insert_one(doc)
+    except PyMongoError as e:
+        logging.warning("Failed to save run metrics: %s", e)
+        return None
+    return doc
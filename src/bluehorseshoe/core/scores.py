@@ -6,6 +6,9 @@ from datetime import datetime
 from pymongo import UpdateOne
 from pymongo.database import Database
 
+# Index serving the top scores of a strategy on a date (performance.top_candidates)
+SCORE_RANK_INDEX = [("date", 1), ("strategy", 1), ("score", -1)]
+
 class ScoreManager:
     """
     Manages the 'trade_scores' collection.
@@ -28,11 +31,13 @@ class ScoreManager:
         self.collection = self._db[self.collection_name]
         # Ensure index for performance and uniqueness
         self.collection.create_index([("symbol", 1), ("date", 1), ("strategy", 1)], unique=True)
+        self.collection.create_index(SCORE_RANK_INDEX)
 
-    def save_scores(self, scores: List[Dict[str, Any]]):
+    def save_scores(self, scores: List[Dict[str, Any]], overwrite: bool = True):
         """
         Bulk upsert scores.
         Each score dict should have: symbol, date, score, strategy, version, and optional metadata.
+        With overwrite=False, scores that already exist are left untouched.
         """
         if not scores:
             return
@@ -45,7 +50,7 @@ class ScoreManager:
                 "strategy": s.get("strategy", "baseline")
             }
             update_query = {
-                "$set": {
+                "$set" if overwrite else "$setOnInsert": {
                     "score": s["score"],
                     "version": s.get("version", "1.0"),
                     "metadata": s.get("metadata", {}),
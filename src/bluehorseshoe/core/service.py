@@ -16,6 +16,7 @@ from .symbols import (
     upsert_overview_to_mongo,
     get_overview_from_mongo
 )
+from .trading_calendar import get_trading_calendar
 
 def run_backtest(symbol: str, start: date, end: date, strategy_name: str = "baseline") -> Dict[str, Any]:
     """
@@ -250,7 +251,7 @@ def load_universe_data(
 
 def get_latest_market_date(database=None) -> Optional[str]:
     """
-    Find the most recent date available in historical_data.
+    Find the most recent session available in historical_data.
 
     Args:
         database: MongoDB database instance. Required.
@@ -261,5 +262,9 @@ def get_latest_market_date(database=None) -> Optional[str]:
     if database is None:
         raise ValueError("database parameter is required for get_latest_market_date")
 
-    latest = database.historical_prices.find_one({}, {'days.date': 1}, sort=[('days.date', -1)])
-    return latest['days'][-1]['date'] if latest else None
+    latest = get_trading_calendar(database).latest()
+    if latest is not None:
+        return latest
+    # No benchmark history to build the calendar from: scan the stored histories
+    doc = database.historical_prices.find_one({}, {'days.date': 1}, sort=[('days.date', -1)])
+    return doc['days'][-1]['date'] if doc else None
@@ -0,0 +1,294 @@
+"""
+symbol_status.py
+
+Per-symbol update status, kept in the 'symbol_status' collection:
+
+    {symbol, last_bar_date, bar_count, adjustment_hash, last_fetch_at, last_error, updated_at}
+
+Every write to historical_prices updates the bar fields (`record_bars` after a
+rewrite, `record_appended_bars` after an append), and update drivers record the
+outcome of each fetch with `record_fetch`. `adjustment_hash` fingerprints the last
+stored bar, so fetched bars can be checked for a split/dividend back-adjustment
+without reading the stored history.
+
+`plan_updates` reads the status of a universe in one query and returns the
+symbols an update has to fetch, most urgent first, each with the Alpha Vantage
+output size its gap needs. Status follows the writes, so an update that crashed
+resumes by planning again; nothing is checkpointed per symbol. A symbol already
+fetched since the expected bar was published (delisted, halted, or failing) is
+not planned again until the next session is expected, so repeated plans run dry.
+
+Usage example:
+    for fetch in plan_updates(database, ['AAPL', 'MSFT']):
+        refresh_historical_for_symbol(fetch.symbol, recent=fetch.mode == COMPACT, database=database)
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from .trading_calendar import BAR_READY_HOUR, get_trading_calendar, session_busdaycalendar
+
+SYMBOL_STATUS_COLLECTION = "symbol_status"
+
+COMPACT = "compact"
+FULL = "full"
+
+# Bars in an Alpha Vantage compact response
+COMPACT_BARS = 100
+# Largest gap (sessions) a compact fetch fills while still overlapping the last stored bar
+COMPACT_MAX_GAP = COMPACT_BARS - 1
+
+
+@dataclass
+class PlannedFetch:
+    """
+    One symbol an update has to fetch.
+
+    Attributes:
+        symbol (str): Stock symbol.
+        mode (str): COMPACT or FULL output size.
+        gap (Optional[int]): Sessions missing after the last stored bar (None if nothing is stored).
+        active (bool): Whether the symbol is listed as active.
+        last_error (Optional[str]): Error of the previous fetch, if it failed.
+    """
+    symbol: str
+    mode: str
+    gap: Optional[int]
+    active: bool = True
+    last_error: Optional[str] = None
+
+
+def adjustment_hash(days: List[Dict[str, Any]]) -> Optional[str]:
+    """Fingerprint of the last bar's date and close (None without bars)."""
+    if not days:
+        return None
+    last = days[-1]
+    return hashlib.md5(f"{last['date']}:{float(last['close']):.4f}".encode()).hexdigest()[:16]
+
+
+def is_adjusted(status: Optional[Dict[str, Any]], days: List[Dict[str, Any]]) -> Optional[bool]:
+    """
+    Whether fetched bars changed the close of the last stored bar.
+
+    Returns:
+        True or False, or None when the status or the fetched bars cannot tell
+        (no status, or no fetched bar on the last stored date).
+    """
+    if not status or not status.get("last_bar_date") or not status.get("adjustment_hash"):
+        return None
+    overlap = [d for d in days if d["date"] == status["last_bar_date"]]
+    if not overlap:
+        return None
+    return adjustment_hash(overlap) != status["adjustment_hash"]
+
+
+def _status_col(database):
+    return database[SYMBOL_STATUS_COLLECTION]
+
+
+def get_symbol_status(symbol: str, database=None) -> Optional[Dict[str, Any]]:
+    """
+    Returns the status document of a symbol, or None.
+
+    Args:
+        symbol: Stock symbol.
+        database: MongoDB database instance. Required.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for get_symbol_status")
+    try:
+        doc = _status_col(database).find_one({"symbol": symbol}, {"_id": 0})
+    except PyMongoError as e:
+        logging.warning("Failed to read status of %s: %s", symbol, e)
+        return None
+    return doc if isinstance(doc, dict) else None
+
+
+def record_bars(symbol: str, days: List[Dict[str, Any]], database=None) -> None:
+    """
+    Sets the bar fields of a symbol after its stored history was (re)written.
+
+    Args:
+        symbol: Stock symbol.
+        days: Stored bars, oldest first.
+        database: MongoDB database instance. Required.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for record_bars")
+    fields = {
+        "symbol": symbol,
+        "last_bar_date": days[-1]["date"] if days else None,
+        "bar_count": len(days),
+        "adjustment_hash": adjustment_hash(days),
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    try:
+        _status_col(database).update_one({"symbol": symbol}, {"$set": fields}, upsert=True)
+    except PyMongoError as e:
+        logging.error("Failed to record status of %s: %s", symbol, e)
+
+
+def record_appended_bars(symbol: str, new_days: List[Dict[str, Any]], database=None) -> None:
+    """
+    Moves the bar fields of a symbol forward after bars were appended to its history.
+
+    Args:
+        symbol: Stock symbol.
+        new_days: Appended bars, oldest first.
+        database: MongoDB database instance. Required.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for record_appended_bars")
+    if not new_days:
+        return
+    update = {
+        "$set": {
+            "last_bar_date": new_days[-1]["date"],
+            "adjustment_hash": adjustment_hash(new_days),
+            "updated_at": datetime.utcnow().isoformat(),
+        },
+        "$inc": {"bar_count": len(new_days)},
+    }
+    try:
+        # No upsert: without a status the count is unknown; backfill_status builds it from the history
+        _status_col(database).update_one({"symbol": symbol, "bar_count": {"$exists": True}}, update)
+    except PyMongoError as e:
+        logging.error("Failed to record status of %s: %s", symbol, e)
+
+
+def record_fetch(symbol: str, error: Optional[str] = None, database=None) -> None:
+    """
+    Records the outcome of a fetch: last_fetch_at, and last_error (None on success).
+
+    Args:
+        symbol: Stock symbol.
+        error: Error message of a failed fetch.
+        database: MongoDB database instance. Required.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for record_fetch")
+    now = datetime.utcnow().isoformat()
+    try:
+        _status_col(database).update_one(
+            {"symbol": symbol},
+            {"$set": {"symbol": symbol, "last_fetch_at": now, "last_error": error, "updated_at": now}},
+            upsert=True
+        )
+    except PyMongoError as e:
+        logging.error("Failed to record fetch of %s: %s", symbol, e)
+
+
+def backfill_status(database, symbols: Optional[Iterable[str]] = None) -> int:
+    """
+    Builds the bar fields of symbols without a status from historical_prices, in one aggregation.
+
+    Args:
+        database: MongoDB database instance.
+        symbols: Symbols to backfill (None = every stored symbol).
+
+    Returns:
+        int: Number of status documents written.
+    """
+    pipeline = []
+    if symbols is not None:
+        pipeline.append({"$match": {"symbol": {"$in": list(symbols)}}})
+    pipeline.append({"$project": {
+        "_id": 0, "symbol": 1, "bar_count": {"$size": "$days"}, "last": {"$arrayElemAt": ["$days", -1]}
+    }})
+    now = datetime.utcnow().isoformat()
+    ops = []
+    for doc in database["historical_prices"].aggregate(pipeline):
+        last = doc.get("last")
+        if not last:
+            continue
+        ops.append(UpdateOne({"symbol": doc["symbol"]}, {"$set": {
+            "symbol": doc["symbol"],
+            "last_bar_date": last["date"],
+            "bar_count": doc["bar_count"],
+            "adjustment_hash": adjustment_hash([last]),
+            "updated_at": now,
+        }}, upsert=True))
+    if ops:
+        _status_col(database).bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def expected_bar_date(now: Optional[pd.Timestamp] = None, database=None) -> str:
+    """
+    Date of the latest daily bar Alpha Vantage should have: the previous session
+    before 6PM New York time, today's after it ('YYYY-MM-DD').
+    """
+    return get_trading_calendar(database).last_closed(now)
+
+
+def _gap(last_bar_date: str, expected: str) -> int:
+    """Sessions after last_bar_date up to and including expected."""
+    start = np.datetime64(last_bar_date[:10], 'D') + 1
+    return int(np.busday_count(start, np.datetime64(expected, 'D') + 1, busdaycal=session_busdaycalendar()))
+
+
+def _fetched_since(last_fetch_at: Optional[str], expected: str) -> bool:
+    """Whether a fetch (UTC ISO time) happened after the expected date's bar was published."""
+    if not last_fetch_at:
+        return False
+    published = pd.Timestamp(expected).tz_localize('US/Eastern') + pd.Timedelta(hours=BAR_READY_HOUR)
+    return pd.Timestamp(last_fetch_at).tz_localize('UTC') >= published
+
+
+def plan_updates(database, symbols: Iterable[Any], expected: Optional[str] = None) -> List[PlannedFetch]:
+    """
+    Returns the symbols whose stored bars end before the expected date, most urgent first.
+
+    Active symbols come before inactive ones, symbols whose last fetch failed after
+    the others, then symbols with stored bars by decreasing gap, then symbols with
+    nothing stored. Gaps up to COMPACT_MAX_GAP sessions use a COMPACT fetch;
+    longer gaps and new symbols use FULL. Symbols fetched after the expected bar
+    was published are left out: that fetch failed or had no newer bar to give.
+
+    Args:
+        database: MongoDB database instance. Required.
+        symbols: Symbol names, or symbol rows with 'symbol' (and optionally 'active').
+        expected: Date the latest bar should have (default: expected_bar_date()).
+
+    Returns:
+        List[PlannedFetch]: Symbols to fetch, in fetch order.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for plan_updates")
+    expected = expected or expected_bar_date(database=database)
+    active = {}
+    for row in symbols:
+        if isinstance(row, dict):
+            active[row["symbol"]] = row.get("active", True) is not False
+        else:
+            active[row] = True
+
+    _status_col(database).create_index("symbol", unique=True)
+    fields = {"_id": 0, "symbol": 1, "last_bar_date": 1, "last_error": 1, "last_fetch_at": 1}
+    statuses = {d["symbol"]: d for d in _status_col(database).find({"symbol": {"$in": list(active)}}, fields)}
+    missing = [s for s in active if not (statuses.get(s) or {}).get("last_bar_date")]
+    if missing and backfill_status(database, missing):
+        # First plan after an upgrade: statuses built from the stored histories
+        statuses.update({d["symbol"]: d for d in _status_col(database).find({"symbol": {"$in": missing}}, fields)})
+
+    plan = []
+    for symbol, is_active in active.items():
+        status = statuses.get(symbol) or {}
+        last = status.get("last_bar_date")
+        if (last and last[:10] >= expected) or _fetched_since(status.get("last_fetch_at"), expected):
+            continue
+        gap = _gap(last, expected) if last else None
+        mode = COMPACT if gap is not None and gap <= COMPACT_MAX_GAP else FULL
+        plan.append(PlannedFetch(symbol, mode, gap, is_active, status.get("last_error")))
+
+    plan.sort(key=lambda p: (not p.active, p.last_error is not None, p.gap is None, -(p.gap or 0)))
+    return plan
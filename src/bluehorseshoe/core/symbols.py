@@ -23,6 +23,8 @@ from ratelimit import limits, sleep_and_retry
 from pymongo import UpdateOne
 from pymongo.results import BulkWriteResult
 
+from .symbol_status import get_symbol_status, is_adjusted, record_appended_bars, record_bars
+
 # Database instances are now passed as parameters instead of using global singletons
 
 # ---------------------------------------------------------------------
@@ -292,16 +294,95 @@ def fetch_daily_ohlc_from_net(symbol: str, recent: bool = False) -> Dict[str, An
     return {"symbol": sym, "days": days}
 
 
-def upsert_historical_to_mongo(symbol: str, days: List[Dict[str, Any]], database=None) -> None:
+def has_price_adjustment(stored_days: List[Dict[str, Any]], new_days: List[Dict[str, Any]],
+                         tolerance: float = 1e-4) -> bool:
+    """
+    Return True if any new bar overlapping the stored (sorted) days has a different close.
+    Alpha Vantage back-adjusts history after a split or dividend, so a changed
+    past close means the stored series must be rewritten rather than appended to.
+    """
+    new_close = {d["date"]: d["close"] for d in new_days}
+    if not new_close:
+        return False
+
+    first_new = min(new_close)
+    for day in reversed(stored_days):
+        if day["date"] < first_new:
+            break
+        if day["date"] in new_close and abs(new_close[day["date"]] - day["close"]) > tolerance:
+            return True
+    return False
+
+
+def append_historical_days_to_mongo(
+    symbol: str,
+    new_days: List[Dict[str, Any]],
+    database=None,
+    set_fields: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Append bars to historical_prices and historical_prices_recent with $push/$each,
+    trimming the recent collection with $slice instead of rewriting either document.
+
+    The filter skips documents that already hold the first new date, so a retried
+    append is a no-op instead of a duplicate.
+
+    Args:
+        symbol: Stock symbol.
+        new_days: Bars newer than the last stored bar, oldest first.
+        database: MongoDB database instance. Required.
+        set_fields: Extra top-level fields to $set alongside the push (e.g. indicator_state).
+    """
+    if database is None:
+        raise ValueError("database parameter is required for append_historical_days_to_mongo")
+    if not new_days:
+        return
+
+    now = datetime.utcnow().isoformat()
+    guard = {"symbol": symbol, "days.date": {"$ne": new_days[0]["date"]}}
+    fields = {"last_updated": now, **(set_fields or {})}
+
+    appended = database["historical_prices"].update_one(
+        guard, {"$push": {"days": {"$each": new_days}}, "$set": fields})
+
+    recent_fields = {k: v for k, v in fields.items() if k != "indicator_state"}
+    result = database["historical_prices_recent"].update_one(
+        guard,
+        {"$push": {"days": {"$each": new_days, "$slice": -RECENT_TRADING_DAYS}}, "$set": recent_fields})
+    if result.matched_count == 0 and database["historical_prices_recent"].count_documents({"symbol": symbol}, limit=1) == 0:
+        # No recent document yet: seed it from the tail of the full history
+        full_doc = database["historical_prices"].find_one(
+            {"symbol": symbol}, {"days": {"$slice": -RECENT_TRADING_DAYS}})
+        recent_days = full_doc.get("days", []) if full_doc else new_days[-RECENT_TRADING_DAYS:]
+        database["historical_prices_recent"].update_one(
+            {"symbol": symbol}, {"$set": {"symbol": symbol, "days": recent_days, **recent_fields}}, upsert=True)
+
+    if appended.matched_count:
+        record_appended_bars(symbol, new_days, database=database)
+
+
+def upsert_historical_to_mongo(symbol: str, days: List[Dict[str, Any]], database=None,
+                               full_history: bool = False) -> bool:
     """
     Store full historical days in historical_prices,
     plus a recent slice in historical_prices_recent.
-    Merges with existing data to prevent truncation.
+
+    Bars newer than the stored history are appended with $push. The full documents
+    are only rewritten for a new symbol, or when the fetched bars show that a
+    split/dividend adjustment changed past prices. An adjustment restates every
+    past bar, so a window that starts after the stored history (a compact fetch)
+    is not stored at all: the caller has to fetch the full history instead.
 
     Args:
         symbol: Stock symbol.
         days: List of OHLCV day dictionaries.
         database: MongoDB database instance. Required.
+        full_history: True if days is the symbol's complete history, which replaces
+            the stored history on an adjustment wherever it starts.
+
+    Returns:
+        bool: True if a price adjustment was found in a partial window and nothing
+        was stored; False otherwise.
     """
     sym = symbol.upper().strip()
     if not sym:
@@ -314,34 +395,55 @@ def upsert_historical_to_mongo(symbol: str, days: List[Dict[str, Any]], database
     _prices_recent = database["historical_prices_recent"]
 
     now = datetime.utcnow().isoformat()
-
-    # Load existing days to merge
-    existing_doc = _prices.find_one({"symbol": sym}, {"days": 1})
-    if existing_doc and "days" in existing_doc:
-        import pandas as pd
-        df_existing = pd.DataFrame(existing_doc["days"])
-        df_new = pd.DataFrame(days)
-        # Combine and drop duplicates based on date
-        df_merged = pd.concat([df_existing, df_new]).drop_duplicates(subset=['date'])
-        df_merged = df_merged.sort_values(by='date').reset_index(drop=True)
-        merged_days = df_merged.to_dict(orient='records')
-    else:
-        merged_days = days
+    days = sorted(days, key=lambda x: x["date"])
+
+    # The status fingerprint of the last stored bar settles most updates without reading the history
+    status = get_symbol_status(sym, database=database)
+    adjusted = is_adjusted(status, days)
+    if adjusted is False:
+        last_date = status["last_bar_date"]
+        append_historical_days_to_mongo(sym, [d for d in days if d["date"] > last_date], database=database)
+        return False
+
+    if adjusted is None:
+        # Only the stored tail that the fetched window can overlap is needed to decide
+        existing_tail = _prices.find_one({"symbol": sym}, {"days": {"$slice": -max(len(days), 1)}})
+        stored_days = existing_tail.get("days") if existing_tail else None
+        if stored_days and not has_price_adjustment(stored_days, days):
+            last_date = stored_days[-1]["date"]
+            append_historical_days_to_mongo(
+                sym, [d for d in days if d["date"] > last_date], database=database)
+            return False
+        adjusted = bool(stored_days)
+
+    if adjusted and not full_history:
+        first_bar = _prices.find_one({"symbol": sym}, {"days": {"$slice": 1}})
+        if first_bar and first_bar.get("days") and days and days[0]["date"] > first_bar["days"][0]["date"]:
+            logging.info("Price adjustment detected for %s in a partial window; full history needed.", sym)
+            return True
+
+    if adjusted:
+        logging.info("Price adjustment detected for %s; rewriting stored history.", sym)
 
     # Update Full History
-    full_doc = {"symbol": sym, "days": merged_days, "last_updated": now}
+    full_doc = {"symbol": sym, "days": days, "last_updated": now}
     _prices.update_one({"symbol": sym}, {"$set": full_doc}, upsert=True)
 
     # Update Recent History (Used for scanning)
-    recent_days = merged_days[-RECENT_TRADING_DAYS:] if merged_days else []
+    recent_days = days[-RECENT_TRADING_DAYS:] if days else []
     recent_doc = {"symbol": sym, "days": recent_days, "last_updated": now}
     _prices_recent.update_one({"symbol": sym}, {"$set": recent_doc}, upsert=True)
+    record_bars(sym, days, database=database)
+    return False
 
 
 def refresh_historical_for_symbol(symbol: str, recent: bool = False, database=None) -> Dict[str, Any]:
     """
     Fetch OHLC from net and upsert to Mongo.
 
+    A compact fetch that reveals a price adjustment is followed by a full fetch,
+    which replaces the stored history.
+
     Args:
         symbol: Stock symbol.
         recent: If True, fetch compact data; if False, fetch full history.
@@ -355,7 +457,12 @@ def refresh_historical_for_symbol(symbol: str, recent: bool = False, database=No
     if not days:
         raise RuntimeError(f"No historical days returned for {symbol}")
 
-    upsert_historical_to_mongo(data["symbol"], days, database=database)
+    if upsert_historical_to_mongo(data["symbol"], days, database=database, full_history=not recent):
+        data = fetch_daily_ohlc_from_net(symbol, recent=False)
+        days = data.get("days", [])
+        if not days:
+            raise RuntimeError(f"No historical days returned for {symbol}")
+        upsert_historical_to_mongo(data["symbol"], days, database=database, full_history=True)
 
     return {
         "symbol": data["symbol"],
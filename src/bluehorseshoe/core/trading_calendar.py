@@ -0,0 +1,212 @@
+"""
+trading_calendar.py
+
+NYSE session dates for the whole application. Past sessions are the dates of the
+benchmark's (SPY) stored bars, kept as one sorted list in the 'trading_calendar'
+collection and refreshed by `update_trading_calendar` after every `-u` update.
+Dates after the last stored session follow the exchange rules: weekdays that are
+not NYSE holidays.
+
+Lookups are binary searches over the sorted sessions (index_of is a dict lookup),
+and each database's calendar is loaded once and reused for CACHE_SECONDS.
+
+Usage example:
+    calendar = get_trading_calendar(database)
+    calendar.latest()                              # '2024-07-05'
+    calendar.previous('2024-07-05')                # '2024-07-03' (July 4th is a holiday)
+    calendar.range('2024-07-01', '2024-07-05')     # ['2024-07-01', '2024-07-02', '2024-07-03', '2024-07-05']
+"""
+import bisect
+import logging
+import time
+import weakref
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr, USMemorialDay,
+    USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+from pandas.tseries.offsets import CustomBusinessDay
+from pymongo.errors import PyMongoError
+
+CALENDAR_COLLECTION = 'trading_calendar'
+CALENDAR_ID = 'NYSE'
+
+# Symbol whose stored bars define the past sessions
+BENCHMARK_SYMBOL = 'SPY'
+
+# Daily bars of a session are expected from 6PM New York time
+BAR_READY_HOUR = 18
+
+# Seconds a loaded calendar is reused before it is read again
+CACHE_SECONDS = 900
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """NYSE full-day holidays (a New Year's Day on Saturday is not observed)."""
+    rules = [
+        Holiday('NewYearsDay', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('IndependenceDay', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+@lru_cache(maxsize=1)
+def _session_offset() -> CustomBusinessDay:
+    return CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+
+def session_busdaycalendar() -> np.busdaycalendar:
+    """NumPy business day calendar of the NYSE rules, for vectorised session counts."""
+    return _session_offset().calendar
+
+
+def _day(date) -> str:
+    return str(date)[:10]
+
+
+class TradingCalendar:
+    """
+    Sorted session dates ('YYYY-MM-DD'), extended past the last one by the NYSE rules.
+
+    Args:
+        sessions: Known session dates, in any order.
+    """
+
+    def __init__(self, sessions: Iterable[str] = ()):
+        self.sessions: List[str] = sorted({_day(s) for s in sessions})
+        self._index: Dict[str, int] = {d: i for i, d in enumerate(self.sessions)}
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def latest(self) -> Optional[str]:
+        """Last known session."""
+        return self.sessions[-1] if self.sessions else None
+
+    def index_of(self, date: str) -> Optional[int]:
+        """Position of a known session, or None."""
+        return self._index.get(_day(date))
+
+    def _projected(self, start: str, end: str) -> List[str]:
+        """Rule sessions in [start, end] after the last known session."""
+        latest = self.latest()
+        if latest is not None and start <= latest:
+            start = (pd.Timestamp(latest) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        if start > end:
+            return []
+        return list(pd.date_range(start, end, freq=_session_offset()).strftime('%Y-%m-%d'))
+
+    def is_session(self, date: str) -> bool:
+        """Whether the market is open on date."""
+        date = _day(date)
+        return date in self._index or bool(self._projected(date, date))
+
+    def previous(self, date: str) -> Optional[str]:
+        """Last session strictly before date."""
+        date = _day(date)
+        latest = self.latest()
+        if latest is None or date > latest:
+            day_before = (pd.Timestamp(date) - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+            projected = self._projected((pd.Timestamp(date) - pd.Timedelta(days=10)).strftime('%Y-%m-%d'), day_before)
+            if projected:
+                return projected[-1]
+        pos = bisect.bisect_left(self.sessions, date)
+        return self.sessions[pos - 1] if pos > 0 else None
+
+    def next(self, date: str) -> Optional[str]:
+        """First session strictly after date."""
+        date = _day(date)
+        pos = bisect.bisect_right(self.sessions, date)
+        if pos < len(self.sessions):
+            return self.sessions[pos]
+        day_after = pd.Timestamp(date) + pd.Timedelta(days=1)
+        projected = self._projected(day_after.strftime('%Y-%m-%d'),
+                                    (day_after + pd.Timedelta(days=10)).strftime('%Y-%m-%d'))
+        return projected[0] if projected else None
+
+    def range(self, start: str, end: str) -> List[str]:
+        """Sessions from start to end, both included."""
+        start, end = _day(start), _day(end)
+        known = self.sessions[bisect.bisect_left(self.sessions, start):bisect.bisect_right(self.sessions, end)]
+        return known + self._projected(start, end)
+
+    def last_closed(self, now: Optional[pd.Timestamp] = None) -> str:
+        """
+        Latest session whose daily bar should be published at now (New York time):
+        today's from BAR_READY_HOUR on, otherwise the previous session's.
+        """
+        now_ny = now if now is not None else pd.Timestamp.now(tz='US/Eastern')
+        cutoff = now_ny.normalize() + pd.Timedelta(days=1 if now_ny.hour >= BAR_READY_HOUR else 0)
+        return self.previous(cutoff.strftime('%Y-%m-%d'))
+
+
+# Loaded calendars per database, with their load time
+_cache: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def _benchmark_sessions(database) -> List[str]:
+    doc = database['historical_prices'].find_one({'symbol': BENCHMARK_SYMBOL}, {'_id': 0, 'days.date': 1})
+    if not isinstance(doc, dict):
+        return []
+    return [d['date'] for d in doc.get('days', []) if d.get('date')]
+
+
+def update_trading_calendar(database=None) -> int:
+    """
+    Rebuilds the stored sessions from the benchmark's bars and refreshes the cache.
+
+    Args:
+        database: MongoDB database instance. Required.
+
+    Returns:
+        int: Number of stored sessions.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for update_trading_calendar")
+    calendar = TradingCalendar(_benchmark_sessions(database))
+    if calendar.sessions:
+        database[CALENDAR_COLLECTION].update_one(
+            {'_id': CALENDAR_ID},
+            {'$set': {'sessions': calendar.sessions, 'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+    _cache[database] = (calendar, time.monotonic())
+    return len(calendar)
+
+
+def get_trading_calendar(database=None) -> TradingCalendar:
+    """
+    The calendar of a database: its stored sessions, built from the benchmark's bars
+    on first use. Without a database, or when nothing is stored, only the rules apply.
+
+    Args:
+        database: MongoDB database instance.
+    """
+    if database is None:
+        return TradingCalendar()
+    cached: Optional[Tuple[TradingCalendar, float]] = _cache.get(database)
+    if cached is not None and time.monotonic() - cached[1] < CACHE_SECONDS:
+        return cached[0]
+    try:
+        doc = database[CALENDAR_COLLECTION].find_one({'_id': CALENDAR_ID})
+        if isinstance(doc, dict) and doc.get('sessions'):
+            calendar = TradingCalendar(doc['sessions'])
+            _cache[database] = (calendar, time.monotonic())
+            return calendar
+        update_trading_calendar(database)
+    except PyMongoError as e:
+        logging.warning("Failed to load the trading calendar, using the exchange rules: %s", e)
+        _cache[database] = (TradingCalendar(), time.monotonic())
+    return _cache[database][0]
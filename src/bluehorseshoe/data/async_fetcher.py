@@ -0,0 +1,293 @@
+"""
+async_fetcher.py
+
+This module provides `AlphaVantageFetcher`, an asyncio fetch engine for Alpha Vantage
+daily series. A fixed number of requests stay in flight over a pooled HTTP session,
+all of them drawing from one `TokenBucket` so the combined request rate honors
+ALPHAVANTAGE_CPS. Throttle responses ("Note"/"Information" payloads, HTTP 429 and
+5xx) are retried with exponential backoff, and parsed results are handed through a
+queue to a store stage that runs off the event loop.
+
+aiohttp is used when it is installed; otherwise requests are issued from a thread
+pool over a `requests.Session` with a connection pool of the same size.
+
+Usage example:
+    fetcher = AlphaVantageFetcher(parse=parse_daily_series, cps=2, concurrency=4)
+    summary = fetcher.run(['AAPL', 'MSFT'], recent=True, store=lambda result: print(result.symbol))
+"""
+import asyncio
+import json
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+ALPHAVANTAGE_URL = "https://www.alphavantage.co/query"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_SECONDS = 2.0
+MAX_BACKOFF_SECONDS = 60.0
+THROTTLE_KEYS = ('Note', 'Information')
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket shared by all fetch workers.
+
+    Tokens refill at `rate` per second up to `capacity`; each request takes one.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self._updated is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Waits until a token is available and takes it."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                self._refill(loop.time())
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def drain(self):
+        """Empties the bucket so every worker backs off after a throttle response."""
+        self._tokens = 0.0
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one symbol."""
+    symbol: str
+    data: Optional[dict] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+class _RetryableError(Exception):
+    """Raised for responses that should be retried after a backoff."""
+
+
+class _ThrottledError(_RetryableError):
+    """Raised when Alpha Vantage reports that the call frequency was exceeded."""
+
+
+class _SessionTransport:
+    """requests.Session driven from a thread pool sized to the concurrency."""
+
+    def __init__(self, pool_size: int, timeout: float):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='av-fetch')
+
+    async def get(self, url: str, params: dict):
+        """Returns (status, body text) for a GET request."""
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self.executor, lambda: self.session.get(url, params=params, timeout=self.timeout))
+        return response.status_code, response.text
+
+    async def close(self):
+        """Releases pooled connections and worker threads."""
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+
+class _AiohttpTransport:
+    """aiohttp client session with a connection pool sized to the concurrency."""
+
+    def __init__(self, pool_size: int, timeout: float):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=pool_size),
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        )
+
+    async def get(self, url: str, params: dict):
+        """Returns (status, body text) for a GET request."""
+        async with self.session.get(url, params=params) as response:
+            return response.status, await response.text()
+
+    async def close(self):
+        """Closes the client session."""
+        await self.session.close()
+
+
+def _transport_errors():
+    errors = (requests.exceptions.RequestException, asyncio.TimeoutError, OSError)
+    if aiohttp is not None:
+        errors += (aiohttp.ClientError,)
+    return errors
+
+
+class AlphaVantageFetcher:
+    """
+    Fetches TIME_SERIES_DAILY_ADJUSTED for many symbols concurrently under a shared rate limit.
+
+    Args:
+        parse: Callable (symbol, json payload) -> parsed dict, or None if the payload has no series.
+        cps: Requests per second allowed across all workers.
+        concurrency: Number of requests kept in flight.
+        api_key: Alpha Vantage API key.
+        base_url: Query endpoint (overridable for tests).
+        max_retries: Retries per symbol after throttle or transient errors.
+        backoff_seconds: Base delay of the exponential backoff.
+        timeout: Per-request timeout in seconds.
+    """
+
+    def __init__(self, parse: Callable[[str, dict], Optional[dict]], cps: float = 2,
+                 concurrency: int = DEFAULT_CONCURRENCY, api_key: str = '',
+                 base_url: str = ALPHAVANTAGE_URL, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_seconds: float = DEFAULT_BACKOFF_SECONDS, timeout: float = 15.0):
+        self.parse = parse
+        self.cps = cps
+        self.concurrency = max(1, int(concurrency))
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+
+    def _make_transport(self):
+        if aiohttp is not None:
+            return _AiohttpTransport(self.concurrency, self.timeout)
+        return _SessionTransport(self.concurrency, self.timeout)
+
+    def _params(self, symbol: str, recent: bool) -> dict:
+        return {
+            'function': 'TIME_SERIES_DAILY_ADJUSTED',
+            'outputsize': 'compact' if recent else 'full',
+            'symbol': symbol,
+            'apikey': self.api_key,
+        }
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(MAX_BACKOFF_SECONDS, self.backoff_seconds * (2 ** attempt))
+        return delay + random.uniform(0, self.backoff_seconds / 2)
+
+    def _read_payload(self, symbol: str, status: int, body: str) -> dict:
+        """Validates a response and returns the parsed series, raising on failures."""
+        if status in RETRYABLE_STATUS:
+            raise _RetryableError(f"HTTP {status}")
+        if status != 200:
+            raise ValueError(f"HTTP {status}")
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise _RetryableError(f"invalid JSON: {e}") from e
+
+        if 'Error Message' in payload:
+            raise ValueError(payload['Error Message'])
+        data = self.parse(symbol, payload)
+        if data is None:
+            throttle = next((payload[k] for k in THROTTLE_KEYS if k in payload), None)
+            if throttle:
+                raise _ThrottledError(f"throttled: {throttle}")
+            raise ValueError(f"no time series in response: {payload}")
+        return data
+
+    async def _fetch_symbol(self, transport, bucket: TokenBucket, symbol: str, recent: bool) -> FetchResult:
+        """Fetches one symbol, retrying throttled and transient failures."""
+        errors = _transport_errors()
+        result = FetchResult(symbol=symbol)
+        while True:
+            await bucket.acquire()
+            result.attempts += 1
+            try:
+                status, body = await transport.get(self.base_url, self._params(symbol, recent))
+                result.data = self._read_payload(symbol, status, body)
+                return result
+            except ValueError as e:
+                result.error = str(e)
+                return result
+            except (_RetryableError,) + errors as e:
+                result.error = str(e)
+                if isinstance(e, _ThrottledError):
+                    bucket.drain()
+                if result.attempts > self.max_retries:
+                    return result
+                delay = self._backoff(result.attempts - 1)
+                logging.warning("Retrying %s in %.1fs (attempt %d): %s", symbol, delay, result.attempts, e)
+                await asyncio.sleep(delay)
+
+    async def _run(self, symbols: Iterable[str], recent: bool, store: Optional[Callable[[FetchResult], None]]) -> dict:
+        pending = asyncio.Queue()
+        for symbol in symbols:
+            pending.put_nowait(symbol)
+        # Bounded so fetching cannot run far ahead of a slow store stage
+        results = asyncio.Queue(maxsize=self.concurrency * 2)
+        bucket = TokenBucket(self.cps)
+        transport = self._make_transport()
+        summary = {'fetched': 0, 'failed': 0, 'stored': 0, 'retries': 0}
+
+        async def fetch_worker():
+            while True:
+                try:
+                    symbol = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await results.put(await self._fetch_symbol(transport, bucket, symbol, recent))
+
+        async def store_worker():
+            while True:
+                result = await results.get()
+                if result is None:
+                    return
+                summary['retries'] += max(0, result.attempts - 1)
+                if result.data is None:
+                    summary['failed'] += 1
+                    logging.error("Failed to fetch %s after %d attempts: %s", result.symbol, result.attempts, result.error)
+                else:
+                    summary['fetched'] += 1
+                if store is None:
+                    continue
+                try:
+                    await asyncio.to_thread(store, result)
+                    summary['stored'] += 1
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logging.error("Failed to store %s: %s", result.symbol, e)
+
+        store_task = asyncio.create_task(store_worker())
+        try:
+            await asyncio.gather(*(fetch_worker() for _ in range(self.concurrency)))
+            await results.put(None)
+            await store_task
+        finally:
+            store_task.cancel()
+            await transport.close()
+        return summary
+
+    def run(self, symbols: Iterable[str], recent: bool = True,
+            store: Optional[Callable[[FetchResult], None]] = None) -> dict:
+        """
+        Fetches every symbol and passes each FetchResult (successful or not) to `store`.
+
+        Store calls run one at a time, in completion order, on a worker thread.
+
+        Returns:
+            dict: Counts of 'fetched', 'failed', 'stored' and 'retries'.
+        """
+        return asyncio.run(self._run(list(symbols), recent, store))
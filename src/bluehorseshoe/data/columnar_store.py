@@ -0,0 +1,189 @@
+"""
+columnar_store.py
+
+The columnar price store: each symbol's history as one document in
+`historical_prices_columnar`, with one binary field per column (int32 epoch-day
+dates, int64 volume, float64 prices and indicators) instead of a list of daily
+dicts. Appended bars are pushed as extra binary chunks per column; a full save
+rewrites the document and drops them.
+
+Used when the `price_store` setting is "columnar" (see UniversePanel and the
+grading engine); `build_columnar_store` converts the existing 'historical_prices'
+documents.
+
+Usage example:
+    save_columnar_data_to_mongo('AAPL', {'days': days}, database)
+    frame = load_columnar_data_from_mongo('AAPL', database, fields=['close'])['frame']
+"""
+import logging
+import numpy as np
+import pandas as pd
+from pymongo.errors import ServerSelectionTimeoutError, PyMongoError
+
+COLUMNAR_COLLECTION = 'historical_prices_columnar'
+INTEGER_COLUMNS = ('volume',)
+COLUMNAR_MAX_CHUNKS = 64  # Appended chunks per column before the document is rewritten whole
+
+
+def days_to_columns(days):
+    """
+    Converts a list of daily bar dicts into typed NumPy column arrays.
+
+    Dates become int32 days since the Unix epoch, volume is stored as int64 and
+    every other numeric field (prices and indicators) as float64.
+    Non-numeric fields are dropped.
+    """
+    df = pd.DataFrame(days)
+    if df.empty or 'date' not in df.columns:
+        return {}
+
+    df = df.drop_duplicates(subset=['date'], keep='last').sort_values('date')
+    dates = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[D]')
+    columns = {'date': dates.astype(np.int32)}
+
+    for col in df.columns:
+        if col == 'date' or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if col in INTEGER_COLUMNS:
+            columns[col] = df[col].fillna(0).to_numpy(dtype=np.int64)
+        else:
+            columns[col] = df[col].to_numpy(dtype=np.float64)
+    return columns
+
+
+def columns_to_frame(columns):
+    """
+    Builds a DataFrame from typed column arrays without any per-row work.
+    The 'date' column is returned as datetime64[ns].
+    """
+    if 'date' not in columns:
+        return pd.DataFrame()
+
+    frame = {'date': columns['date'].astype('datetime64[D]').astype('datetime64[ns]')}
+    frame.update({name: arr for name, arr in columns.items() if name != 'date'})
+    return pd.DataFrame(frame)
+
+
+def save_columnar_data_to_mongo(symbol, data, db_instance):
+    """
+    Saves a symbol's history to the columnar collection, one binary field per column.
+    Rewrites the whole document, dropping any chunks appended since the last save.
+    """
+    columns = days_to_columns(data.get('days', []))
+    if not columns:
+        return
+
+    doc = {
+        'symbol': symbol,
+        'full_name': data.get('full_name', symbol),
+        'bar_count': int(len(columns['date'])),
+        'last_date': str(columns['date'][-1:].astype('datetime64[D]')[0]),
+        'fields': sorted(columns),
+        'chunk_count': 0,
+        'columns': {
+            name: {'dtype': arr.dtype.str, 'data': arr.tobytes()}
+            for name, arr in columns.items()
+        },
+        'last_updated': pd.Timestamp.now().isoformat()
+    }
+    db_instance[COLUMNAR_COLLECTION].update_one({"symbol": symbol}, {"$set": doc}, upsert=True)
+
+
+def append_columnar_data_to_mongo(symbol, new_days, db_instance):
+    """
+    Appends bars to a symbol's columnar document by pushing one binary chunk per column,
+    without reading or rewriting the stored columns.
+
+    The append only applies when the stored document ends before the first new bar,
+    holds exactly the same columns and has fewer than COLUMNAR_MAX_CHUNKS chunks, so a
+    retried append is a no-op and a document is periodically compacted by a full save.
+
+    Returns:
+        True if the bars were appended (or there were none), False if the caller
+        should rewrite the document with `save_columnar_data_to_mongo`.
+    """
+    columns = days_to_columns(new_days)
+    if not columns:
+        return True
+
+    first_date = str(columns['date'][:1].astype('datetime64[D]')[0])
+    result = db_instance[COLUMNAR_COLLECTION].update_one(
+        {'symbol': symbol, 'last_date': {'$lt': first_date}, 'fields': sorted(columns),
+         'chunk_count': {'$lt': COLUMNAR_MAX_CHUNKS}},
+        {
+            '$push': {f'columns.{name}.chunks': arr.tobytes() for name, arr in columns.items()},
+            '$inc': {'bar_count': int(len(columns['date'])), 'chunk_count': 1},
+            '$set': {'last_date': str(columns['date'][-1:].astype('datetime64[D]')[0]),
+                     'last_updated': pd.Timestamp.now().isoformat()},
+        })
+    return result.matched_count > 0
+
+
+def columns_from_document(doc):
+    """
+    Decodes the binary column fields of a columnar store document into NumPy arrays
+    (the saved data followed by any appended chunks).
+    """
+    return {
+        name: np.frombuffer(b''.join([spec['data'], *spec.get('chunks', [])]), dtype=np.dtype(spec['dtype']))
+        for name, spec in doc.get('columns', {}).items()
+    }
+
+
+def load_columnar_data_from_mongo(symbol, db_instance, fields=None):
+    """
+    Loads a symbol's history from the columnar collection.
+
+    Args:
+        symbol: Stock symbol to load
+        db_instance: MongoDB database instance
+        fields: Optional list of columns to load ('date' is always included)
+
+    Returns:
+        Dictionary with 'symbol', 'full_name' and 'frame' (a DataFrame), or {} if not stored.
+    """
+    projection = None
+    if fields:
+        projection = {'symbol': 1, 'full_name': 1, 'columns.date': 1}
+        projection.update({f'columns.{f}': 1 for f in fields})
+
+    try:
+        doc = db_instance[COLUMNAR_COLLECTION].find_one({"symbol": symbol}, projection)
+    except (ServerSelectionTimeoutError, OSError, PyMongoError) as e:
+        logging.error("Error accessing MongoDB: %s", e)
+        return {}
+
+    if not doc or not doc.get('columns'):
+        return {}
+
+    columns = columns_from_document(doc)
+    return {
+        'symbol': doc.get('symbol', symbol),
+        'full_name': doc.get('full_name', symbol),
+        'frame': columns_to_frame(columns)
+    }
+
+
+def build_columnar_store(database, symbols=None):
+    """
+    Converts existing 'historical_prices' documents into the columnar collection.
+
+    Args:
+        database: MongoDB database instance
+        symbols: Optional list of symbols to convert (default: all)
+
+    Returns:
+        Number of symbols converted.
+    """
+    if database is None:
+        raise ValueError("database parameter is required for build_columnar_store")
+
+    query = {"symbol": {"$in": list(symbols)}} if symbols else {}
+    converted = 0
+    for doc in database['historical_prices'].find(query, {'_id': 0}):
+        save_columnar_data_to_mongo(doc['symbol'], doc, database)
+        converted += 1
+        if converted % 500 == 0:
+            logging.info("Converted %d symbols to columnar store...", converted)
+    logging.info("Columnar store build complete: %d symbols.", converted)
+    return converted
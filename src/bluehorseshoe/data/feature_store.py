@@ -0,0 +1,209 @@
+"""
+feature_store.py
+
+This module provides the `FeatureStore` class, an in-memory cache of the
+fundamental and sentiment inputs used by `ml_utils.extract_features`. Company
+overviews are bulk-loaded into a dict keyed by symbol, and each symbol's news feed
+is parsed once into a sorted publication-time series with running sentiment sums,
+so a point-in-time sentiment lookup is two binary searches instead of a
+`symbol_news` read and a `strptime` per article.
+
+Entries older than `ttl_seconds` are reloaded on next use, and the least recently
+used symbols are evicted once `max_symbols` is exceeded.
+
+Usage example:
+    store = FeatureStore(database)
+    store.preload(['AAPL', 'MSFT'])
+    overview = store.get_overview('AAPL')
+    sentiment = store.get_sentiment('AAPL', '2024-06-28')
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+# Symbols per `$in` query when bulk-loading
+LOAD_BATCH_SIZE = 500
+
+# Articles published within this many days before the target date count towards its score
+SENTIMENT_LOOKBACK_DAYS = 7
+
+# Default refresh policy: overviews and news change at most a few times a day
+DEFAULT_TTL_SECONDS = 6 * 3600
+DEFAULT_MAX_SYMBOLS = 20000
+
+
+@dataclass
+class _SymbolFeatures:
+    """Cached inputs for one symbol."""
+    overview: Dict[str, Any]
+    published: np.ndarray   # Sorted publication times (datetime64[s])
+    score_sums: np.ndarray  # score_sums[i] = sum of the first i sentiment scores
+    loaded_at: float
+
+
+def _to_datetime64(target_date) -> Optional[np.datetime64]:
+    """Converts a 'YYYY-MM-DD' string, date or datetime to datetime64[s]; None if invalid."""
+    if isinstance(target_date, str):
+        try:
+            target_date = datetime.strptime(target_date, "%Y-%m-%d")
+        except ValueError:
+            return None
+    elif isinstance(target_date, date) and not isinstance(target_date, datetime):
+        target_date = datetime.combine(target_date, datetime.min.time())
+    if not isinstance(target_date, datetime):
+        return None
+    return np.datetime64(target_date.replace(tzinfo=None), 's')
+
+
+def _sentiment_series(symbol: str, feed: List[Dict[str, Any]]) -> tuple:
+    """Parses a news feed into sorted publication times and running sums of the symbol's scores."""
+    times, scores = [], []
+    for item in feed:
+        for ts in item.get("ticker_sentiment", []):
+            if ts.get("ticker") != symbol:
+                continue
+            try:
+                score = float(ts.get("ticker_sentiment_score", 0.0))
+            except (ValueError, TypeError):
+                continue
+            times.append(item.get("time_published"))
+            scores.append(score)
+
+    published = pd.to_datetime(pd.Series(times, dtype=object), format="%Y%m%dT%H%M%S", errors="coerce")
+    valid = published.notna().to_numpy()
+    published = published[valid].to_numpy(dtype='datetime64[s]')
+    values = np.asarray(scores, dtype=float)[valid]
+
+    order = np.argsort(published, kind='stable')
+    score_sums = np.concatenate(([0.0], np.cumsum(values[order])))
+    return published[order], score_sums
+
+
+class FeatureStore:
+    """
+    Point-in-time cache of company overviews and news sentiment per symbol.
+
+    Thread-safe; one store is meant to be shared by the inference models of a run.
+    """
+
+    def __init__(self, database, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_symbols: int = DEFAULT_MAX_SYMBOLS):
+        """
+        Args:
+            database: MongoDB database instance. Required.
+            ttl_seconds: Age after which a symbol's cached data is reloaded.
+            max_symbols: Maximum number of cached symbols; least recently used are evicted.
+        """
+        if database is None:
+            raise ValueError("database parameter is required for FeatureStore")
+        self.database = database
+        self.ttl_seconds = ttl_seconds
+        self.max_symbols = max_symbols
+        self._entries: "OrderedDict[str, _SymbolFeatures]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper().strip() in self._entries
+
+    def _is_fresh(self, entry: Optional[_SymbolFeatures], now: float) -> bool:
+        return entry is not None and now - entry.loaded_at < self.ttl_seconds
+
+    def preload(self, symbols: Iterable[str]) -> None:
+        """
+        Bulk-loads overviews and news for every symbol that is not cached or has expired.
+        Symbols without an overview or news are cached as empty, so they are not queried again.
+        """
+        now = time.monotonic()
+        with self._lock:
+            wanted = {s.upper().strip() for s in symbols}
+            missing = sorted(s for s in wanted if not self._is_fresh(self._entries.get(s), now))
+
+        for i in range(0, len(missing), LOAD_BATCH_SIZE):
+            batch = missing[i:i + LOAD_BATCH_SIZE]
+            overviews = {
+                doc['symbol']: doc
+                for doc in self.database["symbol_overviews"].find({"symbol": {"$in": batch}}, {"_id": 0})
+            }
+            feeds = {
+                doc['symbol']: doc.get("feed", [])
+                for doc in self.database["symbol_news"].find({"symbol": {"$in": batch}}, {"_id": 0, "symbol": 1, "feed": 1})
+            }
+
+            loaded = {}
+            for symbol in batch:
+                published, score_sums = _sentiment_series(symbol, feeds.get(symbol, []))
+                loaded[symbol] = _SymbolFeatures(overviews.get(symbol, {}), published, score_sums, now)
+
+            with self._lock:
+                self._entries.update(loaded)
+                for symbol in loaded:
+                    self._entries.move_to_end(symbol)
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drops least recently used entries beyond max_symbols. Caller holds the lock."""
+        while len(self._entries) > self.max_symbols:
+            self._entries.popitem(last=False)
+
+    def _entry(self, symbol: str) -> _SymbolFeatures:
+        """Returns a symbol's cached entry, loading it when missing or expired."""
+        sym = symbol.upper().strip()
+        with self._lock:
+            entry = self._entries.get(sym)
+            if self._is_fresh(entry, time.monotonic()):
+                self._entries.move_to_end(sym)
+                return entry
+        self.preload([sym])
+        with self._lock:
+            return self._entries[sym]
+
+    def invalidate(self, symbols: Optional[Iterable[str]] = None) -> None:
+        """Drops cached entries for the given symbols, or for all symbols when None."""
+        with self._lock:
+            if symbols is None:
+                self._entries.clear()
+                return
+            for symbol in symbols:
+                self._entries.pop(symbol.upper().strip(), None)
+
+    def get_overview(self, symbol: str) -> Dict[str, Any]:
+        """Returns the company overview for a symbol ({} when unknown)."""
+        return self._entry(symbol).overview
+
+    def get_sentiment(self, symbol: str, target_date) -> float:
+        """
+        Average sentiment score of articles published in the 7 days up to target_date.
+        Matches `core.symbols.get_sentiment_score`.
+        """
+        target = _to_datetime64(target_date)
+        if target is None:
+            return 0.0
+        entry = self._entry(symbol)
+        # get_sentiment_score keeps articles with 0 <= (target - published).days <= 7,
+        # i.e. published in (target - 8 days, target]
+        start = target - np.timedelta64(SENTIMENT_LOOKBACK_DAYS + 1, 'D')
+        lo = np.searchsorted(entry.published, start, side='right')
+        hi = np.searchsorted(entry.published, target, side='right')
+        if hi <= lo:
+            return 0.0
+        return float((entry.score_sums[hi] - entry.score_sums[lo]) / (hi - lo))
+
+    def get_sentiment_series(self, symbol: str, start_date: str, end_date: str) -> pd.Series:
+        """Daily point-in-time sentiment scores for a symbol, indexed by calendar date."""
+        entry = self._entry(symbol)
+        days = pd.date_range(start_date, end_date, freq='D')
+        targets = days.to_numpy(dtype='datetime64[s]')
+        lo = np.searchsorted(entry.published, targets - np.timedelta64(SENTIMENT_LOOKBACK_DAYS + 1, 'D'), side='right')
+        hi = np.searchsorted(entry.published, targets, side='right')
+        counts = hi - lo
+        sums = entry.score_sums[hi] - entry.score_sums[lo]
+        values = np.divide(sums, counts, out=np.zeros(len(days)), where=counts > 0)
+        return pd.Series(values, index=days, name=symbol.upper().strip())
@@ -9,23 +9,31 @@ from ratelimit import limits, sleep_and_retry #pylint: disable=import-error
 from pymongo.errors import ServerSelectionTimeoutError, PyMongoError
 import talib as ta
 from bluehorseshoe.core.config import get_settings
-from bluehorseshoe.core.symbols import get_symbol_list
+from bluehorseshoe.core.symbols import get_symbol_list, has_price_adjustment, append_historical_days_to_mongo
+from bluehorseshoe.core.symbol_status import (
+    COMPACT, get_symbol_status, plan_updates, record_bars, record_fetch
+)
+from bluehorseshoe.core.trading_calendar import get_trading_calendar
 from bluehorseshoe.core.scores import ScoreManager
 from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+from bluehorseshoe.data.async_fetcher import AlphaVantageFetcher
+from bluehorseshoe.data.columnar_store import append_columnar_data_to_mongo, save_columnar_data_to_mongo
+from bluehorseshoe.data.indicator_state import (
+    can_update_incrementally, compute_indicator_state, update_technical_indicators
+)
 
 
 # Rate Limit Configuration
 CPS = int(os.environ.get("ALPHAVANTAGE_CPS", "2"))
 ALPHAVANTAGE_KEY = os.environ.get("ALPHAVANTAGE_KEY", "JFRQJ8YWSX8UK50X")
 
+
 @sleep_and_retry
 @limits(calls=1, period=1.0/CPS)
 def load_historical_data_from_net(stock_symbol, recent=False):
     """
     Fetch historical stock data from Alpha Vantage API.
     """
-    symbol = {'name': stock_symbol}
-
     outputsize = 'full' if not recent else 'compact'
     url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY_ADJUSTED&outputsize={outputsize}" + \
         f"&symbol={stock_symbol}&apikey={ALPHAVANTAGE_KEY}"
@@ -35,6 +43,19 @@ def load_historical_data_from_net(stock_symbol, recent=False):
 
     json_data = response.json()
 
+    symbol = parse_daily_series(stock_symbol, json_data)
+    if symbol is None:
+        logging.error("'Time Series (Daily)' key not found in response for %s. URL: %s. Response: %s", stock_symbol, url, json_data)
+    return symbol
+
+
+def parse_daily_series(stock_symbol, json_data):
+    """
+    Parses an Alpha Vantage TIME_SERIES_DAILY_ADJUSTED response into split/dividend
+    adjusted daily bars. Returns None if the response has no time series.
+    """
+    symbol = {'name': stock_symbol}
+
     if 'Time Series (Daily)' in json_data:
         time_series = json_data['Time Series (Daily)']
         symbol['days'] = []
@@ -60,7 +81,6 @@ def load_historical_data_from_net(stock_symbol, recent=False):
 
             symbol['days'].append(daily_data)
     else:
-        logging.error("'Time Series (Daily)' key not found in response for %s. URL: %s. Response: %s", stock_symbol, url, json_data)
         return None
 
     return symbol
@@ -72,23 +92,8 @@ def check_market_status(symbol='SPY'):
     Returns True if the latest data point matches the expected trading day.
     """
     try:
-        # Determine expected date (Today in NY, or last Friday if Weekend)
-        try:
-            now_ny = pd.Timestamp.now(tz='US/Eastern')
-        except Exception:  # pylint: disable=broad-exception-caught
-             # Fallback to local if TZ fails
-            now_ny = pd.Timestamp.now()
-
-        # If before 6 PM ET, expect data from the previous day
-        if now_ny.hour < 18:
-            now_ny -= pd.Timedelta(days=1)
-
-        expected_date = now_ny.date()
-
-        if now_ny.weekday() == 5: # Saturday
-            expected_date -= pd.Timedelta(days=1)
-        elif now_ny.weekday() == 6: # Sunday
-            expected_date -= pd.Timedelta(days=2)
+        # Determine expected date: the last session whose bar is published (exchange rules)
+        expected_date = get_trading_calendar().last_closed()
 
         net_data = load_historical_data_from_net(symbol, recent=True)
         if not net_data or 'days' not in net_data:
@@ -100,7 +105,7 @@ def check_market_status(symbol='SPY'):
 
         last_market_date = max(dates) # String 'YYYY-MM-DD'
 
-        if str(expected_date) <= last_market_date:
+        if expected_date <= last_market_date:
             logging.info("Bellwether check passed: %s data available for %s", last_market_date, symbol)
             return True
 
@@ -144,11 +149,37 @@ def save_historical_data_to_mongo(symbol, data, db_instance):
 
     # Store just the last year of data in a separate collection
     recent_data = save_data.copy()
+    recent_data.pop('indicator_state', None)
     if 'days' in recent_data:
         recent_data['days'] = save_data['days'][-240:]
     recent_collection = db_instance['historical_prices_recent']
     recent_collection.update_one(
         {"symbol": symbol}, {"$set": recent_data}, upsert=True)
+    record_bars(symbol, save_data.get('days', []), database=db_instance)
+
+    if get_settings().price_store == 'columnar':
+        save_columnar_data_to_mongo(symbol, save_data, db_instance)
+
+
+def append_historical_data_to_mongo(symbol, data, new_days, db_instance):
+    """
+    Appends new bars for a symbol whose stored history is otherwise unchanged.
+
+    Args:
+        symbol: Stock symbol
+        data: Full merged data dict (indicator state, and the columnar rewrite when
+            the new bars cannot be appended there)
+        new_days: Bars newer than the last stored bar
+        db_instance: MongoDB database instance
+    """
+    set_fields = {'full_name': data.get('full_name', symbol)}
+    if data.get('indicator_state'):
+        set_fields['indicator_state'] = data['indicator_state']
+    append_historical_days_to_mongo(symbol, new_days, database=db_instance, set_fields=set_fields)
+
+    if get_settings().price_store == 'columnar' and not append_columnar_data_to_mongo(symbol, new_days, db_instance):
+        save_columnar_data_to_mongo(symbol, data, db_instance)
+
 
 def get_backfill_checkpoint(database):
     """
@@ -190,11 +221,16 @@ class BackfillConfig:
     symbols: Optional[List] = None
     resume: bool = False
     limit: Optional[int] = None
+    concurrency: int = 1  # >1 fetches through the async engine with this many requests in flight
 
 def build_all_symbols_history(config: Optional[BackfillConfig] = None, database=None):
     """
     Builds historical data for all stock symbols and saves them to MongoDB.
 
+    Recent updates (config.recent) fetch only the symbols plan_updates finds behind,
+    each with the output size its gap needs; full backfills walk the symbol list
+    from the checkpoint.
+
     Args:
         config: BackfillConfig for controlling the backfill process
         database: MongoDB database instance. Required for checkpoint operations.
@@ -216,10 +252,24 @@ def build_all_symbols_history(config: Optional[BackfillConfig] = None, database=
         logging.error("Symbol list is None.")
         return
 
+    if config.recent and not starting_at:
+        _update_planned_symbols(symbol_list, config, database)
+        return
+
     skip = bool(starting_at)
     total_symbols = len(symbol_list)
     processed_count = 0
 
+    if config.concurrency > 1:
+        rows = list(enumerate(symbol_list, start=1))
+        if starting_at:
+            positions = [i for i, (_, row) in enumerate(rows) if row['symbol'] == starting_at]
+            rows = rows[positions[0] + 1:] if positions else []
+        if config.limit:
+            rows = rows[:config.limit]
+        _build_symbols_history_concurrently(rows, total_symbols, config, database)
+        return
+
     for index, row in enumerate(symbol_list, start=1):
         symbol = row['symbol']
         if skip:
@@ -237,7 +287,98 @@ def build_all_symbols_history(config: Optional[BackfillConfig] = None, database=
 
 
 
-def process_symbol(row, index, total_symbols, save_to_file, recent, database):
+def _update_planned_symbols(symbol_list, config, database):
+    """
+    Fetches the symbols plan_updates finds behind, compact or full per symbol.
+
+    Progress lives in symbol_status, which every write updates, so a crashed update
+    resumes by planning again and no checkpoint is written.
+
+    Args:
+        symbol_list: Symbol rows with 'symbol' and 'name' keys
+        config: BackfillConfig for the run
+        database: MongoDB database instance
+    """
+    rows_by_symbol = {row['symbol']: row for row in symbol_list}
+    plan = plan_updates(database, symbol_list)
+    if config.limit:
+        plan = plan[:config.limit]
+    compact = {p.symbol for p in plan if p.mode == COMPACT}
+    logging.info("Update plan: %d of %d symbols behind (%d compact, %d full)",
+                 len(plan), len(symbol_list), len(compact), len(plan) - len(compact))
+
+    total_symbols = len(plan)
+    if config.concurrency > 1:
+        rows = [(i, rows_by_symbol[p.symbol]) for i, p in enumerate(plan, start=1)]
+        for recent in (True, False):
+            group = [(i, row) for i, row in rows if (row['symbol'] in compact) == recent]
+            if group:
+                _build_symbols_history_concurrently(group, total_symbols, config, database,
+                                                    recent=recent, checkpoint=False)
+        return
+
+    for index, fetch in enumerate(plan, start=1):
+        process_symbol(rows_by_symbol[fetch.symbol], index, total_symbols, config.save_to_file,
+                       fetch.mode == COMPACT, database)
+
+
+def _build_symbols_history_concurrently(rows, total_symbols, config, database, recent=None, checkpoint=True):
+    """
+    Fetches symbols through the async engine and processes each response as it arrives.
+
+    The checkpoint only advances past a symbol once every symbol before it has been
+    stored, so a resumed backfill never skips work that completed out of order.
+    Compact responses that reveal a price adjustment are not stored; those symbols
+    are fetched again in full in a second pass, under the same rate limit.
+
+    Args:
+        rows: List of (index, symbol row) pairs to process, in symbol list order
+        total_symbols: Total number of symbols
+        config: BackfillConfig for the run
+        database: MongoDB database instance
+        recent: Output size override (None = config.recent)
+        checkpoint: Whether to advance the backfill checkpoint
+    """
+    recent = config.recent if recent is None else recent
+    by_symbol = {row['symbol']: (index, row) for index, row in rows}
+    order = [row['symbol'] for _, row in rows]
+    done = set()
+    adjusted = []
+    frontier = 0
+
+    def store(result, full=False):
+        nonlocal frontier
+        index, row = by_symbol[result.symbol]
+        if result.data is not None:
+            if process_symbol(row, index, total_symbols, config.save_to_file, recent and not full, database,
+                              net_data=result.data, defer_refetch=True):
+                adjusted.append(result.symbol)
+                return
+        else:
+            record_fetch(result.symbol, error="fetch failed", database=database)
+        done.add(result.symbol)
+        if not checkpoint:
+            return
+        advanced = frontier
+        while advanced < len(order) and order[advanced] in done:
+            advanced += 1
+        if advanced > frontier:
+            frontier = advanced
+            set_backfill_checkpoint(order[frontier - 1], database)
+
+    fetcher = AlphaVantageFetcher(parse=parse_daily_series, cps=CPS, concurrency=config.concurrency,
+                                  api_key=ALPHAVANTAGE_KEY)
+    summary = fetcher.run(order, recent=recent, store=store)
+    logging.info("Async fetch complete: %d fetched, %d failed, %d retries",
+                 summary['fetched'], summary['failed'], summary['retries'])
+    if adjusted:
+        logging.info("Refetching full history of %d adjusted symbols", len(adjusted))
+        summary = fetcher.run(adjusted, recent=False, store=lambda result: store(result, full=True))
+        logging.info("Full refetch complete: %d fetched, %d failed, %d retries",
+                     summary['fetched'], summary['failed'], summary['retries'])
+
+def process_symbol(row, index, total_symbols, save_to_file, recent, database, net_data=None,
+                   defer_refetch=False):
     """
     Processes a stock symbol by loading its historical data, validating it,
     calculating technical indicators, and saving the data to MongoDB and optionally to a file.
@@ -249,6 +390,14 @@ def process_symbol(row, index, total_symbols, save_to_file, recent, database):
         save_to_file: Whether to save data to file
         recent: Whether to fetch recent data only
         database: MongoDB database instance
+        net_data: Already fetched API data (skips the network fetch when given)
+        defer_refetch: On a price adjustment in compact data, return True instead of
+            fetching the full history here (the caller fetches and processes it again)
+
+    Returns:
+        bool: True only when defer_refetch held back a price-adjusted compact response
+        (nothing was stored; the caller must fetch the full history and process it
+        again). False when the symbol was stored, skipped as up to date, or failed.
     """
     symbol = row['symbol']
     name = row['name']
@@ -257,58 +406,81 @@ def process_symbol(row, index, total_symbols, save_to_file, recent, database):
     # Load existing data from MongoDB to merge with or check for updates
     existing_data = {}
     try:
-        existing_data = load_historical_data_from_mongo(symbol, database)
-        if existing_data and 'days' in existing_data and existing_data['days']:
-            last_stored_date = existing_data['days'][-1]['date']
-            
-            # OPTIMIZATION: Check if data is already up-to-date
-            now_ny = pd.Timestamp.now(tz='US/Eastern')
-            today = now_ny.date()
-            if now_ny.hour < 18: # Before 6PM ET, expect previous day
-                target_date = today - pd.Timedelta(days=1)
-            else:
-                target_date = today
-
-            # Adjust for weekends
-            if target_date.weekday() == 5: # Saturday -> Friday
-                target_date -= pd.Timedelta(days=1)
-            elif target_date.weekday() == 6: # Sunday -> Friday
-                target_date -= pd.Timedelta(days=2)
-                
-            if str(target_date) <= last_stored_date:
-                logging.info("Skipping %s: Data up to date (%s)", symbol, last_stored_date)
-                return
+        # OPTIMIZATION: Check if data is already up-to-date, from the status before the full document
+        status = get_symbol_status(symbol, database=database)
+        last_stored_date = status.get('last_bar_date') if status else None
+        if last_stored_date is None:
+            existing_data = load_historical_data_from_mongo(symbol, database)
+            if existing_data and 'days' in existing_data and existing_data['days']:
+                last_stored_date = existing_data['days'][-1]['date']
+
+        if last_stored_date and get_trading_calendar(database).last_closed() <= last_stored_date:
+            logging.info("Skipping %s: Data up to date (%s)", symbol, last_stored_date)
+            return False
+
+        if not existing_data:
+            existing_data = load_historical_data_from_mongo(symbol, database)
 
     except Exception as e:
         logging.warning("Optimization check failed for %s: %s. Proceeding to fetch.", symbol, e)
 
     try:
-        net_data = load_historical_data_from_net(stock_symbol=symbol, recent=recent)
+        if net_data is None:
+            net_data = load_historical_data_from_net(stock_symbol=symbol, recent=recent)
         if not validate_net_data(net_data, symbol, name):
-            return
+            record_fetch(symbol, error="no data", database=database)
+            return False
 
         if net_data and 'days' in net_data:
             df_new = pd.DataFrame(net_data['days'])
         else:
             logging.error("No 'days' data found for %s.", symbol)
-            return
+            return False
 
-        # MERGE LOGIC: Combine existing history with new data
-        if existing_data and 'days' in existing_data:
+        if 'date' not in df_new.columns:
+            logging.error("Column 'date' not found in DataFrame for %s.", symbol)
+            return False
+
+        # INCREMENTAL PATH: Extend stored indicators from saved state for the new bars only
+        merged_days = None
+        new_days = None
+        indicator_state = None
+        adjusted = bool(existing_data and existing_data.get('days')) and has_price_adjustment(
+            existing_data['days'], df_new[['date', 'close']].to_dict(orient='records'))
+        if adjusted:
+            logging.info("Price adjustment detected for %s; rebuilding full history.", symbol)
+            if recent and defer_refetch:
+                return True
+            if recent:
+                full_data = load_historical_data_from_net(stock_symbol=symbol, recent=False)
+                if full_data and full_data.get('days'):
+                    df_new = pd.DataFrame(full_data['days'])
+        elif can_update_incrementally(existing_data, df_new, adjusted=False):
             df_existing = pd.DataFrame(existing_data['days'])
-            # Combine and drop duplicates based on date
-            df = pd.concat([df_existing, df_new]).drop_duplicates(subset=['date'])
-        else:
-            df = df_new
+            last_stored_date = existing_data['days'][-1]['date']
+            df_append = df_new[df_new['date'] > last_stored_date].sort_values(by='date').reset_index(drop=True)
+            new_days, indicator_state = update_technical_indicators(
+                df_existing, df_append, existing_data['indicator_state'])
+            merged_days = existing_data['days'] + new_days
+            logging.info("Incremental indicator update for %s: %d new bars", symbol, len(new_days))
+
+        if merged_days is None:
+            # MERGE LOGIC: Combine existing history with new data
+            if existing_data and 'days' in existing_data:
+                df_existing = pd.DataFrame(existing_data['days'])
+                # Combine and drop duplicates based on date (adjusted bars replace stored ones)
+                parts = [df_new, df_existing] if adjusted else [df_existing, df_new]
+                df = pd.concat(parts).drop_duplicates(subset=['date'])
+            else:
+                df = df_new
 
-        if 'date' not in df.columns:
-            logging.error("Column 'date' not found in DataFrame for %s.", symbol)
-            return
+            df = df.sort_values(by='date').reset_index(drop=True)
+            # Recalculate indicators on the FULL merged set to ensure continuity
+            merged_days = get_technical_indicators(df)
+            indicator_state = compute_indicator_state(df)
 
-        df = df.sort_values(by='date').reset_index(drop=True)
-        # Recalculate indicators on the FULL merged set to ensure continuity
-        merged_days = get_technical_indicators(df)
         net_data['days'] = merged_days
+        net_data['indicator_state'] = indicator_state
 
         # Calculate and save score for the latest day
         try:
@@ -342,12 +514,19 @@ def process_symbol(row, index, total_symbols, save_to_file, recent, database):
 
         logging.info('%d - %s (%d%%) - size: %d', index, symbol, percentage, len(net_data["days"]))
         print(f"Processed {symbol}: {len(net_data['days'])} days")
-        save_historical_data_to_mongo(symbol, net_data, database)
+        if new_days is not None:
+            # Append-only write: only the new bars and the indicator state go over the wire
+            append_historical_data_to_mongo(symbol, net_data, new_days, database)
+        else:
+            save_historical_data_to_mongo(symbol, net_data, database)
 
         if save_to_file:
             save_data_to_file(symbol, net_data)
+        record_fetch(symbol, database=database)
     except (requests.exceptions.RequestException, json.JSONDecodeError, OSError) as e:
         logging.error('%s error: %s', type(e).__name__, e)
+        record_fetch(symbol, error=f"{type(e).__name__}: {e}", database=database)
+    return False
 
 def validate_net_data(net_data, symbol, name):
     """
@@ -0,0 +1,217 @@
+"""
+indicator_state.py
+
+Incremental technical indicators. `compute_indicator_state` captures the recursive
+indicator state (EMA, MACD, ADX/DMI, RSI, ATR, OBV) at the last bar of a history;
+`update_technical_indicators` continues from it for newly appended bars, so an
+update does not recompute `get_technical_indicators` over the whole history.
+
+Usage example:
+    if can_update_incrementally(stored, df_new):
+        new_days, state = update_technical_indicators(pd.DataFrame(stored['days']), df_append,
+                                                      stored['indicator_state'])
+"""
+import logging
+import numpy as np
+import pandas as pd
+import talib as ta
+from bluehorseshoe.core.symbols import has_price_adjustment
+
+WILDER_PERIOD = 14
+INDICATOR_WARMUP_BARS = 40  # Covers the longest windowed indicator (BBANDS/avg volume 20)
+INCREMENTAL_MIN_HISTORY = 250  # Bars needed before the saved recursive state is trusted
+INDICATOR_COLUMNS = (
+    'ema_20', 'macd_line', 'macd_signal', 'macd_hist', 'adx', 'dmi_p', 'dmi_n', 'rsi_14', 'atr_14',
+    'bb_upper', 'bb_middle', 'bb_lower', 'stoch_k', 'stoch_d', 'obv', 'mfi', 'cci', 'willr', 'roc_5',
+    'avg_volume_20'
+)
+
+
+def compute_indicator_state(df):
+    """
+    Captures the recursive indicator state at the last bar of a full history so that
+    later bars can be computed with `update_technical_indicators` instead of a full recompute.
+
+    EMA, MACD, ATR, ADX and OBV are taken from the TA-Lib outputs; the Wilder averages
+    behind RSI and DMI are rebuilt with the equivalent exponential smoothing, which has
+    converged to the TA-Lib values once INCREMENTAL_MIN_HISTORY bars are available.
+
+    Returns:
+        Dictionary of state values, or None if the history is too short.
+    """
+    if len(df) < INCREMENTAL_MIN_HISTORY:
+        return None
+
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
+
+    true_range, plus_dm, minus_dm = _directional_moves(high, low, close)
+    change = np.diff(close)
+    alpha = 1.0 / WILDER_PERIOD
+
+    def wilder(values):
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().iloc[-1]
+
+    _, macd_signal, _ = ta.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9) # type: ignore
+    state = {
+        'as_of': str(df['date'].iloc[-1]),
+        'close': close[-1],
+        'high': high[-1],
+        'low': low[-1],
+        'ema_20': df['close'].ewm(span=20, adjust=False).mean().iloc[-1],
+        'ema_12': ta.EMA(close, timeperiod=12)[-1], # type: ignore
+        'ema_26': ta.EMA(close, timeperiod=26)[-1], # type: ignore
+        'macd_signal': macd_signal[-1],
+        'atr_14': ta.ATR(high, low, close, timeperiod=WILDER_PERIOD)[-1], # type: ignore
+        'adx': ta.ADX(high, low, close, timeperiod=WILDER_PERIOD)[-1], # type: ignore
+        'tr_avg': wilder(true_range),
+        'plus_dm_avg': wilder(plus_dm),
+        'minus_dm_avg': wilder(minus_dm),
+        'gain_avg': wilder(np.maximum(change, 0.0)),
+        'loss_avg': wilder(np.maximum(-change, 0.0)),
+        'obv': ta.OBV(close, volume)[-1] # type: ignore
+    }
+    if any(pd.isna(v) for k, v in state.items() if k != 'as_of'):
+        return None
+    return {k: (v if k == 'as_of' else float(v)) for k, v in state.items()}
+
+
+def _directional_moves(high, low, close):
+    """Returns true range, +DM and -DM arrays (one shorter than the inputs)."""
+    prev_close = close[:-1]
+    true_range = np.maximum.reduce([
+        high[1:] - low[1:], np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)])
+    up_move = high[1:] - high[:-1]
+    down_move = low[:-1] - low[1:]
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    return true_range, plus_dm, minus_dm
+
+
+def update_technical_indicators(history_df, new_df, state):
+    """
+    Computes indicators for bars appended after an already-processed history.
+
+    Recursive indicators (EMA, MACD, ADX/DMI, RSI, ATR, OBV) continue from `state`.
+    Windowed indicators (BBANDS, STOCH, MFI, CCI, WILLR, ROC, average volume) are
+    computed over the last INDICATOR_WARMUP_BARS stored bars plus the new ones.
+
+    Args:
+        history_df: DataFrame of the stored history (must end at state['as_of'])
+        new_df: DataFrame of new OHLCV bars, sorted by date, all after the history
+        state: State from `compute_indicator_state` or a previous update
+
+    Returns:
+        Tuple of (list of new day dicts with indicators, updated state)
+    """
+    if new_df.empty:
+        return [], state
+
+    new_df = new_df.copy()
+    if 'midpoint' not in new_df.columns:
+        new_df['midpoint'] = round((new_df['open'] + new_df['close']) / 2, 4)
+
+    ohlcv = ['open', 'high', 'low', 'close', 'volume']
+    tail = pd.concat([history_df[ohlcv].tail(INDICATOR_WARMUP_BARS), new_df[ohlcv]], ignore_index=True)
+    count = len(new_df)
+    t_close = tail['close'].to_numpy(dtype=np.float64)
+    t_high = tail['high'].to_numpy(dtype=np.float64)
+    t_low = tail['low'].to_numpy(dtype=np.float64)
+    t_volume = tail['volume'].to_numpy(dtype=np.float64)
+
+    bb_upper, bb_middle, bb_lower = ta.BBANDS(t_close, timeperiod=20, nbdevup=2, nbdevdn=2, matype=0) # type: ignore
+    stoch_k, stoch_d = ta.STOCH( # type: ignore
+        t_high, t_low, t_close, fastk_period=5, slowk_period=3, slowk_matype=0, slowd_period=3, slowd_matype=0)
+    windowed = {
+        'bb_upper': bb_upper, 'bb_middle': bb_middle, 'bb_lower': bb_lower,
+        'stoch_k': stoch_k, 'stoch_d': stoch_d,
+        'mfi': ta.MFI(t_high, t_low, t_close, t_volume, timeperiod=14), # type: ignore
+        'cci': ta.CCI(t_high, t_low, t_close, timeperiod=14), # type: ignore
+        'willr': ta.WILLR(t_high, t_low, t_close, timeperiod=14), # type: ignore
+        'roc_5': ta.ROC(t_close, timeperiod=5), # type: ignore
+        'avg_volume_20': tail['volume'].rolling(window=20).mean().to_numpy()
+    }
+    for name, values in windowed.items():
+        new_df[name] = np.round(values[-count:], 4)
+
+    state = dict(state)
+    recursive = {name: [] for name in (
+        'ema_20', 'macd_line', 'macd_signal', 'macd_hist', 'adx', 'dmi_p', 'dmi_n', 'rsi_14', 'atr_14', 'obv')}
+    n = WILDER_PERIOD
+    for close, high, low, volume in new_df[['close', 'high', 'low', 'volume']].itertuples(index=False):
+        prev_close, prev_high, prev_low = state['close'], state['high'], state['low']
+
+        state['ema_20'] += (2.0 / 21.0) * (close - state['ema_20'])
+        state['ema_12'] += (2.0 / 13.0) * (close - state['ema_12'])
+        state['ema_26'] += (2.0 / 27.0) * (close - state['ema_26'])
+        macd_line = state['ema_12'] - state['ema_26']
+        state['macd_signal'] += (2.0 / 10.0) * (macd_line - state['macd_signal'])
+
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        up_move, down_move = high - prev_high, prev_low - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+        state['tr_avg'] += (true_range - state['tr_avg']) / n
+        state['plus_dm_avg'] += (plus_dm - state['plus_dm_avg']) / n
+        state['minus_dm_avg'] += (minus_dm - state['minus_dm_avg']) / n
+        dmi_p = 100.0 * state['plus_dm_avg'] / state['tr_avg'] if state['tr_avg'] else 0.0
+        dmi_n = 100.0 * state['minus_dm_avg'] / state['tr_avg'] if state['tr_avg'] else 0.0
+        dx = 100.0 * abs(dmi_p - dmi_n) / (dmi_p + dmi_n) if (dmi_p + dmi_n) else 0.0
+        state['adx'] = (state['adx'] * (n - 1) + dx) / n
+        state['atr_14'] = (state['atr_14'] * (n - 1) + true_range) / n
+
+        change = close - prev_close
+        state['gain_avg'] = (state['gain_avg'] * (n - 1) + max(change, 0.0)) / n
+        state['loss_avg'] = (state['loss_avg'] * (n - 1) + max(-change, 0.0)) / n
+        avg_total = state['gain_avg'] + state['loss_avg']
+        rsi = 100.0 * state['gain_avg'] / avg_total if avg_total else 0.0
+
+        if change > 0:
+            state['obv'] += volume
+        elif change < 0:
+            state['obv'] -= volume
+
+        state['close'], state['high'], state['low'] = float(close), float(high), float(low)
+
+        for name, value in (
+                ('ema_20', state['ema_20']), ('macd_line', macd_line), ('macd_signal', state['macd_signal']),
+                ('macd_hist', macd_line - state['macd_signal']), ('adx', state['adx']),
+                ('dmi_p', dmi_p), ('dmi_n', dmi_n), ('rsi_14', rsi), ('atr_14', state['atr_14']),
+                ('obv', state['obv'])):
+            recursive[name].append(round(value, 4))
+
+    for name, values in recursive.items():
+        new_df[name] = values
+
+    # Match the column order produced by get_technical_indicators
+    new_df = new_df[[c for c in new_df.columns if c not in INDICATOR_COLUMNS] + list(INDICATOR_COLUMNS)]
+    state['as_of'] = str(new_df['date'].iloc[-1])
+    return new_df.to_dict(orient='records'), state
+
+
+def can_update_incrementally(existing_data, df_new, adjusted=None):
+    """
+    Returns True when the stored history can be extended with `update_technical_indicators`:
+    a saved indicator state that matches the last stored bar, enough history for the state to
+    have converged, and no split/dividend adjustment on the bars the new data overlaps.
+
+    Args:
+        existing_data: Stored document (days and indicator_state).
+        df_new: Fetched bars.
+        adjusted: Result of has_price_adjustment on the same bars, when already known.
+    """
+    if not existing_data or not existing_data.get('days'):
+        return False
+    days = existing_data['days']
+    state = existing_data.get('indicator_state')
+    if not state or state.get('as_of') != days[-1]['date']:
+        logging.warning("%s indicator state for %s; recomputing indicators over the full history.",
+                        'Stale' if state else 'No', existing_data.get('symbol', 'symbol'))
+        return False
+    if len(days) < INCREMENTAL_MIN_HISTORY:
+        return False
+    if adjusted is None:
+        adjusted = has_price_adjustment(days, df_new[['date', 'close']].to_dict(orient='records'))
+    return not adjusted
@@ -0,0 +1,286 @@
+"""
+universe_panel.py
+
+This module provides the `UniversePanel` class, an in-memory, NumPy-backed view of
+the whole symbol universe (symbols x dates x fields). A panel is built once per run
+and shared by `SwingTrader`, `Backtester`, `GradingEngine` and `MarketRegime`, so
+point-in-time history is an index lookup instead of a fresh Mongo read and a
+`df[df['date'] <= target_ts]` filter per symbol per date.
+
+Usage example:
+    panel = UniversePanel.from_database(database, symbols=['AAPL', 'SPY'], start_date='2023-01-01')
+    df = panel.frame('AAPL', target_date='2024-06-28')
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from bluehorseshoe.analysis.cross_sectional import INDICATOR_FIELDS, PRICE_FIELDS
+from bluehorseshoe.core.config import get_settings
+from bluehorseshoe.core.symbols import get_symbol_name_list
+from bluehorseshoe.data.columnar_store import (
+    COLUMNAR_COLLECTION,
+    INTEGER_COLUMNS,
+    columns_from_document,
+    days_to_columns
+)
+
+# Number of symbols fetched per Mongo round trip while building a panel
+LOAD_BATCH_SIZE = 200
+
+# Calendar days of history kept before the first date of interest. Covers the
+# longest windows in use (EMA200, 52-week range, weekly EMA30) with room for
+# EMA seeds to converge.
+DEFAULT_LOOKBACK_DAYS = 1100
+
+# Fields loaded from the database by default: everything technical scoring reads.
+# Consumers that need other fields (grading's atr_14) pass their own list.
+DEFAULT_FIELDS = PRICE_FIELDS + INDICATOR_FIELDS
+
+
+class UniversePanel:
+    """
+    Dense price panel for many symbols on a shared, sorted date axis.
+
+    Attributes:
+        symbols (list[str]): Symbols in panel order.
+        dates (np.ndarray): Sorted session dates (datetime64[D]).
+        fields (list[str]): Field names in panel order.
+        values (np.ndarray): Array of shape (len(symbols), len(dates), len(fields)).
+            Bars a symbol does not have are NaN.
+    """
+
+    def __init__(self, symbols: List[str], dates: np.ndarray, fields: List[str],
+                 values: np.ndarray, names: Optional[Dict[str, str]] = None):
+        if 'close' not in fields:
+            raise ValueError("UniversePanel requires a 'close' field")
+        self.symbols = list(symbols)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.fields = list(fields)
+        self.values = values
+        self.names = names or {}
+        self._symbol_index = {s: i for i, s in enumerate(self.symbols)}
+        self._field_index = {f: i for i, f in enumerate(self.fields)}
+        self._valid = ~np.isnan(values[:, :, self._field_index['close']])
+        # A field is present for a symbol if any of its bars has a value
+        self._present = ~np.all(np.isnan(values), axis=1)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._symbol_index
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @classmethod
+    def from_columns(cls, symbol_columns: Dict[str, Dict[str, np.ndarray]],
+                     names: Optional[Dict[str, str]] = None,
+                     fields: Optional[Iterable[str]] = None,
+                     dtype=np.float64) -> 'UniversePanel':
+        """
+        Builds a panel from per-symbol column arrays (see `days_to_columns`).
+
+        Args:
+            symbol_columns: Mapping of symbol to {column name: array}, with 'date' as
+                int32 days since epoch.
+            names: Optional mapping of symbol to full name.
+            fields: Optional list of fields to keep (default: every numeric field seen).
+            dtype: Floating point dtype of the panel values.
+        """
+        symbol_columns = {s: c for s, c in symbol_columns.items() if c and len(c.get('date', ())) > 0}
+        if fields is None:
+            fields = sorted({name for cols in symbol_columns.values() for name in cols if name != 'date'})
+        fields = list(fields)
+        if 'close' not in fields:
+            fields.append('close')
+
+        symbols = list(symbol_columns)
+        if symbols:
+            dates = np.unique(np.concatenate([c['date'] for c in symbol_columns.values()]))
+        else:
+            dates = np.array([], dtype=np.int32)
+
+        values = np.full((len(symbols), len(dates), len(fields)), np.nan, dtype=dtype)
+        for i, symbol in enumerate(symbols):
+            cols = symbol_columns[symbol]
+            positions = np.searchsorted(dates, cols['date'])
+            for j, field in enumerate(fields):
+                if field in cols:
+                    values[i, positions, j] = cols[field]
+
+        return cls(symbols, dates.astype('datetime64[D]'), fields, values, names=names)
+
+    @classmethod
+    def from_database(cls, database, symbols: Optional[List[str]] = None,
+                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      fields: Optional[Iterable[str]] = DEFAULT_FIELDS,
+                      dtype=np.float32) -> 'UniversePanel':
+        """
+        Loads a panel from MongoDB in batched queries.
+
+        The defaults keep memory bounded for the whole universe: the scoring fields
+        only, as float32 (10k symbols x 757 sessions x 18 fields is about 550 MB).
+
+        Reads the columnar store when `price_store` is "columnar" and the
+        'historical_prices' documents otherwise.
+
+        Args:
+            database: MongoDB database instance. Required.
+            symbols: Symbols to load (default: every symbol in the universe).
+            start_date: Optional first date to keep ('YYYY-MM-DD').
+            end_date: Optional last date to keep ('YYYY-MM-DD').
+            fields: Fields to keep (default: DEFAULT_FIELDS; None keeps every stored field).
+            dtype: Floating point dtype of the panel values.
+        """
+        if database is None:
+            raise ValueError("database parameter is required for UniversePanel.from_database")
+
+        if symbols is None:
+            symbols = get_symbol_name_list(database=database)
+        symbols = list(dict.fromkeys(symbols))
+
+        start = _to_epoch_day(start_date)
+        end = _to_epoch_day(end_date)
+        use_columnar = get_settings().price_store == 'columnar'
+
+        # Only the requested fields leave the server
+        prefix = 'columns' if use_columnar else 'days'
+        projection = {'_id': 0, 'symbol': 1, 'full_name': 1}
+        if fields is None:
+            projection[prefix] = 1
+        else:
+            projection.update({f'{prefix}.{f}': 1 for f in ('date', *fields)})
+
+        symbol_columns = {}
+        names = {}
+        for offset in range(0, len(symbols), LOAD_BATCH_SIZE):
+            batch = symbols[offset:offset + LOAD_BATCH_SIZE]
+            collection = COLUMNAR_COLLECTION if use_columnar else 'historical_prices'
+            cursor = database[collection].find({"symbol": {"$in": batch}}, projection)
+
+            for doc in cursor:
+                symbol = doc['symbol']
+                cols = columns_from_document(doc) if use_columnar else days_to_columns(doc.get('days', []))
+                if not cols:
+                    continue
+                mask = np.ones(len(cols['date']), dtype=bool)
+                if start is not None:
+                    mask &= cols['date'] >= start
+                if end is not None:
+                    mask &= cols['date'] <= end
+                symbol_columns[symbol] = {name: arr[mask] for name, arr in cols.items()}
+                names[symbol] = doc.get('full_name', symbol)
+
+        panel = cls.from_columns(symbol_columns, names=names, fields=fields, dtype=dtype)
+        logging.info("UniversePanel loaded: %d symbols x %d dates x %d fields (%.1f MB)",
+                     len(panel.symbols), len(panel.dates), len(panel.fields), panel.values.nbytes / 1e6)
+        return panel
+
+    def full_name(self, symbol: str) -> str:
+        """Returns the stored full name for a symbol, or the symbol itself."""
+        return self.names.get(symbol, symbol)
+
+    def date_index(self, target_date: Optional[str] = None) -> int:
+        """
+        Returns the number of panel dates on or before target_date,
+        i.e. the exclusive end index of a point-in-time slice.
+        """
+        if target_date is None:
+            return len(self.dates)
+        return int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(target_date).date(), 'D'), side='right'))
+
+    def _slice_frame(self, symbol: str, start: int, end: int) -> Optional[pd.DataFrame]:
+        """Builds a DataFrame of a symbol's valid bars in [start, end)."""
+        i = self._symbol_index.get(symbol)
+        if i is None:
+            return None
+
+        valid = self._valid[i, start:end]
+        block = self.values[i, start:end][valid]
+        frame = {'date': self.dates[start:end][valid].astype('datetime64[ns]')}
+        for j, field in enumerate(self.fields):
+            if not self._present[i, j]:
+                continue
+            column = block[:, j]
+            if field in INTEGER_COLUMNS and not np.isnan(column).any():
+                column = column.astype(np.int64)
+            frame[field] = column
+        return pd.DataFrame(frame)
+
+    def frame(self, symbol: str, target_date: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Returns a symbol's history up to and including target_date.
+
+        Returns:
+            DataFrame with a datetime64 'date' column, or None if the symbol is not in the panel.
+        """
+        return self._slice_frame(symbol, 0, self.date_index(target_date))
+
+    def future_frame(self, symbol: str, after_date: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Returns a symbol's bars strictly after after_date, optionally capped at `limit` bars.
+        """
+        df = self._slice_frame(symbol, self.date_index(after_date), len(self.dates))
+        if df is not None and limit is not None:
+            df = df.head(limit)
+        return df
+
+    def aligned_columns(self, symbols: List[str], target_date: Optional[str] = None,
+                        fields: Optional[Iterable[str]] = None, min_width: int = 0):
+        """
+        Returns the symbols' valid bars up to target_date, right-aligned on a common width.
+
+        Row i of each field array holds symbol i's bars in the same order as `frame`,
+        ending in the last column and NaN-padded on the left.
+
+        Returns:
+            tuple: (lengths, {field: array of shape (len(symbols), width)}, {field: bool presence per symbol})
+        """
+        end = self.date_index(target_date)
+        rows = np.array([self._symbol_index[s] for s in symbols], dtype=np.int64)
+        valid = self._valid[rows, :end]
+        lengths = valid.sum(axis=1).astype(np.int64)
+        width = max(min_width, int(lengths.max()) if len(rows) else 0)
+
+        # Destination column of each valid bar: its rank among the symbol's bars, pushed right
+        rank = np.cumsum(valid, axis=1) - 1
+        dest = (width - lengths)[:, None] + rank
+        src_row, src_col = np.nonzero(valid)
+
+        columns, present = {}, {}
+        for field in fields if fields is not None else self.fields:
+            j = self._field_index.get(field)
+            if j is None:
+                continue
+            out = np.full((len(rows), width), np.nan)
+            out[src_row, dest[src_row, src_col]] = self.values[rows[src_row], src_col, j]
+            columns[field] = out
+            present[field] = self._present[rows, j]
+        return lengths, columns, present
+
+    def cross_section(self, field: str, target_date: Optional[str] = None) -> np.ndarray:
+        """
+        Returns the latest value of `field` on or before target_date for every symbol.
+        Symbols without a bar in the window are NaN.
+        """
+        end = self.date_index(target_date)
+        result = np.full(len(self.symbols), np.nan)
+        if end == 0:
+            return result
+        valid = self._valid[:, :end]
+        has_bar = valid.any(axis=1)
+        last_idx = end - 1 - np.argmax(valid[:, ::-1], axis=1)
+        rows = np.nonzero(has_bar)[0]
+        result[rows] = self.values[rows, last_idx[rows], self._field_index[field]]
+        return result
+
+
+def _to_epoch_day(date_str: Optional[str]) -> Optional[int]:
+    """Converts a date string to int days since epoch, or None."""
+    if date_str is None:
+        return None
+    return int(np.datetime64(pd.Timestamp(date_str).date(), 'D').astype(np.int64))
+
+
+def panel_start_date(start_date: str, lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> str:
+    """Returns the first date to load so that start_date has `lookback_days` of warm-up history."""
+    return (pd.Timestamp(start_date) - pd.Timedelta(days=lookback_days)).strftime('%Y-%m-%d')
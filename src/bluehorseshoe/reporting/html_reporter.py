@@ -3,13 +3,9 @@ HTML Reporter module for BlueHorseshoe.
 Generates a styled HTML report from trading signals and market data.
 """
 import os
-import io
-import base64
-import pandas as pd
-import mplfinance as mpf
 from datetime import datetime
 from typing import List, Dict, Any
-from bluehorseshoe.data.historical_data import load_historical_data
+from bluehorseshoe.reporting.sparklines import SparklineRenderer
 
 class HTMLReporter:
     """
@@ -20,16 +16,20 @@ class HTMLReporter:
     # Number of candidates to show in main "Top Candidates" table
     TOP_CANDIDATES_TABLE_LIMIT = 10
 
-    def __init__(self, output_dir: str = "src/logs", database=None):
+    def __init__(self, output_dir: str = "src/logs", database=None, panel=None):
         """
         Initialize HTMLReporter with optional dependency injection.
 
         Args:
             output_dir: Directory to save generated reports
             database: MongoDB database instance. If None, uses global singleton.
+            panel: Optional UniversePanel of the run, used for sparkline bars.
         """
         self.output_dir = output_dir
         self.database = database
+        # Shared by every report of this reporter; files are reused by later runs
+        self.sparklines = SparklineRenderer(
+            database, cache_dir=os.path.join(output_dir, "sparklines"), panel=panel) if database is not None else None
         self.css = """
         <style>
             :root {
@@ -265,40 +265,15 @@ class HTMLReporter:
             return "score-med"
         return "score-low"
     
-    def _generate_sparkline(self, symbol: str) -> str:
+    def _add_sparklines(self, candidates: List[Dict[str, Any]]) -> None:
         """
-        Generates a base64 encoded candlestick chart for the last 10 trading days.
+        Sets 'chart_b64' of each candidate to its candlestick chart of the last 10 trading days.
         """
-        try:
-            data = load_historical_data(symbol, database=self.database)
-            if not data or 'days' not in data:
-                return ""
-            
-            df = pd.DataFrame(data['days'])
-            if df.empty:
-                return ""
-                
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date')
-            df = df.tail(10) # Last 10 days
-            
-            # Create buffer
-            buf = io.BytesIO()
-            
-            # Plot
-            # Minimalist style
-            s = mpf.make_mpf_style(base_mpf_style='charles', rc={'font.size': 8})
-            
-            mpf.plot(df, type='candle', style=s, volume=False, 
-                     savefig=dict(fname=buf, dpi=72, bbox_inches='tight', pad_inches=0.1),
-                     figsize=(4, 2), axisoff=True)
-            
-            buf.seek(0)
-            img_str = base64.b64encode(buf.read()).decode('utf-8')
-            return f"data:image/png;base64,{img_str}"
-        except Exception as e:
-            print(f"Error generating chart for {symbol}: {e}")
-            return ""
+        if self.sparklines is None or not candidates:
+            return
+        charts = self.sparklines.render(c['symbol'] for c in candidates)
+        for c in candidates:
+            c['chart_b64'] = charts.get(c['symbol'], "")
 
     def _format_top_list_item(self, c: Dict[str, Any]) -> str:
         # Format: <<SYMBOL>>:<<EXCHANGE>> <<TECH SCORE>> <<ML ATTITUDE>> <<ENTRY>> <<STOP>> <<TARGET>>
@@ -336,7 +311,33 @@ class HTMLReporter:
         return f"<details><summary>{summary_html}</summary>{chart_html}</details>"
 
 
-    def generate_report(self, date: str, regime: Dict[str, Any], candidates: List[Dict[str, Any]], charts: List[str], previous_performance: Dict[str, Any] = None) -> str:
+    def _format_rolling_performance(self, rolling: Dict[str, Any]) -> List[str]:
+        """
+        Table of the rolling scorecard: win rate and PnL by strategy and score bucket.
+        """
+        html = [f"<h2>Rolling Performance <small style='font-size:0.6em; color:#777'>"
+                f"({rolling['sessions']} sessions from {rolling['start']}, {rolling['trades']} trades)</small></h2>"]
+        html.append("<table>")
+        html.append("<tr><th>Strategy</th><th>Score</th><th>Picks</th><th>Entries</th><th>Win Rate</th><th>Avg PnL</th><th>Total PnL</th></tr>")
+        for row in rolling['table']:
+            win_rate = f"{row['win_rate']*100:.0f}%" if row['win_rate'] is not None else "-"
+            avg_pnl = f"{row['avg_pnl']*100:.2f}%" if row['avg_pnl'] is not None else "-"
+            total = row['total_pnl']
+            total_color = "color: #27ae60;" if total > 0 else ("color: #c0392b;" if total < 0 else "color: #777;")
+            weight = "font-weight:bold; " if row['bucket'] == 'All' else ""
+            html.append(f"<tr style='{weight}'>")
+            html.append(f"<td>{row['strategy']}</td>")
+            html.append(f"<td>{row['bucket']}</td>")
+            html.append(f"<td>{row['picks']}</td>")
+            html.append(f"<td>{row['entries']}</td>")
+            html.append(f"<td>{win_rate}</td>")
+            html.append(f"<td>{avg_pnl}</td>")
+            html.append(f"<td style='{total_color}'>{total*100:.2f}%</td>")
+            html.append("</tr>")
+        html.append("</table>")
+        return html
+
+    def generate_report(self, date: str, regime: Dict[str, Any], candidates: List[Dict[str, Any]], charts: List[str], previous_performance: Dict[str, Any] = None, rolling_performance: Dict[str, Any] = None) -> str:
         """
         Builds the complete HTML string.
         """
@@ -346,12 +347,8 @@ class HTMLReporter:
         baseline_top = [c for c in candidates if c.get('strategy') == 'Baseline'][:top_n]
         meanrev_top = [c for c in candidates if c.get('strategy') == 'MeanRev'][:top_n]
 
-        # Generate Sparklines
-        for c in baseline_top:
-            c['chart_b64'] = self._generate_sparkline(c['symbol'])
-            
-        for c in meanrev_top:
-            c['chart_b64'] = self._generate_sparkline(c['symbol'])
+        # Generate Sparklines (one query for all candidates)
+        self._add_sparklines(baseline_top + meanrev_top)
 
         html = [
             "<!DOCTYPE html>",
@@ -469,6 +466,9 @@ class HTMLReporter:
                 
             html.append("</table>")
 
+        if rolling_performance and rolling_performance.get('table'):
+            html.extend(self._format_rolling_performance(rolling_performance))
+
         # Candidates Section - limit to top N by score (primary), then ML confidence (secondary)
         # Preserve Expected P&L sorting from strategy.py - do NOT re-sort
         top_candidates = candidates[:self.TOP_CANDIDATES_TABLE_LIMIT]
@@ -516,7 +516,7 @@ class HTMLReporter:
 
         return "\n".join(html)
 
-    def generate_email_report(self, date: str, regime: Dict[str, Any], candidates: List[Dict[str, Any]], previous_performance: Dict[str, Any] = None) -> str:
+    def generate_email_report(self, date: str, regime: Dict[str, Any], candidates: List[Dict[str, Any]], previous_performance: Dict[str, Any] = None, rolling_performance: Dict[str, Any] = None) -> str:
         """
         Generates a simplified, email-friendly HTML report without JavaScript or interactive elements.
 
@@ -525,6 +525,7 @@ class HTMLReporter:
             regime: Market regime data
             candidates: Trading candidates
             previous_performance: Optional previous day performance data
+            rolling_performance: Optional rolling scorecard (analysis.performance.rolling_performance)
 
         Returns:
             Email-friendly HTML string
@@ -732,6 +733,9 @@ class HTMLReporter:
 
             html.append("</table>")
 
+        if rolling_performance and rolling_performance.get('table'):
+            html.extend(self._format_rolling_performance(rolling_performance))
+
         # Top Candidates Table - simplified
         # Preserve Expected P&L sorting from strategy.py - do NOT re-sort
         top_candidates = candidates[:self.TOP_CANDIDATES_TABLE_LIMIT]
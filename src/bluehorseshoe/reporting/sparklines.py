@@ -0,0 +1,186 @@
+"""
+sparklines.py
+
+Candlestick sparklines of the report's top candidates. The last SPARKLINE_BARS bars
+of every candidate come from the run's UniversePanel when it holds the symbol, and
+otherwise from one query on `historical_prices_recent` (symbols it lacks from one
+more on `historical_prices`). Each chart is written directly as SVG, so no plotting
+library is started per chart.
+
+Charts are cached by (symbol, last bar date): in memory for the life of the
+renderer, and as files under cache_dir when one is given, so regenerating a
+report for the same session reuses the images.
+
+Usage example:
+    renderer = SparklineRenderer(database, cache_dir='src/logs/sparklines')
+    renderer.render(['AAPL', 'MSFT'])   # {'AAPL': 'data:image/svg+xml;base64,...', ...}
+"""
+import base64
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+# Bars per sparkline
+SPARKLINE_BARS = 10
+
+# Size in pixels (the former 4x2 inch figure at 72 dpi)
+SPARKLINE_WIDTH = 288
+SPARKLINE_HEIGHT = 144
+SPARKLINE_PADDING = 6
+
+# Candle colours of mplfinance's 'charles' style
+UP_COLOR = '#006340'
+DOWN_COLOR = '#a02128'
+
+RECENT_COLLECTION = 'historical_prices_recent'
+
+
+def fetch_recent_bars(database, symbols: Iterable[str], bars: int = SPARKLINE_BARS) -> Dict[str, List[Dict]]:
+    """
+    Last `bars` bars of each symbol, in one query (two if the recent collection lacks some).
+
+    Returns:
+        Dict[str, List[Dict]]: symbol -> bars, oldest first (symbols without bars are absent).
+    """
+    symbols = list(dict.fromkeys(symbols))
+    found: Dict[str, List[Dict]] = {}
+    for collection in (RECENT_COLLECTION, 'historical_prices'):
+        missing = [s for s in symbols if s not in found]
+        if not missing:
+            break
+        cursor = database[collection].find(
+            {'symbol': {'$in': missing}},
+            {'_id': 0, 'symbol': 1, 'days': {'$slice': -bars}}
+        )
+        found.update({doc['symbol']: doc['days'] for doc in cursor if doc.get('days')})
+    return found
+
+
+def _candle(bar: Dict) -> Optional[Tuple[float, float, float, float]]:
+    try:
+        close = float(bar['close'])
+        return (float(bar.get('open') or close), float(bar.get('high') or close),
+                float(bar.get('low') or close), close)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def render_svg(bars: List[Dict], width: int = SPARKLINE_WIDTH, height: int = SPARKLINE_HEIGHT) -> str:
+    """
+    Candlestick chart of bars (open/high/low/close) as an SVG document ('' without bars).
+    """
+    candles = [c for c in (_candle(b) for b in bars) if c is not None]
+    if not candles:
+        return ''
+    top = max(c[1] for c in candles)
+    bottom = min(c[2] for c in candles)
+    span = (top - bottom) or 1.0
+    inner = height - 2 * SPARKLINE_PADDING
+    slot = (width - 2 * SPARKLINE_PADDING) / len(candles)
+    body_width = max(slot * 0.6, 1.0)
+
+    def y(price: float) -> float:
+        return SPARKLINE_PADDING + (top - price) / span * inner
+
+    shapes = []
+    for i, (open_, high, low, close) in enumerate(candles):
+        color = UP_COLOR if close >= open_ else DOWN_COLOR
+        x = SPARKLINE_PADDING + (i + 0.5) * slot
+        body_top, body_bottom = y(max(open_, close)), y(min(open_, close))
+        shapes.append(f'<line x1="{x:.1f}" y1="{y(high):.1f}" x2="{x:.1f}" y2="{y(low):.1f}" stroke="{color}"/>')
+        shapes.append(f'<rect x="{x - body_width / 2:.1f}" y="{body_top:.1f}" width="{body_width:.1f}" '
+                      f'height="{max(body_bottom - body_top, 1.0):.1f}" fill="{color}"/>')
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">{"".join(shapes)}</svg>')
+
+
+def _data_uri(svg: str) -> str:
+    return f"data:image/svg+xml;base64,{base64.b64encode(svg.encode('utf-8')).decode('ascii')}"
+
+
+class SparklineRenderer:
+    """
+    Renders and caches the sparklines of a report's candidates.
+
+    Args:
+        database: MongoDB database instance. Required.
+        cache_dir: Directory of the on-disk cache (None = memory only).
+        bars: Bars per sparkline.
+        panel: Optional UniversePanel of the run; its symbols are not queried.
+    """
+
+    def __init__(self, database=None, cache_dir: Optional[str] = None, bars: int = SPARKLINE_BARS,
+                 panel=None):
+        if database is None:
+            raise ValueError("database parameter is required for SparklineRenderer")
+        self.database = database
+        self.cache_dir = cache_dir
+        self.bars = bars
+        self.panel = panel
+        self._cache: Dict[Tuple[str, str], str] = {}
+
+    def _path(self, key: Tuple[str, str]) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        symbol = re.sub(r'[^A-Za-z0-9.\-]', '_', key[0])
+        return os.path.join(self.cache_dir, f"{symbol}_{key[1]}.svg")
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[str]:
+        if key in self._cache:
+            return self._cache[key]
+        path = self._path(key)
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._cache[key] = _data_uri(f.read())
+            return self._cache[key]
+        return None
+
+    def _store(self, key: Tuple[str, str], svg: str) -> str:
+        self._cache[key] = _data_uri(svg)
+        path = self._path(key)
+        if path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(svg)
+            except OSError as e:
+                logging.warning("Failed to cache sparkline %s: %s", path, e)
+        return self._cache[key]
+
+    def _panel_bars(self, symbol: str) -> Optional[List[Dict]]:
+        if self.panel is None or symbol not in self.panel:
+            return None
+        df = self.panel.frame(symbol).tail(self.bars)
+        df = df.assign(date=df['date'].dt.strftime('%Y-%m-%d'))
+        return df[['date', 'open', 'high', 'low', 'close']].to_dict('records') if 'open' in df else None
+
+    def render(self, symbols: Iterable[str]) -> Dict[str, str]:
+        """
+        Sparklines of symbols as data URIs, usable as an <img> src.
+
+        Returns:
+            Dict[str, str]: symbol -> data URI ('' for symbols without bars or on a query failure).
+        """
+        symbols = list(dict.fromkeys(symbols))
+        recent = {s: bars for s, bars in ((s, self._panel_bars(s)) for s in symbols) if bars}
+        try:
+            recent.update(fetch_recent_bars(self.database, [s for s in symbols if s not in recent], self.bars))
+        except PyMongoError as e:
+            logging.error("Failed to load sparkline bars: %s", e)
+
+        charts = {}
+        for symbol in symbols:
+            bars = recent.get(symbol)
+            if not bars:
+                charts[symbol] = ''
+                continue
+            key = (symbol, str(bars[-1].get('date', ''))[:10])
+            cached = self._cached(key)
+            if cached is None:
+                svg = render_svg(bars)
+                cached = self._store(key, svg) if svg else ''
+            charts[symbol] = cached
+        return charts
@@ -1,7 +1,7 @@
 """
 Deep Data Quality Audit Script
 Scans MongoDB 'historical_prices' for:
-1. Gaps in trading days (vs business days)
+1. Gaps in trading days (vs NYSE sessions)
 2. Logical inconsistencies (High < Low)
 3. Zero/Null values
 4. Extreme price spikes (>50% daily change)
@@ -17,6 +17,7 @@ sys.path.append(os.path.join(os.getcwd(), 'src'))
 
 # pylint: disable=wrong-import-position
 from bluehorseshoe.core.container import create_app_container
+from bluehorseshoe.core.trading_calendar import get_trading_calendar
 
 # Setup logging
 logging.basicConfig(
@@ -72,7 +73,7 @@ def audit_symbol(df):
     start_date = df['date_dt'].min()
     end_date = df['date_dt'].max()
 
-    expected_days = pd.bdate_range(start=start_date, end=end_date)
+    expected_days = pd.to_datetime(get_trading_calendar().range(start_date, end_date))
     actual_days = set(df['date_dt'])
 
     missing_days = [d for d in expected_days if d not in actual_days]
@@ -82,7 +83,7 @@ def audit_symbol(df):
         missing_ratio = len(missing_days) / total_range if total_range > 0 else 0
 
         if missing_ratio > 0.10:
-            issues.append(f"GAPS: Missing {len(missing_days)} business days ({missing_ratio:.1%} of range)")
+            issues.append(f"GAPS: Missing {len(missing_days)} trading days ({missing_ratio:.1%} of range)")
 
     return issues
 
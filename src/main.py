@@ -31,7 +31,9 @@ from sklearn.exceptions import ConvergenceWarning
 from bluehorseshoe.reporting.html_reporter import HTMLReporter
 from bluehorseshoe.cli.context import create_cli_context
 from bluehorseshoe.core.service import get_latest_market_date
+from bluehorseshoe.core.trading_calendar import update_trading_calendar
 from bluehorseshoe.data.historical_data import build_all_symbols_history, check_market_status, BackfillConfig
+from bluehorseshoe.data.universe_panel import UniversePanel, panel_start_date
 from bluehorseshoe.analysis.strategy import SwingTrader
 from bluehorseshoe.analysis.optimizer import WeightOptimizer
 
@@ -107,8 +109,19 @@ if __name__ == "__main__":
                 pass # Will default to all symbols
 
         with create_cli_context() as ctx:
-            build_all_symbols_history(BackfillConfig(recent=True, symbols=symbols_filter), database=ctx.db)
+            build_all_symbols_history(BackfillConfig(recent=True, symbols=symbols_filter,
+                                                     concurrency=ctx.config.fetch_concurrency), database=ctx.db)
             logging.info("Recent historical data updated.")
+
+            sessions = update_trading_calendar(database=ctx.db)
+            logging.info("Trading calendar updated (%d sessions).", sessions)
+
+            from bluehorseshoe.analysis.market_regime import MarketRegime
+            regime_since = None
+            if "--regime-since" in sys.argv:
+                regime_since = sys.argv[sys.argv.index("--regime-since") + 1]
+            written = MarketRegime.update_history(database=ctx.db, start_date=regime_since)
+            logging.info("Market regime history updated (%d sessions).", written)
     elif "-b" in sys.argv:
         resume = "--resume" in sys.argv
         limit = None
@@ -126,7 +139,8 @@ if __name__ == "__main__":
                 pass
 
         with create_cli_context() as ctx:
-            build_all_symbols_history(BackfillConfig(recent=False, resume=resume, limit=limit, symbols=symbols_filter), database=ctx.db)
+            build_all_symbols_history(BackfillConfig(recent=False, resume=resume, limit=limit, symbols=symbols_filter,
+                                                     concurrency=ctx.config.fetch_concurrency), database=ctx.db)
             logging.info("Full historical data updated.")
     elif "-p" in sys.argv:
         logging.info('Predicting next midpoints...')
@@ -166,15 +180,24 @@ if __name__ == "__main__":
                 report_writer=ctx.report_writer
             )
 
+            # Pre-screen first, then one panel of the survivors for the run: scores
+            # them at once and feeds the sparklines
+            symbols = trader.screen_symbols(symbols_filter, target_date)
+            panel = UniversePanel.from_database(
+                ctx.db, symbols=symbols, start_date=panel_start_date(target_date), end_date=target_date)
+            trader.panel = panel
+
             report_data = trader.swing_predict(
                 target_date=target_date,
                 enabled_indicators=enabled_indicators,
                 aggregation=aggregation,
-                symbols=symbols_filter
+                symbols=symbols,
+                screened=True
             )
             
             # Calculate previous day's performance
             prev_perf = trader.get_previous_performance(target_date)
+            rolling_perf = trader.get_rolling_performance(target_date)
 
             # Generate HTML Report
             if report_data:
@@ -185,7 +208,7 @@ if __name__ == "__main__":
                 regime_for_html['spy_ma50'] = spy_details.get('ema50', 'N/A')
                 regime_for_html['spy_ma200'] = spy_details.get('ema200', 'N/A')
 
-                reporter = HTMLReporter(database=ctx.db)
+                reporter = HTMLReporter(database=ctx.db, panel=panel)
 
                 # Generate full interactive report
                 html_content = reporter.generate_report(
@@ -193,7 +216,8 @@ if __name__ == "__main__":
                     regime=regime_for_html,
                     candidates=report_data.get('candidates', []),
                     charts=report_data.get('charts', []),
-                    previous_performance=prev_perf
+                    previous_performance=prev_perf,
+                    rolling_performance=rolling_perf
                 )
 
                 # Generate email-friendly report (no JavaScript, no charts)
@@ -201,7 +225,8 @@ if __name__ == "__main__":
                     date=target_date,
                     regime=regime_for_html,
                     candidates=report_data.get('candidates', []),
-                    previous_performance=prev_perf
+                    previous_performance=prev_perf,
+                    rolling_performance=rolling_perf
                 )
 
                 # Save both versions
@@ -314,6 +339,7 @@ if __name__ == "__main__":
             # Calculate previous day's performance
             trader = SwingTrader(database=ctx.db)
             prev_perf = trader.get_previous_performance(target_date)
+            rolling_perf = trader.get_rolling_performance(target_date)
 
             reporter = HTMLReporter(database=ctx.db)
 
@@ -323,7 +349,8 @@ if __name__ == "__main__":
                 regime=market_health,
                 candidates=top_candidates,
                 charts=[],
-                previous_performance=prev_perf
+                previous_performance=prev_perf,
+                rolling_performance=rolling_perf
             )
 
             # Generate email-friendly report (no JavaScript, no charts)
@@ -331,7 +358,8 @@ if __name__ == "__main__":
                 date=target_date,
                 regime=market_health,
                 candidates=top_candidates,
-                previous_performance=prev_perf
+                previous_performance=prev_perf,
+                rolling_performance=rolling_perf
             )
 
             # Save both versions
@@ -397,7 +425,41 @@ if __name__ == "__main__":
                     symbols=symbols_filter
                 )
 
-                if "--end" in sys.argv:
+                if "--end" in sys.argv and "--walk-forward" in sys.argv:
+                    from bluehorseshoe.analysis.backtest import summarize_range_results
+                    from bluehorseshoe.analysis.walk_forward import WALK_FORWARD_SUMMARY_TITLE, WalkForwardBacktester
+
+                    end_date = sys.argv[sys.argv.index("--end") + 1]
+                    interval = int(sys.argv[sys.argv.index("--interval") + 1]) if "--interval" in sys.argv else 7
+                    logging.info("Running walk-forward backtest from %s to %s | Strategy: %s...", target_date, end_date, strategy)
+                    panel = UniversePanel.from_database(
+                        ctx.db, symbols=symbols_filter, start_date=panel_start_date(target_date))
+                    results = WalkForwardBacktester(config=config, panel=panel).run(
+                        target_date, end_date, interval_days=interval, options=options)
+                    results_path = 'src/logs/walk_forward_results.csv'
+                    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+                    results.to_csv(results_path, index=False)
+                    print(f"Walk-forward results ({len(results)} trades) saved to {results_path}")
+                    # Unfilled and open trades have NaN entry/exit in the frame
+                    summarize_range_results(results.dropna(subset=['entry', 'exit_price']).to_dict('records'),
+                                            title=WALK_FORWARD_SUMMARY_TITLE)
+
+                    if "--portfolio" in sys.argv:
+                        from bluehorseshoe.analysis.portfolio import PortfolioConfig, PortfolioSimulator
+
+                        portfolio_config = PortfolioConfig(hold_days=hold_days)
+                        if "--capital" in sys.argv:
+                            portfolio_config.initial_capital = float(sys.argv[sys.argv.index("--capital") + 1])
+                        if "--risk" in sys.argv:
+                            portfolio_config.risk_percent = float(sys.argv[sys.argv.index("--risk") + 1])
+                        if "--max-positions" in sys.argv:
+                            portfolio_config.max_positions = int(sys.argv[sys.argv.index("--max-positions") + 1])
+                        portfolio = PortfolioSimulator(portfolio_config).run(results, panel)
+                        portfolio.equity.to_frame('equity').assign(drawdown=portfolio.drawdown).to_csv(
+                            'src/logs/walk_forward_equity.csv')
+                        for key, value in portfolio.summary().items():
+                            print(f"  {key}: {value:,.2f}")
+                elif "--end" in sys.argv:
                     end_date = sys.argv[sys.argv.index("--end") + 1]
                     interval = int(sys.argv[sys.argv.index("--interval") + 1]) if "--interval" in sys.argv else 7
                     logging.info("Running range backtest from %s to %s | Strategy: %s...", target_date, end_date, strategy)
@@ -407,7 +469,8 @@ if __name__ == "__main__":
                     tester.run_backtest(target_date, options=options)
             except (IndexError, ValueError) as e:
                 logging.error("Invalid arguments for backtesting: %s", e)
-                print("Usage: python main.py -t START_DATE [--end END_DATE] [--interval 7] [--target 1.01] [--stop 0.98] [--hold 3]")
+                print("Usage: python main.py -t START_DATE [--end END_DATE [--walk-forward [--portfolio]]] [--interval 7] "
+                      "[--target 1.01] [--stop 0.98] [--hold 3]")
     elif "-o" in sys.argv:
         logging.info("Optimizing indicator weights...")
         WeightOptimizer().run_optimization()
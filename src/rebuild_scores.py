@@ -3,35 +3,42 @@ Script to rebuild trade scores for a historical date range.
 """
 import sys
 import logging
-from datetime import datetime, timedelta
 # pylint: disable=wrong-import-position
+from bluehorseshoe.analysis.score_history import ScoreHistoryBuilder
 from bluehorseshoe.analysis.strategy import SwingTrader
 from bluehorseshoe.cli.context import create_cli_context
+from bluehorseshoe.core.trading_calendar import get_trading_calendar
+from bluehorseshoe.data.universe_panel import UniversePanel, panel_start_date
 
 def rebuild_scores(start_date: str, end_date: str, inverted: bool = False, symbols: list[str] = None): # pylint: disable=unused-argument
     """
     Rebuilds scores for a range of dates.
     """
     with create_cli_context() as ctx:
-        trader = SwingTrader(database=ctx.db, config=ctx.config, report_writer=ctx.report_writer)
+        # One panel covers every date of the range; each date is a point-in-time slice of it
+        panel = UniversePanel.from_database(
+            ctx.db, symbols=symbols, start_date=panel_start_date(start_date), end_date=end_date)
+        trader = SwingTrader(database=ctx.db, config=ctx.config, report_writer=ctx.report_writer, panel=panel)
 
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
+        # Sessions only: weekends and exchange holidays are skipped
+        for date_str in get_trading_calendar(ctx.db).range(start_date, end_date):
+            print(f"\nRebuilding scores for {date_str}...")
+            trader.swing_predict(target_date=date_str, symbols=symbols)
 
-        current = start
-        while current <= end:
-            # Skip weekends
-            if current.weekday() < 5:
-                date_str = current.strftime('%Y-%m-%d')
-                print(f"\nRebuilding scores for {date_str}...")
-                trader.swing_predict(target_date=date_str, symbols=symbols)
-            current += timedelta(days=1)
+def rebuild_score_history(start_date: str, end_date: str, symbols: list[str] = None, overwrite: bool = False) -> int:
+    """
+    Rebuilds technical scores for a range of dates in one pass per symbol.
+    Existing scores are kept unless overwrite is set.
+    """
+    with create_cli_context() as ctx:
+        builder = ScoreHistoryBuilder(database=ctx.db, overwrite=overwrite)
+        return builder.build(start_date, end_date, symbols=symbols)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
     if len(sys.argv) < 3:
-        print("Usage: python src/rebuild_scores.py <start_date> <end_date> [--inverted] [--symbols=A,AAPL]")
+        print("Usage: python src/rebuild_scores.py <start_date> <end_date> [--inverted] [--symbols=A,AAPL] [--bulk [--overwrite]]")
         sys.exit(1)
 
     start_dt = sys.argv[1]
@@ -44,5 +51,9 @@ if __name__ == "__main__":
         if arg.startswith("--symbols="):
             symbols_filter = arg.split("=")[1].split(",")
 
-    rebuild_scores(start_dt, end_dt, inverted=is_inverted, symbols=symbols_filter)
+    if "--bulk" in sys.argv:
+        count = rebuild_score_history(start_dt, end_dt, symbols=symbols_filter, overwrite="--overwrite" in sys.argv)
+        print(f"\nWrote {count} technical scores.")
+    else:
+        rebuild_scores(start_dt, end_dt, inverted=is_inverted, symbols=symbols_filter)
     print("\nRebuild complete.")
\ No newline at end of file
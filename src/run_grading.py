@@ -87,7 +87,7 @@ def main():
             print(f"Filtering by strategy: {args.strategy}")
 
         print(f"Fetching up to {args.limit} scores and evaluating performance...")
-        results = engine.run_grading(query=query, limit=args.limit, database=ctx.db)
+        results = engine.run_grading(query=query, limit=args.limit, database=ctx.db, preload=True)
 
         if not results:
             print("No results found.")
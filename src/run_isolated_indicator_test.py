@@ -14,6 +14,10 @@ Usage:
 
     # Test with a specific name for tracking
     python src/run_isolated_indicator_test.py --indicator RSI --name rsi_boost_2x --multiplier 2.0 --runs 20
+
+    # Score from a raw-signal cache instead of a backtest per run (baseline only);
+    # the cache is built on first use and reused by later indicators and multipliers
+    python src/run_isolated_indicator_test.py --indicator RSI --multiplier 2.0 --runs 20 --sweep
 """
 
 import sys
@@ -133,6 +137,115 @@ def get_valid_dates(database, min_history_days=100, min_future_days=7):
     return valid_dates
 
 
+def _summarize_trades(pnl_per_trade: list, winning_trades: int) -> dict:
+    """Win rate, PnL, Sharpe ratio and drawdown of trades given their PnL (%) and win count."""
+    total_trades = len(pnl_per_trade)
+    total_pnl = float(np.sum(pnl_per_trade)) if pnl_per_trade else 0.0
+    avg_pnl = total_pnl / total_trades if total_trades > 0 else 0
+
+    # Sharpe Ratio (annualized, assuming ~252 trading days and 5-day holds)
+    sharpe_ratio = 0.0
+    if total_trades > 1:
+        std_pnl = np.std(pnl_per_trade, ddof=1)
+        if std_pnl > 0:
+            sharpe_ratio = (avg_pnl / std_pnl) * np.sqrt(252 / 5)
+
+    max_drawdown = 0.0
+    if pnl_per_trade:
+        cumulative = np.cumsum(pnl_per_trade)
+        max_drawdown = float(np.max(np.maximum.accumulate(cumulative) - cumulative))
+
+    return {
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'win_rate': (winning_trades / total_trades * 100) if total_trades > 0 else 0,
+        'avg_pnl': avg_pnl,
+        'total_pnl': total_pnl,
+        'sharpe_ratio': sharpe_ratio,
+        'max_drawdown': max_drawdown,
+        'pnl_std': float(np.std(pnl_per_trade, ddof=1)) if total_trades > 1 else 0.0
+    }
+
+
+def run_sweep_experiment(
+    indicator_name: str,
+    multiplier: float,
+    num_runs: int,
+    experiment_name: str = None,
+    cache_path: str = str(EXPERIMENTS_DIR / "signal_cache.npz")
+) -> dict:
+    """
+    Run an isolated indicator experiment against a raw-signal cache (baseline only).
+
+    The sub-indicator signals of the sampled dates and symbols are computed once and
+    saved to cache_path; each experiment is then one weight matrix product per date
+    and a vectorized grading pass, without rewriting weights.json. Candidates are
+    entered at the signal-date close (see WeightSweep), so results differ from the
+    full backtest's limit-order entries and ML filters.
+    """
+    from bluehorseshoe.analysis.signal_cache import SignalCache, WeightSweep
+    from bluehorseshoe.core.symbols import get_symbol_name_list
+    from bluehorseshoe.data.universe_panel import UniversePanel, panel_start_date
+
+    if experiment_name is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        experiment_name = f"{indicator_name.lower()}_m{multiplier}_{timestamp}"
+    isolated_weights = create_isolated_weights(indicator_name, multiplier, 'baseline')
+
+    container = create_app_container()
+    try:
+        database = container.get_database()
+        cache = SignalCache.load(cache_path) if Path(cache_path).exists() else None
+        if cache is not None:
+            symbols, dates = cache.symbols, cache.dates
+            print(f"Loaded signal cache {cache_path} ({len(dates)} dates x {len(symbols)} symbols)")
+        else:
+            all_symbols = get_symbol_name_list(database=database)
+            symbols = random.sample(all_symbols, min(1000, len(all_symbols)))
+            valid_dates = get_valid_dates(database)
+            dates = sorted({d.strftime('%Y-%m-%d') for d in random.sample(valid_dates, min(num_runs, len(valid_dates)))})
+
+        panel = UniversePanel.from_database(database, symbols=symbols, start_date=panel_start_date(min(dates)))
+    finally:
+        container.close()
+
+    if cache is None:
+        print(f"Building signal cache for {len(dates)} dates...")
+        cache = SignalCache.build(panel, dates)
+        cache.save(cache_path)
+        print(f"✓ Saved {cache_path}")
+
+    config = BacktestConfig(target_profit_factor=1.05, stop_loss_factor=0.95, hold_days=5)
+    result = WeightSweep(cache, panel, config=config, top_n=5).run([isolated_weights], [experiment_name])[0]
+    graded = result.trades[result.trades['status'].isin(['success', 'failure'])] if len(result.trades) else result.trades
+    all_trades = [
+        {'date': t['date'], 'symbol': t['symbol'], 'entry': t['entry'], 'exit': t['exit_price'],
+         'pnl_pct': t['pnl'], 'status': t['status']}
+        for t in graded.to_dict('records')
+    ]
+    winning_trades = sum(1 for t in all_trades if t['status'] == 'success')
+
+    experiment_results = {
+        'experiment_name': experiment_name,
+        'indicator': indicator_name,
+        'multiplier': multiplier,
+        'strategy': 'baseline',
+        'mode': 'sweep',
+        'timestamp': datetime.now().isoformat(),
+        'runs': len(cache.dates),
+        'metrics': _summarize_trades([t['pnl_pct'] for t in all_trades], winning_trades),
+        'trades': all_trades
+    }
+    results_path = EXPERIMENTS_DIR / "results" / f"{experiment_name}.json"
+    with open(results_path, 'w') as f:
+        json.dump(experiment_results, f, indent=2)
+    metrics = experiment_results['metrics']
+    print(f"Trades: {metrics['total_trades']} | Win Rate: {metrics['win_rate']:.2f}% | "
+          f"Avg PnL: {metrics['avg_pnl']:.2f}% | Sharpe: {metrics['sharpe_ratio']:.3f}")
+    print(f"✓ Results saved: {results_path}")
+    return experiment_results
+
+
 def run_experiment(
     indicator_name: str,
     multiplier: float,
@@ -276,23 +389,9 @@ def run_experiment(
                 print("No trades")
 
         # Calculate statistics
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-        avg_pnl = total_pnl / total_trades if total_trades > 0 else 0
-
-        # Calculate Sharpe Ratio (annualized, assuming ~252 trading days)
-        sharpe_ratio = 0.0
-        if len(pnl_per_trade) > 1:
-            std_pnl = np.std(pnl_per_trade, ddof=1)
-            if std_pnl > 0:
-                sharpe_ratio = (avg_pnl / std_pnl) * np.sqrt(252 / 5)  # 5-day holds
-
-        # Calculate max drawdown
-        max_drawdown = 0.0
-        if pnl_per_trade:
-            cumulative = np.cumsum(pnl_per_trade)
-            running_max = np.maximum.accumulate(cumulative)
-            drawdown = running_max - cumulative
-            max_drawdown = np.max(drawdown) if len(drawdown) > 0 else 0.0
+        metrics = _summarize_trades(pnl_per_trade, winning_trades)
+        win_rate, avg_pnl = metrics['win_rate'], metrics['avg_pnl']
+        sharpe_ratio, max_drawdown = metrics['sharpe_ratio'], metrics['max_drawdown']
 
         # Compile results
         experiment_results = {
@@ -302,16 +401,7 @@ def run_experiment(
             'strategy': strategy,
             'timestamp': datetime.now().isoformat(),
             'runs': num_runs,
-            'metrics': {
-                'total_trades': total_trades,
-                'winning_trades': winning_trades,
-                'win_rate': win_rate,
-                'avg_pnl': avg_pnl,
-                'total_pnl': total_pnl,
-                'sharpe_ratio': sharpe_ratio,
-                'max_drawdown': max_drawdown,
-                'pnl_std': np.std(pnl_per_trade, ddof=1) if len(pnl_per_trade) > 1 else 0.0
-            },
+            'metrics': metrics,
             'trades': all_trades
         }
 
@@ -422,12 +512,34 @@ def main():
         choices=['baseline', 'mean_reversion'],
         help='Strategy to use (default: baseline)'
     )
+    parser.add_argument(
+        '--sweep',
+        action='store_true',
+        help='Evaluate against a raw-signal cache instead of running backtests (baseline only)'
+    )
+    parser.add_argument(
+        '--cache',
+        default=str(EXPERIMENTS_DIR / "signal_cache.npz"),
+        help='Signal cache file used by --sweep (built if missing)'
+    )
 
     args = parser.parse_args()
 
     # Setup logging
     logging.basicConfig(level=logging.WARNING, format='%(message)s')
 
+    if args.sweep:
+        if args.strategy != 'baseline':
+            parser.error("--sweep only supports the baseline strategy")
+        run_sweep_experiment(
+            indicator_name=args.indicator,
+            multiplier=args.multiplier,
+            num_runs=args.runs,
+            experiment_name=args.name,
+            cache_path=args.cache
+        )
+        return
+
     # Run experiment
     run_experiment(
         indicator_name=args.indicator,
@@ -8,9 +8,15 @@ to determine standalone performance and optimal weights.
 Uses random sample of 1,000 symbols per backtest for statistical significance
 while maintaining reasonable execution time.
 
+With --cache, every indicator/weight configuration is evaluated in-process against
+a raw-signal cache (see bluehorseshoe.analysis.signal_cache) instead of rewriting
+weights.json and launching one backtest subprocess per date. The cache is built on
+the first run and reused by later sweeps over the same dates and symbols.
+
 Usage:
     python src/run_phase3_testing.py --indicator RS --weight 1.0 --runs 20
     python src/run_phase3_testing.py --indicator all --runs 20
+    python src/run_phase3_testing.py --indicator all --runs 20 --cache src/experiments/phase3_signals.npz
 """
 
 import sys
@@ -335,6 +341,51 @@ def test_indicator(indicator_code, weight, num_runs, start_date, end_date, sampl
     return successful_runs
 
 
+def run_sweep(indicators_to_test, weight, args):
+    """Evaluate every indicator/weight configuration against a raw-signal cache."""
+    from bluehorseshoe.analysis.signal_cache import SignalCache, WeightSweep
+    from bluehorseshoe.data.universe_panel import UniversePanel, panel_start_date
+
+    cache_path = Path(args.cache)
+    cache = SignalCache.load(cache_path) if cache_path.exists() else None
+    if cache is not None:
+        symbols, dates = cache.symbols, cache.dates
+        print(f"Loaded signal cache {cache_path} ({len(dates)} dates x {len(symbols)} symbols)")
+    else:
+        symbols = get_random_symbols(args.sample_size)
+        dates = sorted(generate_random_dates(args.start_date, args.end_date, args.runs))
+
+    client = MongoClient(os.getenv('MONGO_URI', 'mongodb://mongo:27017'))
+    database = client[os.getenv('MONGO_DB', 'bluehorseshoe')]
+    print("Building universe panel...", end=' ', flush=True)
+    panel = UniversePanel.from_database(database, symbols=symbols, start_date=panel_start_date(min(dates)))
+    client.close()
+    print(f"✓ ({len(panel)} symbols x {len(panel.dates)} dates)")
+
+    if cache is None:
+        print(f"Building signal cache for {len(dates)} dates...", flush=True)
+        cache = SignalCache.build(panel, dates)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache.save(cache_path)
+        print(f"✓ Saved {cache_path}")
+
+    configs, labels = [], []
+    for indicator_code in indicators_to_test:
+        weights_to_test = [weight] if weight is not None else PHASE3_INDICATORS[indicator_code]['weights']
+        for value in weights_to_test:
+            configs.append(create_test_config(indicator_code, value))
+            labels.append(f"{indicator_code}@{value}")
+
+    sweep = WeightSweep(cache, panel, top_n=args.top_n)
+    summary = WeightSweep.summarize(sweep.run(configs, labels))
+    print(f"\n{summary.to_string(index=False)}")
+
+    output_path = Path('src/logs/phase3_sweep.csv')
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(output_path, index=False)
+    print(f"\nResults saved to: {output_path}")
+
+
 def main():
     parser = argparse.ArgumentParser(description='Phase 3A Isolated Indicator Testing')
     parser.add_argument('--indicator', type=str, required=True,
@@ -350,6 +401,10 @@ def main():
                        help='Start date for random backtest dates (default: 2024-01-01)')
     parser.add_argument('--end-date', type=str, default='2026-01-27',
                        help='End date for random backtest dates (default: 2026-01-27)')
+    parser.add_argument('--cache', type=str,
+                       help='Raw-signal cache (.npz) to sweep in-process; built if missing')
+    parser.add_argument('--top-n', type=int, default=5,
+                       help='Candidates per date in --cache sweeps (default: 5)')
 
     args = parser.parse_args()
 
@@ -359,6 +414,10 @@ def main():
     else:
         indicators_to_test = [args.indicator]
 
+    if args.cache:
+        run_sweep(indicators_to_test, args.weight, args)
+        return
+
     # Track overall progress
     total_tests = 0
     total_successful = 0
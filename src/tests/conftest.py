@@ -0,0 +1,52 @@
+"""
+Shared test helpers: an in-memory database and random-walk price histories with the
+stored indicator columns.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.data.columnar_store import days_to_columns
+from bluehorseshoe.data.historical_data import get_technical_indicators
+
+
+@pytest.fixture(name='database')
+def fixture_database():
+    """An empty mongomock database (tests are skipped without mongomock)."""
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['test']
+
+
+def random_walk_bars(rng, dates, vol, price=50.0, drift=0.0, volume=(50_000, 3_000_000)):
+    """
+    OHLCV bars of a geometric random walk, rounded to cents.
+
+    Args:
+        rng: numpy Generator the prices and volumes are drawn from.
+        dates: Bar dates ('YYYY-MM-DD' strings), one per bar.
+        vol: Daily log-return volatility (opens and wicks use half of it).
+        price: Scale of the first close.
+        drift: Mean daily log return.
+        volume: Low (inclusive) and high (exclusive) bound of the daily volume.
+    """
+    n = len(dates)
+    close = price * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    open_ = close * np.exp(rng.normal(0, vol / 2, n))
+    return pd.DataFrame({
+        'date': list(dates),
+        'open': open_.round(2),
+        'high': (np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))).round(2),
+        'low': (np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))).round(2),
+        'close': close.round(2),
+        'volume': rng.integers(volume[0], volume[1], n),
+    })
+
+
+def indicator_frame(rng, dates, vol, **kwargs):
+    """random_walk_bars with the stored indicator columns computed over all of it, as a DataFrame."""
+    return pd.DataFrame(get_technical_indicators(random_walk_bars(rng, dates, vol, **kwargs)))
+
+
+def indicator_columns(rng, dates, vol, **kwargs):
+    """random_walk_bars with the stored indicator columns, as panel column arrays (see days_to_columns)."""
+    return days_to_columns(get_technical_indicators(random_walk_bars(rng, dates, vol, **kwargs)))
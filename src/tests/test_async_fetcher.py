@@ -0,0 +1,81 @@
+"""
+Tests for the async Alpha Vantage fetch engine, run against a local fake HTTP server.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bluehorseshoe.data.async_fetcher import AlphaVantageFetcher
+from bluehorseshoe.data.historical_data import parse_daily_series
+
+SERIES = {
+    "Time Series (Daily)": {
+        "2024-01-03": {"1. open": "10", "2. high": "11", "3. low": "9", "4. close": "10.5",
+                       "5. adjusted close": "10.5", "6. volume": "1000"},
+        "2024-01-02": {"1. open": "9", "2. high": "10", "3. low": "8", "4. close": "9.5",
+                       "5. adjusted close": "9.5", "6. volume": "900"},
+    }
+}
+
+
+def _serve(throttle_first):
+    """Starts a fake Alpha Vantage server; throttles the first call for each symbol in throttle_first."""
+    calls = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        """Answers TIME_SERIES_DAILY_ADJUSTED queries."""
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Serves a throttle note, an error or the daily series."""
+            symbol = parse_qs(urlparse(self.path).query)['symbol'][0]
+            with lock:
+                calls.append((symbol, time.monotonic()))
+                first_call = sum(1 for s, _ in calls if s == symbol) == 1
+            if symbol in throttle_first and first_call:
+                body = {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+            elif symbol == 'BAD':
+                body = {"Error Message": "Invalid API call."}
+            else:
+                body = SERIES
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, calls
+
+
+def test_fetcher_retries_throttle_and_honors_rate():
+    """
+    Throttled symbols are retried, permanent errors are not, and the shared bucket caps the request rate.
+    """
+    server, calls = _serve(throttle_first={'MSFT'})
+    try:
+        fetcher = AlphaVantageFetcher(parse=parse_daily_series, cps=20, concurrency=4,
+                                      base_url=f"http://127.0.0.1:{server.server_address[1]}/query",
+                                      backoff_seconds=0.05)
+        stored = {}
+        summary = fetcher.run(['AAPL', 'MSFT', 'SPY', 'QQQ', 'BAD'], recent=True,
+                              store=lambda result: stored.update({result.symbol: result}))
+    finally:
+        server.shutdown()
+
+    assert summary == {'fetched': 4, 'failed': 1, 'stored': 5, 'retries': 1}
+    assert stored['MSFT'].attempts == 2
+    assert [d['date'] for d in stored['AAPL'].data['days']] == ['2024-01-03', '2024-01-02']
+    assert stored['BAD'].data is None and stored['BAD'].attempts == 1
+
+    # 6 requests at 20/s: consecutive starts are spaced by the bucket, not fired at once
+    starts = sorted(t for _, t in calls)
+    assert len(starts) == 6
+    assert starts[-1] - starts[0] >= 5 / 20 * 0.9
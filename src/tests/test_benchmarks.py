@@ -0,0 +1,54 @@
+"""
+Tests for the benchmark suite: synthetic universes, measurement and run comparison.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.harness import BenchmarkResult, compare_runs, measure
+from benchmarks.synthetic import (
+    SCORE_FUTURE_BARS, SYNTHETIC_SCORE_VERSION, SyntheticUniverse, seed_database, seed_trade_scores
+)
+from bluehorseshoe.analysis.market_regime import MarketRegime
+
+
+def test_synthetic_universe_is_deterministic():
+    """Same seed, same bars; named symbols first; prices keep OHLC order."""
+    universe = SyntheticUniverse(n_symbols=30, years=1, seed=3)
+    assert universe.symbols[:2] == MarketRegime.INDICES and len(set(universe.symbols)) == 30
+    df = universe.ohlcv(5)
+    assert len(df) == universe.n_bars == len(universe.sessions)
+    assert df.equals(universe.ohlcv(5)) and not df.equals(universe.ohlcv(6))
+    assert (df['high'] >= df[['open', 'close']].max(axis=1)).all()
+    assert (df['low'] <= df[['open', 'close']].min(axis=1)).all()
+
+
+def test_measure_and_compare_runs():
+    """Throughput and rates come from the timed counts; slower runs are flagged."""
+    result = measure('work', 'items', lambda: (10, {'trades': 4}))
+    assert result.items == 10 and result.seconds > 0 and result.peak_rss_mb > 0
+    data = result.to_dict()
+    assert data['throughput'] == pytest.approx(10 / result.seconds)
+    assert data['rates']['trades'] == pytest.approx(4 / result.seconds)
+
+    baseline = {'results': [BenchmarkResult('work', 1.0, 100, 'items', 50.0).to_dict()]}
+    slower = {'results': [BenchmarkResult('work', 2.0, 100, 'items', 50.0).to_dict()]}
+    assert 'REGRESSION' in compare_runs(slower, baseline)[0]
+    assert 'REGRESSION' not in compare_runs(baseline, slower)[0]
+
+
+def test_seeded_universe_is_readable(database, tmp_path):
+    """Seeded histories load with indicators, and every synthetic score has bars to grade."""
+    from benchmarks.run_benchmarks import run_suite  # pylint: disable=import-outside-toplevel
+
+    universe = SyntheticUniverse(n_symbols=4, years=1, seed=2)
+    assert seed_database(database, universe) == {'symbols': 4, 'bars': 4 * universe.n_bars}
+    doc = database['historical_prices'].find_one({'symbol': 'SPY'})
+    assert len(doc['days']) == universe.n_bars and 'ema_20' in doc['days'][-1]
+
+    n_scores = seed_trade_scores(database, universe, per_symbol=5)
+    dates = [s['date'] for s in database['trade_scores'].find({'version': SYNTHETIC_SCORE_VERSION})]
+    assert len(dates) == n_scores > 0 and max(dates) <= universe.sessions[-SCORE_FUTURE_BARS - 1]
+
+    results = run_suite(database, universe, ['indicators', 'grading'], workdir=str(tmp_path), n_scores=n_scores)
+    assert [r.name for r in results] == ['indicators', 'grading']
+    assert results[1].items == n_scores and np.isfinite(results[1].throughput)
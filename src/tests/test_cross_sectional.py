@@ -0,0 +1,76 @@
+"""
+Parity tests for the vectorized CrossSectionalScorer against the per-symbol TechnicalAnalyzer path.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.cross_sectional import CrossSectionalScorer
+from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+from bluehorseshoe.data.universe_panel import UniversePanel
+from conftest import indicator_columns
+
+LENGTHS = [1, 3, 8, 21, 26, 30, 60, 120, 260, 300]
+
+
+def _universe(seed=7, copies=4):
+    """Random-walk symbols of mixed history lengths, with the stored indicator columns."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=max(LENGTHS))
+    symbol_columns = {}
+    for k, n in enumerate(LENGTHS * copies):
+        symbol_columns[f'S{k}'] = indicator_columns(rng, dates[-n:].strftime('%Y-%m-%d'), rng.uniform(0.005, 0.04))
+
+    # Prices only: the per-symbol trend indicators reject it for missing stochastic columns
+    symbol_columns['RAW'] = {
+        name: arr for name, arr in symbol_columns['S9'].items()
+        if name in ('date', 'open', 'high', 'low', 'close', 'volume', 'avg_volume_20')
+    }
+    return UniversePanel.from_columns(symbol_columns), dates
+
+
+def _reference(df, strategy, enabled_indicators, aggregation):
+    try:
+        return TechnicalAnalyzer.calculate_technical_score(df, strategy, enabled_indicators, aggregation)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("enabled_indicators,aggregation", [
+    (None, "sum"),
+    (None, "product"),
+    (["trend", "momentum:rsi", "volume:obv"], "sum"),
+    (["rsi", "bb", "candlestick"], "sum"),
+])
+def test_scores_match_per_symbol_path(enabled_indicators, aggregation):
+    """
+    Every symbol gets the same component dict as calculate_technical_score on its panel frame.
+    """
+    panel, dates = _universe()
+    target_date = dates[-5].strftime('%Y-%m-%d')
+    scorer = CrossSectionalScorer(enabled_indicators=enabled_indicators, aggregation=aggregation)
+    scores = scorer.score_panel(panel, target_date=target_date, chunk_size=7)
+
+    scored = 0
+    for strategy in ("baseline", "mean_reversion"):
+        for symbol in panel.symbols:
+            expected = _reference(panel.frame(symbol, target_date), strategy, enabled_indicators, aggregation)
+            actual = scores[strategy].get(symbol)
+            if expected is None:
+                assert actual is None, symbol
+                continue
+            assert actual is not None, symbol
+            assert actual.keys() == expected.keys(), symbol
+            for key, value in expected.items():
+                assert actual[key] == pytest.approx(value, abs=1e-9), (strategy, symbol, key)
+            scored += expected['total'] != 0.0
+    assert scored > 0
+
+
+def test_symbols_missing_columns_fall_back():
+    """
+    Symbols the per-symbol path would reject are left out rather than scored with guesses.
+    """
+    panel, _ = _universe(copies=1)
+    scores = CrossSectionalScorer().score_panel(panel, symbols=['S9', 'RAW', 'MISSING'], strategies=("baseline",))
+    assert set(scores['baseline']) == {'S9'}
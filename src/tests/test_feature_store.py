@@ -0,0 +1,89 @@
+"""
+Tests for the FeatureStore fundamentals and sentiment cache.
+"""
+from unittest.mock import MagicMock
+import pytest
+
+from bluehorseshoe.core.symbols import get_sentiment_score
+from bluehorseshoe.data.feature_store import FeatureStore
+
+OVERVIEWS = [{"symbol": "AAPL", "Sector": "Technology", "Beta": "1.2"}]
+
+NEWS = [{"symbol": "AAPL", "feed": [
+    {"time_published": "20240110T093000", "ticker_sentiment": [
+        {"ticker": "AAPL", "ticker_sentiment_score": "0.4"},
+        {"ticker": "MSFT", "ticker_sentiment_score": "-0.9"}]},
+    {"time_published": "20240105T000000", "ticker_sentiment": [
+        {"ticker": "AAPL", "ticker_sentiment_score": "0.2"}]},
+    {"time_published": "20240102T120000", "ticker_sentiment": [
+        {"ticker": "AAPL", "ticker_sentiment_score": "-0.3"}]},
+    {"time_published": "bad", "ticker_sentiment": [
+        {"ticker": "AAPL", "ticker_sentiment_score": "1.0"}]},
+    {"time_published": "20240108T150000", "ticker_sentiment": [
+        {"ticker": "AAPL", "ticker_sentiment_score": "n/a"}]},
+]}]
+
+
+def _database():
+    """Mock database serving OVERVIEWS and NEWS through both find and find_one."""
+    collections = {}
+    for name, docs in (("symbol_overviews", OVERVIEWS), ("symbol_news", NEWS)):
+        col = MagicMock()
+        col.find.side_effect = lambda query, projection=None, docs=docs: [
+            d for d in docs if d["symbol"] in query["symbol"]["$in"]
+        ]
+        col.find_one.side_effect = lambda query, projection=None, docs=docs: next(
+            (d for d in docs if d["symbol"] == query["symbol"]), None
+        )
+        collections[name] = col
+    database = MagicMock()
+    database.__getitem__.side_effect = collections.__getitem__
+    return database
+
+
+@pytest.mark.parametrize("target_date", [
+    "2024-01-01", "2024-01-02", "2024-01-05", "2024-01-09", "2024-01-10",
+    "2024-01-11", "2024-01-13", "2024-01-17", "2024-01-18", "2024-02-01", "not-a-date"
+])
+def test_sentiment_matches_get_sentiment_score(target_date):
+    """Point-in-time lookups give the same score as the per-call scan, including window edges."""
+    database = _database()
+    store = FeatureStore(database)
+    expected = get_sentiment_score("AAPL", target_date, database=database)
+    assert store.get_sentiment("AAPL", target_date) == pytest.approx(expected)
+
+
+def test_bulk_load_and_series():
+    """One preload serves every lookup; unknown symbols are cached as empty."""
+    database = _database()
+    store = FeatureStore(database)
+    store.preload(["aapl", "ZZZ"])
+
+    assert store.get_overview("AAPL")["Sector"] == "Technology"
+    assert store.get_overview("ZZZ") == {}
+    assert store.get_sentiment("ZZZ", "2024-01-10") == 0.0
+    assert database["symbol_overviews"].find.call_count == 1
+    assert database["symbol_news"].find.call_count == 1
+
+    series = store.get_sentiment_series("AAPL", "2024-01-09", "2024-01-11")
+    assert series.tolist() == pytest.approx([
+        store.get_sentiment("AAPL", day) for day in ("2024-01-09", "2024-01-10", "2024-01-11")
+    ])
+
+
+def test_refresh_and_eviction():
+    """Expired entries are reloaded and the least recently used symbols are evicted."""
+    database = _database()
+    store = FeatureStore(database, ttl_seconds=0)
+    store.get_overview("AAPL")
+    store.get_overview("AAPL")
+    assert database["symbol_overviews"].find.call_count == 2
+
+    store = FeatureStore(database, max_symbols=2)
+    store.preload(["A", "B"])
+    store.get_overview("A")
+    store.preload(["C"])
+    assert "A" in store and "C" in store and "B" not in store
+
+    store.invalidate(["A"])
+    assert "A" not in store and len(store) == 1
@@ -11,8 +11,11 @@ from bluehorseshoe.data.historical_data import (
     build_all_symbols_history,
     get_technical_indicators,
     load_historical_data,
-    BackfillConfig
+    BackfillConfig,
+    _build_symbols_history_concurrently
 )
+from bluehorseshoe.data.async_fetcher import FetchResult
+from bluehorseshoe.core.symbols import has_price_adjustment, upsert_historical_to_mongo
 
 @patch('bluehorseshoe.data.historical_data.requests.get')
 def test_load_historical_data_from_net(mock_get):
@@ -193,3 +196,65 @@ def test_load_historical_data(mock_net, mock_file, mock_mongo):
     assert result is not None
     assert result['symbol'] == 'AAPL'
     assert 'days' in result
+
+
+def test_has_price_adjustment():
+    """
+    Test that only a changed close on an overlapping date counts as an adjustment.
+    """
+    stored = [{'date': '2024-01-02', 'close': 10.0}, {'date': '2024-01-03', 'close': 11.0}]
+    assert not has_price_adjustment(stored, [{'date': '2024-01-03', 'close': 11.0}, {'date': '2024-01-04', 'close': 12.0}])
+    assert has_price_adjustment(stored, [{'date': '2024-01-03', 'close': 5.5}, {'date': '2024-01-04', 'close': 6.0}])
+    assert not has_price_adjustment(stored, [])
+
+
+def test_upsert_historical_appends_new_bars():
+    """
+    Test that upsert_historical_to_mongo pushes only the new bars when past prices are unchanged.
+
+    Asserts:
+        - historical_prices receives a $push of the single new bar.
+        - historical_prices_recent is trimmed with $slice instead of rewritten.
+    """
+    mock_db = MagicMock()
+    mock_collection = MagicMock()
+    mock_db.__getitem__.return_value = mock_collection
+    mock_collection.find_one.return_value = {'days': [{'date': '2024-01-02', 'close': 10.0}]}
+
+    upsert_historical_to_mongo('AAPL', [{'date': '2024-01-02', 'close': 10.0}, {'date': '2024-01-03', 'close': 11.0}],
+                               database=mock_db)
+
+    first_update = mock_collection.update_one.call_args_list[0][0][1]
+    recent_update = mock_collection.update_one.call_args_list[1][0][1]
+    assert first_update['$push']['days']['$each'] == [{'date': '2024-01-03', 'close': 11.0}]
+    assert '$slice' in recent_update['$push']['days']
+    assert all('$set' not in call[0][1] or 'days' not in call[0][1]['$set']
+               for call in mock_collection.update_one.call_args_list)
+
+
+def test_concurrent_backfill_refetches_adjusted_symbols_async():
+    """Adjusted symbols of a compact pass get a second, full pass through the async fetcher."""
+    calls = []
+
+    class FakeFetcher:
+        """Passes one result per symbol to store, recording each pass."""
+        def __init__(self, **_):
+            pass
+
+        def run(self, symbols, recent=True, store=None):
+            calls.append((list(symbols), recent))
+            for symbol in symbols:
+                store(FetchResult(symbol=symbol, data={'days': []}))
+            return {'fetched': len(symbols), 'failed': 0, 'retries': 0}
+
+    rows = [(1, {'symbol': 'ADJ', 'name': 'Adjusted'}), (2, {'symbol': 'OK', 'name': 'Fine'})]
+    with patch('bluehorseshoe.data.historical_data.AlphaVantageFetcher', FakeFetcher), \
+            patch('bluehorseshoe.data.historical_data.process_symbol',
+                  side_effect=lambda row, *args, **kwargs: row['symbol'] == 'ADJ' and args[3]) as process, \
+            patch('bluehorseshoe.data.historical_data.set_backfill_checkpoint') as checkpoint:
+        _build_symbols_history_concurrently(rows, 2, BackfillConfig(recent=True, concurrency=2), MagicMock())
+
+    assert calls == [(['ADJ', 'OK'], True), (['ADJ'], False)]
+    assert [c.args[4] for c in process.call_args_list] == [True, True, False]
+    assert all(c.kwargs['defer_refetch'] for c in process.call_args_list)
+    assert checkpoint.call_args_list[-1].args[0] == 'OK'
@@ -0,0 +1,68 @@
+"""
+Tests for the incremental technical indicators.
+"""
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+from bluehorseshoe.data.historical_data import get_technical_indicators
+from bluehorseshoe.data.indicator_state import (
+    INCREMENTAL_MIN_HISTORY,
+    can_update_incrementally,
+    compute_indicator_state,
+    update_technical_indicators
+)
+
+
+def test_incremental_indicators_match_full_recompute():
+    """
+    Test that extending a history from its saved indicator state matches a full recompute.
+
+    Builds a 400-bar random walk, computes indicators and state over the first 395 bars,
+    then updates the last 5 bars incrementally.
+
+    Asserts:
+        - Every indicator column of the new bars equals the full recompute (4 d.p. rounding).
+        - The returned state is dated at the last new bar.
+    """
+    rng = np.random.default_rng(7)
+    count = 400
+    close = np.round(np.abs(100 + np.cumsum(rng.normal(0, 1, count))) + 5, 4)
+    df = pd.DataFrame({
+        'date': pd.bdate_range('2022-01-03', periods=count).strftime('%Y-%m-%d'),
+        'open': np.round(close + rng.normal(0, 0.5, count), 4),
+        'high': np.round(close + rng.uniform(0, 2, count), 4),
+        'low': np.round(close - rng.uniform(0, 2, count), 4),
+        'close': close,
+        'volume': rng.integers(1000, 100000, count)
+    })
+    full = pd.DataFrame(get_technical_indicators(df.copy()))
+
+    history = df.iloc[:-5].copy()
+    history_days = get_technical_indicators(history.copy())
+    state = compute_indicator_state(history.copy())
+    new_days, new_state = update_technical_indicators(
+        pd.DataFrame(history_days), df.iloc[-5:].reset_index(drop=True), state)
+
+    incremental = pd.DataFrame(new_days)
+    expected = full.iloc[-5:].reset_index(drop=True)
+    columns = [c for c in expected.columns if c != 'date']
+    assert list(incremental.columns) == list(expected.columns)
+    np.testing.assert_allclose(incremental[columns].to_numpy(dtype=float),
+                               expected[columns].to_numpy(dtype=float), atol=1e-3)
+    assert new_state['as_of'] == expected['date'].iloc[-1]
+
+
+def test_incremental_check_reuses_the_adjustment_result(caplog):
+    """
+    Test that a known adjustment result is not recomputed and that a missing state is logged.
+    """
+    days = [{'date': d, 'close': 1.0}
+            for d in pd.bdate_range('2020-01-01', periods=INCREMENTAL_MIN_HISTORY).strftime('%Y-%m-%d')]
+    df_new = pd.DataFrame([{'date': '2030-01-02', 'close': 1.0}])
+    with patch('bluehorseshoe.data.indicator_state.has_price_adjustment', side_effect=AssertionError), \
+            caplog.at_level('WARNING'):
+        assert can_update_incrementally(
+            {'symbol': 'AAPL', 'days': days, 'indicator_state': {'as_of': days[-1]['date']}}, df_new, adjusted=False)
+        assert not can_update_incrementally({'symbol': 'AAPL', 'days': days}, df_new, adjusted=False)
+    assert 'No indicator state for AAPL' in caplog.text
@@ -0,0 +1,66 @@
+"""
+Convergence tests for the bounded scoring lookback: scoring the last warmup_bars of a
+long history gives the same scores as the full history.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.technical_analyzer import (
+    INDICATOR_CLASSES, LOOKBACK_ALIGNMENT, MODIFIER_WARMUP_BARS, TechnicalAnalyzer
+)
+from bluehorseshoe.core.config import weights_config
+from conftest import indicator_frame
+
+
+def _history(n_bars, seed):
+    """Long random-walk history with the stored indicator columns computed over all of it."""
+    rng = np.random.default_rng(seed)
+    vol = rng.uniform(0.01, 0.03)
+    drift = rng.normal(0, 0.001)
+    return indicator_frame(rng, pd.bdate_range('2005-01-03', periods=n_bars).strftime('%Y-%m-%d'), vol,
+                           price=40.0, drift=drift, volume=(500_000, 5_000_000))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_indicator_warmups_give_full_history_signals(seed):
+    """Each indicator's raw signals are unchanged when it only sees its last warmup_bars."""
+    df = _history(2600, seed)
+    for end in range(2400, 2600, 13):
+        days = df.iloc[:end]
+        for group, cls in INDICATOR_CLASSES.items():
+            tail = days.iloc[-cls.warmup_bars:]
+            assert cls(tail).get_raw_signals() == cls(days).get_raw_signals(), (group, end)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sliced_scores_match_full_history(seed):
+    """calculate_technical_score on a long history equals scoring without the cut."""
+    df = _history(2600, seed)
+    for end in range(2400, 2600, 11):
+        days = df.iloc[:end]
+        total, components, _ = TechnicalAnalyzer._score_indicators(days, {}, "sum")  # pylint: disable=protected-access
+        modifiers, modifier_components = TechnicalAnalyzer._calculate_baseline_modifiers(days)  # pylint: disable=protected-access
+        expected = {**components, **modifier_components, "total": float(total + modifiers)}
+        assert TechnicalAnalyzer.calculate_technical_score(days, "baseline") == expected, end
+
+        mr_components = TechnicalAnalyzer._get_mean_reversion_components(  # pylint: disable=protected-access
+            days, None, weights_config.get_weights('mean_reversion'))
+        expected = {**mr_components, "total": float(sum(mr_components.values()))}
+        assert TechnicalAnalyzer.calculate_technical_score(days, "mean_reversion") == expected, end
+
+
+def test_required_lookback():
+    """The lookback is the longest warm-up of the scored groups and is cut on the alignment grid."""
+    assert TechnicalAnalyzer.required_lookback() == max(
+        [cls.warmup_bars for cls in INDICATOR_CLASSES.values()] + [MODIFIER_WARMUP_BARS])
+    assert TechnicalAnalyzer.required_lookback(["momentum"], modifiers=False) == INDICATOR_CLASSES["momentum"].warmup_bars
+    assert TechnicalAnalyzer.required_lookback() < 2000
+
+    days = pd.DataFrame({'close': np.arange(5000.0)})
+    starts = {TechnicalAnalyzer._lookback_tail(days.iloc[:n], 300)['close'].iloc[0]  # pylint: disable=protected-access
+              for n in range(4000, 4000 + LOOKBACK_ALIGNMENT)}
+    assert len(starts) <= 2
+    for n in (10, 300, 301, 4000, 5000):
+        tail = TechnicalAnalyzer._lookback_tail(days.iloc[:n], 300)  # pylint: disable=protected-access
+        assert min(n, 300) <= len(tail) < 300 + LOOKBACK_ALIGNMENT and tail['close'].iloc[-1] == n - 1
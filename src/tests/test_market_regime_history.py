@@ -0,0 +1,106 @@
+"""
+Tests for the precomputed market regime history against the per-date regime computation.
+"""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.market_regime import REGIME_BACKFILL_DAYS, MarketRegime
+from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+from bluehorseshoe.data.universe_panel import UniversePanel
+from conftest import random_walk_bars
+
+
+def _panel(n_bars=320, seed=3):
+    """SPY/QQQ plus stocks with gaps, late listings and a flat stretch."""
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range('2022-01-03', periods=n_bars)
+    dates = sessions.values.astype('datetime64[D]').astype(np.int32)
+    columns = {}
+    for k, symbol in enumerate(['SPY', 'QQQ'] + [f'S{k}' for k in range(10)]):
+        close = random_walk_bars(rng, sessions.strftime('%Y-%m-%d'), 0.015, price=80.0,
+                                 drift=0.0004 * (k % 3 - 1))['close'].to_numpy()
+        if symbol == 'SPY':
+            close[150:175] = close[150]  # Constant window for the trend fit
+        keep = np.ones(n_bars, dtype=bool)
+        if k % 4 == 1:
+            keep = rng.random(n_bars) > 0.1
+        if k % 5 == 2:
+            keep[:rng.integers(60, 200)] = False
+        columns[symbol] = {'date': dates[keep], 'close': close[keep]}
+    return UniversePanel.from_columns(columns)
+
+
+def test_trend_series_matches_calculate_trend():
+    """The rolling fit labels every bar like calculate_trend on the bars up to it."""
+    rng = np.random.default_rng(8)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, 120)))
+    trends = MarketRegime._trend_series(close)  # pylint: disable=protected-access
+    assert len(trends) == len(close)
+    for i in range(len(close)):
+        assert trends[i] == TechnicalAnalyzer.calculate_trend(pd.DataFrame({'close': close[:i + 1]})), i
+
+
+def test_history_matches_per_date_market_health():
+    """Every stored session equals get_market_health with breadth over the same universe."""
+    panel = _panel()
+    index_frames = {symbol: panel.frame(symbol) for symbol in MarketRegime.INDICES}
+
+    history = MarketRegime.compute_history(panel, index_frames, '2022-09-01', '2023-03-31')
+    assert [doc['date'] for doc in history] == [
+        str(d) for d in panel.dates if '2022-09-01' <= str(d) <= '2023-03-31']
+    for doc in history:
+        expected = MarketRegime.get_market_health(target_date=doc['date'], panel=panel)
+        assert (doc['status'], doc['multiplier']) == (expected['status'], expected['multiplier']), doc['date']
+        assert doc['details']['breadth'] == pytest.approx(expected['details']['breadth'])
+        for symbol in MarketRegime.INDICES:
+            for key, value in expected['details'][symbol].items():
+                assert doc['details'][symbol][key] == pytest.approx(value), (doc['date'], symbol, key)
+
+
+def test_get_market_health_serves_stored_regime(monkeypatch):
+    """A stored date is returned from the collection; a missing one is computed."""
+    database = MagicMock()
+    collection = database.__getitem__.return_value
+    collection.find_one.return_value = {
+        '_id': 1, 'date': '2024-06-28', 'status': 'Neutral', 'multiplier': 0.5,
+        'details': {'SPY': {'score': 3}, 'QQQ': {'score': 2}, 'breadth': 0.45}}
+    health = MarketRegime.get_market_health(target_date='2024-06-28', database=database)
+    assert health == {'status': 'Neutral', 'multiplier': 0.5,
+                      'details': {'SPY': {'score': 3}, 'QQQ': {'score': 2}, 'breadth': 0.45}}
+    database.__getitem__.assert_called_with('market_regime')
+
+    # A missing date takes its breadth from a close-only panel of the whole universe, like update_history
+    panel = _panel()
+    loads = []
+    monkeypatch.setattr(UniversePanel, 'from_database', lambda *args, **kwargs: loads.append(kwargs) or panel)
+    collection.find_one.return_value = None
+    computed = MarketRegime.get_market_health(target_date='2023-01-05', database=database, panel=panel)
+    assert computed == MarketRegime.get_market_health(target_date='2023-01-05', panel=panel)
+    assert [(kwargs['end_date'], kwargs['fields']) for kwargs in loads] == [('2023-01-05', ['close'])]
+    stored = MarketRegime.compute_history(
+        panel, {symbol: panel.frame(symbol) for symbol in MarketRegime.INDICES}, '2023-01-05', '2023-01-05')
+    assert stored[0]['details']['breadth'] == pytest.approx(computed['details']['breadth'])
+
+
+def test_first_update_is_bounded(database, monkeypatch):
+    """With nothing stored, only the last REGIME_BACKFILL_DAYS are computed; start_date reaches further."""
+    panel = _panel(n_bars=600)
+    for symbol in MarketRegime.INDICES:
+        days = panel.frame(symbol).assign(date=lambda df: df['date'].dt.strftime('%Y-%m-%d'),
+                                          high=lambda df: df['close'], low=lambda df: df['close'], volume=1000)
+        database['historical_prices'].insert_one({'symbol': symbol, 'days': days.to_dict('records')})
+    loads = []
+    monkeypatch.setattr(UniversePanel, 'from_database', lambda *args, **kwargs: loads.append(kwargs) or panel)
+
+    written = MarketRegime.update_history(database=database)
+    stored = sorted(doc['date'] for doc in database['market_regime'].find())
+    last = str(panel.dates[-1])
+    assert written == len(stored) and stored[-1] == last
+    assert stored[0] >= (pd.Timestamp(last) - pd.Timedelta(days=REGIME_BACKFILL_DAYS)).strftime('%Y-%m-%d')
+    assert all(kwargs['fields'] == ['close'] for kwargs in loads)
+
+    assert MarketRegime.update_history(database=database) == 0
+    assert MarketRegime.update_history(database=database, start_date='2022-06-01', end_date=stored[0]) > 0
@@ -70,3 +70,28 @@ def test_predict_probability_with_date(mock_database):
     # Using a date from the past to ensure get_sentiment_score is called
     prob = inference.predict_probability("AAPL", components, target_date="2026-01-01")
     assert 0.0 <= prob <= 1.0
+
+def test_predict_probability_batch_single_call(mock_database):
+    """A batch runs predict_proba once, encodes categories per row and maps unknown ones to 0."""
+    import numpy as np
+    from sklearn.preprocessing import LabelEncoder
+    inference = MLInference(model_path="non_existent.joblib", database=mock_database)
+    model = MagicMock()
+    model.predict_proba.side_effect = lambda df: np.column_stack([1 - df['trend'] / 10, df['trend'] / 10])
+    inference.models["general"] = model
+    inference.encoders["general"] = {"Sector": LabelEncoder().fit(["Energy", "Technology"])}
+    inference.features["general"] = ["trend", "Sector", "Beta", "missing"]
+    mock_database["symbol_overviews"].find.return_value = [
+        {"symbol": "AAPL", "Sector": "Technology", "Beta": "1.2"},
+        {"symbol": "XOM", "Sector": "Utilities", "Beta": "0.8"},
+    ]
+
+    items = [("AAPL", {"trend": 3.0}, "2026-01-01"), ("XOM", {"trend": 1.0}, "2026-01-01"), ("NEW", {}, None)]
+    probs = inference.predict_probability_batch(items)
+
+    assert model.predict_proba.call_count == 1
+    X = model.predict_proba.call_args[0][0]  # pylint: disable=invalid-name
+    assert list(X.columns) == ["trend", "Sector", "Beta", "missing"]
+    assert X["Sector"].tolist() == [1, 0, 0]
+    assert X["Beta"].tolist() == [1.2, 0.8, 0.0]
+    assert probs.tolist() == [0.3, 0.1, 0.0]
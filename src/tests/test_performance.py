@@ -0,0 +1,101 @@
+"""
+Tests for the batched candidate performance evaluation.
+"""
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.performance import (
+    evaluate_outcomes, performance_table, previous_performance, rolling_performance, top_candidates
+)
+from bluehorseshoe.core.trading_calendar import update_trading_calendar
+from bluehorseshoe.reporting.html_reporter import HTMLReporter
+
+SESSIONS = ['2024-07-01', '2024-07-02', '2024-07-03', '2024-07-05']
+
+
+def _score(symbol, date, score, strategy='baseline', entry=100.0, stop=95.0, target=110.0):
+    return {'symbol': symbol, 'date': date, 'strategy': strategy, 'score': score,
+            'metadata': {'entry_price': entry, 'stop_loss': stop, 'take_profit': target}}
+
+
+@pytest.fixture(name='database')
+def fixture_database(database):
+    """Scores for each session and the bars they are evaluated on."""
+    database['historical_prices'].insert_many([
+        {'symbol': 'SPY', 'days': [{'date': d, 'high': 1, 'low': 1, 'close': 1} for d in SESSIONS]},
+        {'symbol': 'HIT', 'days': [{'date': d, 'high': 112.0, 'low': 99.0, 'close': 108.0} for d in SESSIONS]},
+        {'symbol': 'STOP', 'days': [{'date': d, 'high': 101.0, 'low': 90.0, 'close': 92.0} for d in SESSIONS]},
+        {'symbol': 'MISS', 'days': [{'date': d, 'high': 120.0, 'low': 101.0, 'close': 110.0} for d in SESSIONS]},
+        {'symbol': 'OPEN', 'days': [{'date': d, 'high': 103.0, 'low': 98.0, 'close': 102.0} for d in SESSIONS]},
+    ])
+    scores = []
+    for date in SESSIONS:
+        scores += [_score('HIT', date, 16.0), _score('STOP', date, 12.0), _score('MISS', date, 3.0),
+                   _score('NOBAR', date, 20.0), _score('NOENTRY', date, 18.0, entry=None),
+                   _score('LOW', date, 1.0),
+                   _score('OPEN', date, 7.0, strategy='mean_reversion')]
+    database['trade_scores'].insert_many(scores)
+    return database
+
+
+def test_evaluate_outcomes_matches_the_trade_rules():
+    """Stop is checked before target; untriggered setups have no PnL."""
+    frame = pd.DataFrame({
+        'entry': [100.0, 100.0, 100.0, 100.0], 'stop': [95.0, 95.0, 95.0, 95.0],
+        'target': [110.0, 110.0, 110.0, 110.0], 'high': [112.0, 112.0, 101.0, 120.0],
+        'low': [94.0, 99.0, 98.0, 101.0], 'close': [100.0, 108.0, 102.0, 110.0],
+    })
+    evaluated = evaluate_outcomes(frame)
+    assert list(evaluated['outcome']) == ['Stopped Out', 'Target Hit', 'Active', 'No Entry']
+    assert list(evaluated['pnl'].round(4)) == [-0.05, 0.1, 0.02, 0.0]
+
+
+def test_previous_performance_uses_two_queries(database):
+    """The previous session's top candidates are evaluated with one query for scores and one for bars."""
+    update_trading_calendar(database)
+    with patch.object(database['historical_prices'], 'find_one', side_effect=AssertionError):
+        perf = previous_performance(database, '2024-07-05', top_n=5)
+
+    assert perf['date'] == '2024-07-03'
+    # NOBAR has no bar, NOENTRY no entry price, LOW is outside the top 5; baseline first
+    assert [(r['symbol'], r['outcome']) for r in perf['results']] == [
+        ('HIT', 'Target Hit'), ('STOP', 'Stopped Out'), ('MISS', 'No Entry'), ('OPEN', 'Active')]
+    assert perf['results'][0]['pnl'] == pytest.approx(0.1)
+    assert previous_performance(database, '2024-07-01') == {}
+
+
+def test_rolling_performance_table(database):
+    """Each pick date is evaluated on the next session and summarised by strategy and score bucket."""
+    rolling = rolling_performance(database, '2024-07-05', sessions=30, top_n=5)
+    assert rolling['start'] == '2024-07-01' and rolling['sessions'] == 3 and rolling['trades'] == 12
+
+    table = {(r['strategy'], r['bucket']): r for r in rolling['table']}
+    assert [k for k in table if k[0] == 'baseline'] == [
+        ('baseline', '<5'), ('baseline', '10-15'), ('baseline', '15+'), ('baseline', 'All')]
+    assert table[('baseline', '15+')]['win_rate'] == 1.0
+    assert table[('baseline', '<5')]['entries'] == 0 and table[('baseline', '<5')]['win_rate'] is None
+    assert table[('baseline', 'All')]['picks'] == 9 and table[('baseline', 'All')]['entries'] == 6
+    assert table[('baseline', 'All')]['total_pnl'] == pytest.approx(3 * (0.1 - 0.05))
+    assert table[('mean_reversion', '5-10')]['avg_pnl'] == pytest.approx(0.02)
+
+    html = HTMLReporter(output_dir='.').generate_email_report(
+        date='2024-07-05', regime={}, candidates=[], rolling_performance=rolling)
+    assert 'Rolling Performance' in html and '15+' in html
+
+
+def test_top_candidates_sort_on_the_rank_index(database):
+    """The (date, strategy, score) index exists and the pipeline sorts on it."""
+    top = top_candidates(database, ['2024-07-01'], top_n=2)
+    assert list(top['symbol']) == ['NOBAR', 'NOENTRY', 'OPEN']
+    assert 'date_1_strategy_1_score_-1' in database['trade_scores'].index_information()
+
+
+def test_performance_table_skips_non_numeric_scores():
+    """Scores that are missing or not numbers do not get a bucket."""
+    evaluated = pd.DataFrame({'strategy': ['baseline'] * 3, 'score': [16.0, None, 'n/a'],
+                              'pnl': [0.1, 0.2, 0.3], 'triggered': [True, True, True]})
+    rows = performance_table(evaluated)
+    assert [(r['bucket'], r['picks']) for r in rows] == [('15+', 1), ('All', 1)]
+    assert performance_table(evaluated.iloc[1:]) == []
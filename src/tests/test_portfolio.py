@@ -0,0 +1,119 @@
+"""
+Tests for the portfolio backtest: order resolution, account constraints and a per-session reference loop.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.portfolio import PortfolioConfig, PortfolioSimulator, resolve_candidates
+from bluehorseshoe.analysis.trade_simulator import simulate_limit_trades
+from bluehorseshoe.data.columnar_store import days_to_columns
+from bluehorseshoe.data.universe_panel import UniversePanel
+from conftest import random_walk_bars
+
+
+def _panel(n_symbols=8, n_bars=160, seed=11):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=n_bars).strftime('%Y-%m-%d')
+    columns = {}
+    for k in range(n_symbols):
+        bars = random_walk_bars(rng, dates, 0.02, price=30.0, drift=0.0005)
+        keep = rng.random(n_bars) > 0.03 if k == 0 else np.ones(n_bars, dtype=bool)  # Gaps in one symbol
+        columns[f'S{k}'] = days_to_columns(bars[keep].drop(columns='volume').to_dict('records'))
+    return UniversePanel.from_columns(columns)
+
+
+def _candidates(panel, n=300, seed=4):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        symbol = panel.symbols[rng.integers(len(panel.symbols))]
+        day = str(panel.dates[rng.integers(20, len(panel.dates) - 5)])
+        close = panel.frame(symbol, day)['close'].iloc[-1]
+        rows.append({'date': day, 'symbol': symbol, 'score': float(rng.uniform(1, 20)),
+                     'entry_price': close * 0.995, 'stop_loss': close * rng.uniform(0.9, 0.97),
+                     'take_profit': close * rng.uniform(1.02, 1.08)})
+    return pd.DataFrame(rows)
+
+
+def _reference(orders, panel, cfg, offset):
+    """Per-session account loop with one Python object per position."""
+    closes = pd.DataFrame(panel.values[:, :, panel.fields.index('close')].T, columns=panel.symbols).ffill()
+    cash, positions, equity = cfg.initial_capital, [], []
+    orders = orders.sort_values(['fill_day', 'score'], ascending=[True, False], kind='stable')
+    for day in range(offset, len(panel.dates)):
+        for pos in [p for p in positions if p['exit_day'] == day]:
+            cash += pos['shares'] * pos['exit_price']
+            positions.remove(pos)
+        prev = closes.iloc[max(day - 1, 0)]
+        account = cash + sum(p['shares'] * (prev[p['symbol']] if not np.isnan(prev[p['symbol']]) else p['fill_price'])
+                             for p in positions)
+        for _, order in orders[orders['fill_day'] == day].iterrows():
+            if len(positions) >= cfg.max_positions or order['symbol'] in {p['symbol'] for p in positions}:
+                continue
+            risk = order['fill_price'] - order['stop_loss']
+            if risk <= 0:
+                continue
+            cap = min(account * cfg.max_position_percent / 100 / order['fill_price'], cash / order['fill_price'])
+            shares = min(round(account * cfg.risk_percent / 100 / risk, 3), np.floor(cap * 1000) / 1000)
+            if shares <= 0:
+                continue
+            cash -= shares * order['fill_price']
+            if order['exit_day'] == day:
+                cash += shares * order['exit_price']
+            else:
+                positions.append({**order.to_dict(), 'shares': shares})
+        equity.append(cash + sum(p['shares'] * closes.iloc[day][p['symbol']] for p in positions))
+    return np.array(equity)
+
+
+def test_resolve_candidates_matches_per_trade_simulation():
+    """Fill and exit sessions equal simulate_limit_trades on each candidate's future bars."""
+    panel = _panel()
+    candidates = _candidates(panel, n=80)
+    orders = resolve_candidates(candidates, panel, hold_days=3)
+    assert 0 < len(orders) <= len(candidates)
+    for _, order in orders.iterrows():
+        future = panel.future_frame(order['symbol'], order['date'])
+        sim = simulate_limit_trades(future['open'], future['high'], future['low'], future['close'],
+                                    [0], [order['entry_price']], [order['stop_loss']], [order['take_profit']], 3)
+        assert panel.dates[order['fill_day']] == future['date'].iloc[sim.entry_idx[0]]
+        assert order['fill_price'] == sim.actual_entry[0] and order['status'] == sim.status[0]
+        if sim.exit_idx[0] != -1:
+            assert panel.dates[order['exit_day']] == future['date'].iloc[sim.exit_idx[0]]
+
+
+@pytest.mark.parametrize("max_positions,risk_percent", [(3, 1.0), (10, 2.5), (50, 5.0)])
+def test_portfolio_matches_reference_loop(max_positions, risk_percent):
+    """The array order book gives the same equity curve as a per-session object loop."""
+    panel = _panel()
+    candidates = _candidates(panel)
+    cfg = PortfolioConfig(initial_capital=25_000, risk_percent=risk_percent, max_positions=max_positions)
+    result = PortfolioSimulator(cfg).run(candidates, panel)
+
+    offset = panel.date_index(candidates['date'].min()) - 1
+    expected = _reference(resolve_candidates(candidates, panel, cfg.hold_days), panel, cfg, offset)
+    np.testing.assert_allclose(result.equity.to_numpy(), expected, rtol=1e-9)
+
+    assert result.positions.max() <= max_positions
+    assert (result.cash >= -1e-6).all()
+    assert (result.drawdown <= 0).all()
+    assert len(result.trades) + len(result.skipped) == len(resolve_candidates(candidates, panel, cfg.hold_days))
+    closed = result.trades.dropna(subset=['exit_price'])
+    assert result.cash.iloc[-1] == pytest.approx(
+        cfg.initial_capital + closed['pnl'].sum()
+        - (result.trades['shares'] * result.trades['fill_price'])[result.trades['exit_price'].isna()].sum())
+    summary = result.summary()
+    assert summary['trades'] == len(result.trades) and summary['turnover'] > 0
+
+
+def test_sizing_rounds_like_position_sizer():
+    """Risk-sized orders round to 3 decimals (or down to whole shares); caps always round down."""
+    sim = PortfolioSimulator(PortfolioConfig(risk_percent=1.0, max_position_percent=100.0))
+    # 1000 / 3 = 333.3333 -> 333.333; 1000 / 0.6 = 1666.6667 -> 1666.667 (position_sizer rounds up here)
+    assert sim._size(100_000, 100_000, 30.0, 27.0) == 333.333  # pylint: disable=protected-access
+    assert sim._size(100_000, 100_000, 30.0, 29.4) == 1666.667  # pylint: disable=protected-access
+    # Cash cap: 1000 / 30 = 33.3333 -> 33.333, never 33.334
+    assert sim._size(100_000, 1000, 30.0, 29.4) == 33.333  # pylint: disable=protected-access
+    whole = PortfolioSimulator(PortfolioConfig(fractional=False, max_position_percent=100.0))
+    assert whole._size(100_000, 100_000, 30.0, 29.4) == 1666.0  # pylint: disable=protected-access
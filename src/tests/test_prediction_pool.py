@@ -0,0 +1,72 @@
+"""
+Tests for process-pool prediction execution.
+"""
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from bluehorseshoe.analysis import prediction_pool
+from bluehorseshoe.analysis.strategy import StrategyContext
+
+
+class _FakeTrader:
+    """Stands in for SwingTrader inside the worker processes."""
+    instances = 0
+
+    def __init__(self, database=None, config=None, panel=None):
+        _FakeTrader.instances += 1
+        self.instance = (os.getpid(), _FakeTrader.instances)
+
+    def process_symbols(self, symbols, ctx):
+        """Echoes what the worker saw, failing the whole chunk that holds BAD."""
+        if 'BAD' in symbols:
+            raise ValueError("boom")
+        return [(symbol, {
+            'symbol': symbol,
+            'trader': self.instance,
+            'scores': sorted(ctx.precomputed_scores['baseline']),
+            'exchange': ctx.symbol_map.get(symbol),
+        }, None) for symbol in symbols]
+
+
+@pytest.mark.skipif('fork' not in prediction_pool.multiprocessing.get_all_start_methods(),
+                    reason="needs the fork start method")
+def test_process_pool_streams_chunks_with_one_trader_per_worker():
+    """
+    Every symbol comes back once, each worker builds a single trader, chunks only carry their own symbols,
+    and a failing chunk reports an error for each of its symbols.
+    """
+    symbols = [f'S{i}' for i in range(20)] + ['BAD']
+    ctx = StrategyContext(
+        target_date='2024-06-28',
+        precomputed_scores={'baseline': {s: {'total': 1.0} for s in symbols}},
+        symbol_map={s: 'NYSE' for s in symbols}
+    )
+
+    with patch.object(prediction_pool, 'create_app_container', MagicMock()), \
+            patch('bluehorseshoe.analysis.strategy.SwingTrader', _FakeTrader):
+        results = list(prediction_pool.iter_process_predictions(symbols, ctx, MagicMock(), workers=2, chunk_size=4))
+
+    assert sorted(r[0] for r in results) == sorted(symbols)
+    errors = {symbol: error for symbol, _, error in results if error}
+    assert 'BAD' in errors and set(errors.values()) == {'boom'} and len(errors) <= 4
+
+    ok = [result for _, result, error in results if error is None]
+    # One trader per worker process, reused for every chunk it runs
+    traders = {r['trader'] for r in ok}
+    assert len({pid for pid, _ in traders}) == len(traders) <= 2
+    assert all(count == 1 for _, count in traders)
+    for result in ok:
+        assert result['symbol'] in result['scores'] and len(result['scores']) <= 4
+        assert result['exchange'] == 'NYSE'
+
+
+def test_resolve_workers_defaults():
+    """
+    0 workers means one per CPU for processes and at most 8 threads.
+    """
+    with patch.object(prediction_pool.os, 'cpu_count', return_value=32):
+        assert prediction_pool.resolve_workers(0, "process") == 32
+        assert prediction_pool.resolve_workers(0, "thread") == 8
+        assert prediction_pool.resolve_workers(3, "process") == 3
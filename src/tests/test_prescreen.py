@@ -0,0 +1,53 @@
+"""
+Tests for the server-side universe pre-screen.
+"""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.prescreen import RECENT_COLLECTION, prescreen_symbols
+from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+
+
+def _bars(end='2024-06-28', close=50.0, volume=1_000_000, spread=0.03, n=30, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end, periods=n).strftime('%Y-%m-%d')
+    closes = close * (1 + rng.normal(0, spread, n))
+    return [{'date': d, 'open': c, 'high': c * (1 + spread), 'low': c * (1 - spread), 'close': c,
+             'volume': volume, 'avg_volume_20': volume} for d, c in zip(dates, closes)]
+
+
+UNIVERSE = {
+    'GOOD': _bars(),
+    'STALE': _bars(end='2024-06-10'),
+    'THIN': _bars(volume=20_000),
+    'PENNY': _bars(close=2.0),
+    'FLAT': _bars(spread=0.0005),
+    'LATER': _bars(end='2024-07-31'),
+}
+
+
+def test_prescreen_drops_symbols_the_prediction_path_skips(database):
+    """Each rejected symbol gets its reason; the flat test agrees with TechnicalAnalyzer."""
+    database[RECENT_COLLECTION].insert_many([{'symbol': s, 'days': days} for s, days in UNIVERSE.items()])
+
+    screen = prescreen_symbols(list(UNIVERSE) + ['UNKNOWN'], database=database, target_date='2024-06-28')
+    assert screen.kept == ['GOOD', 'LATER', 'UNKNOWN']
+    assert screen.dropped == {'STALE': 'stale', 'THIN': 'illiquid', 'PENNY': 'price', 'FLAT': 'flat'}
+    assert screen.counts()['flat'] == 1
+    assert TechnicalAnalyzer._is_dead_or_flat(pd.DataFrame(UNIVERSE['FLAT']))  # pylint: disable=protected-access
+
+    # Without a target date, staleness is measured from the latest bar of the universe
+    latest = prescreen_symbols(['GOOD', 'LATER'], database=database)
+    assert latest.kept == ['LATER'] and latest.dropped == {'GOOD': 'stale'}
+
+
+def test_prescreen_keeps_everything_it_cannot_judge():
+    """No recent documents keep every symbol; a database is required."""
+    database = MagicMock()
+    database[RECENT_COLLECTION].aggregate.return_value = iter([])
+    assert prescreen_symbols(['A', 'B'], database=database).kept == ['A', 'B']
+    with pytest.raises(ValueError):
+        prescreen_symbols(['A'])
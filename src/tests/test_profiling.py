@@ -0,0 +1,131 @@
+"""
+Tests for stage timing spans, their aggregation across workers and slow-symbol profiles.
+"""
+import contextvars
+import pstats
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from bluehorseshoe.analysis import prediction_pool
+from bluehorseshoe.analysis.strategy import StrategyContext, SwingTrader
+from bluehorseshoe.core import profiling
+
+
+def test_summary_percentiles_and_slowest():
+    """Stages aggregate count, total, percentiles and max; symbols rank by wall time."""
+    recorder = profiling.StageRecorder()
+    for seconds in range(1, 101):
+        recorder.add('load', seconds / 1000)
+    recorder.add_symbol('A', 0.5)
+    recorder.add_symbol('B', 0.2)
+    recorder.add_symbol('A', 0.1)
+
+    load = recorder.summary()['load']
+    assert load['count'] == 100 and load['max'] == pytest.approx(0.1)
+    assert load['total'] == pytest.approx(5.05) and load['p50'] == pytest.approx(0.0505)
+    assert load['p95'] == pytest.approx(0.09505)
+    assert recorder.slowest(1) == [('A', pytest.approx(0.6))]
+    assert recorder.format_table().splitlines()[1].startswith('load')
+
+
+def test_spans_only_record_while_recording():
+    """Without an active recorder spans do nothing; nested recording restores the previous one."""
+    with profiling.span('load'):
+        pass
+    outer, inner = profiling.StageRecorder(), profiling.StageRecorder()
+    with profiling.recording(outer):
+        with profiling.recording(inner):
+            with profiling.symbol_span('A'):
+                with profiling.span('load'):
+                    pass
+        assert profiling.active_recorder() is outer
+    assert profiling.active_recorder() is None
+    assert not outer.durations
+    assert set(inner.summary()) == {'load', profiling.SYMBOL_STAGE} and set(inner.symbol_seconds) == {'A'}
+
+
+def test_worker_spans_are_merged_into_the_active_recorder():
+    """Chunk results carrying drained spans are merged; plain results pass through."""
+    worker = profiling.StageRecorder()
+    worker.add('load', 0.25)
+    worker.add_symbol('A', 0.25)
+    spans = worker.drain()
+    assert not worker.durations and not worker.symbol_seconds
+
+    with_spans, plain = Future(), Future()
+    with_spans.set_result(([('A', {}, None)], spans))
+    plain.set_result([('B', {}, None)])
+    parent = profiling.StageRecorder()
+    with profiling.recording(parent):
+        results = list(prediction_pool.iter_chunk_results({with_spans: ['A'], plain: ['B']}))
+    assert sorted(r[0] for r in results) == ['A', 'B']
+    assert parent.durations['load'] == [0.25] and parent.symbol_seconds == {'A': 0.25}
+
+
+def test_slowest_symbol_profiles_are_dumped(tmp_path):
+    """Only the N slowest symbols keep a profile, written in pstats format, slowest first."""
+    recorder = profiling.StageRecorder(profile_slowest=2)
+    with profiling.recording(recorder):
+        for symbol, loops in (('FAST', 1), ('SLOW', 200_000), ('MID', 50_000)):
+            with profiling.symbol_span(symbol):
+                sum(i * i for i in range(loops))
+
+    paths = recorder.dump_profiles(str(tmp_path))
+    assert [p.rsplit('/', 1)[-1] for p in paths] == ['01_SLOW.prof', '02_MID.prof']
+    assert pstats.Stats(paths[0]).total_calls > 0
+
+
+def test_prepare_symbol_records_its_stages():
+    """A symbol's load and both strategy stages are timed under its symbol span."""
+    trader = SwingTrader(database=MagicMock())
+    recorder = profiling.StageRecorder()
+    with patch.object(trader, '_load_and_validate_data', return_value=(MagicMock(), {}, {})), \
+            patch.object(trader, '_prepare_baseline', return_value=None), \
+            patch.object(trader, '_prepare_mr', return_value={}), \
+            profiling.recording(recorder):
+        prepared = trader._prepare_symbol('AAPL', StrategyContext())  # pylint: disable=protected-access
+
+    assert prepared['symbol'] == 'AAPL'
+    assert set(recorder.summary()) == {'load', 'baseline', 'mean_reversion', profiling.SYMBOL_STAGE}
+    assert set(recorder.symbol_seconds) == {'AAPL'}
+
+
+def test_save_run_metrics():
+    """Run metrics are inserted with the stage summary; no database means nothing is saved."""
+    recorder = profiling.StageRecorder()
+    recorder.add('load', 0.1)
+    database = MagicMock()
+    doc = profiling.save_run_metrics(database, 'swing_predict', recorder, symbols=1)
+    database[profiling.RUN_METRICS_COLLECTION].insert_one.assert_called_once_with(doc)
+    assert doc['symbols'] == 1 and doc['stages']['load']['count'] == 1
+    assert profiling.save_run_metrics(None, 'swing_predict', recorder) is None
+
+
+def test_concurrent_runs_record_separately():
+    """Each thread's recording is its own; a worker thread joins a run through a copied context."""
+    recorders = [profiling.StageRecorder(), profiling.StageRecorder()]
+    both_recording = threading.Barrier(2)
+
+    def work():
+        with profiling.span('worker'):
+            pass
+
+    def run(recorder):
+        with profiling.recording(recorder):
+            both_recording.wait()
+            with profiling.span('load'):
+                pass
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(contextvars.copy_context().run, work).result()
+
+    threads = [threading.Thread(target=run, args=(r,)) for r in recorders]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [len(r.durations['load']) for r in recorders] == [1, 1]
+    assert [len(r.durations['worker']) for r in recorders] == [1, 1]
+    assert profiling.active_recorder() is None
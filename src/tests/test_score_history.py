@@ -0,0 +1,80 @@
+"""
+Tests for materializing point-in-time scores for a date range in one pass per symbol.
+"""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis import score_history
+from bluehorseshoe.analysis.score_history import (
+    HISTORY_SCORE_VERSION, ScoreHistoryBuilder, history_block
+)
+from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+from bluehorseshoe.data.columnar_store import days_to_columns
+from bluehorseshoe.data.universe_panel import UniversePanel
+from conftest import indicator_frame
+
+
+def _history(n_bars, seed, drift=0.0):
+    """Random-walk history with the stored indicator columns computed over all of it."""
+    rng = np.random.default_rng(seed)
+    return indicator_frame(rng, pd.bdate_range('2016-01-04', periods=n_bars).strftime('%Y-%m-%d'),
+                           rng.uniform(0.01, 0.03), price=40.0, drift=drift, volume=(500_000, 5_000_000))
+
+
+def test_history_block_rows_are_lookback_tails():
+    """Each row holds the same bars TechnicalAnalyzer._lookback_tail keeps."""
+    df = pd.DataFrame({'close': np.arange(1000.0)})
+    block = history_block(df, [10, 299, 300, 700, 999], 300)
+    for row, end in enumerate([10, 299, 300, 700, 999]):
+        tail = TechnicalAnalyzer._lookback_tail(df.iloc[:end + 1], 300)  # pylint: disable=protected-access
+        values = block.columns['close'][row]
+        assert block.lengths[row] == len(tail)
+        np.testing.assert_array_equal(values[~np.isnan(values)], tail['close'].to_numpy())
+
+
+@pytest.mark.parametrize("seed,drift", [(0, 0.0), (1, -0.004)])
+def test_score_history_matches_per_date_scores(seed, drift):
+    """Every date's components equal calculate_technical_score on the history up to that date."""
+    df = _history(1900, seed, drift)
+    start, end = df['date'].iloc[1800], df['date'].iloc[1899]
+    scores = score_history.score_history(df, start, end, chunk_size=32)
+
+    assert list(scores['baseline']) == list(df['date'].iloc[1800:1900])
+    for position in range(1800, 1900, 3):
+        days = df.iloc[:position + 1]
+        date = df['date'].iloc[position]
+        for strategy in ("baseline", "mean_reversion"):
+            expected = TechnicalAnalyzer.calculate_technical_score(days, strategy)
+            assert scores[strategy][date] == pytest.approx(expected, abs=1e-6), (strategy, date)
+
+
+def test_builder_inserts_missing_scores_only(monkeypatch):
+    """The builder loads each symbol once and bulk-inserts positive scores without overwriting."""
+    frames = {'AAA': _history(400, 2), 'BBB': _history(400, 3, -0.006)}
+    panel = UniversePanel.from_columns({s: days_to_columns(df.to_dict('records')) for s, df in frames.items()})
+    loads = []
+
+    def from_database(_database, symbols=None, **_kwargs):
+        loads.append(list(symbols))
+        return panel
+    monkeypatch.setattr(score_history.UniversePanel, 'from_database', from_database)
+
+    database = MagicMock()
+    collection = database.__getitem__.return_value
+    with pytest.raises(ValueError):
+        ScoreHistoryBuilder()
+
+    start, end = frames['AAA']['date'].iloc[350], frames['AAA']['date'].iloc[399]
+    written = ScoreHistoryBuilder(database=database).build(start, end, symbols=['AAA', 'BBB'])
+
+    assert loads == [['AAA', 'BBB']]
+    operations = collection.bulk_write.call_args[0][0]
+    assert written == len(operations) > 0
+    for operation in operations:
+        document = operation._doc['$setOnInsert']  # pylint: disable=protected-access
+        assert document['version'] == HISTORY_SCORE_VERSION and document['score'] > 0
+        assert document['metadata']['components']['total'] == document['score']
+        assert start <= operation._filter['date'] <= end  # pylint: disable=protected-access
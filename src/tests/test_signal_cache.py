@@ -0,0 +1,100 @@
+"""
+Tests for the raw-signal cache and the weight sweep engine.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.cross_sectional import CrossSectionalScorer
+from bluehorseshoe.analysis.signal_cache import SignalCache, WeightSweep
+from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+from bluehorseshoe.core.config import weights_config
+from bluehorseshoe.data.universe_panel import UniversePanel
+from conftest import indicator_columns
+
+CONFIGS = [
+    {},
+    {'trend': {'PSAR_MULTIPLIER': 2.0, 'ADX_MULTIPLIER': 0.0}, 'momentum': {'RSI_MULTIPLIER': 0.5}},
+    {'volume': {'OBV_MULTIPLIER': 0.0, 'VWAP_MULTIPLIER': 1.5}, 'price_action': {'GAP_MULTIPLIER': 3.0}},
+]
+
+
+def _universe(n_symbols=24, n_bars=320, seed=11):
+    """Random-walk symbols with the stored indicator columns."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=n_bars)
+    symbol_columns = {}
+    for k in range(n_symbols):
+        n = n_bars - 10 * (k % 4)
+        symbol_columns[f'S{k}'] = indicator_columns(rng, dates[-n:].strftime('%Y-%m-%d'), rng.uniform(0.005, 0.04))
+    return UniversePanel.from_columns(symbol_columns), dates
+
+
+def _with_weights(monkeypatch, config):
+    """Patches weights_config so the regular scorers see `config` on top of the current weights."""
+    current = weights_config.get_weights
+    monkeypatch.setattr(weights_config, 'get_weights',
+                        lambda category: {**current(category), **config.get(category, {})})
+
+
+def test_raw_signals_match_indicator_classes():
+    """Cached raw signals equal the per-symbol Indicator.get_raw_signals values."""
+    panel, dates = _universe(n_symbols=4)
+    target_date = dates[-20].strftime('%Y-%m-%d')
+    cache = SignalCache.build(panel, [target_date])
+
+    for s, symbol in enumerate(cache.symbols):
+        if not cache.eligible[0, s]:
+            continue
+        expected = TechnicalAnalyzer.calculate_raw_signals(panel.frame(symbol, target_date))
+        assert list(expected) == cache.signals
+        assert cache.values[0, s] == pytest.approx(list(expected.values()), abs=1e-6)
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_sweep_scores_match_rescoring(monkeypatch, config):
+    """One matrix multiply gives the totals a full rescore with the config's weights would."""
+    panel, dates = _universe()
+    signal_dates = [dates[-40].strftime('%Y-%m-%d'), dates[-15].strftime('%Y-%m-%d')]
+    cache = SignalCache.build(panel, signal_dates, chunk_size=5)
+    sweep = WeightSweep(cache, panel, top_n=3)
+    matrix = sweep.weight_matrix([config])
+
+    _with_weights(monkeypatch, config)
+    for d, date in enumerate(signal_dates):
+        expected = CrossSectionalScorer().score_panel(panel, date, strategies=("baseline",))['baseline']
+        scores = sweep.scores(d, matrix)[:, 0]
+        for s, symbol in enumerate(cache.symbols):
+            assert scores[s] == pytest.approx(expected.get(symbol, {'total': 0.0})['total'], abs=1e-4), symbol
+
+
+def test_sweep_selects_and_grades_candidates(tmp_path):
+    """Each config trades its top positive scores; the cache survives a save/load round trip."""
+    panel, dates = _universe()
+    signal_dates = [d.strftime('%Y-%m-%d') for d in dates[-60:-10:10]]
+    SignalCache.build(panel, signal_dates).save(tmp_path / 'signals.npz')
+    cache = SignalCache.load(tmp_path / 'signals.npz')
+    assert cache.dates == signal_dates and cache.specs[0] == ('trend', 'stochastic', 'STOCHASTIC_MULTIPLIER')
+
+    sweep = WeightSweep(cache, panel, top_n=3)
+    results = sweep.run(CONFIGS, labels=['current', 'trend', 'volume'])
+    matrix = sweep.weight_matrix(CONFIGS)
+    for c, result in enumerate(results):
+        for d, date in enumerate(signal_dates):
+            scores = sweep.scores(d, matrix)[:, c]
+            top = [cache.symbols[s] for s in np.argsort(-scores, kind='stable')[:3] if scores[s] > 0]
+            assert result.trades[result.trades['date'] == date]['symbol'].tolist() == top
+        assert set(result.trades['status']) <= {'success', 'failure'}
+
+    summary = WeightSweep.summarize(results)
+    assert sorted(summary['label']) == ['current', 'trend', 'volume']
+    assert (summary['trades'] > 0).all()
+
+
+def test_macd_threshold_change_is_rejected():
+    """MACD_SIGNAL_MULTIPLIER is baked into the raw MACD signal, so changing it needs a rebuild."""
+    panel, dates = _universe(n_symbols=2)
+    sweep = WeightSweep(SignalCache.build(panel, [dates[-5].strftime('%Y-%m-%d')]), panel)
+    with pytest.raises(ValueError):
+        sweep.weight_matrix([{'momentum': {'MACD_SIGNAL_MULTIPLIER': 0.5}}])
+    sweep.weight_matrix([{'momentum': {'MACD_SIGNAL_MULTIPLIER': 0.5, 'MACD_MULTIPLIER': 0.0}}])
@@ -0,0 +1,77 @@
+"""
+Tests for the SVG sparklines of the HTML report.
+"""
+import base64
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from bluehorseshoe.data.columnar_store import days_to_columns
+from bluehorseshoe.data.universe_panel import UniversePanel
+from bluehorseshoe.reporting import sparklines
+from bluehorseshoe.reporting.html_reporter import HTMLReporter
+from bluehorseshoe.reporting.sparklines import SparklineRenderer, fetch_recent_bars, render_svg
+
+
+def _days(n, start='2024-06-03', close=100.0):
+    return [{'date': d, 'open': close + i, 'high': close + i + 2, 'low': close + i - 2, 'close': close + i + (-1) ** i}
+            for i, d in enumerate(pd.bdate_range(start, periods=n).strftime('%Y-%m-%d'))]
+
+
+@pytest.fixture(name='database')
+def fixture_database(database):
+    """AAPL in the recent collection, MSFT only in the full one."""
+    database['historical_prices_recent'].insert_one({'symbol': 'AAPL', 'days': _days(30)})
+    database['historical_prices'].insert_many([{'symbol': 'AAPL', 'days': _days(300)},
+                                               {'symbol': 'MSFT', 'days': _days(40)}])
+    return database
+
+
+def test_render_svg_draws_one_candle_per_bar():
+    """Each bar gets a wick and a body coloured by direction."""
+    svg = render_svg(_days(10))
+    assert svg.startswith('<svg') and svg.count('<line') == 10 and svg.count('<rect') == 10
+    assert sparklines.UP_COLOR in svg and sparklines.DOWN_COLOR in svg
+    assert render_svg([]) == ''
+
+
+def test_bars_come_from_one_query_per_collection(database):
+    """Only the last bars are fetched; symbols missing from the recent collection fall back."""
+    bars = fetch_recent_bars(database, ['AAPL', 'MSFT', 'NONE'], bars=10)
+    assert sorted(bars) == ['AAPL', 'MSFT']
+    assert len(bars['AAPL']) == 10 and bars['AAPL'][-1]['date'] == '2024-07-12'
+
+
+def test_charts_are_cached_by_last_bar(database, tmp_path):
+    """A second renderer on the same directory reuses the files until a new bar arrives."""
+    charts = SparklineRenderer(database, cache_dir=str(tmp_path)).render(['AAPL', 'NONE'])
+    assert charts['NONE'] == '' and charts['AAPL'].startswith('data:image/svg+xml;base64,')
+    assert (tmp_path / 'AAPL_2024-07-12.svg').exists()
+
+    with patch.object(sparklines, 'render_svg', side_effect=AssertionError):
+        assert SparklineRenderer(database, cache_dir=str(tmp_path)).render(['AAPL']) == {'AAPL': charts['AAPL']}
+
+    database['historical_prices_recent'].update_one(
+        {'symbol': 'AAPL'}, {'$push': {'days': {'date': '2024-07-15', 'open': 1, 'high': 2, 'low': 0.5, 'close': 1.5}}})
+    assert SparklineRenderer(database, cache_dir=str(tmp_path)).render(['AAPL'])['AAPL'] != charts['AAPL']
+
+
+def test_report_embeds_sparklines(database, tmp_path):
+    """Top candidates of the full report carry their chart."""
+    candidates = [{'symbol': 'AAPL', 'strategy': 'Baseline', 'score': 10.0, 'close': 100.0,
+                   'stop_loss': 95.0, 'target': 110.0}]
+    html = HTMLReporter(output_dir=str(tmp_path), database=database).generate_report(
+        date='2024-07-12', regime={}, candidates=candidates, charts=[])
+    uri = candidates[0]['chart_b64']
+    assert uri in html
+    assert base64.b64decode(uri.split(',', 1)[1]).decode().startswith('<svg')
+
+
+def test_panel_symbols_are_not_queried(database):
+    """Symbols held by the run's panel take their bars from it."""
+    panel = UniversePanel.from_columns({'AAPL': days_to_columns(_days(30))})
+    with patch.object(sparklines, 'fetch_recent_bars', return_value={}) as fetch:
+        charts = SparklineRenderer(database, panel=panel).render(['AAPL', 'MSFT'])
+    fetch.assert_called_once_with(database, ['MSFT'], sparklines.SPARKLINE_BARS)
+    assert charts['AAPL'] == SparklineRenderer(database).render(['AAPL'])['AAPL']
@@ -36,7 +36,7 @@ def test_process_baseline_bearish_regime(sample_data, mocker):
     trader = SwingTrader()
     
     # Mock dependencies
-    trader.ml_inference.predict_probability = MagicMock(return_value=0.6)
+    trader.ml_inference.predict_probability_batch = MagicMock(side_effect=lambda items, strategy: [0.6] * len(items))
     
     # Context with Bearish regime
     ctx = StrategyContext(
@@ -16,6 +16,8 @@ import pytest
 import pandas as pd
 from unittest.mock import MagicMock
 from bluehorseshoe.analysis.strategy import SwingTrader, TechnicalAnalyzer, StrategyContext
+from bluehorseshoe.data.columnar_store import days_to_columns
+from bluehorseshoe.data.universe_panel import UniversePanel
 
 @pytest.fixture
 def mock_database():
@@ -161,8 +163,10 @@ def test_process_symbol(swing_trader, sample_data, mocker): # pylint: disable=re
     # Mock holiday_mode on the config object instead of GlobalData
     swing_trader.config.holiday_mode = False
     mocker.patch('bluehorseshoe.analysis.strategy.MIN_RR_RATIO_BASELINE', 0.0)
-    mocker.patch('bluehorseshoe.analysis.strategy.MIN_RR_RATIO_MEAN_REVERSION', 0.0)
     mocker.patch('bluehorseshoe.analysis.strategy.MAX_RISK_PERCENT', 1.0)
+    mocker.patch('bluehorseshoe.analysis.prediction_batch.MIN_RR_RATIO_BASELINE', 0.0)
+    mocker.patch('bluehorseshoe.analysis.prediction_batch.MIN_RR_RATIO_MEAN_REVERSION', 0.0)
+    mocker.patch('bluehorseshoe.analysis.prediction_batch.MAX_RISK_PERCENT', 1.0)
     # Mocking now to a Sunday so BDay(1) is Friday (Jan 2)
     mocker.patch('bluehorseshoe.analysis.strategy.pd.Timestamp.now', return_value=pd.Timestamp('2026-01-04'))
 
@@ -183,3 +187,46 @@ def test_process_symbol(swing_trader, sample_data, mocker): # pylint: disable=re
     assert result['name'] == 'Test Stock'
     assert result['baseline_setup']['entry_price'] > 0
     assert result['baseline_score'] > 0
+
+def test_swing_predict_precomputes_scores_from_panel(mock_database, sample_data, mocker): # pylint: disable=redefined-outer-name
+    """
+    With a panel, swing_predict scores the requested symbols at once with CrossSectionalScorer.
+    """
+    days = sample_data.assign(date=sample_data['date'].dt.strftime('%Y-%m-%d')).to_dict('records')
+    panel = UniversePanel.from_columns({'AAPL': days_to_columns(days)})
+    trader = SwingTrader(database=mock_database, panel=panel)
+    target_date = days[-1]['date']
+
+    mocker.patch('bluehorseshoe.analysis.strategy.MarketRegime.get_market_health',
+                 return_value={'status': 'Neutral', 'multiplier': 1.0})
+    mocker.patch('bluehorseshoe.analysis.strategy.get_symbols_from_mongo', return_value=[{'symbol': 'AAPL'}])
+    mocker.patch.object(trader, '_load_benchmark_data', return_value=None)
+    mocker.patch.object(trader, '_write_report')
+    mocker.patch.object(trader, '_prescreen', side_effect=lambda symbols, _: symbols)
+    mocker.patch.object(trader, '_execute_prediction_batch', return_value=[])
+    score_panel = mocker.patch('bluehorseshoe.analysis.strategy.CrossSectionalScorer.score_panel',
+                               return_value={'baseline': {}})
+
+    trader.swing_predict(target_date=target_date, symbols=['AAPL'])
+    score_panel.assert_called_once_with(panel, target_date=target_date, symbols=['AAPL'])
+
+
+def test_swing_predict_does_not_rescreen_screened_symbols(mock_database, mocker): # pylint: disable=redefined-outer-name
+    """
+    Symbols from screen_symbols (main -p builds its panel from them) are not pre-screened again.
+    """
+    trader = SwingTrader(database=mock_database)
+    mocker.patch.object(trader.config, 'prescreen', True)
+    prescreen = mocker.patch.object(trader, '_prescreen', side_effect=lambda symbols, _: symbols[:1])
+    assert trader.screen_symbols(['AAPL', 'MSFT'], '2024-06-28') == ['AAPL']
+
+    mocker.patch('bluehorseshoe.analysis.strategy.MarketRegime.get_market_health',
+                 return_value={'status': 'Neutral', 'multiplier': 1.0})
+    mocker.patch('bluehorseshoe.analysis.strategy.get_symbols_from_mongo', return_value=[{'symbol': 'AAPL'}])
+    mocker.patch.object(trader, '_load_benchmark_data', return_value=None)
+    mocker.patch.object(trader, '_write_report')
+    execute = mocker.patch.object(trader, '_execute_prediction_batch', return_value=[])
+
+    trader.swing_predict(target_date='2024-06-28', symbols=['AAPL'], screened=True)
+    prescreen.assert_called_once()
+    assert execute.call_args[0][0] == ['AAPL']
@@ -0,0 +1,137 @@
+"""
+Tests for the symbol_status collection and the update planner.
+"""
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from bluehorseshoe.core import batch_loader
+from bluehorseshoe.core.symbol_status import (
+    COMPACT, FULL, SYMBOL_STATUS_COLLECTION, expected_bar_date, get_symbol_status, is_adjusted,
+    plan_updates, record_appended_bars, record_fetch
+)
+from bluehorseshoe.core.symbols import refresh_historical_for_symbol, upsert_historical_to_mongo
+from bluehorseshoe.data.historical_data import process_symbol, save_historical_data_to_mongo
+
+
+def _days(start, periods, close=10.0):
+    return [{'date': d, 'close': close + i} for i, d in
+            enumerate(pd.bdate_range(start, periods=periods).strftime('%Y-%m-%d'))]
+
+
+def test_writes_maintain_status(database):
+    """Rewrites set the bar fields, appends move them forward, fetches record their outcome."""
+    upsert_historical_to_mongo('AAPL', _days('2024-01-01', 10), database=database)
+    status = get_symbol_status('AAPL', database=database)
+    assert status['bar_count'] == 10 and status['last_bar_date'] == '2024-01-12'
+
+    # Same closes on the stored dates: appended through the status, without reading the history
+    with patch.object(database['historical_prices'], 'find_one', side_effect=AssertionError):
+        upsert_historical_to_mongo('AAPL', _days('2024-01-01', 12), database=database)
+    status = get_symbol_status('AAPL', database=database)
+    assert status['bar_count'] == 12 and status['last_bar_date'] == '2024-01-16'
+    assert len(database['historical_prices'].find_one({'symbol': 'AAPL'})['days']) == 12
+
+    # A back-adjusted close is detected and the history rewritten
+    adjusted = _days('2024-01-01', 13, close=5.0)
+    assert is_adjusted(status, adjusted) is True
+    upsert_historical_to_mongo('AAPL', adjusted, database=database)
+    assert database['historical_prices'].find_one({'symbol': 'AAPL'})['days'][0]['close'] == 5.0
+    assert get_symbol_status('AAPL', database=database)['bar_count'] == 13
+
+    record_fetch('AAPL', error='timeout', database=database)
+    status = get_symbol_status('AAPL', database=database)
+    assert status['last_error'] == 'timeout' and status['last_fetch_at'] and status['bar_count'] == 13
+
+
+
+def test_adjusted_compact_fetch_rewrites_the_full_history(database):
+    """A compact window showing an adjustment is not merged; the full history is refetched and replaces the stored one."""
+    upsert_historical_to_mongo('AAPL', _days('2024-01-01', 300), database=database)
+    adjusted = _days('2024-01-01', 301, close=5.0)
+    fetches = []
+
+    def fetch(symbol, recent=False):
+        fetches.append(recent)
+        return {'symbol': symbol, 'days': adjusted[-100:] if recent else adjusted}
+
+    with patch('bluehorseshoe.core.symbols.fetch_daily_ohlc_from_net', side_effect=fetch):
+        summary = refresh_historical_for_symbol('AAPL', recent=True, database=database)
+
+    assert fetches == [True, False]
+    assert summary['num_days'] == 301
+    stored = database['historical_prices'].find_one({'symbol': 'AAPL'})['days']
+    assert [d['close'] for d in stored] == [d['close'] for d in adjusted]
+    assert get_symbol_status('AAPL', database=database)['bar_count'] == 301
+
+def test_plan_orders_by_urgency_and_picks_output_size(database):
+    """Up-to-date symbols are skipped; active, healthy and far-behind symbols come first."""
+    save_historical_data_to_mongo('NEAR', {'symbol': 'NEAR', 'days': _days('2024-06-03', 20)}, database)
+    save_historical_data_to_mongo('FAR', {'symbol': 'FAR', 'days': _days('2023-01-02', 20)}, database)
+    save_historical_data_to_mongo('DONE', {'symbol': 'DONE', 'days': _days('2024-06-03', 25)}, database)
+    save_historical_data_to_mongo('IDLE', {'symbol': 'IDLE', 'days': _days('2024-06-03', 10)}, database)
+    save_historical_data_to_mongo('FAILED', {'symbol': 'FAILED', 'days': _days('2024-06-03', 10)}, database)
+    record_fetch('FAILED', error='boom', database=database)
+    # Fetched after the 2024-07-05 bar was published and still behind: not planned again
+    save_historical_data_to_mongo('GONE', {'symbol': 'GONE', 'days': _days('2024-06-03', 10)}, database)
+    statuses = database[SYMBOL_STATUS_COLLECTION]
+    statuses.update_one({'symbol': 'GONE'}, {'$set': {'last_fetch_at': '2024-07-06T01:00:00'}})
+    statuses.update_one({'symbol': 'FAILED'}, {'$set': {'last_fetch_at': '2024-07-05T12:00:00'}})
+    # Stored before statuses existed: backfilled from historical_prices on the first plan
+    database['historical_prices'].insert_one({'symbol': 'OLD', 'days': _days('2024-06-03', 21)})
+
+    rows = [{'symbol': s} for s in ('NEAR', 'FAR', 'DONE', 'FAILED', 'GONE', 'OLD', 'NEW')] + [
+        {'symbol': 'IDLE', 'active': False}]
+    plan = plan_updates(database, rows, expected='2024-07-05')
+
+    assert [p.symbol for p in plan] == ['FAR', 'NEAR', 'OLD', 'NEW', 'FAILED', 'IDLE']
+    by_symbol = {p.symbol: p for p in plan}
+    # Gaps count sessions: July 4th is not one
+    assert by_symbol['NEAR'].mode == COMPACT and by_symbol['NEAR'].gap == 4
+    assert by_symbol['OLD'].gap == 3
+    assert by_symbol['FAR'].mode == FULL and by_symbol['NEW'].mode == FULL and by_symbol['NEW'].gap is None
+    assert database[SYMBOL_STATUS_COLLECTION].count_documents({'symbol': 'OLD'}) == 1
+
+
+def test_append_without_status_leaves_the_count_to_backfill(database):
+    """An append to a symbol without status does not create one with a partial bar count."""
+    record_appended_bars('AAPL', _days('2024-01-01', 2), database=database)
+    assert get_symbol_status('AAPL', database=database) is None
+
+    database['historical_prices'].insert_one({'symbol': 'AAPL', 'days': _days('2024-01-01', 12)})
+    plan_updates(database, ['AAPL'], expected='2024-07-05')
+    assert get_symbol_status('AAPL', database=database)['bar_count'] == 12
+
+
+def test_batch_runs_end_with_failing_symbols(database):
+    """Failed symbols are not retried within the session, and classification keeps its own cursor."""
+    database['symbols'].insert_many([{'symbol': s, 'active': True} for s in ('AAA', 'ZZZ')])
+    with patch('bluehorseshoe.core.symbol_status.expected_bar_date', return_value='2024-07-05'), \
+            patch.object(batch_loader, 'refresh_historical_for_symbol', side_effect=RuntimeError('delisted')):
+        first = batch_loader.run_historical_batch(database, sleep_seconds=0)
+        assert first['status'] == 'ok' and sorted(first['failed_symbols']) == ['AAA', 'ZZZ']
+        assert batch_loader.run_historical_batch(database, sleep_seconds=0)['status'] == 'done'
+
+    with patch.object(batch_loader, 'fetch_daily_ohlc_from_net'), \
+            patch.object(batch_loader, 'refresh_historical_for_symbol'):
+        assert batch_loader.classify_symbols_batch(database, limit=1, sleep_seconds=0)['last_symbol'] == 'AAA'
+    assert batch_loader.get_checkpoint(database)['classify_cursor'] == 'AAA'
+
+
+def test_process_symbol_skips_from_status():
+    """An up-to-date status skips the symbol without loading its history."""
+    database = MagicMock()
+    database['symbol_status'].find_one.return_value = {'symbol': 'AAPL', 'last_bar_date': '2999-01-01'}
+    with patch('bluehorseshoe.data.historical_data.load_historical_data_from_mongo') as load, \
+            patch('bluehorseshoe.data.historical_data.load_historical_data_from_net') as fetch:
+        process_symbol({'symbol': 'AAPL', 'name': 'Apple'}, 1, 1, False, True, database)
+    load.assert_not_called()
+    fetch.assert_not_called()
+
+
+def test_expected_bar_date():
+    """Before 6PM New York time the previous session's bar is the latest; weekends and holidays are skipped."""
+    assert expected_bar_date(pd.Timestamp('2024-07-03 10:00', tz='US/Eastern')) == '2024-07-02'
+    assert expected_bar_date(pd.Timestamp('2024-07-03 19:00', tz='US/Eastern')) == '2024-07-03'
+    assert expected_bar_date(pd.Timestamp('2024-07-08 09:00', tz='US/Eastern')) == '2024-07-05'
+    assert expected_bar_date(pd.Timestamp('2024-07-05 10:00', tz='US/Eastern')) == '2024-07-03'
@@ -0,0 +1,122 @@
+"""
+Parity tests for the vectorized trade simulator against per-bar reference loops.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.grading_engine import GradingEngine
+from bluehorseshoe.analysis.trade_simulator import simulate_bracket_trades, simulate_limit_trades
+
+
+def _bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    opens = close + rng.normal(0, 1.0, n)
+    high = np.maximum(opens, close) + rng.uniform(0, 1.5, n)
+    low = np.minimum(opens, close) - rng.uniform(0, 1.5, n)
+    return opens, high, low, close
+
+
+def _bracket_reference(highs, lows, closes, start, entry, stop, target, hold_days):
+    """Bar-by-bar GradingEngine rules: target before stop, close out at the end of the window."""
+    window = range(start, min(start + hold_days, len(closes)))
+    if not window:
+        return None
+    max_gain = -999.0
+    for pos, i in enumerate(window):
+        max_gain = max(max_gain, (highs[i] / entry - 1) * 100)
+        if highs[i] >= target:
+            return 'success', target, pos + 1, max_gain
+        if lows[i] <= stop:
+            return 'failure', stop, pos + 1, max_gain
+    last = window[-1]
+    return ('success' if closes[last] > entry else 'failure'), closes[last], len(window), max_gain
+
+
+def _limit_reference(opens, highs, lows, closes, start, entry, stop, target, hold_days):
+    """Bar-by-bar Backtester rules: limit fill with gap pricing, stop before target, time exit."""
+    status, actual, exit_price, entry_idx, i = 'no_entry', None, None, -1, 0
+    for i in range(len(closes) - start):
+        bar = start + i
+        if status == 'no_entry':
+            if lows[bar] <= entry:
+                status, entry_idx = 'active', i
+                actual = opens[bar] if opens[bar] < entry else entry
+            elif i >= hold_days:
+                status = 'limit_expired'
+                break
+        if status == 'active':
+            if lows[bar] <= stop:
+                status, exit_price = 'stopped_out', (opens[bar] if opens[bar] < stop else stop)
+            elif highs[bar] >= target:
+                status, exit_price = 'success', (opens[bar] if opens[bar] > target else target)
+            elif i != entry_idx and i - entry_idx >= hold_days:
+                exit_price = closes[bar]
+                status = 'closed_profit' if exit_price > actual else 'closed_loss'
+            if status != 'active':
+                break
+    return status, actual, exit_price, (i - entry_idx) if entry_idx != -1 else 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bracket_trades_match_reference(seed):
+    """Every graded trade matches the bar-by-bar loop, including windows cut short by the end of data."""
+    _, highs, lows, closes = _bars(300, seed)
+    rng = np.random.default_rng(100 + seed)
+    start = rng.integers(0, 305, 400)
+    entry = closes[np.minimum(start, 299)]
+    stop = entry * rng.uniform(0.9, 0.99, 400)
+    target = entry * rng.uniform(1.01, 1.1, 400)
+
+    out = simulate_bracket_trades(highs, lows, closes, start, entry, stop, target, hold_days=10)
+    for k in range(400):
+        expected = _bracket_reference(highs, lows, closes, start[k], entry[k], stop[k], target[k], 10)
+        if expected is None:
+            assert out.status[k] == 'no_future_data'
+            continue
+        assert (out.status[k], out.days_held[k]) == (expected[0], expected[2])
+        assert out.exit_price[k] == pytest.approx(expected[1])
+        assert out.max_gain[k] == pytest.approx(expected[3])
+        window = slice(start[k], start[k] + 10)
+        assert out.max_high[k] == max(highs[window].max(), entry[k])
+        assert out.min_low[k] == min(lows[window].min(), entry[k])
+
+
+@pytest.mark.parametrize("hold_days", [0, 1, 3, 10])
+def test_limit_trades_match_reference(hold_days):
+    """Limit fills, gap-through exits, time exits and expiries match the bar-by-bar loop."""
+    opens, highs, lows, closes = _bars(200, hold_days)
+    rng = np.random.default_rng(hold_days)
+    start = rng.integers(0, 200, 300)
+    entry = closes[start] * rng.uniform(0.95, 1.01, 300)
+    stop = entry * rng.uniform(0.93, 0.99, 300)
+    target = entry * rng.uniform(1.01, 1.08, 300)
+
+    out = simulate_limit_trades(opens, highs, lows, closes, start, entry, stop, target, hold_days)
+    for k in range(300):
+        status, actual, exit_price, days_held = _limit_reference(
+            opens, highs, lows, closes, start[k], entry[k], stop[k], target[k], hold_days)
+        assert (out.status[k], out.days_held[k]) == (status, days_held)
+        assert (np.nan if actual is None else actual) == pytest.approx(out.actual_entry[k], nan_ok=True)
+        assert (np.nan if exit_price is None else exit_price) == pytest.approx(out.exit_price[k], nan_ok=True)
+
+
+def test_grading_engine_batch_matches_single_scores():
+    """Grading many scores of a symbol at once gives the same result as one at a time."""
+    opens, highs, lows, closes = _bars(60, 7)
+    df = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=60, freq='D').strftime('%Y-%m-%d'),
+        'open': opens, 'high': highs, 'low': lows, 'close': closes, 'atr_14': 1.5
+    }).iloc[::-1]  # Unsorted input
+    docs = [{
+        'symbol': 'TEST', 'date': f'2024-02-{day:02d}', 'score': 1.0, 'strategy': 'baseline',
+        'metadata': {'entry_price': 100.0, 'stop_loss': 97.0, 'take_profit': 104.0}
+    } for day in range(1, 30)] + [{'symbol': 'TEST', 'date': '2024-01-05', 'metadata': {}}]
+
+    engine = GradingEngine(hold_days=10)
+    batch = engine._evaluate_batch(docs, df)  # pylint: disable=protected-access
+    assert batch == [engine._evaluate_with_df(doc, df) for doc in docs]  # pylint: disable=protected-access
+    assert batch[-1]['status'] == 'missing_metadata'
+    assert batch[-2]['status'] == 'no_future_data'
+    assert {r['status'] for r in batch[:-2]} <= {'success', 'failure'}
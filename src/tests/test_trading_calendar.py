@@ -0,0 +1,73 @@
+"""
+Tests for the trading calendar service.
+"""
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from bluehorseshoe.core import trading_calendar
+from bluehorseshoe.core.trading_calendar import (
+    CALENDAR_COLLECTION, TradingCalendar, get_trading_calendar, update_trading_calendar
+)
+
+# SPY sessions of early July 2024 (July 4th closed)
+JULY = ['2024-07-01', '2024-07-02', '2024-07-03', '2024-07-05', '2024-07-08']
+
+
+@pytest.fixture(name='database')
+def fixture_database(database):
+    """The shared database with SPY bars."""
+    database['historical_prices'].insert_one({'symbol': 'SPY', 'days': [{'date': d, 'close': 1.0} for d in JULY]})
+    return database
+
+
+def test_lookups_over_stored_sessions():
+    """Stored sessions answer previous/next/range/index_of; holidays are skipped."""
+    calendar = TradingCalendar(reversed(JULY))
+    assert calendar.latest() == '2024-07-08'
+    assert calendar.previous('2024-07-05') == '2024-07-03'
+    assert calendar.previous('2024-07-04') == '2024-07-03'
+    assert calendar.previous('2024-07-01') is None
+    assert calendar.next('2024-07-03') == '2024-07-05'
+    assert calendar.range('2024-07-02', '2024-07-05') == ['2024-07-02', '2024-07-03', '2024-07-05']
+    assert calendar.index_of('2024-07-05') == 3 and calendar.index_of('2024-07-04') is None
+    assert calendar.is_session('2024-07-05') and not calendar.is_session('2024-07-04')
+
+
+def test_rules_extend_past_the_last_session():
+    """After the last stored session, weekdays that are not NYSE holidays are sessions."""
+    calendar = TradingCalendar(JULY)
+    assert calendar.next('2024-07-08') == '2024-07-09'
+    assert calendar.range('2024-08-30', '2024-09-03') == ['2024-08-30', '2024-09-03']  # Labor Day
+    assert calendar.previous('2024-12-26') == '2024-12-24'  # Christmas
+
+    rules = TradingCalendar()
+    assert rules.latest() is None
+    assert rules.previous('2024-07-05') == '2024-07-03'
+    assert rules.next('2024-11-27') == '2024-11-29'  # Thanksgiving
+    assert rules.last_closed(pd.Timestamp('2024-07-05 10:00', tz='US/Eastern')) == '2024-07-03'
+    assert rules.last_closed(pd.Timestamp('2024-07-05 18:30', tz='US/Eastern')) == '2024-07-05'
+    assert rules.last_closed(pd.Timestamp('2024-07-07 12:00', tz='US/Eastern')) == '2024-07-05'
+
+
+def test_calendar_is_stored_and_cached(database):
+    """The first lookup builds and stores the sessions; later ones reuse the cached calendar."""
+    calendar = get_trading_calendar(database)
+    assert calendar.sessions == JULY
+    assert database[CALENDAR_COLLECTION].find_one({'_id': 'NYSE'})['sessions'] == JULY
+
+    with patch.object(database[CALENDAR_COLLECTION], 'find_one', side_effect=AssertionError):
+        assert get_trading_calendar(database) is calendar
+
+    database['historical_prices'].update_one({'symbol': 'SPY'}, {'$push': {'days': {'date': '2024-07-09'}}})
+    assert update_trading_calendar(database) == 6
+    assert get_trading_calendar(database).latest() == '2024-07-09'
+
+    # Past CACHE_SECONDS the stored sessions are read again
+    with patch.object(trading_calendar, 'CACHE_SECONDS', 0):
+        database[CALENDAR_COLLECTION].update_one({'_id': 'NYSE'}, {'$set': {'sessions': JULY[:2]}})
+        assert get_trading_calendar(database).latest() == '2024-07-02'
+
+    with pytest.raises(ValueError):
+        update_trading_calendar()
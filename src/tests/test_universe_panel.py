@@ -0,0 +1,88 @@
+"""
+Tests for the in-memory UniversePanel.
+"""
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+
+from bluehorseshoe.data.columnar_store import days_to_columns
+from bluehorseshoe.data.universe_panel import DEFAULT_FIELDS, UniversePanel
+from bluehorseshoe.analysis.market_regime import MarketRegime
+
+
+def _days(dates, start_price):
+    return [
+        {'date': d, 'open': start_price + i, 'high': start_price + i + 1, 'low': start_price + i - 1,
+         'close': start_price + i + 0.5, 'volume': 1000 + i}
+        for i, d in enumerate(dates)
+    ]
+
+
+def _panel():
+    aapl = _days(['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'], 100.0)
+    newco = _days(['2024-01-04', '2024-01-05'], 10.0)
+    return UniversePanel.from_columns(
+        {'AAPL': days_to_columns(aapl), 'NEWCO': days_to_columns(newco)},
+        names={'AAPL': 'Apple'}
+    )
+
+
+def test_frame_point_in_time():
+    """
+    The point-in-time slice only contains the symbol's own bars on or before the target date.
+    """
+    panel = _panel()
+    assert 'AAPL' in panel and 'MSFT' not in panel
+    assert panel.full_name('AAPL') == 'Apple'
+
+    df = panel.frame('AAPL', target_date='2024-01-04')
+    assert df['date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-01-02', '2024-01-03', '2024-01-04']
+    assert df['close'].tolist() == [100.5, 101.5, 102.5]
+    assert df['volume'].dtype == np.int64
+
+    # A symbol listed mid-panel has no NaN padding rows
+    newco = panel.frame('NEWCO')
+    assert len(newco) == 2
+    assert not newco['close'].isna().any()
+    assert panel.frame('MSFT') is None
+
+
+def test_future_frame_and_cross_section():
+    """
+    future_frame returns bars strictly after the date; cross_section returns the latest values.
+    """
+    panel = _panel()
+    future = panel.future_frame('AAPL', '2024-01-03')
+    assert future['date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-01-04', '2024-01-05']
+    assert future.index.tolist() == [0, 1]
+    assert len(panel.future_frame('AAPL', '2024-01-02', limit=1)) == 1
+
+    closes = panel.cross_section('close', target_date='2024-01-03')
+    assert closes[0] == 101.5
+    assert np.isnan(closes[1])
+
+
+def test_market_regime_reads_from_panel():
+    """
+    MarketRegime slices panel symbols without touching the database.
+    """
+    panel = _panel()
+    mock_db = MagicMock()
+    df = MarketRegime._load_frame('AAPL', '2024-01-03', database=mock_db, panel=panel)  # pylint: disable=protected-access
+    assert len(df) == 2
+    assert pd.api.types.is_datetime64_any_dtype(df['date'])
+    mock_db.__getitem__.assert_not_called()
+
+
+def test_from_database_loads_scoring_fields_as_float32(database):
+    """By default only the scoring fields are fetched and stored as float32."""
+    days = [dict(d, rsi_14=50.0, atr_14=2.0, obv=1e9) for d in _days(['2024-01-02', '2024-01-03'], 100.0)]
+    database['historical_prices'].insert_one({'symbol': 'AAPL', 'full_name': 'Apple', 'days': days})
+
+    panel = UniversePanel.from_database(database, symbols=['AAPL'])
+    assert panel.values.dtype == np.float32
+    assert panel.fields == list(DEFAULT_FIELDS)
+    assert panel.frame('AAPL')['rsi_14'].tolist() == [50.0, 50.0]
+
+    graded = UniversePanel.from_database(database, symbols=['AAPL'], fields=['close', 'atr_14'])
+    assert graded.fields == ['close', 'atr_14'] and graded.full_name('AAPL') == 'Apple'
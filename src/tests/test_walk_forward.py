@@ -0,0 +1,139 @@
+"""
+Tests for the walk-forward range backtest against per-date scoring, setups and trade simulation.
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.backtest import BacktestConfig, BacktestOptions, summarize_range_results
+from bluehorseshoe.analysis.constants import (
+    MAX_RISK_PERCENT, MAX_STOCK_PRICE, MIN_RR_RATIO_BASELINE, MIN_RR_RATIO_MEAN_REVERSION, MIN_STOCK_PRICE
+)
+from bluehorseshoe.analysis.cross_sectional import CrossSectionalScorer
+from bluehorseshoe.analysis.strategy import SwingTrader
+from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+from bluehorseshoe.analysis.trade_simulator import simulate_limit_trades
+from bluehorseshoe.analysis.walk_forward import (
+    FALLBACK_MULTIPLIERS, RESULT_COLUMNS, WALK_FORWARD_SUMMARY_TITLE, WalkForwardBacktester, step_dates
+)
+from bluehorseshoe.data.universe_panel import UniversePanel
+from conftest import indicator_columns
+
+
+def _panel(n_symbols=6, n_bars=330, seed=5):
+    """Random-walk symbols; odd symbols drift down so mean reversion has candidates."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2022-01-03', periods=n_bars).strftime('%Y-%m-%d')
+    columns = {}
+    for k in range(n_symbols):
+        columns[f'S{k}'] = indicator_columns(rng, dates, rng.uniform(0.01, 0.035), price=60.0,
+                                             drift=-0.004 if k % 2 else 0.002, volume=(500_000, 5_000_000))
+    return UniversePanel.from_columns(columns)
+
+
+def _reference_setup(days, score, strategy):
+    """The levels and validity SwingTrader computes for one symbol on one date."""
+    trader = SwingTrader.__new__(SwingTrader)
+    stop_mult, profit_mult = FALLBACK_MULTIPLIERS[strategy]
+    days = days.copy()
+    if strategy == "mean_reversion":
+        setup = trader.calculate_mean_reversion_setup(days, stop_mult, profit_mult)
+        valid = setup['is_realistic'] and setup['rr_ratio'] >= MIN_RR_RATIO_MEAN_REVERSION
+    else:
+        setup = trader.calculate_baseline_setup(days, stop_mult, profit_mult)
+        ema9 = days['close'].ewm(span=9).mean().iloc[-1]
+        setup['entry_price'], _, _ = trader._determine_baseline_entry(  # pylint: disable=protected-access
+            days.iloc[-1], ema9, trader._calculate_atr(days), score)  # pylint: disable=protected-access
+        entry, stop = setup['entry_price'], setup['stop_loss']
+        rr_ratio = (setup['take_profit'] - entry) / (entry - stop) if entry - stop > 0 else 0
+        risk_pct = (entry - stop) / entry if entry > 0 else 0
+        valid = abs(days['close'].iloc[-1] / entry - 1) <= 0.15 and risk_pct <= MAX_RISK_PERCENT and rr_ratio >= MIN_RR_RATIO_BASELINE
+    return setup, valid and MIN_STOCK_PRICE < setup['entry_price'] < MAX_STOCK_PRICE
+
+
+def test_step_dates_map_calendar_steps_to_sessions():
+    """Daily steps visit every session once; weekly steps keep the calendar spacing."""
+    sessions = pd.bdate_range('2024-01-01', '2024-02-29').values.astype('datetime64[D]')
+    daily = step_dates(sessions, '2024-01-06', '2024-01-31', 1)
+    assert daily[0] == '2024-01-05' and len(daily) == len(set(daily)) == 19
+    assert step_dates(sessions, '2024-01-01', '2024-01-31', 7) == [
+        '2024-01-01', '2024-01-08', '2024-01-15', '2024-01-22', '2024-01-29']
+
+
+@pytest.mark.parametrize("strategy", ["baseline", "mean_reversion"])
+def test_walk_forward_matches_per_date_backtest(strategy):
+    """Each step trades the per-date top candidates with the per-date levels and outcomes."""
+    panel = _panel()
+    options = BacktestOptions(strategy=strategy, top_n=2)
+    config = BacktestConfig(hold_days=3)
+    results = WalkForwardBacktester(config=config, panel=panel).run(
+        '2022-12-01', '2023-01-31', interval_days=1, options=options)
+    steps = step_dates(panel.dates, '2022-12-01', '2023-01-31', 1)
+
+    assert not results.empty
+    for date in steps:
+        candidates = []
+        for symbol in panel.symbols:
+            days = panel.frame(symbol, date)
+            score = TechnicalAnalyzer.calculate_technical_score(days, strategy)['total']
+            if score <= 0:
+                continue
+            setup, valid = _reference_setup(days, score, strategy)
+            if valid:
+                candidates.append((score, symbol, setup))
+        candidates.sort(key=lambda c: -c[0])
+
+        traded = results[results['date'] == date]
+        assert list(traded['symbol']) == [symbol for _, symbol, _ in candidates[:options.top_n]], date
+        for (score, symbol, setup), (_, row) in zip(candidates, traded.iterrows()):
+            assert row['score'] == pytest.approx(score, abs=1e-6)
+            for key in ('entry_price', 'stop_loss', 'take_profit'):
+                assert row[key] == pytest.approx(setup[key]), (date, symbol, key)
+
+            future = panel.future_frame(symbol, date)
+            sim = simulate_limit_trades(future['open'], future['high'], future['low'], future['close'],
+                                        [0], [setup['entry_price']], [setup['stop_loss']],
+                                        [setup['take_profit']], config.hold_days)
+            assert row['status'] == sim.status[0] and row['days_held'] == sim.days_held[0]
+
+
+def test_summary_skips_unfilled_trades():
+    """Unfilled trades have NaN entry/exit in the results frame and are not counted."""
+    results = pd.DataFrame([
+        {'date': '2023-01-03', 'symbol': 'S0', 'status': 'success', 'entry': 100.0, 'exit_price': 110.0},
+        {'date': '2023-01-03', 'symbol': 'S1', 'status': 'no_entry', 'entry': None, 'exit_price': None},
+    ], columns=RESULT_COLUMNS)
+    assert results['entry'].isna().sum() == 1
+
+    with patch('bluehorseshoe.analysis.backtest.ReportSingleton') as report:
+        summarize_range_results(results.to_dict('records'))
+    lines = [c.args[0] for c in report.return_value.write.call_args_list]
+    assert 'Total Trades Evaluated: 1' in lines
+    assert 'Overall Average PnL: 10.00%' in lines and not any('nan' in line for line in lines)
+
+
+def test_walk_forward_summary_is_labelled_approximate():
+    """main -t --walk-forward heads its summary so it is not read as a run_range_backtest result."""
+    trades = [{'status': 'success', 'entry': 100.0, 'exit_price': 110.0}]
+    with patch('bluehorseshoe.analysis.backtest.ReportSingleton') as report:
+        summarize_range_results(trades, title=WALK_FORWARD_SUMMARY_TITLE)
+    lines = [c.args[0] for c in report.return_value.write.call_args_list]
+    assert lines[0] == f"\n--- {WALK_FORWARD_SUMMARY_TITLE} ---" and 'approximate' in lines[0]
+
+def test_stale_and_short_histories_are_not_traded():
+    """Steps where the per-date path skips the symbol (stale last bar, < 30 bars) get no setup."""
+    df = _panel(n_symbols=1).frame('S0').iloc[:200].reset_index(drop=True)
+    dates = list(df['date'].astype(str).str[:10])
+    last = pd.Timestamp(dates[-1])
+    steps = [dates[20], dates[29], dates[-1],
+             (last + pd.Timedelta(days=7)).strftime('%Y-%m-%d'),
+             (last + pd.Timedelta(days=8)).strftime('%Y-%m-%d')]
+    options = BacktestOptions(strategy='baseline')
+    scorer = CrossSectionalScorer(options.enabled_indicators, options.aggregation, options.weights)
+    signals = WalkForwardBacktester(panel=_panel(n_symbols=1))._symbol_signals(  # pylint: disable=protected-access
+        df, steps, options, scorer)
+    assert not signals['valid'][0] and signals['score'][0] == 0.0
+    assert signals['score'][1] != 0.0 and signals['score'][3] != 0.0
+    assert not signals['valid'][4] and signals['score'][4] == 0.0
@@ -0,0 +1,96 @@
+"""
+Tests for injecting immutable WeightSets into scoring instead of the weights_config singleton.
+"""
+import dataclasses
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bluehorseshoe.analysis.cross_sectional import CrossSectionalScorer
+from bluehorseshoe.analysis.indicators.trend_indicators import TrendIndicator
+from bluehorseshoe.analysis.technical_analyzer import TechnicalAnalyzer
+from bluehorseshoe.core.config import DEFAULT_WEIGHTS, WeightSet, weights_config
+from bluehorseshoe.data.columnar_store import days_to_columns
+from bluehorseshoe.data.universe_panel import UniversePanel
+from conftest import indicator_frame
+
+OVERRIDES = {
+    'trend': {'PSAR_MULTIPLIER': 3.0, 'ADX_MULTIPLIER': 0.0},
+    'momentum': {'RSI_MULTIPLIER': 2.5},
+    'mean_reversion': {'CANDLESTICK_MULTIPLIER': 0.0, 'RSI_MULTIPLIER': 2.0},
+}
+
+
+def _frames(n_symbols=6, n_bars=260, seed=3):
+    """Random-walk symbols with the stored indicator columns; odd symbols drift down into oversold."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=n_bars)
+    frames = {}
+    for k in range(n_symbols):
+        frames[f'S{k}'] = indicator_frame(rng, dates.strftime('%Y-%m-%d'), rng.uniform(0.005, 0.04),
+                                          drift=-0.006 if k % 2 else 0.0)
+    return frames
+
+
+def test_weight_set_is_immutable_value():
+    """Overrides return a new set; the original, its copies and weights_config are untouched."""
+    base = WeightSet.from_dict(DEFAULT_WEIGHTS)
+    boosted = base.with_overrides(OVERRIDES)
+
+    assert boosted.get_weights('trend')['PSAR_MULTIPLIER'] == 3.0
+    assert base.get_weights('trend')['PSAR_MULTIPLIER'] == DEFAULT_WEIGHTS['trend']['PSAR_MULTIPLIER']
+    assert boosted.get_weights('momentum')['MACD_SIGNAL_MULTIPLIER'] == 0.15
+
+    weights = boosted.get_weights('trend')
+    weights['PSAR_MULTIPLIER'] = 99.0
+    assert boosted.get_weights('trend')['PSAR_MULTIPLIER'] == 3.0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        boosted.categories = ()
+
+    assert base == WeightSet.from_dict(DEFAULT_WEIGHTS) and hash(base) == hash(WeightSet.from_dict(DEFAULT_WEIGHTS))
+    assert pickle.loads(pickle.dumps(boosted)) == boosted
+    assert WeightSet().get_weights('volume') == DEFAULT_WEIGHTS['volume']
+    assert WeightSet.current().get_weights('trend') == weights_config.get_weights('trend')
+
+
+def test_indicators_use_injected_weights():
+    """An indicator built with a WeightSet scores with it, not with weights_config."""
+    df = _frames(n_symbols=1)['S0']
+    boosted = WeightSet.current().with_overrides(OVERRIDES)
+
+    indicator = TrendIndicator(df, weights=boosted)
+    assert indicator.weights['PSAR_MULTIPLIER'] == 3.0
+    raw = indicator.get_raw_signals()
+    expected = sum(raw[name] * boosted.get_weights('trend')[key]
+                   for name, (_, key) in indicator.sub_indicators().items())
+    assert indicator.get_score().buy == pytest.approx(expected)
+    assert TrendIndicator(df).weights == weights_config.get_weights('trend')
+
+
+@pytest.mark.parametrize("strategy", ["baseline", "mean_reversion"])
+def test_concurrent_weight_sets_match_sequential(strategy):
+    """Two weight sets scored at once on threads give the same totals as one after the other."""
+    frames = _frames()
+    sets = [WeightSet.current(), WeightSet.current().with_overrides(OVERRIDES)]
+
+    def score_all(weights):
+        return {symbol: TechnicalAnalyzer.calculate_technical_score(df, strategy, weights=weights)
+                for symbol, df in frames.items()}
+
+    sequential = [score_all(weights) for weights in sets]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        concurrent = list(pool.map(score_all, sets * 2))
+
+    assert concurrent == sequential * 2
+    assert sequential[0] != sequential[1]
+
+    panel = UniversePanel.from_columns(
+        {symbol: days_to_columns(df.to_dict('records')) for symbol, df in frames.items()}
+    )
+    for weights, expected in zip(sets, sequential):
+        scores = CrossSectionalScorer(weights=weights).score_panel(panel, strategies=(strategy,))[strategy]
+        for symbol, components in expected.items():
+            assert scores[symbol]['total'] == pytest.approx(components['total'], abs=1e-6), symbol